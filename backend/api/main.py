@@ -33,6 +33,7 @@ from sqlalchemy import select
 
 try:
     import yfinance as yf
+    from tradingagents.dataflows.yf_gateway import get_yf_gateway
     from tradingagents.graph.trading_graph import TradingAgentsGraph
     from tradingagents.default_config import DEFAULT_CONFIG
     from cli.models import AnalystType
@@ -1712,15 +1713,16 @@ async def get_telegram_status():
 async def get_quote(ticker: str):
     """Fetch real-time quote data for a ticker."""
     try:
-        t = yf.Ticker(ticker)
+        # Shared gateway: concurrent requests for the same quote hit Yahoo once
+        gateway = get_yf_gateway()
         
         # Get fast price data
         # Try intraday 5m data first for "Live" feel
-        hist = t.history(period="1d", interval="5m")
+        hist = gateway.history(ticker, period="1d", interval="5m")
         
         if hist.empty or len(hist) < 2:
             # Fallback to 5d hourly if 1d is empty or too short (e.g. pre-market or just opened)
-            hist = t.history(period="5d", interval="60m")
+            hist = gateway.history(ticker, period="5d", interval="60m")
         
         if hist.empty:
              raise HTTPException(status_code=404, detail="Ticker not found or no data available")
@@ -1729,7 +1731,7 @@ async def get_quote(ticker: str):
         
         # Get metadata (slower, but useful)
         try:
-            info = t.info
+            info = gateway.info(ticker)
         except:
             info = {}
         
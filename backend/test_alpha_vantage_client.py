@@ -0,0 +1,146 @@
+import unittest
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# Add relevant paths
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from datetime import datetime, timezone
+
+from tradingagents.dataflows.alpha_vantage_common import (
+    AlphaVantageClient, AlphaVantageRateLimitError, DailyQuota, TokenBucket
+)
+from tradingagents.dataflows.alpha_vantage_cache import AlphaVantageCache, freshness_ttl
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeSession:
+    def __init__(self, text='{"Symbol": "AAPL"}', delay=0.0):
+        self.text = text
+        self.delay = delay
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def get(self, url, params=None, timeout=None):
+        with self._lock:
+            self.calls.append(params)
+        time.sleep(self.delay)
+        return FakeResponse(self.text)
+
+
+class TestAlphaVantageClient(unittest.TestCase):
+    def setUp(self):
+        os.environ.setdefault("ALPHA_VANTAGE_API_KEY", "test-key")
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def make_client(self, session, **kwargs):
+        kwargs.setdefault("requests_per_minute", 600)
+        kwargs.setdefault("requests_per_day", 25)
+        return AlphaVantageClient(session=session, quota_path=os.path.join(self.tmp.name, "quota.json"), **kwargs)
+
+    def test_identical_concurrent_requests_are_coalesced(self):
+        session = FakeSession(delay=0.2)
+        client = self.make_client(session)
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(client.request({"function": "OVERVIEW", "symbol": "AAPL"})))
+            for _ in range(5)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(session.calls), 1)
+        self.assertEqual(len(results), 5)
+        self.assertEqual(client.stats()["coalesced"], 4)
+        self.assertEqual(client.quota.remaining(), 24)
+
+    def test_daily_quota_fails_before_sending(self):
+        session = FakeSession()
+        client = self.make_client(session, requests_per_day=2)
+        client.request({"function": "OVERVIEW", "symbol": "A"})
+        client.request({"function": "OVERVIEW", "symbol": "B"})
+        with self.assertRaises(AlphaVantageRateLimitError):
+            client.request({"function": "OVERVIEW", "symbol": "C"})
+        self.assertEqual(len(session.calls), 2)
+        # The count survives a restart
+        self.assertEqual(DailyQuota(2, os.path.join(self.tmp.name, "quota.json")).remaining(), 0)
+
+    def test_rate_limit_response_raises(self):
+        session = FakeSession('{"Information": "We have detected your API key ... 25 requests per day."}')
+        client = self.make_client(session)
+        with self.assertRaises(AlphaVantageRateLimitError):
+            client.request({"function": "OVERVIEW", "symbol": "AAPL"})
+        self.assertEqual(client.quota.remaining(), 0)
+
+    def test_token_bucket_paces_requests(self):
+        now = [0.0]
+        slept = []
+        bucket = TokenBucket(5, clock=lambda: now[0], sleep=slept.append)
+        for _ in range(5):
+            self.assertEqual(bucket.acquire(), 0.0)
+        self.assertAlmostEqual(bucket.acquire(), 12.0)
+        with self.assertRaises(AlphaVantageRateLimitError):
+            bucket.acquire(max_wait=10)
+        now[0] = 60.0
+        self.assertEqual(bucket.acquire(), 0.0)
+
+
+class TestAlphaVantageCache(unittest.TestCase):
+    def setUp(self):
+        os.environ.setdefault("ALPHA_VANTAGE_API_KEY", "test-key")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = AlphaVantageCache(os.path.join(self.tmp.name, "av.sqlite3"))
+
+    def tearDown(self):
+        self.cache.store._conn.close()
+        self.tmp.cleanup()
+
+    def test_hits_cost_no_quota(self):
+        session = FakeSession('{"Symbol": "AAPL", "Name": "Apple"}')
+        client = AlphaVantageClient(
+            session=session, cache=self.cache, requests_per_minute=600, requests_per_day=25,
+            quota_path=os.path.join(self.tmp.name, "quota.json"),
+        )
+        params = {"function": "OVERVIEW", "symbol": "AAPL", "source": "trading_agents"}
+        first = client.request(params)
+        second = client.request(dict(params))
+        self.assertEqual(first, second)
+        self.assertEqual(len(session.calls), 1)
+        self.assertEqual(client.quota.remaining(), 24)
+        self.assertEqual(client.stats()["cache_hits"], 1)
+
+    def test_errors_are_not_cached(self):
+        session = FakeSession('{"Error Message": "Invalid API call."}')
+        client = AlphaVantageClient(session=session, cache=self.cache, requests_per_minute=600,
+                                    quota_path=os.path.join(self.tmp.name, "quota.json"))
+        client.request({"function": "OVERVIEW", "symbol": "NOPE"})
+        client.request({"function": "OVERVIEW", "symbol": "NOPE"})
+        self.assertEqual(len(session.calls), 2)
+
+    def test_statement_fresh_until_next_period_is_due(self):
+        now = datetime(2024, 6, 1, tzinfo=timezone.utc)
+        body = '{"quarterlyReports": [{"fiscalDateEnding": "2024-03-31"}], "annualReports": [{"fiscalDateEnding": "2023-12-31"}]}'
+        # 2024-03-31 + 92 + 45 days = 2024-08-15
+        self.assertAlmostEqual(freshness_ttl("statement", body, now) / 86400, 75, places=0)
+        # Next period overdue: recheck daily
+        later = datetime(2024, 9, 1, tzinfo=timezone.utc)
+        self.assertEqual(freshness_ttl("statement", body, later), 86400)
+        self.assertLessEqual(freshness_ttl("daily", "", now), 86400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+import threading
+
+# Add relevant paths
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from tradingagents.dataflows.artifact_writer import ArtifactWriter, write_batch
+
+
+class TestArtifactWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def path(self, *parts):
+        return os.path.join(self.tmp.name, *parts)
+
+    def read(self, *parts):
+        with open(self.path(*parts), encoding="utf-8") as f:
+            return f.read()
+
+    def test_writes_land_in_order_after_flush(self):
+        writer = ArtifactWriter()
+        self.addCleanup(writer.close)
+        log = self.path("log.txt")
+        writer.append_text(log, "old run\n")
+        writer.write_text(log, "reset\n")
+        for i in range(100):
+            writer.append_text(log, f"line {i}\n")
+        writer.write_json(self.path("nested", "choice.json"), {"symbol": "PTT.BK", "name": "ปตท."})
+        writer.write_jsonl(self.path("items.jsonl"), [{"a": 1}, {"a": 2}])
+        writer.write_jsonl(self.path("items.jsonl"), [{"a": 3}], append=True)
+        writer.flush()
+
+        lines = self.read("log.txt").splitlines()
+        self.assertEqual(lines[0], "reset")
+        self.assertEqual(lines[1:], [f"line {i}" for i in range(100)])
+        self.assertEqual(json.loads(self.read("nested", "choice.json"))["name"], "ปตท.")
+        self.assertEqual([json.loads(l)["a"] for l in self.read("items.jsonl").splitlines()], [1, 2, 3])
+        self.assertEqual(writer.writes, 105)
+
+    def test_payload_is_captured_at_submit_time(self):
+        writer = ArtifactWriter()
+        self.addCleanup(writer.close)
+        payload = {"value": 1}
+        writer.write_json(self.path("p.json"), payload)
+        payload["value"] = 2
+        writer.flush()
+        self.assertEqual(json.loads(self.read("p.json"))["value"], 1)
+
+    def test_close_drains_queue_and_later_writes_are_synchronous(self):
+        writer = ArtifactWriter(max_queue=4, batch_size=2)
+        threads = [threading.Thread(target=writer.append_text, args=(self.path("t.txt"), f"{i}\n")) for i in range(20)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        writer.close()
+        self.assertEqual(sorted(int(l) for l in self.read("t.txt").splitlines()), list(range(20)))
+
+        writer.append_text(self.path("t.txt"), "after\n")
+        self.assertTrue(self.read("t.txt").endswith("after\n"))
+
+    def test_disabled_writer_is_synchronous(self):
+        writer = ArtifactWriter(enabled=False)
+        writer.write_json(self.path("s.json"), [1, 2])
+        self.assertEqual(json.loads(self.read("s.json")), [1, 2])
+        self.assertIsNone(writer._thread)
+
+    def test_failed_write_does_not_stop_the_batch(self):
+        blocker = self.path("file")
+        with open(blocker, "w") as f:
+            f.write("x")
+        write_batch([(os.path.join(blocker, "bad.txt"), "w", "x"), (self.path("ok.txt"), "w", "ok")])
+        self.assertEqual(self.read("ok.txt"), "ok")
+
+
+if __name__ == '__main__':
+    unittest.main()
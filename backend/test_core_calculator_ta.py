@@ -11,8 +11,10 @@ sys.path.append(os.path.join(os.getcwd(), 'backend'))
 from tradingagents.dataflows.core_calculator import (
     calculate_sma, calculate_ema, calculate_rsi, calculate_macd,
     calculate_bollinger_bands, calculate_atr, calculate_vwma,
-    process_indicators_from_csv
+    process_indicators_from_csv, process_indicators,
+    resample_ohlcv, process_multi_timeframe
 )
+from tradingagents.dataflows.price_frame import PriceFrame
 
 class TestCoreCalculatorTA(unittest.TestCase):
     def setUp(self):
@@ -84,5 +86,42 @@ class TestCoreCalculatorTA(unittest.TestCase):
         self.assertIn("rsi", indicators)
         self.assertIn("macd", indicators)
 
+    def test_process_indicators_from_price_frame(self):
+        frame = PriceFrame("TEST", self.df, "unit-test", start_date="2023-01-01", end_date="2023-04-10")
+        indicators, df_res = process_indicators(frame)
+        self.assertNotIn("error", indicators)
+        self.assertEqual(frame.record_count, 100)
+        # The caller's frame is not modified
+        self.assertEqual(list(self.df.columns), ["Open", "High", "Low", "Close", "Volume"])
+
+        from_text, _ = process_indicators_from_csv(frame.render())
+        for key, value in indicators.items():
+            self.assertAlmostEqual(value, from_text[key], places=6)
+
+    def test_failed_price_frame(self):
+        indicators, df_res = process_indicators(PriceFrame.failed("TEST", "# Error: No data found for TEST.\n"))
+        self.assertIn("error", indicators)
+        self.assertIsNone(df_res)
+
+    def test_resample_weekly_bars(self):
+        weekly = resample_ohlcv(self.df, "weekly")
+        first_week = self.df.loc[:weekly.index[0]]
+        self.assertEqual(weekly["Open"].iloc[0], first_week["Open"].iloc[0])
+        self.assertEqual(weekly["High"].iloc[0], first_week["High"].max())
+        self.assertEqual(weekly["Low"].iloc[0], first_week["Low"].min())
+        self.assertEqual(weekly["Close"].iloc[0], first_week["Close"].iloc[-1])
+        self.assertEqual(weekly["Volume"].sum(), self.df["Volume"].sum())
+        # Labelled with the last bar of each period, so the newest bar is the newest day
+        self.assertEqual(weekly.index[-1], self.df.index[-1])
+
+    def test_multi_timeframe_from_one_frame(self):
+        results = process_multi_timeframe(self.df)
+        self.assertEqual(list(results), ["daily", "weekly", "monthly"])
+        self.assertEqual(results["daily"]["bars"], 100)
+        self.assertEqual(results["weekly"]["bars"], len(resample_ohlcv(self.df, "weekly")))
+        daily, _ = process_indicators(self.df)
+        self.assertAlmostEqual(results["daily"]["rsi"], daily["rsi"])
+        self.assertTrue(pd.notna(results["weekly"]["close_10_ema"]))
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,103 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# Add relevant paths
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from tradingagents.dataflows.fundamentals_history import FundamentalsHistoryStore
+
+DAY = 24 * 3600
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class Vendor:
+    """Annual statements for fiscal years ending Sep 30; records the `since` of every fetch."""
+
+    def __init__(self, years, revenue=100.0, growth=0.1):
+        self.years = list(years)
+        self.revenue = revenue
+        self.growth = growth
+        self.calls = []
+
+    def fetch(self, since):
+        self.calls.append(since)
+        inc, bs = {}, {}
+        for i, year in enumerate(self.years):
+            period = f"{year}-09-30"
+            revenue = self.revenue * (1 + self.growth) ** i
+            inc[period] = {"totalRevenue": revenue, "netIncome": revenue * 0.25, "operatingIncome": revenue * 0.3}
+            bs[period] = {"totalAssets": revenue * 3}
+        return {"balancesheet": bs, "cashflow": {}, "incomestatement": inc}
+
+
+class TestFundamentalsHistoryStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        # 2025-03-01 UTC
+        self.clock = Clock(1740787200.0)
+        self.store = FundamentalsHistoryStore(self.tmp.name, recheck_after=DAY, clock=self.clock)
+
+    def test_history_is_not_refetched_until_next_year_is_due(self):
+        vendor = Vendor(range(2015, 2025))
+        self.assertEqual(self.store.refresh("AAPL", "yfinance", "annual", vendor.fetch), 40)
+        self.clock.now += 30 * DAY
+        self.assertEqual(self.store.refresh("AAPL", "yfinance", "annual", vendor.fetch), 0)
+        self.assertEqual(vendor.calls, [None])
+
+        # FY2025 (ends 2025-09-30) is due after the filing lag, only newer rows are appended
+        self.clock.now += 300 * DAY
+        vendor.years.append(2025)
+        self.assertEqual(self.store.refresh("AAPL", "yfinance", "annual", vendor.fetch), 4)
+        self.assertEqual(vendor.calls, [None, "2024-09-30"])
+        sections = self.store.sections("AAPL", "yfinance")
+        self.assertEqual(len(sections["incomestatement"]), 11)
+        self.assertEqual(sections["balancesheet"]["2025-09-30"]["totalAssets"], vendor.fetch(None)["balancesheet"]["2025-09-30"]["totalAssets"])
+
+    def test_table_keeps_provenance_and_merges_sources(self):
+        self.store.refresh("MSFT", "alphavantage", "annual", Vendor(range(2015, 2025), revenue=200.0).fetch)
+        self.store.refresh("MSFT", "yfinance", "annual", Vendor(range(2021, 2025)).fetch)
+        frame = self.store.frame("MSFT")
+        self.assertEqual(set(frame["source"].astype(str)), {"alphavantage", "yfinance"})
+
+        # yfinance wins where it has a value, alphavantage fills the older years
+        revenue = self.store.item("MSFT", "totalRevenue")
+        self.assertEqual(len(revenue), 10)
+        self.assertAlmostEqual(revenue.loc["2021"], 100.0)
+        self.assertAlmostEqual(revenue.loc["2015"], 200.0)
+
+    def test_vectorized_queries(self):
+        self.store.refresh("AAPL", "yfinance", "annual", Vendor(range(2015, 2025)).fetch)
+        self.assertAlmostEqual(self.store.cagr("AAPL", "totalRevenue"), 0.1)
+        self.assertAlmostEqual(self.store.cagr("AAPL", "totalRevenue", years=3), 0.1)
+        margins = self.store.margins("AAPL")
+        self.assertTrue((margins["netIncomeMargin"] - 0.25).abs().max() < 1e-9)
+        self.assertTrue((margins["operatingIncomeMargin"] - 0.3).abs().max() < 1e-9)
+        self.assertTrue(margins["freeCashFlowMargin"].isna().all())
+        asset_turnover = self.store.ratio("AAPL", "totalRevenue", "totalAssets")
+        self.assertTrue((asset_turnover - 1 / 3).abs().max() < 1e-9)
+        self.assertAlmostEqual(self.store.growth("AAPL")["totalRevenue"].iloc[-1], 0.1)
+
+    def test_failed_fetch_keeps_history_and_is_retried(self):
+        self.store.refresh("AAPL", "yfinance", "annual", Vendor(range(2020, 2025)).fetch)
+
+        def broken(since):
+            raise ConnectionError("down")
+
+        self.clock.now += 400 * DAY
+        self.assertEqual(self.store.refresh("AAPL", "yfinance", "annual", broken), 0)
+        self.assertEqual(len(self.store.sections("AAPL", "yfinance")["incomestatement"]), 5)
+        self.assertEqual(self.store.refresh("AAPL", "yfinance", "annual", Vendor(range(2020, 2026)).fetch), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
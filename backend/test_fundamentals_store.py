@@ -0,0 +1,110 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# Add relevant paths
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from tradingagents.dataflows.fundamentals_store import FundamentalsStore, merge_hints, to_date_str
+
+DAY = 24 * 3600
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class Source:
+    """Counts overview / statement fetches; the fiscal period can be moved forward."""
+
+    def __init__(self, period="2024-09-30", hints=None):
+        self.period = period
+        self.hints = hints or {}
+        self.overview_calls = 0
+        self.statement_calls = 0
+
+    def overview(self):
+        self.overview_calls += 1
+        return {"marketCap": 1e12 + self.overview_calls}, dict(self.hints)
+
+    def statements(self):
+        self.statement_calls += 1
+        return {"balancesheet": {"totalAssets": 100.0}, "cashflow": {}, "incomestatement": {"netIncome": 10.0}}, self.period
+
+
+class TestFundamentalsStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        # 2025-03-01 UTC
+        self.clock = Clock(1740787200.0)
+        self.store = FundamentalsStore(self.tmp.name, overview_ttl=3600, recheck_after=DAY, clock=self.clock)
+
+    def get(self, src):
+        return self.store.get("AAPL", "yfinance", src.overview, src.statements)
+
+    def test_repeat_run_is_served_from_store(self):
+        src = Source()
+        first = self.get(src)
+        second = self.get(src)
+        self.assertEqual(first, second)
+        self.assertEqual((src.overview_calls, src.statement_calls), (1, 1))
+        self.assertEqual(second["balancesheet"]["totalAssets"], 100.0)
+
+    def test_overview_expires_but_statements_stay(self):
+        src = Source()
+        self.get(src)
+        self.clock.now += 2 * 3600
+        self.get(src)
+        self.assertEqual((src.overview_calls, src.statement_calls), (2, 1))
+
+    def test_newer_period_in_overview_refreshes_statements(self):
+        src = Source()
+        self.get(src)
+        src.hints = {"latest_period": "2025-09-30"}
+        self.clock.now += 2 * 3600
+        self.get(src)
+        self.assertEqual(src.statement_calls, 2)
+        # A fiscal year end a few days off is the same period
+        src.hints = {"latest_period": "2024-09-28"}
+        self.assertIsNone(self.store.statements_stale({"period": "2024-09-30", "statements_at": self.clock.now}, merge_hints({}, src.hints)))
+
+    def test_passed_earnings_date_refreshes_statements(self):
+        src = Source(hints={"earnings_date": "2025-03-05"})
+        self.get(src)
+        self.clock.now += 6 * DAY
+        # The upcoming date has moved on to the next quarter by now
+        src.hints = {"earnings_date": "2025-06-05"}
+        self.get(src)
+        self.assertEqual(src.statement_calls, 2)
+
+    def test_overdue_report_is_rechecked_daily(self):
+        src = Source(period="2023-09-30")  # next annual report due 2024-12-29
+        self.get(src)
+        self.clock.now += 3600
+        self.get(src)
+        self.assertEqual(src.statement_calls, 1)
+        self.clock.now += DAY
+        self.get(src)
+        self.assertEqual(src.statement_calls, 2)
+
+    def test_decision_reused_for_same_inputs(self):
+        raw = {"yfinance": {"overview": {"marketCap": 1.0}}}
+        self.assertIsNone(self.store.decision("AAPL", raw))
+        self.store.save_decision("AAPL", raw, {"chosen_source": "yfinance", "raw": raw})
+        self.assertEqual(self.store.decision("AAPL", raw)["chosen_source"], "yfinance")
+        self.assertIsNone(self.store.decision("AAPL", {"yfinance": {"overview": {"marketCap": 2.0}}}))
+
+    def test_to_date_str(self):
+        self.assertEqual(to_date_str(1727654400), "2024-09-30")
+        self.assertEqual(to_date_str("2024-09-28 00:00:00"), "2024-09-28")
+        self.assertIsNone(to_date_str("n/a"))
+
+
+if __name__ == '__main__':
+    unittest.main()
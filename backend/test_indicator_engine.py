@@ -0,0 +1,80 @@
+import unittest
+import numpy as np
+import pandas as pd
+import pandas_ta as ta
+import sys
+import os
+
+# Add relevant paths
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from tradingagents.dataflows.indicator_engine import (
+    SUPPORTED_INDICATORS, compute_indicators, indicator_window, render_indicator, cross_check
+)
+from tradingagents.dataflows.price_frame import PriceFrame
+
+
+def sample_ohlcv(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    return pd.DataFrame({
+        "Open": close + rng.normal(0, 0.3, n),
+        "High": close + rng.random(n),
+        "Low": close - rng.random(n),
+        "Close": close,
+        "Volume": rng.integers(1000, 5000, n).astype(float),
+    }, index=pd.date_range("2023-01-02", periods=n, freq="B"))
+
+
+class TestIndicatorEngine(unittest.TestCase):
+    def setUp(self):
+        self.df = sample_ohlcv()
+        self.values = compute_indicators(self.df)
+
+    def assertSeriesClose(self, a, b):
+        mask = a.notna() & b.notna()
+        self.assertTrue(mask.any())
+        np.testing.assert_allclose(a[mask].to_numpy(), b[mask].to_numpy(), rtol=1e-9)
+
+    def test_all_indicators_in_one_pass(self):
+        self.assertEqual(list(self.values.columns), SUPPORTED_INDICATORS)
+        self.assertTrue(self.values.iloc[-1].notna().all())
+
+    def test_matches_reference_implementations(self):
+        self.assertSeriesClose(self.values["close_50_sma"], ta.sma(self.df["Close"], 50))
+        self.assertSeriesClose(self.values["rsi"], ta.rsi(self.df["Close"], 14))
+        self.assertSeriesClose(self.values["vwma"], ta.vwma(self.df["Close"], self.df["Volume"], 20))
+        self.assertSeriesClose(
+            self.values["mfi"], ta.mfi(self.df["High"], self.df["Low"], self.df["Close"], self.df["Volume"], 14)
+        )
+        std = self.df["Close"].rolling(20).std()
+        self.assertSeriesClose(self.values["boll_ub"], self.df["Close"].rolling(20).mean() + 2 * std)
+        self.assertSeriesClose(self.values["macdh"], self.values["macd"] - self.values["macds"])
+
+    def test_price_frame_input_and_subset(self):
+        frame = PriceFrame("TEST", self.df, "unit-test")
+        subset = compute_indicators(frame, ["rsi", "atr"])
+        self.assertEqual(list(subset.columns), ["rsi", "atr"])
+        self.assertSeriesClose(subset["rsi"], self.values["rsi"])
+        with self.assertRaises(ValueError):
+            compute_indicators(self.df, ["not_an_indicator"])
+
+    def test_window_and_report(self):
+        curr_date = self.df.index[-1].strftime("%Y-%m-%d")
+        window = indicator_window(self.values, "rsi", curr_date, 7)
+        self.assertEqual(window[0][0], curr_date)  # newest first
+        self.assertLessEqual(len(window), 6)
+        report = render_indicator("rsi", window, curr_date, 7)
+        self.assertIn("## rsi values from", report)
+        self.assertIn(f"{curr_date}: {window[0][1]}", report)
+
+    def test_cross_check(self):
+        local = [("2024-01-02", 100.0), ("2024-01-03", 101.0)]
+        remote = [("2024-01-02", "100.5"), ("2024-01-03", "110"), ("2024-01-04", "N/A")]
+        result = cross_check(local, remote, tolerance=0.01)
+        self.assertEqual(result["compared"], 2)
+        self.assertAlmostEqual(result["agreement"], 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
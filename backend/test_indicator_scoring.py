@@ -0,0 +1,88 @@
+import unittest
+import sys
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Add relevant paths
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from tradingagents.dataflows.indicator_scoring import compute_core_indicator_score
+
+
+def fixture():
+    """Three providers in their native shapes: gaps, a None, a NaN, a 0/0 bar and outliers."""
+    data_yf = [
+        ("2024-01-02", 50.0), ("2024-01-03", 51.0), ("2024-01-04", 52.0), ("2024-01-05", None),
+        ("2024-01-08", 0.0), ("2024-01-09", 54.0), ("2024-01-10", 55.0),
+    ]
+    data_av = [
+        (datetime(2024, 1, 2), 50.2), (datetime(2024, 1, 3), 53.0), (datetime(2024, 1, 4), 52.1),
+        (datetime(2024, 1, 5), 49.0), (datetime(2024, 1, 8), 0.0), (datetime(2024, 1, 10), 55.3),
+    ]
+    data_tv = pd.DataFrame({
+        "datetime": pd.to_datetime(["2024-01-02", "2024-01-03", "2024-01-04", "2024-01-05",
+                                    "2024-01-08", "2024-01-09", "2024-01-11"]),
+        "rsi": [50.1, 51.2, 60.0, 49.3, 0.0, np.nan, 56.0],
+    })
+    return data_yf, data_av, data_tv
+
+
+class TestCoreIndicatorScore(unittest.TestCase):
+    """Outputs pinned from the per-date loop that the vectorized version replaced."""
+
+    def test_scores_match_previous_loop(self):
+        self.assertEqual(
+            compute_core_indicator_score(*fixture(), "rsi"),
+            ({"yahoo": 7, "alpha": 7, "tv": 6}, ["yahoo", "alpha"]),
+        )
+        self.assertEqual(
+            compute_core_indicator_score(*fixture(), "rsi", tolerance=0.05),
+            ({"yahoo": 8, "alpha": 9, "tv": 7}, ["alpha"]),
+        )
+
+    def test_fallbacks_match_previous_loop(self):
+        # Nothing agrees: most data points win
+        yf = [("2024-01-02", 1.0), ("2024-01-03", 2.0)]
+        av = [(datetime(2024, 1, 2), 5.0)]
+        self.assertEqual(
+            compute_core_indicator_score(yf, av, pd.DataFrame(), "rsi"),
+            ({"yahoo": 0, "alpha": 0, "tv": 0}, ["yahoo"]),
+        )
+        # No data at all
+        self.assertEqual(
+            compute_core_indicator_score([], [], None, "rsi"),
+            ({"yahoo": 0, "alpha": 0, "tv": 0}, ["alpha"]),
+        )
+        # TradingView frame without the indicator column is ignored
+        tv = pd.DataFrame({"datetime": pd.to_datetime(["2024-01-02"]), "macd": [1.0]})
+        self.assertEqual(compute_core_indicator_score(yf, [], tv, "rsi")[1], ["yahoo"])
+
+    def test_diagnostics(self):
+        scores, best, diagnostics = compute_core_indicator_score(*fixture(), "rsi", return_diagnostics=True)
+        self.assertEqual((scores, best), ({"yahoo": 7, "alpha": 7, "tv": 6}, ["yahoo", "alpha"]))
+        self.assertEqual(
+            list(diagnostics.columns),
+            ["yahoo", "alpha", "tv", "n_sources", "agree_pairs", "disagree_pairs", "max_rel_diff", "outliers"],
+        )
+        self.assertEqual(
+            [d.strftime("%Y-%m-%d") for d in diagnostics.index],
+            ["2024-01-02", "2024-01-03", "2024-01-04", "2024-01-05",
+             "2024-01-08", "2024-01-09", "2024-01-10", "2024-01-11"],
+        )
+        self.assertEqual(list(diagnostics["n_sources"]), [3, 3, 3, 2, 3, 1, 2, 1])
+        self.assertEqual(list(diagnostics["agree_pairs"]), [3, 1, 1, 1, 3, 0, 1, 0])
+        self.assertEqual(list(diagnostics["disagree_pairs"]), [0, 2, 2, 0, 0, 0, 0, 0])
+        self.assertEqual(list(diagnostics["outliers"]), ["", "alpha", "tv", "", "", "", "", ""])
+        np.testing.assert_allclose(
+            diagnostics["max_rel_diff"],
+            [0.2 / 50.2, 2.0 / 53.0, 8.0 / 60.0, 0.3 / 49.3, 0.0, 0.0, 0.3 / 55.3, 0.0],
+        )
+        self.assertEqual(diagnostics.loc["2024-01-04", "tv"], 60.0)
+        self.assertTrue(np.isnan(diagnostics.loc["2024-01-05", "yahoo"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
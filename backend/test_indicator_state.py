@@ -0,0 +1,66 @@
+import unittest
+import tempfile
+import shutil
+import numpy as np
+import pandas as pd
+import sys
+import os
+
+# Add relevant paths
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from tradingagents.dataflows.indicator_engine import SUPPORTED_INDICATORS, compute_indicators
+from tradingagents.dataflows.indicator_state import IndicatorState, IndicatorStateStore, verify_stream
+from test_indicator_engine import sample_ohlcv
+
+
+class TestIndicatorState(unittest.TestCase):
+    def setUp(self):
+        self.df = sample_ohlcv(600)
+        # Completed bars only (the store never persists today's bar)
+        self.df.index = pd.bdate_range(end="2024-06-28", periods=600)
+        self.root = tempfile.mkdtemp()
+        self.store = IndicatorStateStore(self.root, history_bars=10)
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_stream_matches_batch(self):
+        ok, deviation = verify_stream(self.df)
+        self.assertTrue(ok, deviation)
+        # EMA / Wilder updates replicate pandas exactly
+        for name in ("close_10_ema", "macd", "macds", "rsi", "atr"):
+            self.assertEqual(deviation[name], 0.0)
+
+    def test_incremental_refresh(self):
+        self.store.refresh("TEST", self.df.iloc[:500])
+        state = self.store.refresh("TEST", self.df.iloc[495:550])
+        self.assertEqual(state.bars, 550)
+        state = self.store.refresh("TEST", self.df.iloc[549:551])  # one new bar
+        self.assertEqual(state.bars, 551)
+
+        batch = compute_indicators(self.df.iloc[:551])
+        np.testing.assert_allclose(
+            state.history_frame().to_numpy(), batch.iloc[-10:].to_numpy(), rtol=1e-9
+        )
+
+    def test_refresh_requires_overlap(self):
+        self.store.refresh("TEST", self.df.iloc[:500])
+        self.assertIsNone(self.store.refresh("TEST", self.df.iloc[520:]))
+        # Rewritten history (e.g. split adjustment) does not connect either
+        adjusted = self.df.iloc[490:] / 2
+        self.assertIsNone(self.store.refresh("TEST", adjusted))
+        self.assertEqual(self.store.refresh("TEST", adjusted, rebuild=True).bars, len(adjusted))
+
+    def test_round_trip(self):
+        state = IndicatorState("TEST")
+        state.advance(self.df.iloc[:300])
+        restored = IndicatorState.from_dict(state.to_dict())
+        restored.advance(self.df.iloc[:320])
+        state.advance(self.df.iloc[:320])
+        self.assertEqual(restored.values(), state.values())
+        self.assertEqual(list(restored.values()), SUPPORTED_INDICATORS)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+import unittest
+import sys
+import os
+import tempfile
+from datetime import date, timedelta
+
+import pandas as pd
+
+# Add relevant paths
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from tradingagents.dataflows.ohlcv_store import (
+    OHLCVStore, frame_from_csv, provider_gap_fetcher, subtract_ranges, merge_ranges
+)
+
+
+class FakeProvider:
+    """Business-day bars with Close = day of month; records every request."""
+
+    def __init__(self):
+        self.requests = []
+
+    def __call__(self, symbol, start, end):
+        self.requests.append((start, end))
+        idx = pd.bdate_range(start, end, name="Date")
+        return pd.DataFrame({"Open": idx.day, "High": idx.day, "Low": idx.day, "Close": idx.day, "Volume": 100}, index=idx)
+
+
+class TestRanges(unittest.TestCase):
+    def test_merge_adjacent_and_overlapping(self):
+        self.assertEqual(
+            merge_ranges([("2024-01-05", "2024-01-10"), ("2024-01-01", "2024-01-04"), ("2024-01-08", "2024-01-12")]),
+            [("2024-01-01", "2024-01-12")],
+        )
+
+    def test_subtract(self):
+        covered = [("2024-01-05", "2024-01-10"), ("2024-01-15", "2024-01-20")]
+        self.assertEqual(
+            subtract_ranges("2024-01-01", "2024-01-31", covered),
+            [("2024-01-01", "2024-01-04"), ("2024-01-11", "2024-01-14"), ("2024-01-21", "2024-01-31")],
+        )
+        self.assertEqual(subtract_ranges("2024-01-06", "2024-01-09", covered), [])
+
+
+class TestOHLCVStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = OHLCVStore(self.tmp.name)
+        self.fetch = FakeProvider()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_only_gaps_are_fetched(self):
+        first = self.store.get_range("yfinance", "AAPL", "2024-01-01", "2024-03-31", self.fetch)
+        self.assertEqual(len(self.fetch.requests), 1)
+        self.assertEqual(len(first), len(pd.bdate_range("2024-01-01", "2024-03-31")))
+
+        # Fully covered slice: served locally
+        inner = self.store.get_range("yfinance", "AAPL", "2024-02-01", "2024-02-29", self.fetch)
+        self.assertEqual(len(self.fetch.requests), 1)
+        self.assertEqual(inner.index.min(), pd.Timestamp("2024-02-01"))
+
+        # Extended window: only the new days are requested
+        self.store.get_range("yfinance", "AAPL", "2024-01-01", "2024-04-05", self.fetch)
+        self.assertEqual(self.fetch.requests[-1], ("2024-04-01", "2024-04-05"))
+
+    def test_failed_gap_is_not_covered(self):
+        self.store.get_range("twelvedata", "AAPL", "2024-01-01", "2024-01-31", lambda *a: None)
+        self.assertEqual(self.store.coverage("twelvedata", "AAPL"), [])
+
+    def test_today_is_refetched(self):
+        today = date.today()
+        start = (today - timedelta(days=10)).isoformat()
+        self.store.get_range("yfinance", "MSFT", start, today.isoformat(), self.fetch)
+        self.store.get_range("yfinance", "MSFT", start, today.isoformat(), self.fetch)
+        self.assertEqual(self.fetch.requests[-1], (today.isoformat(), today.isoformat()))
+
+    def test_newest_first_csv_is_sorted(self):
+        # TwelveData CSV: newest bar first, one duplicated day
+        csv = ("Date,Open,High,Low,Close,Volume\n"
+               "2024-01-05,5,5,5,5,100\n2024-01-04,4,4,4,4,100\n2024-01-04,4.5,4.5,4.5,4.5,100\n"
+               "2024-01-03,3,3,3,3,100\n2024-01-02,2,2,2,2,100\n")
+        frame = frame_from_csv(csv)
+        self.assertTrue(frame.index.is_monotonic_increasing)
+        self.assertEqual(frame.loc["2024-01-04", "Close"], 4.5)
+
+        fetch = lambda symbol, start, end: frame_from_csv(csv).loc[start:end]
+        result = self.store.get_range("twelvedata", "AAPL", "2024-01-01", "2024-01-07", fetch)
+        self.assertEqual(list(result["Close"]), [2, 3, 4.5, 5])
+
+    def test_no_data_gap_is_covered(self):
+        # Provider function shape: (header, csv) with an exclusive end, or a message
+        requests = []
+
+        def provider(symbol, start, end):
+            requests.append((start, end))
+            return f"No data found for symbol '{symbol}' between {start} and {end}"
+
+        fetch_gap = provider_gap_fetcher("yfinance", provider)
+        # Saturday + Sunday
+        first = self.store.get_range("yfinance", "PTT.BK", "2024-01-06", "2024-01-07", fetch_gap)
+        self.assertTrue(first.empty)
+        self.assertEqual(requests, [("2024-01-06", "2024-01-08")])
+        self.assertEqual(self.store.coverage("yfinance", "PTT.BK"), [("2024-01-06", "2024-01-07")])
+
+        second = self.store.get_range("yfinance", "PTT.BK", "2024-01-06", "2024-01-07", fetch_gap)
+        self.assertTrue(second.empty)
+        self.assertEqual(len(requests), 1)
+
+    def test_provider_errors_leave_gap_uncovered(self):
+        replies = [
+            "No data found for AAPL in TwelveData between 2024-01-01 and 2024-01-06 (invalid symbol)",
+            "Missing TWELVEDATA_API_KEY in .env",
+            ("# header", "not,a,csv\n"),
+            ("# header", "Date,Open,High,Low,Close,Volume\nnot-a-date,1,1,1,1,1\n"),
+        ]
+
+        def provider(symbol, start, end):
+            reply = replies.pop(0) if replies else None
+            if reply is None:
+                raise ConnectionError("down")
+            return reply
+
+        fetch_gap = provider_gap_fetcher("twelvedata", provider)
+        for _ in range(5):
+            self.store.get_range("twelvedata", "AAPL", "2024-01-01", "2024-01-05", fetch_gap)
+        self.assertEqual(self.store.coverage("twelvedata", "AAPL"), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+import sys
+import os
+import tempfile
+import threading
+import time
+
+import pandas as pd
+
+# Add relevant paths
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from tradingagents.dataflows.provider_compare import fetch_providers, pick_best_source, score_providers
+from tradingagents.dataflows.vendor_ranking import VendorRanking
+from tradingagents.dataflows.vendor_router import FanoutPool
+
+
+def bars(days, shift=0.0):
+    index = pd.date_range("2024-01-01", periods=days, freq="D")
+    close = pd.Series(range(days), index=index, dtype=float) + 100 + shift
+    return pd.DataFrame({"Open": close - 1, "High": close + 1, "Low": close - 2, "Close": close, "Volume": 1000}, index=index)
+
+
+class TestProviderCompare(unittest.TestCase):
+    def setUp(self):
+        self.gate = threading.Event()
+        self.addCleanup(self.gate.set)
+        self.pool = FanoutPool(max_workers=3)
+
+    def slow(self):
+        self.gate.wait(5)
+        return bars(10, shift=50)
+
+    def wait_idle(self):
+        deadline = time.monotonic() + 5
+        while self.pool.stats()["in_flight"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_provider_missing_deadline_is_scored_zero_and_reported(self):
+        calls = {
+            "yfinance": lambda: bars(10),
+            "twelvedata": lambda: bars(9),
+            "tradingview": self.slow,
+        }
+        started = time.monotonic()
+        outcomes, missed = fetch_providers(calls, deadline=0.3, pool=self.pool)
+        self.assertLess(time.monotonic() - started, 2)
+        self.assertEqual(set(outcomes), {"yfinance", "twelvedata"})
+        self.assertEqual(missed, {"tradingview": "missed the 0.3s deadline"})
+        self.assertEqual(self.pool.stats()["abandoned"], 1)
+
+        frames = {name: outcomes.get(name) for name in calls}
+        score = score_providers(frames, "US")
+        # 9 shared bars x 2 columns, one other provider each
+        self.assertEqual(score, {"yfinance": 18, "twelvedata": 18, "tradingview": 0})
+        self.assertEqual(pick_best_source(score, frames), "yfinance")
+
+        # The miss is a failed call in the ranking, not a vendor that was never asked
+        with tempfile.TemporaryDirectory() as tmp:
+            ranking = VendorRanking(os.path.join(tmp, "ranking.json"), flush_interval=0)
+            latencies = {"yfinance": 0.1, "twelvedata": 0.2, "tradingview": None}
+            available = [name for name, df in frames.items() if df is not None]
+            ranking.record_comparison("US", "get_stock_data", score, latencies, available)
+            stats = ranking.snapshot()["US:get_stock_data"]["vendors"]["tradingview"]
+            self.assertEqual(stats["success"], 0.0)
+            self.assertEqual(stats["agreement"], 0.0)
+
+        # The late thread gives its slot back once the provider returns
+        self.gate.set()
+        self.wait_idle()
+        self.assertEqual(self.pool.stats(), {"max_workers": 3, "in_flight": 0, "abandoned": 0})
+
+    def test_busy_pool_reports_providers_instead_of_queueing(self):
+        self.pool = FanoutPool(max_workers=1)
+        _, missed = fetch_providers({"tradingview": self.slow}, deadline=0.1, pool=self.pool)
+        self.assertIn("deadline", missed["tradingview"])
+
+        asked = []
+        outcomes, missed = fetch_providers({"yfinance": lambda: asked.append(1) or bars(3)}, deadline=0.1, pool=self.pool)
+        self.assertEqual(outcomes, {})
+        self.assertIn("busy", missed["yfinance"])
+        self.assertEqual(asked, [])
+
+        self.gate.set()
+        self.wait_idle()
+        outcomes, missed = fetch_providers({"yfinance": lambda: bars(3)}, deadline=1, pool=self.pool)
+        self.assertEqual((len(outcomes["yfinance"]), missed), (3, {}))
+
+    def test_gold_scoring_tolerates_small_gaps(self):
+        frames = {"yfinance": bars(5), "twelvedata": bars(5, shift=0.3), "tradingview": None}
+        self.assertEqual(score_providers(frames, "GOLD"), {"yfinance": 10, "twelvedata": 10, "tradingview": 0})
+        self.assertEqual(score_providers(frames, "US"), {"yfinance": 0, "twelvedata": 0, "tradingview": 0})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+
+# Add relevant paths
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from tradingagents.dataflows.reconciliation import (
+    align_series,
+    agreement_scores,
+    consensus_frame,
+    consensus_series,
+    field_consensus,
+    match_mask,
+    unit_match_mask,
+)
+
+DATES = pd.to_datetime(["2024-01-02", "2024-01-03", "2024-01-04"])
+
+
+class TestReconciliation(unittest.TestCase):
+    def test_align_outer_joins_and_keeps_missing_sources(self):
+        matrix = align_series({
+            "a": pd.Series([1.0, 2.0], index=DATES[:2]),
+            "b": pd.Series([2.0, 3.0], index=DATES[1:]),
+            "c": None,
+        })
+        self.assertEqual(list(matrix.columns), ["a", "b", "c"])
+        self.assertEqual(len(matrix), 3)
+        self.assertTrue(matrix["c"].isna().all())
+
+    def test_tolerance_modes(self):
+        values = np.array([[100.0, 100.004, 100.4, np.nan]])
+        exact = match_mask(values, rounding=2)
+        self.assertTrue(exact[0, 0, 1])
+        self.assertFalse(exact[0, 0, 2])
+        self.assertFalse(exact[0, 0, 3])
+        self.assertFalse(exact[0, 0, 0])
+        self.assertTrue(match_mask(values, atol=0.5)[0, 0, 2])
+        self.assertTrue(match_mask(values, rtol=0.01)[0, 1, 2])
+        self.assertTrue(match_mask(np.array([[0.0, 0.0]]), rtol=0.01)[0, 0, 1])
+
+    def test_agreement_scores_count_pairs(self):
+        matrix = pd.DataFrame({"a": [1.0, 2.0, 3.0], "b": [1.0, 2.0, 9.0], "c": [1.0, 5.0, 3.0]}, index=DATES)
+        self.assertEqual(agreement_scores(matrix, rounding=2), {"a": 4, "b": 3, "c": 3})
+
+    def test_consensus_median_with_provenance(self):
+        matrix = pd.DataFrame({"a": [1.0, 2.0], "b": [1.0, 2.5], "c": [1.0, 2.0]}, index=DATES[:2])
+        result = consensus_series(matrix, rounding=2)
+        self.assertEqual(list(result["value"]), [1.0, 2.0])
+        self.assertEqual(list(result["sources"]), ["a,b,c", "a,c"])
+        self.assertEqual(list(result["n_sources"]), [3, 3])
+
+    def test_consensus_frame(self):
+        frames = {
+            "yf": pd.DataFrame({"Open": [1.0, 2.0], "Close": [1.5, 2.5], "Volume": [10, 20]}, index=DATES[:2]),
+            "tv": pd.DataFrame({"Open": [1.0, 2.2], "Close": [1.5, 2.5], "Volume": [12, 22]}, index=DATES[:2]),
+            "tw": pd.DataFrame({"Open": [1.0, 2.0], "Close": [1.5, 2.5], "Volume": [11, 21]}, index=DATES[:2]),
+            "empty": None,
+        }
+        result = consensus_frame(frames, ["Open", "Close", "Volume"], provenance_columns=["Open", "Close"], rounding=2)
+        self.assertEqual(list(result["Open"]), [1.0, 2.0])
+        self.assertEqual(list(result["Volume"]), [11.0, 21.0])
+        self.assertEqual(list(result["Sources"]), ["yf,tv,tw", "yf,tw"])
+
+
+    def test_unit_match_mask_allows_rescaled_values(self):
+        values = np.array([[3e12, 3e6, 2.9e12], [np.nan, 5.0, 5.0]])
+        mask = unit_match_mask(values, scales=[1, 1_000_000])
+        self.assertTrue(mask[0, 0, 1] and mask[0, 1, 0])
+        self.assertFalse(mask[0, 0, 2])
+        self.assertFalse(mask[1, 0, 1])
+        self.assertTrue(mask[1, 1, 2])
+
+    def test_field_consensus_picks_best_supported_value(self):
+        matrix = pd.DataFrame(
+            {"yf": [100.0, np.nan, 7.0, np.nan], "fh": [100.0, 2.0, 8.0, np.nan], "av": [90.0, 2.0, np.nan, np.nan]},
+            index=["revenue", "assets", "eps", "missing"],
+        )
+        result = field_consensus(matrix)
+        self.assertEqual(list(result["source"]), ["yf", "fh", "yf", None])
+        self.assertEqual(result.loc["revenue", "sources"], ["yf", "fh"])
+        self.assertEqual(result.loc["assets", "value"], 2.0)
+        self.assertEqual(list(result["n_reported"]), [3, 2, 2, 0])
+        self.assertAlmostEqual(result.loc["eps", "confidence"], 1 / 3)
+        self.assertEqual(result.loc["missing", "confidence"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
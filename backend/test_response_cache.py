@@ -0,0 +1,59 @@
+import unittest
+import sys
+import os
+import tempfile
+import time
+
+# Add relevant paths
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from tradingagents.dataflows.response_cache import ResponseCache, make_key
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ResponseCache(os.path.join(self.tmp.name, "cache.sqlite3"), max_entries=3)
+
+    def tearDown(self):
+        self.cache._conn.close()
+        self.tmp.cleanup()
+
+    def test_hit_and_miss_counters(self):
+        params = {"ticker": "AAPL", "curr_date": "2024-01-02"}
+        self.assertEqual(self.cache.get("get_news", "alpha_vantage", params), (False, None))
+        self.cache.set("get_news", "alpha_vantage", params, "headline", ttl=None)
+        self.assertEqual(self.cache.get("get_news", "alpha_vantage", params), (True, "headline"))
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"]), (1, 1, 1))
+
+    def test_key_depends_on_method_vendor_and_args(self):
+        params = {"ticker": "AAPL"}
+        self.assertNotEqual(make_key("get_news", "a", params), make_key("get_news", "b", params))
+        self.assertNotEqual(make_key("get_news", "a", params), make_key("get_global_news", "a", params))
+        self.assertEqual(make_key("m", "v", {"a": 1, "b": " x "}), make_key("m", "v", {"b": "x", "a": 1}))
+
+    def test_ttl_expiry(self):
+        self.cache.set("get_news", "v", {"t": 1}, "old", ttl=0.01)
+        time.sleep(0.02)
+        self.assertEqual(self.cache.get("get_news", "v", {"t": 1}), (False, None))
+
+    def test_lru_eviction(self):
+        for i in range(3):
+            self.cache.set("m", "v", {"i": i}, f"value-{i}", ttl=None)
+        # Touch entry 0 so entry 1 becomes the least recently used
+        self.cache.get("m", "v", {"i": 0})
+        self.cache.set("m", "v", {"i": 3}, "value-3", ttl=None)
+        self.assertTrue(self.cache.get("m", "v", {"i": 0})[0])
+        self.assertFalse(self.cache.get("m", "v", {"i": 1})[0])
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+    def test_errors_are_not_cached(self):
+        self.assertFalse(self.cache.set("m", "v", {}, "Error retrieving data: timeout", ttl=None))
+        self.assertFalse(self.cache.set("m", "v", {}, "", ttl=None))
+        self.assertFalse(self.cache.set("m", "v", {}, None, ttl=None))
+        self.assertTrue(self.cache.set("m", "v", {}, {"feed": [1]}, ttl=None))
+
+
+if __name__ == '__main__':
+    unittest.main()
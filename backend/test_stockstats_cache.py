@@ -0,0 +1,124 @@
+import unittest
+import sys
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import pandas as pd
+
+# Add relevant paths
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from tradingagents.dataflows import stockstats_utils
+from tradingagents.dataflows.ohlcv_store import OHLCVStore
+
+
+class FakeYahoo:
+    """Business-day adjusted bars (Close = 100 * factor); records every download."""
+
+    def __init__(self, factor=1.0):
+        self.factor = factor
+        self.requests = []
+
+    def __call__(self, symbol, start, end):
+        self.requests.append((start, end))
+        idx = pd.bdate_range(start, pd.Timestamp(end) - pd.Timedelta(days=1), name="Date")
+        close = 100.0 * self.factor
+        return pd.DataFrame({"Open": close, "High": close + 1, "Low": close - 1, "Close": close, "Volume": 1000}, index=idx)
+
+
+class TestStockstatsCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = OHLCVStore(self.tmp.name)
+        patcher = mock.patch.object(stockstats_utils, "_price_store", return_value=self.store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp.cleanup)
+        stockstats_utils._memo.clear()
+
+    def test_history_downloaded_once_then_served_from_store(self):
+        yahoo = FakeYahoo()
+        with mock.patch.object(stockstats_utils, "_download", yahoo):
+            first = stockstats_utils.load_price_history("TEST")
+            second = stockstats_utils.load_price_history("TEST")
+        self.assertEqual(len(yahoo.requests), 1)
+        self.assertFalse(first.empty)
+        pd.testing.assert_frame_equal(first, second)
+
+    def test_only_new_bars_are_fetched(self):
+        yahoo = FakeYahoo()
+        yesterday = pd.Timestamp.today().normalize() - pd.Timedelta(days=1)
+        start = yesterday - pd.DateOffset(years=stockstats_utils.HISTORY_YEARS)
+        # The store already holds everything except the last two weeks
+        self.store.get_range(stockstats_utils.STOCKSTATS_PROVIDER, "TEST", start, yesterday - pd.Timedelta(days=14),
+                             lambda s, a, b: yahoo(s, a, pd.Timestamp(b) + pd.Timedelta(days=1)))
+        yahoo.requests.clear()
+        with mock.patch.object(stockstats_utils, "_download", yahoo):
+            stockstats_utils.load_price_history("TEST")
+        self.assertEqual(len(yahoo.requests), 1)
+        fetched_from = pd.Timestamp(yahoo.requests[0][0])
+        self.assertGreater(fetched_from, yesterday - pd.Timedelta(days=30))
+
+    def test_adjustment_change_rebuilds_history(self):
+        old = FakeYahoo(factor=1.0)
+        yesterday = pd.Timestamp.today().normalize() - pd.Timedelta(days=1)
+        start = yesterday - pd.DateOffset(years=stockstats_utils.HISTORY_YEARS)
+        self.store.get_range(stockstats_utils.STOCKSTATS_PROVIDER, "TEST", start, yesterday - pd.Timedelta(days=14),
+                             lambda s, a, b: old(s, a, pd.Timestamp(b) + pd.Timedelta(days=1)))
+        # A dividend re-based every adjusted close
+        new = FakeYahoo(factor=0.98)
+        with mock.patch.object(stockstats_utils, "_download", new):
+            frame = stockstats_utils.load_price_history("TEST")
+        self.assertEqual(len(new.requests), 2)  # gap with overlap, then the full history
+        self.assertTrue((frame["Close"] == 98.0).all())
+
+    def test_indicator_series_uses_memoized_frame(self):
+        yahoo = FakeYahoo()
+        with mock.patch.object(stockstats_utils, "_download", yahoo):
+            sma = stockstats_utils.get_indicator_series("TEST", "close_10_sma")
+            rsi = stockstats_utils.get_indicator_series("TEST", "rsi")
+        self.assertEqual(len(yahoo.requests), 1)
+        self.assertEqual(set(sma), set(rsi))
+        last_day = max(sma)
+        self.assertAlmostEqual(float(sma[last_day]), 100.0)
+
+
+    def test_concurrent_indicators_on_shared_frame(self):
+        yahoo = FakeYahoo()
+        indicators = ["close_10_sma", "close_50_sma", "rsi", "macd", "boll", "atr", "close_10_ema", "mfi"]
+        barrier = threading.Barrier(len(indicators))
+
+        def compute(indicator):
+            barrier.wait(timeout=5)  # all threads hit the fresh frame at once
+            return stockstats_utils.get_indicator_series("TEST", indicator)
+
+        with mock.patch.object(stockstats_utils, "_download", yahoo):
+            with ThreadPoolExecutor(max_workers=len(indicators)) as pool:
+                results = list(pool.map(compute, indicators * 3))
+            stockstats_utils._memo.clear()
+            expected = [stockstats_utils.get_indicator_series("TEST", i) for i in indicators * 3]
+        self.assertEqual(len(yahoo.requests), 1)
+        self.assertEqual(results, expected)
+
+    def test_memo_is_bounded(self):
+        yahoo = FakeYahoo()
+        config = {"stockstats": {"memo_size": 2}, "data_cache_dir": self.tmp.name}
+        with mock.patch.object(stockstats_utils, "_download", yahoo), \
+                mock.patch.object(stockstats_utils, "get_config", return_value=config):
+            for symbol in ("A", "B", "A", "C"):
+                stockstats_utils.get_indicator_series(symbol, "close_10_sma")
+        self.assertEqual(list(stockstats_utils._memo), ["A", "C"])
+
+    def test_frame_copy_does_not_change_memo(self):
+        yahoo = FakeYahoo()
+        with mock.patch.object(stockstats_utils, "_download", yahoo):
+            frame = stockstats_utils.get_stockstats_frame("TEST")
+            frame["close_20_sma"]
+        self.assertNotIn("close_20_sma", stockstats_utils._memo["TEST"][1].columns)
+
+
+if __name__ == '__main__':
+    unittest.main()
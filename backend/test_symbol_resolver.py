@@ -0,0 +1,87 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# Add relevant paths
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from tradingagents.dataflows.symbol_resolver import SymbolResolver, seed_from_stock_lists, vendor_codes
+
+STOCK_LISTS = {
+    "US": [{"symbol": "AAPL", "name": "Apple Inc.", "exchange": "NASDAQ"}],
+    "TH": [{"symbol": "PTT.BK", "name": "PTT Public Company", "exchange": "SET"}],
+    "CN": [
+        {"symbol": "BABA", "name": "Alibaba Group (US Listed)", "exchange": "NYSE"},
+        {"symbol": "600519.SS", "name": "Kweichow Moutai", "exchange": "SSE"},
+    ],
+}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeProbe:
+    def __init__(self, listed):
+        self.listed = set(listed)
+        self.batches = []
+
+    def __call__(self, listings):
+        self.batches.append(list(listings))
+        return self.listed & set(listings)
+
+
+class TestSymbolResolver(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "symbols.json")
+        self.clock = FakeClock()
+        self.probe = FakeProbe({"KBANK.BK", "0700.HK", "MSFT"})
+        self.resolver = SymbolResolver(
+            path=self.path, negative_ttl=60, seed=seed_from_stock_lists(STOCK_LISTS),
+            probe=self.probe, clock=self.clock,
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_rules_and_seed_need_no_probe(self):
+        self.assertEqual(self.resolver.market("GC=F"), "GOLD")
+        self.assertEqual(self.resolver.market("0700.HK"), "HK")
+        self.assertEqual(self.resolver.market("ptt"), "TH")
+        self.assertEqual(self.resolver.market("BABA"), "US")
+        self.assertEqual(self.resolver.market("AAPL"), "US")
+        self.assertEqual(self.probe.batches, [])
+
+    def test_unknown_symbols_probed_in_one_batch_and_persisted(self):
+        results = self.resolver.resolve_many(["KBANK", "700", "MSFT"])
+        self.assertEqual({s: r["market"] for s, r in results.items()}, {"KBANK": "TH", "700": "HK", "MSFT": "US"})
+        self.assertEqual(len(self.probe.batches), 1)
+
+        reloaded = SymbolResolver(path=self.path, probe=self.probe)
+        self.assertEqual(reloaded.lookup("KBANK")["market"], "TH")
+        self.assertEqual(len(self.probe.batches), 1)
+
+    def test_negative_cache_expires(self):
+        self.assertFalse(self.resolver.resolve("NOPE")["valid"])
+        self.resolver.resolve("NOPE")
+        self.assertEqual(len(self.probe.batches), 1)
+        self.clock.now += 61
+        self.resolver.resolve("NOPE")
+        self.assertEqual(len(self.probe.batches), 2)
+
+    def test_vendor_codes(self):
+        self.assertEqual(vendor_codes("700", "HK")["tradingview"], "HKEX:700")
+        self.assertEqual(vendor_codes("600519", "CN")["alphavantage"], "600519.SH")
+        self.assertEqual(vendor_codes("000858.SZ", "CN")["tradingview"], "SZSE:000858")
+        self.assertEqual(vendor_codes("PTT.BK", "TH")["twelvedata"], "PTT")
+        self.assertEqual(vendor_codes("XAUUSD", "GOLD")["yfinance"], "GC=F")
+
+
+if __name__ == '__main__':
+    unittest.main()
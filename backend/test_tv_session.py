@@ -0,0 +1,78 @@
+import unittest
+import sys
+import os
+import threading
+import time
+from datetime import date
+
+# Add relevant paths
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from tradingagents.dataflows.tv_session import TVSessionPool, bars_needed, MAX_BARS
+
+
+class FakeDatafeed:
+    """Records concurrent use; get_hist fails for the symbol "BAD"."""
+
+    active = 0
+    overlaps = 0
+    lock = threading.Lock()
+
+    def get_hist(self, symbol, exchange, interval, n_bars):
+        with FakeDatafeed.lock:
+            FakeDatafeed.active += 1
+            busy = getattr(self, "busy", False)
+            if busy:
+                FakeDatafeed.overlaps += 1
+            self.busy = True
+        time.sleep(0.01)
+        with FakeDatafeed.lock:
+            self.busy = False
+            FakeDatafeed.active -= 1
+        if symbol == "BAD":
+            raise ConnectionError("socket closed")
+        return n_bars
+
+
+class TestBarsNeeded(unittest.TestCase):
+    def test_daily_counts_weekdays_to_today(self):
+        # Mon 2025-06-02 .. Fri 2025-06-13 = 10 weekdays
+        self.assertEqual(bars_needed("2025-06-02", "1d", margin=0, today=date(2025, 6, 13)), 10)
+        self.assertEqual(bars_needed("2025-06-02", "1d", warmup_bars=200, margin=5, today=date(2025, 6, 13)), 215)
+
+    def test_one_year_is_far_below_the_old_5000(self):
+        n = bars_needed("2024-06-13", "1d", today=date(2025, 6, 13))
+        self.assertGreaterEqual(n, 252)
+        self.assertLess(n, 300)
+
+    def test_other_intervals_and_cap(self):
+        self.assertEqual(bars_needed("2025-01-01", "1M", margin=0, today=date(2025, 6, 13)), 6)
+        self.assertEqual(bars_needed("2025-06-02", "1h", margin=0, today=date(2025, 6, 3)), 48)
+        self.assertEqual(bars_needed("1990-01-01", "1d", today=date(2025, 6, 13)), MAX_BARS)
+        with self.assertRaises(ValueError):
+            bars_needed("2025-01-01", "2d")
+
+
+class TestSessionPool(unittest.TestCase):
+    def test_sessions_are_reused_and_never_shared(self):
+        pool = TVSessionPool(size=2, factory=FakeDatafeed)
+        threads = [threading.Thread(target=pool.get_hist, args=("AAPL", "NASDAQ", None, 10)) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertLessEqual(pool.created, 2)
+        self.assertEqual(pool.created + pool.reused, 8)
+        self.assertEqual(FakeDatafeed.overlaps, 0)
+
+    def test_failed_session_is_replaced(self):
+        pool = TVSessionPool(size=1, factory=FakeDatafeed)
+        with self.assertRaises(ConnectionError):
+            pool.get_hist("BAD", "NASDAQ", None, 10)
+        self.assertEqual(pool.get_hist("AAPL", "NASDAQ", None, 10), 10)
+        self.assertEqual(pool.stats()["discarded"], 1)
+        self.assertEqual(pool.created, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import unittest
+import sys
+import os
+
+# Add relevant paths
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from tradingagents.dataflows.twelve_data import (
+    TwelveDataClient, CreditBudget, TwelveDataRateLimitError
+)
+
+
+def rows(days, close):
+    return [{"datetime": f"2025-01-{d:02d}", "open": str(close), "high": str(close + 1),
+             "low": str(close - 1), "close": str(close), "volume": "100"} for d in reversed(days)]
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+class FakeSession:
+    """Answers time_series like the API: wrapped per symbol only for multi-symbol requests."""
+
+    def __init__(self, missing=()):
+        self.calls = []
+        self.missing = set(missing)
+
+    def get(self, url, params=None, timeout=None):
+        symbols = params["symbol"].split(",")
+        self.calls.append(symbols)
+
+        def one(i, s):
+            if s in self.missing:
+                return {"status": "error", "code": 404, "message": f"**symbol** {s} not found"}
+            return {"meta": {"symbol": s}, "values": rows(range(2, 11), 100 + i), "status": "ok"}
+
+        if len(symbols) == 1:
+            return FakeResponse(one(0, symbols[0]))
+        return FakeResponse({s: one(i, s) for i, s in enumerate(symbols)})
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class TestCreditBudget(unittest.TestCase):
+    def test_waits_for_the_window_to_roll(self):
+        clock = FakeClock()
+        budget = CreditBudget(8, clock=clock, sleep=clock.sleep)
+        self.assertEqual(budget.spend(8), 0.0)
+        clock.now = 10
+        self.assertAlmostEqual(budget.spend(3), 50.0)
+
+    def test_fails_fast_past_max_wait(self):
+        clock = FakeClock()
+        budget = CreditBudget(8, clock=clock, sleep=clock.sleep)
+        budget.spend(8)
+        with self.assertRaises(TwelveDataRateLimitError):
+            budget.spend(1, max_wait=5)
+
+
+class TestBatchTimeSeries(unittest.TestCase):
+    def make_client(self, **kwargs):
+        clock = FakeClock()
+        self.session = FakeSession(**kwargs)
+        return TwelveDataClient(api_key="test", credits_per_minute=8, max_symbols_per_call=8,
+                                session=self.session, budget=CreditBudget(8, clock=clock, sleep=clock.sleep))
+
+    def test_watchlist_is_grouped_into_few_calls(self):
+        client = self.make_client()
+        watchlist = [(f"S{i}", "2025-01-03", "2025-01-09") for i in range(20)]
+        frames = client.batch_time_series(watchlist)
+        self.assertEqual(len(self.session.calls), 3)  # 8 + 8 + 4 symbols
+        self.assertEqual(set(frames), {s for s, _, _ in watchlist})
+        frame = frames["S0"]
+        self.assertEqual(str(frame.data.index[0].date()), "2025-01-03")
+        self.assertEqual(str(frame.data.index[-1].date()), "2025-01-09")
+        self.assertEqual(frame.source, "twelvedata")
+
+    def test_ranges_are_sliced_back_per_symbol(self):
+        client = self.make_client()
+        frames = client.batch_time_series([("A", "2025-01-02", "2025-01-04"), ("B", "2025-01-08", "2025-01-10")])
+        self.assertEqual(len(self.session.calls), 1)
+        self.assertEqual(frames["A"].record_count, 3)
+        self.assertEqual(str(frames["B"].data.index[0].date()), "2025-01-08")
+
+    def test_symbol_errors_stay_per_symbol(self):
+        client = self.make_client(missing={"BAD"})
+        frames = client.batch_time_series([("AAPL", "2025-01-02", "2025-01-10"), ("BAD", "2025-01-02", "2025-01-10")])
+        self.assertFalse(frames["AAPL"].empty)
+        self.assertIn("not found", frames["BAD"].error)
+
+    def test_single_symbol_response_is_unwrapped(self):
+        client = self.make_client()
+        frame = client.time_series("AAPL", "2025-01-02", "2025-01-10")
+        self.assertEqual(len(frame), 9)
+        self.assertTrue(frame.index.is_monotonic_increasing)
+
+
+if __name__ == '__main__':
+    unittest.main()
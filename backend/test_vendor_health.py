@@ -0,0 +1,96 @@
+import unittest
+import sys
+import os
+
+# Add relevant paths
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from tradingagents.dataflows.vendor_health import (
+    CircuitBreaker, VendorHealthRegistry, CLOSED, OPEN, HALF_OPEN
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker(failure_threshold=3, cooldown_seconds=60, clock=self.clock)
+
+    def test_opens_after_consecutive_failures(self):
+        for _ in range(2):
+            self.breaker.record_failure(0.1)
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.breaker.record_failure(0.1)
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertFalse(self.breaker.allow())
+
+    def test_half_open_allows_single_probe(self):
+        for _ in range(3):
+            self.breaker.record_failure()
+        self.clock.now = 61
+        self.assertTrue(self.breaker.allow())
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.assertFalse(self.breaker.allow())
+
+    def test_probe_success_closes(self):
+        for _ in range(3):
+            self.breaker.record_failure()
+        self.clock.now = 61
+        self.breaker.allow()
+        self.breaker.record_success(0.2)
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertTrue(self.breaker.allow())
+
+    def test_probe_failure_reopens(self):
+        for _ in range(3):
+            self.breaker.record_failure()
+        self.clock.now = 61
+        self.breaker.allow()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertFalse(self.breaker.allow())
+
+    def test_error_rate_trips(self):
+        breaker = CircuitBreaker(failure_threshold=10, error_rate_threshold=0.5, min_calls=4, clock=self.clock)
+        breaker.record_success()
+        breaker.record_failure()
+        breaker.record_success()
+        self.assertEqual(breaker.state, CLOSED)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, OPEN)
+
+    def test_forced_cooldown(self):
+        self.breaker.record_failure(cooldown=900)
+        self.assertEqual(self.breaker.state, OPEN)
+        self.clock.now = 120
+        self.assertFalse(self.breaker.allow())
+        self.clock.now = 901
+        self.assertTrue(self.breaker.allow())
+
+
+class TestVendorHealthRegistry(unittest.TestCase):
+    def test_breakers_are_keyed_by_vendor_and_method(self):
+        registry = VendorHealthRegistry({"failure_threshold": 1})
+        registry.record_failure("alpha_vantage", "get_news")
+        self.assertFalse(registry.allow("alpha_vantage", "get_news"))
+        self.assertTrue(registry.allow("alpha_vantage", "get_fundamentals"))
+        self.assertTrue(registry.allow("yfinance", "get_news"))
+
+    def test_rate_limit_uses_long_cooldown(self):
+        registry = VendorHealthRegistry({"rate_limit_cooldown_seconds": 1234})
+        registry.record_failure("alpha_vantage", "get_news", 0.5, rate_limited=True)
+        snap = registry.snapshot()["alpha_vantage:get_news"]
+        self.assertEqual(snap["state"], OPEN)
+        self.assertGreater(snap["retry_in"], 1000)
+        self.assertEqual(snap["avg_latency"], 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import unittest
+import sys
+import os
+import threading
+import time
+from unittest import mock
+
+# Add relevant paths
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from tradingagents.dataflows import vendor_pool
+from tradingagents.dataflows.vendor_pool import VendorPool, fetch_overview_and_statements, run_concurrently
+
+
+class Gauge:
+    """Counts requests in flight and remembers the peak."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.current = 0
+        self.peak = 0
+        self.threads = set()
+
+    def request(self, value, delay=0.05, error=None):
+        with self.lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+            self.threads.add(threading.current_thread().name)
+        try:
+            time.sleep(delay)
+            if error is not None:
+                raise error
+            return value
+        finally:
+            with self.lock:
+                self.current -= 1
+
+
+class TestVendorPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = VendorPool("yfinance", max_workers=2)
+        patcher = mock.patch.object(vendor_pool, "get_vendor_pool", lambda vendor: self.pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.gauge = Gauge()
+
+    def overview(self):
+        got = run_concurrently("yfinance", {
+            "fast": lambda: self.gauge.request({"marketCap": 1.0}),
+            "info": lambda: self.gauge.request({"name": "PTT"}),
+        })
+        return {**got["fast"], **got["info"]}
+
+    def statements(self, fail=None):
+        got = run_concurrently("yfinance", {
+            section: (lambda section=section: self.gauge.request(
+                {"2024-12-31": {"value": 1.0}}, error=ValueError(section) if section == fail else None))
+            for section in ("balancesheet", "cashflow", "incomestatement")
+        })
+        for part in got.values():
+            if isinstance(part, Exception):
+                raise part
+        return got
+
+    def test_nested_fan_out_respects_the_vendor_cap(self):
+        result = fetch_overview_and_statements("yfinance", self.overview, self.statements)
+        self.assertEqual(result["overview"], {"marketCap": 1.0, "name": "PTT"})
+        self.assertEqual(set(result), {"overview", "balancesheet", "cashflow", "incomestatement"})
+        self.assertLessEqual(self.gauge.peak, 2)
+        # Every request ran on the vendor's own workers, none on the caller's thread
+        self.assertTrue(all(name.startswith("fund-yfinance") for name in self.gauge.threads))
+
+    def test_concurrent_callers_share_the_cap(self):
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(
+                fetch_overview_and_statements("yfinance", self.overview, self.statements)))
+            for _ in range(4)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(10)
+        self.assertEqual(len(results), 4)
+        self.assertLessEqual(self.gauge.peak, 2)
+
+    def test_failed_part_is_reported_for_that_part_only(self):
+        result = fetch_overview_and_statements(
+            "yfinance", self.overview, lambda: self.statements(fail="cashflow"))
+        self.assertEqual(result, {"overview": {"marketCap": 1.0, "name": "PTT"}})
+
+        def broken_overview():
+            raise ConnectionError("quote endpoint down")
+
+        result = fetch_overview_and_statements("yfinance", broken_overview, self.statements)
+        self.assertEqual(result["overview"], {})
+        self.assertEqual(result["incomestatement"], {"2024-12-31": {"value": 1.0}})
+
+    def test_sub_request_exception_is_returned_per_call(self):
+        got = run_concurrently("yfinance", {
+            "ok": lambda: self.gauge.request(1),
+            "bad": lambda: self.gauge.request(2, error=KeyError("x")),
+        })
+        self.assertEqual(got["ok"], 1)
+        self.assertIsInstance(got["bad"], KeyError)
+
+
+if __name__ == '__main__':
+    unittest.main()
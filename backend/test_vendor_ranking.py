@@ -0,0 +1,89 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+import threading
+
+# Add relevant paths
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from tradingagents.dataflows.vendor_ranking import VendorRanking
+
+VENDORS = ["yfinance", "twelvedata", "tradingview"]
+
+
+class TestVendorRanking(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "ranking.json")
+        self.ranking = VendorRanking(self.path, warmup_samples=2, explore_every=5)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def compare(self, scores, latencies):
+        self.ranking.record_comparison("US", "get_stock_data", scores, latencies, [v for v in scores if scores[v] > 0])
+
+    def test_full_comparison_until_warm(self):
+        self.assertIsNone(self.ranking.plan("US", "get_stock_data", VENDORS))
+        self.compare({"yfinance": 10, "twelvedata": 8, "tradingview": 10}, {"yfinance": 1.0, "twelvedata": 0.5, "tradingview": 2.0})
+        self.compare({"yfinance": 10, "twelvedata": 8, "tradingview": 10}, {"yfinance": 1.0, "twelvedata": 0.5, "tradingview": 2.0})
+        # Equal agreement -> the faster vendor ranks first; the less accurate one last
+        self.assertEqual(self.ranking.plan("US", "get_stock_data", VENDORS), ["yfinance", "tradingview", "twelvedata"])
+
+    def test_periodic_exploration(self):
+        for _ in range(2):
+            self.compare({"yfinance": 5, "twelvedata": 5, "tradingview": 5}, {"yfinance": 1.0})
+        plans = [self.ranking.plan("US", "get_stock_data", VENDORS) for _ in range(5)]
+        self.assertEqual(sum(p is None for p in plans), 1)
+
+    def test_failed_vendor_drops_and_markets_are_separate(self):
+        for _ in range(2):
+            self.compare({"yfinance": 0, "twelvedata": 4, "tradingview": 4}, {"yfinance": None, "twelvedata": 2.0, "tradingview": 1.0})
+        self.assertEqual(self.ranking.rank("US", "get_stock_data", VENDORS), ["tradingview", "twelvedata", "yfinance"])
+        self.assertEqual(self.ranking.rank("TH", "get_stock_data", VENDORS), VENDORS)
+
+    def test_persisted_between_instances(self):
+        self.compare({"yfinance": 3, "twelvedata": 1, "tradingview": 0}, {"yfinance": 0.2, "twelvedata": 0.1})
+        reloaded = VendorRanking(self.path)
+        self.assertEqual(reloaded.rank("US", "get_stock_data", VENDORS)[0], "yfinance")
+        self.assertEqual(reloaded.snapshot()["US:get_stock_data"]["comparisons"], 1)
+
+
+    def test_writes_are_debounced_and_flushed(self):
+        now = [0.0]
+        ranking = VendorRanking(self.path, flush_interval=5, clock=lambda: now[0])
+        for _ in range(10):
+            ranking.record_call("US", "get_stock_data", "yfinance", 0.5, True)
+        self.assertEqual(ranking.saves, 1)  # the first change, then nothing until the interval passed
+        now[0] = 6.0
+        ranking.record_call("US", "get_stock_data", "yfinance", 0.5, True)
+        self.assertEqual(ranking.saves, 2)
+        ranking.record_call("US", "get_stock_data", "yfinance", 0.5, True)
+        ranking.flush()
+        ranking.flush()  # nothing new
+        self.assertEqual(ranking.saves, 3)
+        self.assertEqual(VendorRanking(self.path).snapshot()["US:get_stock_data"]["vendors"]["yfinance"]["samples"], 12)
+
+    def test_concurrent_saves_keep_file_valid(self):
+        ranking = VendorRanking(self.path, flush_interval=0)
+
+        def work(i):
+            for _ in range(20):
+                ranking.record_call("US", "get_stock_data", VENDORS[i % 3], 0.1 * i, True)
+
+        threads = [threading.Thread(target=work, args=(i,)) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        ranking.flush()
+        with open(self.path, encoding="utf-8") as f:
+            data = json.load(f)
+        self.assertEqual(sum(v["samples"] for v in data["US:get_stock_data"]["vendors"].values()), 160)
+        self.assertEqual([n for n in os.listdir(self.tmp.name) if n.endswith(".tmp")], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,266 @@
+import unittest
+import sys
+import os
+import asyncio
+import tempfile
+import threading
+import time
+from unittest import mock
+
+# Add relevant paths
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from tradingagents.dataflows import vendor_router
+from tradingagents.dataflows.vendor_health import VendorHealthRegistry
+from tradingagents.dataflows.response_cache import ResponseCache
+
+
+def vendor(name, value=None, delay=0.0, error=None, gate=None):
+    """Stub vendor implementation: optional delay, failure or wait on an Event."""
+    def impl(ticker):
+        if gate is not None:
+            gate.wait(5)
+        if delay:
+            time.sleep(delay)
+        if error is not None:
+            raise error
+        return value if value is not None else f"{name}:{ticker}"
+    impl.__name__ = name
+    return impl
+
+
+class TestRouteConcurrent(unittest.TestCase):
+    def setUp(self):
+        self.health = VendorHealthRegistry({"failure_threshold": 100, "min_calls": 100})
+        self.pool = vendor_router.FanoutPool(max_workers=4)
+        for target, value in (
+            ("get_health_registry", lambda: self.health),
+            ("get_response_cache", lambda: None),
+            ("get_fanout_pool", lambda: self.pool),
+        ):
+            patcher = mock.patch.object(vendor_router, target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.gate = threading.Event()
+        self.addCleanup(self.gate.set)
+
+    def fan_out(self, impls, mode, **policy):
+        policy = {"mode": mode, "quorum": 1, "timeout": None, **policy}
+        return vendor_router.route_concurrent("get_news", "news_data", {"local": impls}, ["local"], policy, ("ptt",), {})
+
+    def snapshot(self, name):
+        return self.health.snapshot()[f"{name}:get_news"]
+
+    def test_first_success_returns_fastest_and_abandons_the_rest(self):
+        started = time.monotonic()
+        results = self.fan_out([vendor("hung", gate=self.gate), vendor("fast", delay=0.01)], "first_success")
+        self.assertEqual(results, ["fast:ptt"])
+        self.assertLess(time.monotonic() - started, 2)
+        self.assertEqual(self.pool.stats()["abandoned"], 1)
+
+        # The abandoned call gives its worker back once it returns
+        self.gate.set()
+        deadline = time.monotonic() + 5
+        while self.pool.stats()["in_flight"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.pool.stats(), {"max_workers": 4, "in_flight": 0, "abandoned": 0})
+
+    def test_quorum_keeps_configuration_order(self):
+        impls = [
+            vendor("slow", delay=0.2),
+            vendor("broken", error=ConnectionError("down")),
+            vendor("a", delay=0.02),
+            vendor("b", delay=0.05),
+        ]
+        self.assertEqual(self.fan_out(impls, "quorum", quorum=2), ["a:ptt", "b:ptt"])
+        self.assertEqual(self.snapshot("broken")["failures"], 1)
+
+    def test_gather_all_collects_every_success(self):
+        impls = [vendor("a", delay=0.05), vendor("broken", error=ValueError("bad")), vendor("b")]
+        self.assertEqual(self.fan_out(impls, "gather_all"), ["a:ptt", "b:ptt"])
+        self.assertEqual(self.snapshot("a")["failures"], 0)
+        self.assertEqual(self.snapshot("broken")["failures"], 1)
+
+    def test_timeout_is_measured_per_call(self):
+        impls = [vendor("hung", gate=self.gate), vendor("ok", delay=0.05)]
+        results = self.fan_out(impls, "gather_all", timeout=0.3)
+        self.assertEqual(results, ["ok:ptt"])
+        hung = self.snapshot("hung")
+        self.assertEqual(hung["failures"], 1)
+        self.assertGreaterEqual(hung["avg_latency"], 0.3)
+        self.assertLess(hung["avg_latency"], 1.5)
+        # Latency of a success is its own run time, not time since fan-out start
+        self.assertLess(self.snapshot("ok")["avg_latency"], 0.3)
+
+    def test_saturated_pool_refuses_fan_out(self):
+        self.pool = vendor_router.FanoutPool(max_workers=2)
+        hung = [vendor("hung1", gate=self.gate), vendor("hung2", gate=self.gate)]
+        self.assertEqual(self.fan_out(hung, "gather_all", timeout=0.1), [])
+        self.assertEqual(self.pool.stats()["abandoned"], 2)
+
+        # Both workers are still held by the abandoned calls: nothing is queued behind them
+        calls = []
+        fresh = vendor("fresh")
+        self.assertEqual(self.fan_out([lambda ticker: calls.append(ticker) or fresh(ticker)], "first_success"), [])
+        self.assertEqual(calls, [])
+
+        self.gate.set()
+        deadline = time.monotonic() + 5
+        while self.pool.stats()["in_flight"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.fan_out([fresh], "first_success"), ["fresh:ptt"])
+
+    def test_calls_finishing_past_the_quorum_are_recorded_and_cached(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        cache = ResponseCache(os.path.join(tmp.name, "cache.sqlite3"))
+        real_wait = vendor_router.concurrent.futures.wait
+
+        def one_batch(fs, timeout=None, return_when=None):
+            # Both calls come back in the same wait() batch
+            return real_wait(fs, timeout=timeout)
+
+        with mock.patch.object(vendor_router, "get_response_cache", lambda: cache), \
+                mock.patch.object(vendor_router.concurrent.futures, "wait", one_batch):
+            impls = [vendor("a"), vendor("b"), vendor("dead", error=ConnectionError("down"))]
+            results = self.fan_out(impls, "first_success")
+
+        self.assertEqual(len(results), 1)
+        self.assertIn(results[0], ("a:ptt", "b:ptt"))
+        self.assertEqual([self.snapshot(name)["calls"] for name in ("a", "b", "dead")], [1, 1, 1])
+        self.assertEqual(self.snapshot("dead")["failures"], 1)
+        for name in ("a", "b"):
+            self.assertEqual(cache.get("get_news", name, {"ticker": "PTT"}), (True, f"{name}:ptt"))
+
+    def test_route_falls_back_sequentially_when_fan_out_fails(self):
+        impls = {"local": [vendor("broken", error=ValueError("bad"))], "backup": vendor("backup")}
+        policy = {"mode": "first_success", "quorum": 1, "timeout": None}
+        result = vendor_router.route("get_news", "news_data", impls, ["local"], ["local", "backup"], policy, ("ptt",), {})
+        self.assertEqual(result, "backup:ptt")
+
+    def test_error_reply_counts_as_failure_and_opens_the_breaker(self):
+        self.health = VendorHealthRegistry({"failure_threshold": 2, "min_calls": 2})
+        calls = []
+
+        def misconfigured(ticker):
+            calls.append(ticker)
+            return "Missing TWELVEDATA_API_KEY in .env"
+
+        impls = {"twelvedata": misconfigured, "backup": vendor("backup")}
+        policy = {"mode": "sequential"}
+        for _ in range(3):
+            result = vendor_router.route("get_news", "news_data", impls, ["twelvedata"], ["twelvedata", "backup"],
+                                         policy, ("ptt",), {})
+            self.assertEqual(result, "backup:ptt")
+        # Opened after two error replies, the third call skips the vendor
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(self.snapshot("twelvedata")["state"], "open")
+        self.assertEqual(self.snapshot("backup")["failures"], 0)
+
+    def test_error_reply_does_not_win_fan_out(self):
+        impls = [vendor("dead", value="Error: invalid API key"), vendor("a", delay=0.05)]
+        self.assertEqual(self.fan_out(impls, "first_success"), ["a:ptt"])
+        self.assertEqual(self.snapshot("dead")["failures"], 1)
+
+        # With nothing else to return, the error replies still reach the caller
+        impls = {"local": [vendor("dead", value="No data found for ptt")]}
+        policy = {"mode": "first_success", "quorum": 1, "timeout": None}
+        result = vendor_router.route("get_news", "news_data", impls, ["local"], ["local"], policy, ("ptt",), {})
+        self.assertEqual(result, "No data found for ptt")
+
+
+class TestAsyncRoute(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cache = ResponseCache(os.path.join(tmp.name, "cache.sqlite3"))
+        self.health = VendorHealthRegistry({"failure_threshold": 100, "min_calls": 100})
+        for target, value in (
+            ("get_health_registry", lambda: self.health),
+            ("get_response_cache", lambda: self.cache),
+        ):
+            patcher = mock.patch.object(vendor_router, target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.calls = []
+
+    def async_vendor(self, name, delay=0.0, error=None):
+        async def impl(ticker):
+            self.calls.append(name)
+            await asyncio.sleep(delay)
+            if error is not None:
+                raise error
+            return f"{name}:{ticker}"
+        impl.__name__ = name
+        return impl
+
+    def sequential(self, impls):
+        return {"mode": "sequential", "quorum": 1, "timeout": None}, ["local"], list(impls)
+
+    def test_coroutine_vendor_is_awaited_and_cached(self):
+        impls = {"local": self.async_vendor("social")}
+        policy, primary, fallback = self.sequential(impls)
+
+        async def run():
+            first = await vendor_router.aroute("get_social", "news_data", impls, primary, fallback, policy, ("ptt",), {})
+            second = await vendor_router.aroute("get_social", "news_data", impls, primary, fallback, policy, ("PTT",), {})
+            return first, second
+
+        self.assertEqual(asyncio.run(run()), ("social:ptt", "social:ptt"))
+        self.assertEqual(self.calls, ["social"])
+        self.assertEqual(self.cache.stats()["hits"], 1)
+
+    def test_sync_route_awaits_coroutine_vendor_before_caching(self):
+        impls = {"local": self.async_vendor("social")}
+        policy, primary, fallback = self.sequential(impls)
+        result = vendor_router.route("get_social", "news_data", impls, primary, fallback, policy, ("ptt",), {})
+        self.assertEqual(result, "social:ptt")
+        self.assertEqual(self.cache.get("get_social", "local", {"ticker": "PTT"}), (True, "social:ptt"))
+
+        # Also from a thread that is already running an event loop
+        async def inside_loop():
+            return vendor_router.route("get_social", "news_data", {"local": self.async_vendor("other")},
+                                       primary, fallback, policy, ("scb",), {})
+
+        self.assertEqual(asyncio.run(inside_loop()), "other:scb")
+
+    def test_keyword_arguments_share_cache_key_with_positional(self):
+        def world_news(curr_date, look_back_days=7, limit=5):
+            self.calls.append((curr_date, look_back_days, limit))
+            return f"news {curr_date} {look_back_days} {limit}"
+
+        impls = {"local": world_news}
+        policy, primary, fallback = self.sequential(impls)
+
+        async def run():
+            a = await vendor_router.aroute("get_global_news", "news_data", impls, primary, fallback, policy,
+                                           (), {"curr_date": "2024-01-05", "look_back_days": 7, "limit": 5})
+            b = await vendor_router.aroute("get_global_news", "news_data", impls, primary, fallback, policy,
+                                           ("2024-01-05",), {})
+            return a, b
+
+        self.assertEqual(asyncio.run(run()), ("news 2024-01-05 7 5", "news 2024-01-05 7 5"))
+        self.assertEqual(self.calls, [("2024-01-05", 7, 5)])
+
+    def test_async_fan_out_cancels_losers_and_times_out(self):
+        impls = {"local": [self.async_vendor("slow", delay=5), self.async_vendor("fast", delay=0.01)]}
+
+        async def run():
+            started = time.monotonic()
+            first = await vendor_router.aroute_concurrent(
+                "get_news", "news_data", impls, ["local"], {"mode": "first_success", "quorum": 1, "timeout": None},
+                ("ptt",), {})
+            gathered = await vendor_router.aroute_concurrent(
+                "get_news", "news_data", impls, ["local"], {"mode": "gather_all", "quorum": 1, "timeout": 0.2},
+                ("scb",), {})
+            return first, gathered, time.monotonic() - started
+
+        first, gathered, elapsed = asyncio.run(run())
+        self.assertEqual(first, ["fast:ptt"])
+        self.assertEqual(gathered, ["fast:scb"])
+        self.assertLess(elapsed, 2)
+        self.assertEqual(self.health.snapshot()["slow:get_news"]["failures"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+import sys
+import os
+import threading
+import time
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+# Add relevant paths
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from tradingagents.dataflows import yf_gateway
+from tradingagents.dataflows.yf_gateway import HostLimiter, YFinanceGateway, split_download
+
+
+def fake_download(tickers, start=None, end=None, group_by="column", session=None, **kwargs):
+    """Multi-ticker frame like yf.download(group_by="ticker"); "NONE" has no bars."""
+    time.sleep(0.02)
+    tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+    idx = pd.bdate_range(start, pd.Timestamp(end) - pd.Timedelta(days=1), name="Date")
+    frames = {}
+    for i, t in enumerate(tickers):
+        value = np.nan if t == "NONE" else float(i + 1)
+        frames[t] = pd.DataFrame({"Open": value, "Close": value, "Volume": value * 100}, index=idx)
+    return pd.concat(frames, axis=1)
+
+
+class TestHostLimiter(unittest.TestCase):
+    def test_concurrency_capped_per_host(self):
+        limiter = HostLimiter({"query1.finance.yahoo.com": 2}, default=1)
+        active = {"query1.finance.yahoo.com": 0}
+        peak = {"query1.finance.yahoo.com": 0}
+        lock = threading.Lock()
+
+        def call():
+            with limiter.slot("https://query1.finance.yahoo.com/v8/finance/chart/AAPL"):
+                with lock:
+                    active["query1.finance.yahoo.com"] += 1
+                    peak["query1.finance.yahoo.com"] = max(peak["query1.finance.yahoo.com"], active["query1.finance.yahoo.com"])
+                time.sleep(0.02)
+                with lock:
+                    active["query1.finance.yahoo.com"] -= 1
+
+        threads = [threading.Thread(target=call) for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(peak["query1.finance.yahoo.com"], 2)
+
+
+class TestGateway(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(yf_gateway.yf, "download", side_effect=fake_download)
+        self.download = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.gateway = YFinanceGateway(batch_size=3, session=object())
+
+    def test_batch_groups_by_range(self):
+        requests_ = [(s, "2025-01-06", "2025-01-11") for s in ("A", "B", "C", "D")]
+        requests_.append(("E", "2025-01-13", "2025-01-18"))
+        frames = self.gateway.download_batch(requests_)
+        self.assertEqual(self.download.call_count, 3)  # A-C, D, E
+        self.assertEqual(set(frames), {"A", "B", "C", "D", "E"})
+        self.assertEqual(len(frames["B"]), 5)
+        self.assertEqual(list(frames["B"].columns), ["Open", "Close", "Volume"])
+
+    def test_missing_ticker_is_empty(self):
+        frames = self.gateway.download_batch([("A", "2025-01-06", "2025-01-11"), ("NONE", "2025-01-06", "2025-01-11")])
+        self.assertTrue(frames["NONE"].empty)
+        self.assertFalse(frames["A"].empty)
+        self.assertTrue(split_download(None, "A").empty)
+
+    def test_identical_downloads_in_flight_coalesce(self):
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(self.gateway.download("AAPL", start="2025-01-06", end="2025-01-11")))
+            for _ in range(5)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(results), 5)
+        self.assertLess(self.download.call_count, 5)
+        self.assertEqual(self.download.call_count + self.gateway.flight.coalesced, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
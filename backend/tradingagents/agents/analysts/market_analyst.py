@@ -1,14 +1,15 @@
 import json
 import re
 from typing import List, Literal
+from dataclasses import replace
 from datetime import datetime, timedelta
 from pydantic import BaseModel, Field
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.output_parsers import JsonOutputParser
-from tradingagents.dataflows.core_calculator import process_indicators_from_csv
-from tradingagents.dataflows.core_stock_price import get_stock_data
+from tradingagents.dataflows.core_stock_price import get_stock_frame
+from tradingagents.dataflows.config import get_config
 from tradingagents.dataflows.core_calculator import (
-    process_indicators_from_csv, 
+    process_indicators, process_multi_timeframe, format_multi_timeframe,
     calculate_sma, calculate_ema, calculate_rsi, calculate_macd, 
     calculate_bollinger_bands, calculate_atr, calculate_vwma
 )
@@ -60,20 +61,30 @@ def create_market_analyst(llm):
         ticker = state["company_of_interest"]
         
         # Calculate date range
+        mtf_settings = get_config().get("multi_timeframe", {})
         try:
             curr_date_obj = datetime.strptime(current_date, "%Y-%m-%d")
             start_date = (curr_date_obj - timedelta(days=365)).strftime("%Y-%m-%d")
+            # ดึงย้อนหลังยาวครั้งเดียว แล้ว resample เป็น weekly / monthly เอง
+            history_days = max(mtf_settings.get("history_days", 1825), 365)
+            fetch_start = (curr_date_obj - timedelta(days=history_days)).strftime("%Y-%m-%d")
         except Exception:
-            start_date = "2024-01-01"
+            start_date = fetch_start = "2024-01-01"
 
         # ===================== PRE-FETCH DATA ======================
         print(f"📊 Market Analyst: Pre-fetching data for {ticker}...")
         try:
-            # 1. Fetch Stock Data
-            stock_data = get_stock_data(ticker, start_date, current_date)
+            # 1. Fetch Stock Data (typed frame, no CSV round trip)
+            history_frame = get_stock_frame(ticker, fetch_start, current_date)
+            price_frame = history_frame
+            if not history_frame.empty:
+                price_frame = replace(history_frame, data=history_frame.data.loc[start_date:], header=None, start_date=start_date)
             
             # 2. Calculate Indicators Locally (No API Call)
-            indicators, df = process_indicators_from_csv(stock_data)
+            indicators, df = process_indicators(history_frame)
+            # Daily is already covered above; add the higher timeframes
+            higher_timeframes = [tf for tf in mtf_settings.get("timeframes", ("weekly", "monthly")) if tf != "daily"]
+            timeframe_context = format_multi_timeframe(process_multi_timeframe(history_frame, higher_timeframes))
             
             indicators_context = ""
             if indicators and "error" not in indicators:
@@ -104,12 +115,17 @@ def create_market_analyst(llm):
             else:
                  indicators_context = f"Error calculating indicators: {indicators.get('error')}"
 
+            # แปลงเป็น CSV เฉพาะตอนใส่ใน prompt
+            stock_data = price_frame.render()
             data_context = f"""
             STOCK PRICE DATA (Last 1 Year - CSV Format):
             {stock_data[-2000:] if len(stock_data) > 2000 else stock_data} 
             
             TECHNICAL INDICATORS (Current & History):
             {indicators_context}
+            
+            MULTI-TIMEFRAME INDICATORS (resampled from daily bars):
+            {timeframe_context}
             """
         except Exception as e:
             print(f"⚠️ Data pre-fetch failed: {e}")
@@ -5,7 +5,8 @@ from tradingagents.dataflows.core_stock_price import (
     get_stock_data
 )
 from tradingagents.dataflows.core_indicator import (
-    get_indicators
+    get_indicators,
+    get_multi_timeframe_indicators
 )
 from tradingagents.agents.utils.fundamental_data_tools import (
     get_fundamentals,
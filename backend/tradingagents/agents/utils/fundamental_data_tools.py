@@ -1,10 +1,8 @@
 from langchain_core.tools import tool
 from typing import Annotated
-from tradingagents.dataflows.interface import route_to_vendor
+from tradingagents.dataflows.interface import route_to_vendor, aroute_to_vendor
 
 
-import inspect
-
 # @tool
 async def get_fundamentals(
     ticker: Annotated[str, "ticker symbol"],
@@ -22,10 +20,7 @@ async def get_fundamentals(
     # print("\n\n\nDEBUG:get_fundamentals")
     # print(route_to_vendor("get_fundamentals", ticker, curr_date))
     # print("\n\n\nFINISH DEBUG:get_fundamentals")
-    res = route_to_vendor("get_fundamentals", ticker, curr_date)
-    if inspect.isawaitable(res):
-        return await res
-    return res
+    return await aroute_to_vendor("get_fundamentals", ticker, curr_date)
 
 
 @tool
@@ -1,7 +1,6 @@
 from langchain_core.tools import tool
 from typing import Annotated
-from tradingagents.dataflows.interface import route_to_vendor
-import inspect
+from tradingagents.dataflows.interface import route_to_vendor, aroute_to_vendor
 
 
 # @tool
@@ -85,11 +84,7 @@ async def get_social(
     # print("\n\n\nDEBUG:get_social")
     # print(route_to_vendor("get_social", ticker))
     # print("\n\n\nFINISH DEBUG:get_social")
-    res = route_to_vendor("get_social", ticker)
-
-    if inspect.isawaitable(res):
-        return await res
-    return res
+    return await aroute_to_vendor("get_social", ticker)
 
 
 import asyncio
@@ -103,14 +98,13 @@ async def get_all_news_batch(ticker: str, start_date: str, end_date: str) -> str
     """
     print(f"📰 News Analyst: Pre-fetching data for {ticker}...")
     
-    # Define tasks to run in thread pool to avoid blocking the event loop
+    # Async routing: sync vendors run on the shared vendor pool, async vendors on the loop
     # get_news takes (ticker, start_date, end_date)
-    task_company = asyncio.to_thread(get_news, ticker, start_date, end_date)
+    task_company = aroute_to_vendor("get_news", ticker, start_date, end_date)
     
-    # get_global_news takes (curr_date, look_back_days=7)
-    # We pass arguments positionally or via kwargs in to_thread? 
-    # asyncio.to_thread(func, *args, **kwargs) is available in Python 3.9+
-    task_global = asyncio.to_thread(get_global_news, curr_date=end_date, look_back_days=7)
+    # get_global_news takes (curr_date, look_back_days, limit); keywords keep the
+    # cache key and every vendor signature in step
+    task_global = aroute_to_vendor("get_global_news", curr_date=end_date, look_back_days=7, limit=5)
 
     results = await asyncio.gather(task_company, task_global, return_exceptions=True)
     
@@ -0,0 +1,160 @@
+"""
+On-disk Alpha Vantage response cache.
+
+Sits below `_make_api_request` (inside AlphaVantageClient.request), so every
+Alpha Vantage caller shares it and a hit never touches the quota. Entries are
+keyed by (function, parameters without the API key) in a ResponseCache SQLite
+file, with a freshness rule per function:
+
+- "statement": financial statements only change when a new fiscal period is
+  filed. The entry stays fresh until the period after the latest
+  `fiscalDateEnding` is due (period length + filing lag); after that it is
+  rechecked daily until the new report shows up.
+- "daily": indicators / daily series / overview change at most once a day and
+  expire at the end of the (UTC) day.
+- a number: plain TTL in seconds (e.g. news).
+"""
+import json
+import os
+import threading
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+
+from .config import get_config
+from .response_cache import ResponseCache
+
+VENDOR = "alpha_vantage_api"
+DAY = 24 * 3600
+
+DEFAULT_FRESHNESS = {
+    "OVERVIEW": "daily",
+    "BALANCE_SHEET": "statement",
+    "CASH_FLOW": "statement",
+    "INCOME_STATEMENT": "statement",
+    "EARNINGS": "statement",
+    "SMA": "daily",
+    "EMA": "daily",
+    "MACD": "daily",
+    "RSI": "daily",
+    "BBANDS": "daily",
+    "ATR": "daily",
+    "VWAP": "daily",
+    "TIME_SERIES_DAILY": "daily",
+    "TIME_SERIES_DAILY_ADJUSTED": "daily",
+    "NEWS_SENTIMENT": 15 * 60,
+    "INSIDER_TRANSACTIONS": DAY,
+}
+
+# Days after a fiscal period ends until its report is normally out
+FILING_LAG_DAYS = {"quarterly": 45, "annual": 90}
+PERIOD_DAYS = {"quarterly": 92, "annual": 366}
+
+# Parameters that do not change the response
+_IGNORED_PARAMS = {"apikey", "source"}
+
+
+def cache_params(params: dict) -> dict:
+    return {k: v for k, v in params.items() if k not in _IGNORED_PARAMS and k != "function"}
+
+
+def _seconds_to_end_of_day(now: datetime) -> float:
+    tomorrow = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return max((tomorrow - now).total_seconds(), 60.0)
+
+
+def next_period_due(payload: dict) -> Optional[date]:
+    """When the next statement after the latest `fiscalDateEnding` should be filed."""
+    due = None
+    for key, kind in (("quarterlyReports", "quarterly"), ("quarterlyEarnings", "quarterly"),
+                      ("annualReports", "annual"), ("annualEarnings", "annual")):
+        reports = payload.get(key) or []
+        ends = [r.get("fiscalDateEnding") for r in reports if isinstance(r, dict) and r.get("fiscalDateEnding")]
+        if not ends:
+            continue
+        try:
+            latest = datetime.strptime(max(ends), "%Y-%m-%d").date()
+        except ValueError:
+            continue
+        candidate = latest + timedelta(days=PERIOD_DAYS[kind] + FILING_LAG_DAYS[kind])
+        due = candidate if due is None else min(due, candidate)
+    return due
+
+
+def freshness_ttl(rule, text: str, now: Optional[datetime] = None) -> Optional[float]:
+    """TTL in seconds for a response under a freshness rule (None = don't cache)."""
+    now = now or datetime.now(timezone.utc)
+    if rule is None:
+        return None
+    if rule == "daily":
+        return _seconds_to_end_of_day(now)
+    if rule == "statement":
+        try:
+            due = next_period_due(json.loads(text))
+        except (ValueError, AttributeError):
+            due = None
+        if due is None:
+            return DAY
+        # ยังไม่ถึงงวดใหม่ -> ใช้ของเดิมได้เลย; เลยกำหนดแล้ว -> เช็ควันละครั้ง
+        return max((datetime.combine(due, datetime.min.time(), timezone.utc) - now).total_seconds(), DAY)
+    return float(rule)
+
+
+def is_data_response(text: str) -> bool:
+    """Skip errors / notices so only real payloads are cached."""
+    if not text or not text.strip():
+        return False
+    try:
+        payload = json.loads(text)
+    except ValueError:
+        return True  # CSV payload
+    if not isinstance(payload, dict) or not payload:
+        return bool(payload)
+    return not any(k in payload for k in ("Error Message", "Information", "Note"))
+
+
+class AlphaVantageCache:
+    """Freshness-aware wrapper around a ResponseCache for raw Alpha Vantage bodies."""
+
+    def __init__(self, path: str, freshness: Optional[dict] = None, default_ttl: Optional[float] = 3600,
+                 max_entries: int = 5000):
+        self.store = ResponseCache(path, max_entries=max_entries)
+        self.freshness = {**DEFAULT_FRESHNESS, **(freshness or {})}
+        self.default_ttl = default_ttl
+
+    def get(self, params: dict):
+        """Return (hit, text)."""
+        return self.store.get(params.get("function", ""), VENDOR, cache_params(params))
+
+    def set(self, params: dict, text: str) -> bool:
+        function = params.get("function", "")
+        if not is_data_response(text):
+            return False
+        ttl = freshness_ttl(self.freshness.get(function, self.default_ttl), text)
+        if ttl is None:
+            return False
+        return self.store.set(function, VENDOR, cache_params(params), text, ttl=ttl)
+
+    def stats(self) -> dict:
+        return self.store.stats()
+
+
+_cache: Optional[AlphaVantageCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_av_cache() -> Optional[AlphaVantageCache]:
+    """Get the process-wide Alpha Vantage cache, or None when disabled in the config."""
+    global _cache
+    settings = get_config().get("alpha_vantage", {}).get("cache", {})
+    if not settings.get("enabled", False):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            path = settings.get("path") or os.path.join(get_config()["data_cache_dir"], "alpha_vantage_cache.sqlite3")
+            _cache = AlphaVantageCache(
+                path,
+                freshness=settings.get("freshness"),
+                default_ttl=settings.get("default_ttl", 3600),
+                max_entries=settings.get("max_entries", 5000),
+            )
+        return _cache
@@ -2,9 +2,17 @@ import os
 import requests
 import pandas as pd
 import json
-from datetime import datetime
+import threading
+import time
+from datetime import datetime, timezone
 from io import StringIO
+from typing import Optional
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+from .config import get_config
+from .utils import SingleFlight
+from .alpha_vantage_cache import get_av_cache
 
 load_dotenv()
 
@@ -42,6 +50,243 @@ class AlphaVantageRateLimitError(Exception):
     """Exception raised when Alpha Vantage API rate limit is exceeded."""
     pass
 
+class TokenBucket:
+    """Requests-per-minute pacing. Callers reserve a slot and sleep until it is due."""
+
+    def __init__(self, per_minute: float, clock=time.monotonic, sleep=time.sleep):
+        self.capacity = max(float(per_minute), 1.0)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.clock = clock
+        self.sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, max_wait: Optional[float] = None) -> float:
+        """Take one token, sleeping if needed; returns the wait.
+
+        Raises AlphaVantageRateLimitError instead of waiting longer than `max_wait`.
+        """
+        with self._lock:
+            now = self.clock()
+            self._refill(now)
+            wait = max(0.0, (1.0 - self.tokens) / self.rate)
+            if max_wait is not None and wait > max_wait:
+                raise AlphaVantageRateLimitError(
+                    f"Alpha Vantage per-minute quota busy (next slot in {wait:.0f}s)"
+                )
+            self.tokens -= 1.0  # อาจติดลบ = จองคิวล่วงหน้า
+        if wait > 0:
+            self.sleep(wait)
+        return wait
+
+    def drain(self):
+        """Server said we are too fast: empty the bucket so the next call waits."""
+        with self._lock:
+            self._refill(self.clock())
+            self.tokens = min(self.tokens, 0.0)
+
+
+class DailyQuota:
+    """Requests used per (UTC) day, persisted so restarts keep counting."""
+
+    def __init__(self, limit: Optional[int], path: Optional[str] = None):
+        self.limit = limit
+        self.path = path
+        self._lock = threading.Lock()
+        self._day, self._used = self._load()
+
+    @staticmethod
+    def _today() -> str:
+        return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data["day"], int(data["used"])
+        except (TypeError, OSError, ValueError, KeyError):
+            return self._today(), 0
+
+    def _save(self):
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump({"day": self._day, "used": self._used, "limit": self.limit}, f)
+            os.replace(self.path + ".tmp", self.path)
+        except OSError as e:
+            print(f"⚠️ Could not save Alpha Vantage quota: {e}")
+
+    def _roll(self):
+        today = self._today()
+        if today != self._day:
+            self._day, self._used = today, 0
+
+    def _check(self):
+        if self.limit is not None and self._used >= self.limit:
+            raise AlphaVantageRateLimitError(
+                f"Alpha Vantage daily quota used up ({self._used}/{self.limit} today)"
+            )
+
+    def check(self):
+        """Raise AlphaVantageRateLimitError if the day is used up (without counting)."""
+        with self._lock:
+            self._roll()
+            self._check()
+
+    def take(self):
+        """Count one request, or raise AlphaVantageRateLimitError if the day is used up."""
+        with self._lock:
+            self._roll()
+            self._check()
+            self._used += 1
+            self._save()
+
+    def exhaust(self):
+        with self._lock:
+            self._roll()
+            if self.limit is not None:
+                self._used = max(self._used, self.limit)
+                self._save()
+
+    def remaining(self) -> Optional[int]:
+        with self._lock:
+            self._roll()
+            return None if self.limit is None else max(0, self.limit - self._used)
+
+
+class AlphaVantageClient:
+    """Shared Alpha Vantage client.
+
+    - one pooled requests.Session
+    - per-minute token bucket and daily quota for the configured tier, checked
+      *before* a request is sent
+    - identical in-flight requests (same function + parameters) are coalesced:
+      concurrent callers share a single HTTP call
+    - optional on-disk response cache (alpha_vantage_cache) consulted first;
+      hits cost no quota
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 5,
+        requests_per_day: Optional[int] = 25,
+        max_wait: Optional[float] = 60,
+        timeout: float = 30,
+        quota_path: Optional[str] = None,
+        pool_size: int = 8,
+        session: Optional[requests.Session] = None,
+        cache=None,
+    ):
+        self.bucket = TokenBucket(requests_per_minute)
+        self.quota = DailyQuota(requests_per_day, quota_path)
+        self.max_wait = max_wait
+        self.timeout = timeout
+        self.flight = SingleFlight()
+        self.requests_sent = 0
+        self.cache = cache
+        self.cache_hits = 0
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        self.session = session
+
+    @staticmethod
+    def _flight_key(params: dict):
+        return tuple(sorted((k, str(v)) for k, v in params.items() if k != "apikey"))
+
+    def request(self, params: dict) -> str:
+        """GET the query API with `params` (function, symbol, ...) and return the body text.
+
+        Raises:
+            AlphaVantageRateLimitError: quota exhausted locally or reported by the API
+        """
+        if self.cache is not None:
+            hit, text = self.cache.get(params)
+            if hit:
+                self.cache_hits += 1
+                return text
+
+        def fetch():
+            text = self._send(params)
+            if self.cache is not None:
+                self.cache.set(params, text)
+            return text
+
+        return self.flight.do(self._flight_key(params), fetch)
+
+    def _send(self, params: dict) -> str:
+        # เช็คโควต้าก่อนยิงจริง (ไม่ต้องรอให้ API ตอบว่าเต็มแล้ว)
+        self.quota.check()
+        self.bucket.acquire(self.max_wait)
+        self.quota.take()
+
+        api_params = dict(params)
+        api_params["apikey"] = get_api_key()
+        response = self.session.get(API_BASE_URL, params=api_params, timeout=self.timeout)
+        self.requests_sent += 1
+        response.raise_for_status()
+        response_text = response.text
+
+        # Check if response is JSON (error responses are typically JSON)
+        try:
+            response_json = json.loads(response_text)
+        except json.JSONDecodeError:
+            # Response is not JSON (likely CSV data), which is normal
+            return response_text
+        message = ""
+        if isinstance(response_json, dict):
+            message = response_json.get("Information") or response_json.get("Note") or ""
+        lowered = message.lower()
+        if "rate limit" in lowered or "api key" in lowered or "call frequency" in lowered:
+            if "per day" in lowered or "daily" in lowered:
+                self.quota.exhaust()
+            else:
+                self.bucket.drain()
+            raise AlphaVantageRateLimitError(f"Alpha Vantage rate limit exceeded: {message}")
+        return response_text
+
+    def stats(self) -> dict:
+        return {
+            "requests_sent": self.requests_sent,
+            "cache_hits": self.cache_hits,
+            "coalesced": self.flight.coalesced,
+            "daily_remaining": self.quota.remaining(),
+        }
+
+
+_client: Optional[AlphaVantageClient] = None
+_client_lock = threading.Lock()
+
+
+def get_av_client() -> AlphaVantageClient:
+    """Get the process-wide Alpha Vantage client (tier limits from the config)."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            settings = get_config().get("alpha_vantage", {})
+            quota_path = settings.get("quota_path") or os.path.join(
+                get_config()["data_cache_dir"], "alpha_vantage_quota.json"
+            )
+            _client = AlphaVantageClient(
+                requests_per_minute=settings.get("requests_per_minute", 5),
+                requests_per_day=settings.get("requests_per_day", 25),
+                max_wait=settings.get("max_wait", 60),
+                timeout=settings.get("timeout", 30),
+                quota_path=quota_path,
+                cache=get_av_cache(),
+            )
+        return _client
+
+
 def _make_api_request(function_name: str, params: dict) -> dict | str:
     """Helper function to make API requests and handle responses.
     
@@ -52,7 +297,6 @@ def _make_api_request(function_name: str, params: dict) -> dict | str:
     api_params = params.copy()
     api_params.update({
         "function": function_name,
-        "apikey": get_api_key(),
         "source": "trading_agents",
     })
     
@@ -66,24 +310,7 @@ def _make_api_request(function_name: str, params: dict) -> dict | str:
         # Remove entitlement if it's None or empty
         api_params.pop("entitlement", None)
     
-    response = requests.get(API_BASE_URL, params=api_params)
-    response.raise_for_status()
-
-    response_text = response.text
-    
-    # Check if response is JSON (error responses are typically JSON)
-    try:
-        response_json = json.loads(response_text)
-        # Check for rate limit error
-        if "Information" in response_json:
-            info_message = response_json["Information"]
-            if "rate limit" in info_message.lower() or "api key" in info_message.lower():
-                raise AlphaVantageRateLimitError(f"Alpha Vantage rate limit exceeded: {info_message}")
-    except json.JSONDecodeError:
-        # Response is not JSON (likely CSV data), which is normal
-        pass
-
-    return response_text
+    return get_av_client().request(api_params)
 
 
 
@@ -0,0 +1,168 @@
+"""
+Write-behind persistence for dataflow artifacts.
+
+Fetchers hand their JSON / JSONL dumps and report-log lines to one
+`ArtifactWriter` instead of opening files on the request path. Writes go
+through a bounded queue (callers block only when it is full) to a single
+background thread, which drains them in batches: consecutive writes to the
+same file share one open handle, and the order of writes to a file is kept
+(an overwrite followed by appends ends up as on a synchronous run).
+
+Payloads are serialized by the caller, so later changes to the object do not
+leak into the file. `flush()` waits until everything queued so far is on
+disk (readers of an artifact call it first); the queue is also drained at
+interpreter exit.
+"""
+import atexit
+import json
+import os
+import queue
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .config import get_config
+
+# (path, mode, text); mode "w" overwrites, "a" appends
+Write = Tuple[str, str, str]
+
+_STOP = object()
+
+
+def _ensure_parent(path: str):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+
+def write_batch(batch: List[Write]):
+    """Apply writes in order, opening each file once per run of writes to it."""
+    handles: Dict[str, object] = {}
+    try:
+        for path, mode, text in batch:
+            try:
+                f = handles.get(path)
+                if f is None or mode == "w":
+                    if f is not None:
+                        f.close()
+                    _ensure_parent(path)
+                    f = handles[path] = open(path, mode, encoding="utf-8")
+                f.write(text)
+            except OSError as e:
+                print(f"⚠️ Could not write {path}: {e}")
+                handles.pop(path, None)
+    finally:
+        for f in handles.values():
+            try:
+                f.close()
+            except OSError as e:
+                print(f"⚠️ Could not close {getattr(f, 'name', f)}: {e}")
+
+
+class ArtifactWriter:
+    """Single background writer behind a bounded queue (synchronous when `enabled` is False)."""
+
+    def __init__(self, max_queue: int = 1000, batch_size: int = 64, enabled: bool = True):
+        self.enabled = enabled
+        self.batch_size = max(int(batch_size), 1)
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(int(max_queue), 1))
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._closed = False
+        self.batches = 0
+        self.writes = 0
+
+    # ---------- producer side ----------
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="artifact-writer", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def submit(self, path: str, mode: str, text: str):
+        if not self.enabled or self._closed:
+            write_batch([(path, mode, text)])
+            return
+        self._start()
+        self._queue.put((path, mode, text))
+
+    def write_json(self, path: str, obj, indent: Optional[int] = 2):
+        self.submit(path, "w", json.dumps(obj, ensure_ascii=False, indent=indent, default=str))
+
+    def write_jsonl(self, path: str, items: Iterable, append: bool = False):
+        text = "".join(json.dumps(obj, ensure_ascii=False, default=str) + "\n" for obj in items)
+        self.submit(path, "a" if append else "w", text)
+
+    def append_text(self, path: str, text: str):
+        self.submit(path, "a", text)
+
+    def write_text(self, path: str, text: str):
+        self.submit(path, "w", text)
+
+    def flush(self):
+        """Block until every write queued so far is on disk."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self):
+        """Drain the queue and stop the thread; later writes are done synchronously."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
+
+    # ---------- writer thread ----------
+
+    def _run(self):
+        stop = False
+        while not stop:
+            items = [self._queue.get()]
+            # เก็บงานที่รออยู่มาเขียนรวดเดียว
+            while len(items) < self.batch_size:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            batch = [item for item in items if item is not _STOP]
+            stop = len(batch) != len(items)
+            try:
+                if batch:
+                    write_batch(batch)
+                    self.batches += 1
+                    self.writes += len(batch)
+            except Exception as e:
+                print(f"⚠️ Artifact writer batch failed: {e}")
+            finally:
+                for _ in items:
+                    self._queue.task_done()
+        # งานที่เข้าคิวหลัง STOP (ก่อน _closed จะถูกตั้ง) ก็ต้องลงดิสก์
+        rest = []
+        while True:
+            try:
+                rest.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        write_batch([item for item in rest if item is not _STOP])
+        for _ in rest:
+            self._queue.task_done()
+
+
+_writer: Optional[ArtifactWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_artifact_writer() -> ArtifactWriter:
+    """Process-wide artifact writer (settings under "artifact_writer" in the config)."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            settings = get_config().get("artifact_writer", {})
+            _writer = ArtifactWriter(
+                max_queue=settings.get("max_queue", 1000),
+                batch_size=settings.get("batch_size", 64),
+                enabled=settings.get("enabled", True),
+            )
+        return _writer
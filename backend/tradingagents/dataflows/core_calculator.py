@@ -4,6 +4,8 @@ import numpy as np
 from io import StringIO
 import pandas_ta as ta
 
+from .price_frame import PriceFrame
+
 def calculate_sma(df: pd.DataFrame, period: int = 50, column: str = "Close") -> pd.Series:
     # Use pandas_ta.sma
     return ta.sma(df[column], length=period)
@@ -79,10 +81,26 @@ def calculate_vwma(df: pd.DataFrame, period: int = 20):
 def process_indicators_from_csv(csv_text: str):
     """
     Takes CSV string (Date,Open,High,Low,Close,Volume) and returns calculated indicators.
+    Prefer process_indicators() when a DataFrame / PriceFrame is already at hand.
     """
     try:
         # Ignore comment lines starting with #
         df = pd.read_csv(StringIO(csv_text), comment='#', index_col="Date", parse_dates=True)
+    except Exception as e:
+        return {"error": str(e)}, None
+    return process_indicators(df)
+
+def process_indicators(data):
+    """
+    Takes a date-indexed OHLCV DataFrame (or a PriceFrame) and returns (indicators, df).
+    The frame is copied, so callers can keep using their own data.
+    """
+    try:
+        if isinstance(data, PriceFrame):
+            if data.error:
+                return {"error": data.error}, None
+            data = data.data
+        df = data.copy()
         # Ensure column names are stripped/capitalized properly
         df.columns = [c.strip().capitalize() for c in df.columns]
         
@@ -133,3 +151,82 @@ def process_indicators_from_csv(csv_text: str):
         return indicators, df
     except Exception as e:
         return {"error": str(e)}, None
+
+# Higher timeframes derived from the daily bars (pandas offset aliases).
+# Weeks end on Friday; the last bar may be a partial week / month.
+TIMEFRAMES = {
+    "daily": None,
+    "weekly": "W-FRI",
+    "monthly": "ME",
+}
+
+def resample_ohlcv(data, timeframe: str = "weekly") -> pd.DataFrame:
+    """
+    Aggregates a date-indexed daily OHLCV DataFrame (or PriceFrame) into weekly / monthly bars.
+    Bars are labelled with the date of their last trading day.
+    """
+    if timeframe not in TIMEFRAMES:
+        raise ValueError(f"Timeframe {timeframe} is not supported. Please choose from: {list(TIMEFRAMES)}")
+    if isinstance(data, PriceFrame):
+        data = data.data
+    df = data.copy()
+    df.columns = [c.strip().capitalize() for c in df.columns]
+    df.index = pd.to_datetime(df.index)
+    df = df.sort_index()
+
+    rule = TIMEFRAMES[timeframe]
+    if rule is None or df.empty:
+        return df
+
+    grouped = df.resample(rule)
+    bars = grouped.agg({"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"})
+    # Label with the real last trading day instead of the period end (e.g. a holiday Friday)
+    bars.index = grouped["Close"].apply(lambda s: s.index.max() if len(s) else pd.NaT)
+    bars.index.name = df.index.name or "Date"
+    return bars[bars.index.notna()].dropna(subset=["Close"])
+
+def process_multi_timeframe(data, timeframes=("daily", "weekly", "monthly")):
+    """
+    Computes the indicator set of process_indicators() for several timeframes
+    from one in-memory daily frame (no extra provider calls).
+    Returns {timeframe: {"bar_date", "close", "bars", **indicators}}.
+    """
+    if isinstance(data, PriceFrame):
+        if data.error:
+            return {"error": data.error}
+        data = data.data
+    results = {}
+    for timeframe in timeframes:
+        try:
+            bars = resample_ohlcv(data, timeframe)
+        except Exception as e:
+            results[timeframe] = {"error": str(e)}
+            continue
+        if bars.empty:
+            results[timeframe] = {"error": "No price data"}
+            continue
+        indicators, _ = process_indicators(bars)
+        results[timeframe] = {
+            "bar_date": bars.index[-1].strftime("%Y-%m-%d"),
+            "close": float(bars["Close"].iloc[-1]),
+            "bars": int(len(bars)),
+            **indicators,
+        }
+    return results
+
+def format_multi_timeframe(results: dict) -> str:
+    """Text table of process_multi_timeframe() output for prompts / tool results."""
+    if "error" in results:
+        return f"Error calculating multi-timeframe indicators: {results['error']}"
+    lines = []
+    for timeframe, values in results.items():
+        lines.append(f"--- {timeframe.upper()} ---")
+        if "error" in values:
+            lines.append(f"error: {values['error']}")
+        else:
+            for key, value in values.items():
+                if isinstance(value, float):
+                    value = "N/A" if np.isnan(value) else round(value, 4)
+                lines.append(f"{key}: {value}")
+        lines.append("")
+    return "\n".join(lines)
@@ -3,159 +3,46 @@ import sys
 import pandas as pd
 import requests
 from typing import Annotated
-from datetime import datetime
+from datetime import datetime, timedelta
 from langchain_core.tools import tool
 import concurrent.futures
+import threading
 import time
 
 # --- Import Provider Functions (ตรวจสอบ Path ให้ถูกต้อง) ---
 from tradingagents.dataflows.y_finance import get_stock_stats_indicators_window
 from tradingagents.dataflows.alpha_vantage_indicator import get_indicator
 from tradingagents.dataflows.trading_view import get_tradingview_indicators
+from tradingagents.dataflows.alpha_vantage_common import AlphaVantageRateLimitError
+from tradingagents.dataflows.vendor_health import get_health_registry
+from tradingagents.dataflows.vendor_ranking import get_vendor_ranking
+from tradingagents.dataflows.symbol_resolver import detect_market, vendor_codes
+from tradingagents.dataflows.config import get_config
+from tradingagents.dataflows.core_stock_price import get_stock_frame
+from tradingagents.dataflows.indicator_state import get_indicator_state_store
+from tradingagents.dataflows.core_calculator import TIMEFRAMES, process_multi_timeframe, format_multi_timeframe
+from tradingagents.dataflows.indicator_scoring import compute_core_indicator_score
+from tradingagents.dataflows.artifact_writer import get_artifact_writer
+from tradingagents.dataflows.indicator_engine import (
+    SUPPORTED_INDICATORS, CROSS_CHECKABLE, HISTORY_DAYS, compute_indicators, indicator_window, render_indicator, cross_check
+)
+
+# compute_core_indicator_score keys -> vendor names used by the health registry / ranking
+SCORE_VENDORS = {"yahoo": "yfinance", "alpha": "alpha_vantage", "tv": "tradingview"}
 
 # ==========================================
 # Helper Functions
 # ==========================================
 
-def compute_core_indicator_score(data_yf, data_av, data_tv, indicator, tolerance=0.01):
-    """
-    Compare data from different providers and score their similarity.
-    """
-    dict_yf, dict_av, dict_tv = {}, {}, {}
-
-    # 1. Parse Yahoo Finance Data (list of tuples: (date_str, value))
-    if data_yf:
-        try:
-            dict_yf = {str(d): float(v) for d, v in data_yf if v is not None}
-        except Exception: pass
-
-    # 2. Parse Alpha Vantage Data (list of tuples: (datetime_obj, value))
-    if data_av:
-        try:
-            dict_av = {dt.strftime('%Y-%m-%d'): float(v) for dt, v in data_av if v is not None}
-        except Exception: pass
-
-    # 3. Parse TradingView Data (DataFrame)
-    if isinstance(data_tv, pd.DataFrame) and not data_tv.empty:
-        try:
-            # ตรวจสอบว่ามี column datetime และ indicator ที่ต้องการไหม
-            if 'datetime' in data_tv.columns and indicator in data_tv.columns:
-                for _, row in data_tv.iterrows():
-                    if pd.notna(row[indicator]):
-                        dt_str = row['datetime'].strftime('%Y-%m-%d') if hasattr(row['datetime'], 'strftime') else str(row['datetime'])[:10]
-                        dict_tv[dt_str] = float(row[indicator])
-        except Exception: pass
-
-    # Find intersection of dates (เฉพาะวันที่ที่มีข้อมูลครบอย่างน้อย 2 เจ้าถึงจะเทียบได้)
-    all_dates = set(dict_yf.keys()) | set(dict_av.keys()) | set(dict_tv.keys())
-    
-    scores = {'yahoo': 0, 'alpha': 0, 'tv': 0}
-
-    for date in sorted(all_dates):
-        vals = {
-            'yahoo': dict_yf.get(date), 
-            'alpha': dict_av.get(date), 
-            'tv': dict_tv.get(date)
-        }
-        
-        # เปรียบเทียบทีละคู่ (เฉพาะคู่ที่มีค่าทั้งสองฝั่ง)
-        pairs = [('yahoo', 'alpha'), ('yahoo', 'tv'), ('alpha', 'tv')]
-        
-        for src1, src2 in pairs:
-            v1, v2 = vals[src1], vals[src2]
-            if v1 is not None and v2 is not None:
-                try:
-                    # คำนวณความต่างสัมพัทธ์
-                    diff = abs(v1 - v2)
-                    denom = max(abs(v1), abs(v2))
-                    if denom == 0: # กันหารด้วยศูนย์ (กรณีค่าเป็น 0 ทั้งคู่)
-                        if diff == 0:
-                            scores[src1] += 1
-                            scores[src2] += 1
-                    elif (diff / denom) <= tolerance:
-                        scores[src1] += 1
-                        scores[src2] += 1
-                except Exception: pass
-
-    # เลือก source ที่คะแนนสูงสุด
-    max_score = max(scores.values()) if scores else 0
-    best_sources = [k for k, v in scores.items() if v == max_score]
-    
-    # Fallback: ถ้าคะแนนเป็น 0 หมด ให้เลือกเจ้าที่มีข้อมูลเยอะสุด
-    if max_score == 0:
-        counts = {'yahoo': len(dict_yf), 'alpha': len(dict_av), 'tv': len(dict_tv)}
-        max_count = max(counts.values())
-        if max_count > 0:
-            best_sources = [k for k, v in counts.items() if v == max_count]
-        else:
-            best_sources = ['alpha'] # Default สุดท้ายถ้าไม่มีข้อมูลเลย
-
-    return scores, best_sources
-
-import yfinance as yf
-
 # --- 1. นักสืบหาตลาด (Auto-Detect) ---
 def auto_detect_market(symbol: str) -> str:
-    symbol = symbol.upper().strip()
-    
-    # ทองคำ/Forex
-    if symbol in ["GOLD", "XAUUSD", "GC=F", "XAU/USD"]: return "GOLD"
-    
-    # หุ้นจีน/ฮ่องกง (ตัวเลข)
-    if symbol.isdigit():
-        if len(symbol) <= 5: return "HK" # ฮ่องกง
-        return "CN" # จีนแผ่นดินใหญ่
-        
-    # หุ้นไทย (เช็ค YF เร็วๆ)
-    try:
-        if yf.Ticker(f"{symbol}.BK").fast_info.market_cap is not None: return "TH"
-    except: pass
-
-    return "US" # Default
+    """Market of a symbol via the shared, cached symbol resolver."""
+    return detect_market(symbol)
 
 # --- 2. ตัวแปลงรหัสให้ตรงแต่ละค่าย (Resolver) ---
 def resolve_symbol_for_indicators(symbol: str, market: str):
-    symbol = symbol.upper().strip()
-    
-    # Default = US Stocks
-    mapping = {
-        "yfinance": symbol,
-        "alphavantage": symbol,
-        "tradingview": symbol 
-    }
-
-    if market == "TH":
-        clean = symbol.replace(".BK", "")
-        mapping["yfinance"] = f"{clean}.BK"
-        mapping["alphavantage"] = f"{clean}.BK" # AlphaVantage รองรับ .BK
-        mapping["tradingview"] = f"SET:{clean}"
-
-    elif market == "CN":
-        # จีน: ต้องแยก Shanghai (6xxxx) / Shenzhen (0xxxx/3xxxx)
-        # Yahoo ใช้ .SS/.SZ
-        # AlphaVantage ใช้ .SH/.SZ
-        suffix_yf = ".SS" if symbol.startswith("6") else ".SZ"
-        suffix_av = ".SH" if symbol.startswith("6") else ".SZ" # AV บางทีใช้ SH สำหรับ Shanghai
-        
-        mapping["yfinance"] = f"{symbol}{suffix_yf}"
-        mapping["alphavantage"] = f"{symbol}{suffix_av}"
-        
-        prefix_tv = "SSE" if symbol.startswith("6") else "SZSE"
-        mapping["tradingview"] = f"{prefix_tv}:{symbol}"
-
-    elif market == "HK":
-        clean = symbol.replace(".HK", "").zfill(4) # เติม 0 ให้ครบ 4 หลัก
-        mapping["yfinance"] = f"{clean}.HK"
-        mapping["alphavantage"] = f"{clean}.HK"
-        mapping["tradingview"] = f"HKEX:{int(clean)}" # TV ไม่เอาเลข 0 นำหน้า
-
-    elif market == "GOLD":
-        # ทองคำ ความยากคือ AV กับ YF ใช้คนละตัว
-        mapping["yfinance"] = "GC=F"       # Gold Futures
-        mapping["alphavantage"] = "XAUUSD" # Spot Gold (Forex) แม่นกว่าสำหรับ Indicator
-        mapping["tradingview"] = "OANDA:XAUUSD"
-
-    return mapping
+    """Per-vendor tickers for a symbol (see symbol_resolver.vendor_codes)."""
+    return vendor_codes(symbol, market)
 
 def sent_to_telegram(report_message):
     """Send comparison result to Telegram bot."""
@@ -172,8 +59,7 @@ def sent_to_telegram(report_message):
     }
 
     # write text file
-    with open("all_report_message.txt", "a", encoding='utf-8') as file:
-        file.write(report_message + "\n")
+    get_artifact_writer().append_text("all_report_message.txt", report_message + "\n")
 
     # try:
     #     requests.post(url, data=data, timeout=5)
@@ -219,54 +105,100 @@ def get_indicators(
     print(f"   [Target Tickers] YF: {tickers['yfinance']}, AV: {tickers['alphavantage']}, TV: {tickers['tradingview']}")
 
     # --- 3. Fetch Data (ส่ง Ticker ที่ถูกต้องไป) ---
-    
-    # YFinance
-    result_str_yf, data_yf = "", []
-    try:
-        # ส่ง tickers['yfinance'] แทน symbol เดิม
-        result_str_yf, data_yf = get_stock_stats_indicators_window(
-            tickers['yfinance'], indicator, curr_date, look_back_days
-        )
-    except Exception as e:
-        print(f"⚠️ Yahoo Finance Error: {e}")
-
+    health = get_health_registry()
+    latencies = {}
+
+    def fetch_provider(name, label, fetch, ticker, empty):
+        """Call one provider through its circuit breaker; returns (result_str, data)."""
+        if not health.allow(name, "get_indicators"):
+            print(f"⏭️ {label} skipped (circuit open)")
+            return "", empty
+        started = time.monotonic()
+        latencies[name] = None
+        try:
+            res = fetch(ticker, indicator, curr_date, look_back_days)
+        except AlphaVantageRateLimitError as e:
+            health.record_failure(name, "get_indicators", time.monotonic() - started, rate_limited=True)
+            print(f"⚠️ {label} Rate Limit: {e}")
+            return "", empty
+        except Exception as e:
+            health.record_failure(name, "get_indicators", time.monotonic() - started)
+            print(f"⚠️ {label} Error: {e}")
+            return "", empty
+        latencies[name] = time.monotonic() - started
+        health.record_success(name, "get_indicators", latencies[name])
+
+        # Providers return a plain message instead of (result_str, data) on missing data
+        if not isinstance(res, tuple):
+            print(f"⚠️ {label}: {res}")
+            return "", empty
+        return res
+
+    # YFinance (ส่ง tickers['yfinance'] แทน symbol เดิม)
     # Alpha Vantage
-    result_str_av, data_av = "", []
-    try:
-        # ส่ง tickers['alphavantage']
-        # หมายเหตุ: สำหรับทองคำ (XAUUSD) ใน Alpha Vantage อาจต้องเรียกฟังก์ชันแยกถ้า library คุณแยก endpoint
-        # แต่ถ้าใช้ฟังก์ชันมาตรฐานที่เรียก TIME_SERIES_DAILY มันอาจจะไม่เจอ XAUUSD
-        # ถ้าโค้ด get_indicator ของคุณรองรับ FX_DAILY จะดีมาก
-        result_str_av, data_av = get_indicator(
-            tickers['alphavantage'], indicator, curr_date, look_back_days
-        )
-    except Exception as e:
-        print(f"⚠️ Alpha Vantage Error: {e}")
-
-    # TradingView
-    result_str_tv, data_tv = "", pd.DataFrame()
-    try:
-        # ส่ง tickers['tradingview']
-        result_str_tv, data_tv = get_tradingview_indicators(
-            tickers['tradingview'], indicator, curr_date, look_back_days
-        )
-    except Exception as e:
-        print(f"⚠️ TradingView Error: {e}")
+    # หมายเหตุ: สำหรับทองคำ (XAUUSD) ใน Alpha Vantage อาจต้องเรียกฟังก์ชันแยกถ้า library คุณแยก endpoint
+    # แต่ถ้าใช้ฟังก์ชันมาตรฐานที่เรียก TIME_SERIES_DAILY มันอาจจะไม่เจอ XAUUSD
+    # ถ้าโค้ด get_indicator ของคุณรองรับ FX_DAILY จะดีมาก
+    providers = {
+        "yfinance": ("Yahoo Finance", get_stock_stats_indicators_window, tickers['yfinance'], []),
+        "alpha_vantage": ("Alpha Vantage", get_indicator, tickers['alphavantage'], []),
+        "tradingview": ("TradingView", get_tradingview_indicators, tickers['tradingview'], pd.DataFrame()),
+    }
+    fetched = {}
+
+    # หลัง warm-up: เรียกเฉพาะเจ้าที่อันดับดีที่สุดก่อน แล้วค่อยไล่ลงตามอันดับ
+    data_type = f"get_indicators:{indicator}"
+    ranking = get_vendor_ranking()
+    order = ranking.plan(market, data_type, list(providers)) if ranking else None
+    if order:
+        print(f"   🏁 Learned ranking ({market}): {' → '.join(order)}")
+        for name in order:
+            fetched[name] = fetch_provider(name, *providers[name])
+            ok = bool(fetched[name][0])
+            if name in latencies:
+                ranking.record_call(market, data_type, name, latencies[name], ok)
+            if ok:
+                return fetched[name][0]
+        print("   ⚠️ Ranked providers returned no data, running full comparison")
+
+    for name, args in providers.items():
+        if name not in fetched:
+            fetched[name] = fetch_provider(name, *args)
+
+    result_str_yf, data_yf = fetched["yfinance"]
+    result_str_av, data_av = fetched["alpha_vantage"]
+    result_str_tv, data_tv = fetched["tradingview"]
+    if data_tv is None:
+        data_tv = pd.DataFrame()
 
     # --- 4. Compute Scores (เหมือนเดิม) ---
     # หมายเหตุ: ทองคำราคา Future กับ Spot อาจต่างกันเล็กน้อย 
     # คุณอาจต้องปรับ tolerance เพิ่มขึ้นถ้า market == "GOLD"
     current_tolerance = 0.05 if market == "GOLD" else 0.01
 
-    scores, best_sources = compute_core_indicator_score(
+    scores, best_sources, diagnostics = compute_core_indicator_score(
         data_yf=data_yf,
         data_av=data_av,
         data_tv=data_tv,
         indicator=indicator,
-        tolerance=current_tolerance # ปรับความยืดหยุ่นตามสินทรัพย์
+        tolerance=current_tolerance, # ปรับความยืดหยุ่นตามสินทรัพย์
+        return_diagnostics=True,
     )
 
     print(f"   Scores: {scores} => Best: {best_sources}")
+    disputed = diagnostics[diagnostics['disagree_pairs'] > 0]
+    if not disputed.empty:
+        worst = disputed['max_rel_diff'].idxmax()
+        print(f"   ⚠️ {len(disputed)}/{len(diagnostics)} dates disagree "
+              f"(worst {worst.strftime('%Y-%m-%d')}: {disputed.loc[worst, 'max_rel_diff']:.2%}, outliers: {disputed.loc[worst, 'outliers'] or '-'})")
+
+    if ranking:
+        available = [name for name, (result_str, _) in fetched.items() if result_str]
+        ranking.record_comparison(
+            market, data_type,
+            {SCORE_VENDORS[k]: float(v) for k, v in scores.items()},
+            latencies, available,
+        )
 
     # --- 5. Report & Return (เหมือนเดิม) ---
     report_message = (
@@ -290,16 +222,8 @@ def get_indicators(
     
     return f"No data found for indicator {indicator}"
 
-def get_all_indicators_batch(symbol: str, curr_date: str, look_back_days: int = 7) -> str:
-    """
-    Fetch all key indicators in parallel using ThreadPoolExecutor.
-    """
-    # List of key indicators corresponding to the Market Analyst's needs
-    indicators_list = [
-        "close_50_sma", "close_200_sma", "close_10_ema",
-        "macd", "rsi", "boll", "atr", "vwma"
-    ]
-    
+def _remote_indicators_batch(symbol: str, curr_date: str, look_back_days: int, indicators_list) -> dict:
+    """Legacy path: one multi-vendor get_indicators() comparison per indicator."""
     results = {}
     
     def fetch_one(ind):
@@ -311,8 +235,6 @@ def get_all_indicators_batch(symbol: str, curr_date: str, look_back_days: int =
         except Exception as e:
             return f"Error fetching {ind}: {e}"
 
-    print(f"\n🚀🚀 Batch Fetching {len(indicators_list)} Indicators for {symbol}...")
-    
     with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
         future_to_ind = {executor.submit(fetch_one, ind): ind for ind in indicators_list}
         for future in concurrent.futures.as_completed(future_to_ind):
@@ -323,6 +245,127 @@ def get_all_indicators_batch(symbol: str, curr_date: str, look_back_days: int =
                 results[ind] = data.strip()
             except Exception as e:
                 results[ind] = f"Error: {e}"
+    return results
+
+_batch_runs = 0
+_batch_runs_lock = threading.Lock()
+
+def _cross_check_sample(symbol, market, values, curr_date, look_back_days, settings):
+    """Every `cross_check_every` batches, compare one (rotating) indicator with Yahoo/stockstats."""
+    global _batch_runs
+    every = settings.get("cross_check_every", 0)
+    if not every:
+        return
+    with _batch_runs_lock:
+        _batch_runs += 1
+        run = _batch_runs
+    if run % every:
+        return
+    # หมุนเวียนตัวที่สุ่มตรวจ ครั้งละหนึ่งตัว (ใช้ remote call แค่ครั้งเดียว)
+    sample = CROSS_CHECKABLE[(run // every) % len(CROSS_CHECKABLE)]
+    ticker = resolve_symbol_for_indicators(symbol, market)["yfinance"]
+    try:
+        res = get_stock_stats_indicators_window(ticker, sample, curr_date, look_back_days)
+    except Exception as e:
+        print(f"   ⚠️ Cross-check {sample} failed: {e}")
+        return
+    if not isinstance(res, tuple):
+        return
+    local = indicator_window(values, sample, curr_date, look_back_days)
+    result = cross_check(local, res[1], tolerance=settings.get("cross_check_tolerance", 0.01))
+    print(f"   🔎 Cross-check {sample} vs yfinance: {result['compared']} bars, agreement {result['agreement']:.0%}")
+
+def _local_indicator_values(symbol, market, curr_date, look_back_days, settings):
+    """Indicator rows covering the report window, as (values, source) or (None, None).
+
+    With a stored streaming state only the bars since its last update are
+    fetched and fed to it; otherwise the full history is fetched, computed in
+    one pass and used to (re)build the state.
+    """
+    state_settings = get_config().get("indicator_state", {})
+    store = get_indicator_state_store()
+    verify = state_settings.get("verify", False)
+    window_start = pd.Timestamp(curr_date) - pd.Timedelta(days=look_back_days)
+
+    state = store.load(symbol) if store is not None else None
+    if state is not None and state.last_date and state.last_date <= curr_date and not verify:
+        # ขอเฉพาะแท่งใหม่ (ซ้อนกับแท่งล่าสุดที่เก็บไว้ 1 สัปดาห์ เพื่อเช็คว่าต่อกันได้)
+        start_date = (pd.Timestamp(state.last_date) - pd.Timedelta(days=7)).strftime("%Y-%m-%d")
+        prices = get_stock_frame(symbol, start_date, curr_date, market=market)
+        state = store.refresh(symbol, prices) if not prices.empty else None
+        if state is not None:
+            values = state.history_frame()
+            if not values.empty and values.index[0] <= window_start:
+                print(f"   ⚡ Indicator state for {symbol} advanced to {state.last_date} ({state.bars} bars)")
+                return values, f"indicator state ({prices.source})"
+        print(f"   ↻ Indicator state for {symbol} does not connect, recomputing from full history")
+
+    history_days = settings.get("history_days", HISTORY_DAYS)
+    start_date = (datetime.strptime(curr_date, "%Y-%m-%d") - timedelta(days=look_back_days + history_days)).strftime("%Y-%m-%d")
+    prices = get_stock_frame(symbol, start_date, curr_date, market=market)
+    if prices.empty:
+        print(f"   ⚠️ No price data for the local engine ({(prices.error or '').strip()}), using vendor comparison")
+        return None, None
+
+    if store is not None:
+        stored = store.load(symbol)
+        # ไม่ย้อน state กลับไปในอดีต (เช่นตอน backtest)
+        if stored is None or stored.last_date is None or stored.last_date <= curr_date:
+            store.refresh(symbol, prices, rebuild=True, verify=verify)
+    return compute_indicators(prices), f"local engine ({prices.source})"
+
+def get_multi_timeframe_indicators(symbol: str, curr_date: str) -> str:
+    """
+    Daily, weekly and monthly indicator snapshot from a single daily OHLCV fetch.
+
+    Higher timeframes are resampled locally instead of asking the vendors for
+    1w / 1M bars, so every timeframe costs the same one price request.
+    """
+    settings = get_config().get("multi_timeframe", {})
+    history_days = settings.get("history_days", 1825)
+    timeframes = settings.get("timeframes", list(TIMEFRAMES))
+    start_date = (datetime.strptime(curr_date, "%Y-%m-%d") - timedelta(days=history_days)).strftime("%Y-%m-%d")
+
+    print(f"\n🕒 Multi-timeframe indicators for {symbol} ({', '.join(timeframes)})...")
+    prices = get_stock_frame(symbol, start_date, curr_date, market=auto_detect_market(symbol))
+    if prices.empty:
+        return prices.error or f"No price data for {symbol} between {start_date} and {curr_date}"
+
+    results = process_multi_timeframe(prices, timeframes)
+    return (
+        f"=== MULTI-TIMEFRAME INDICATOR REPORT FOR {symbol} ({prices.source}) ===\n"
+        + format_multi_timeframe(results)
+    )
+
+def get_all_indicators_batch(symbol: str, curr_date: str, look_back_days: int = 7) -> str:
+    """
+    Compute all key indicators locally from a single OHLCV fetch.
+
+    Falls back to the per-indicator vendor comparison when the price data
+    cannot be fetched or the engine is disabled in the config.
+    """
+    settings = get_config().get("indicator_engine", {})
+    indicators_list = list(SUPPORTED_INDICATORS)
+    
+    print(f"\n🚀🚀 Batch Computing {len(indicators_list)} Indicators for {symbol}...")
+
+    results = None
+    if settings.get("enabled", True):
+        market = auto_detect_market(symbol)
+        values, source = _local_indicator_values(symbol, market, curr_date, look_back_days, settings)
+        if values is not None:
+            results = {
+                ind: render_indicator(ind, indicator_window(values, ind, curr_date, look_back_days), curr_date, look_back_days, source)
+                for ind in indicators_list
+            }
+            _cross_check_sample(symbol, market, values, curr_date, look_back_days, settings)
+
+    if results is None:
+        indicators_list = [
+            "close_50_sma", "close_200_sma", "close_10_ema",
+            "macd", "rsi", "boll", "atr", "vwma"
+        ]
+        results = _remote_indicators_batch(symbol, curr_date, look_back_days, indicators_list)
 
     # Format Output as a consolidated string
     output_lines = []
@@ -333,4 +376,4 @@ def get_all_indicators_batch(symbol: str, curr_date: str, look_back_days: int =
         output_lines.append(val)
         output_lines.append("") # Empty line separator
     
-    return "\n".join(output_lines)
\ No newline at end of file
+    return "\n".join(output_lines)
@@ -3,7 +3,9 @@ import sys
 import pandas as pd
 import io
 import re
+import time
 import requests
+from datetime import datetime, timedelta
 from langchain_core.tools import tool
 from typing import Annotated
 
@@ -13,29 +15,22 @@ from tradingagents.dataflows.y_finance import get_YFin_data_online
 from tradingagents.dataflows.alpha_vantage_stock import get_alpha_vantage_stock
 from tradingagents.dataflows.trading_view import get_TV_data_online
 from tradingagents.dataflows.twelve_data import get_twelvedata_stock
+from tradingagents.dataflows.vendor_health import get_health_registry
+from tradingagents.dataflows.vendor_ranking import get_vendor_ranking
+from tradingagents.dataflows.config import get_config
+from tradingagents.dataflows.ohlcv_store import get_ohlcv_store, provider_gap_fetcher
+from tradingagents.dataflows.price_frame import PriceFrame
+from tradingagents.dataflows.reconciliation import consensus_frame
+from tradingagents.dataflows.provider_compare import (
+    COMPARE_COLUMNS, fetch_providers, pick_best_source, score_providers, score_tolerance,
+)
+from tradingagents.dataflows.artifact_writer import get_artifact_writer
+from tradingagents.dataflows.symbol_resolver import detect_market, vendor_codes
 
 # ==========================================
 # Helper Functions
 # ==========================================
 
-def to_df(csv_string: str) -> pd.DataFrame:
-    """Convert CSV string to pandas DataFrame."""
-    if not csv_string or csv_string.strip() == "":
-        return pd.DataFrame()
-    try:
-        return pd.read_csv(io.StringIO(csv_string))
-    except Exception:
-        return pd.DataFrame()
-
-def extract_record_count(header: str) -> int:
-    """Extract 'Total records: XXX' from header."""
-    if not header:
-        return 0
-    match = re.search(r"Total records:\s*(\d+)", header)
-    if match:
-        return int(match.group(1))
-    return 0
-
 def sent_to_telegram(report_message, score: dict, best_source: str):
     """Send comparison result to Telegram bot."""
     TOKEN = os.getenv("TELEGRAM_TOKEN")
@@ -58,142 +53,55 @@ def sent_to_telegram(report_message, score: dict, best_source: str):
         "text": MESSAGE
     }
 
-    # write text file
-    with open("all_report_message.txt", "w", encoding='utf-8') as file:
-        file.write(MESSAGE + "\n\n")
+    # write text file (same queue as the appends, so the reset stays in order)
+    get_artifact_writer().write_text("all_report_message.txt", MESSAGE + "\n\n")
 
     # try:
     #     requests.post(url, data=data, timeout=5)
     # except Exception as e:
     #     print(f"Telegram Error: {e}")
 
+def fetch_from_store(store, provider, fetch, ticker, start_date, end_date):
+    """Serve a provider's bars from the local OHLCV store, fetching only the missing days.
+
+    Returns a PriceFrame, or a "No data" message like the provider functions.
+    """
+    frame = store.get_range(provider, ticker, start_date, end_date, provider_gap_fetcher(provider, fetch))
+    if frame.empty:
+        return f"No data found for symbol '{ticker}' between {start_date} and {end_date}"
+    return PriceFrame(ticker, frame, f"local store: {provider}", start_date=start_date, end_date=end_date)
+
 # ==========================================
 # Core Logic: Compare Providers
 # ==========================================
 
 def resolve_symbol(symbol, market="US"):
-    symbol = symbol.upper().strip()
-    
-    mapping = {
-        "yfinance": symbol,
-        "twelvedata": symbol,
-        "tradingview": symbol,
-        "market_type": "stock"
-    }
-
-    # --- ตลาดฮ่องกง (HK) ---
-    if market == "HK":
-        # ถ้า User พิมพ์ 0700.HK มาแล้ว ให้ลบ .HK ออกก่อนเพื่อ process ง่ายๆ
-        raw_code = symbol.replace(".HK", "")
-        
-        # YFinance: ต้องมี 4 หลัก + .HK (เช่น 0700.HK)
-        yf_code = raw_code.zfill(4)
-        mapping["yfinance"] = f"{yf_code}.HK"
-        
-        # TradingView: ปกติใช้รหัสเลขได้เลย หรือ HKEX:รหัส
-        # ตัดเลข 0 นำหน้าออกสำหรับ TradingView (บางที 0700 ต้องใช้ 700)
-        tv_code = str(int(raw_code)) 
-        mapping["tradingview"] = f"HKEX:{tv_code}"
-        
-        # TwelveData: ใช้รหัสเลข 4 หลัก
-        mapping["twelvedata"] = raw_code.zfill(4)
-
-    # --- ตลาดจีนแผ่นดินใหญ่ (CN) ---
-    elif market == "CN":
-        # ถ้ามี suffix มาแล้ว (.SS/.SZ)
-        if "." in symbol:
-            mapping["yfinance"] = symbol
-            # แปลง suffix เป็น prefix สำหรับ TV
-            code, suffix = symbol.split(".")
-            exchange = "SSE" if suffix == "SS" else "SZSE"
-            mapping["tradingview"] = f"{exchange}:{code}"
-        else:
-            # เดาจากเลข
-            suffix = ".SS" if symbol.startswith("6") else ".SZ"
-            mapping["yfinance"] = f"{symbol}{suffix}"
-            prefix = "SSE" if symbol.startswith("6") else "SZSE"
-            mapping["tradingview"] = f"{prefix}:{symbol}"
-
-    # --- ตลาดไทย (TH) ---
-    elif market == "TH":
-        raw_code = symbol.replace(".BK", "")
-        mapping["yfinance"] = f"{raw_code}.BK"
-        mapping["tradingview"] = f"SET:{raw_code}"
-        mapping["twelvedata"] = raw_code
-
-    # --- ตลาดทอง (GOLD) ---
-    elif market == "GOLD":
-        mapping["market_type"] = "commodities"
-        mapping["yfinance"] = "GC=F"
-        mapping["twelvedata"] = "XAU/USD"
-        mapping["tradingview"] = "OANDA:XAUUSD"
-
-    return mapping
-
-import yfinance as yf
-
-def _check_ticker_exists(symbol):
-    try:
-        t = yf.Ticker(symbol)
-        # เช็ก history 1 วัน ชัวร์กว่า fast_info
-        hist = t.history(period="5d") # เอา 5 วันเผื่อติดวันหยุด
-        return not hist.empty
-    except:
-        return False
+    """Per-vendor tickers for a symbol (see symbol_resolver.vendor_codes)."""
+    return vendor_codes(symbol, market)
 
 def auto_detect_market(symbol):
-    symbol = symbol.upper().strip()
-    print(f"🕵️ Checking market for: {symbol} ...")
-
-    # 1. เช็ก Suffix ที่ User ใส่มาเอง (Trust User)
-    if symbol.endswith(".HK"): return "HK"  # ฮ่องกง
-    if symbol.endswith(".BK"): return "TH"  # ไทย
-    if symbol.endswith(".SS"): return "CN"  # จีน (Shanghai)
-    if symbol.endswith(".SZ"): return "CN"  # จีน (Shenzhen)
-
-    # 2. เช็กทองคำ
-    if symbol in ["GOLD", "XAUUSD", "GC=F", "XAU/USD"]: return "GOLD"
-
-    # 3. เช็กตัวเลข (หุ้นจีน / ฮ่องกง)
-    if symbol.isdigit():
-        # -- ฮ่องกง (HK) --
-        # หุ้นฮ่องกงมักมี 1-5 หลัก (เช่น 700, 9988)
-        # ลองเติม 0 ข้างหน้าให้ครบ 4 หลัก (ตาม format Yahoo)
-        hk_code = symbol.zfill(4)
-        if _check_ticker_exists(f"{hk_code}.HK"):
-            print(f"   👉 Found: Hong Kong Stock (.HK)")
-            return "HK"
-            
-        # -- จีนแผ่นดินใหญ่ (CN) --
-        # หุ้นจีนมักมี 6 หลัก
-        if len(symbol) == 6:
-            if symbol.startswith("6") and _check_ticker_exists(f"{symbol}.SS"):
-                print(f"   👉 Found: China Shanghai (.SS)")
-                return "CN"
-            if _check_ticker_exists(f"{symbol}.SZ"):
-                print(f"   👉 Found: China Shenzhen (.SZ)")
-                return "CN"
-
-    # 4. เช็ก US / Global (เช่น BABA, AAPL, TSLA)
-    # BABA จะตกมาที่นี่
-    if _check_ticker_exists(symbol):
-        print(f"   👉 Found: US/Global Stock")
-        return "US"
-
-    # 5. Fallback: ลองเช็กตลาดไทย (.BK) กรณีไม่ได้ใส่ suffix
-    # เช่น user พิมพ์ "KBANK" แล้วหาใน US ไม่เจอ
-    if _check_ticker_exists(f"{symbol}.BK"):
-        print(f"   👉 Found: Thai Stock (.BK)")
-        return "TH"
-
-    print(f"   ⚠️ Not found, defaulting to US")
-    return "US"
+    """Market of a symbol via the shared, cached symbol resolver."""
+    return detect_market(symbol)
+
+def compare_stock_providers(symbol, start_date, end_date, market=None, consensus=None):
+    """(header, csv) of the most reliable provider; see compare_stock_frames."""
+    frame = compare_stock_frames(symbol, start_date, end_date, market=market, consensus=consensus)
+    if frame.error:
+        return frame.error, ""
+    return frame.header or frame.default_header(), frame.to_csv()
 
 # เพิ่ม parameter market="US" เป็นค่าเริ่มต้น
-def compare_stock_providers(symbol, start_date, end_date, market=None):
+def compare_stock_frames(symbol, start_date, end_date, market=None, consensus=None) -> PriceFrame:
+    """Fetch OHLCV from every provider, score their agreement and return the winner as a PriceFrame.
+
+    Provider text is parsed exactly once (in fetch_provider); scoring, consensus
+    and the caller all work on the resulting DataFrames.
+    """
 
     if market is None:
         market = auto_detect_market(symbol)
+    if consensus is None:
+        consensus = get_config().get("stock_consensus", False)
     
     # ✅ 1. Resolve Symbol ก่อนเริ่มงาน
     tickers = resolve_symbol(symbol, market)
@@ -204,120 +112,159 @@ def compare_stock_providers(symbol, start_date, end_date, market=None):
     print(f"   ► TradingView: {tickers['tradingview']}")
 
     raw_data = {
-        "yfinance": {"header": "", "csv": "", "count": 0},
-        "twelvedata": {"header": "", "csv": "", "count": 0},
-        "tradingview": {"header": "", "csv": "", "count": 0},
+        name: PriceFrame(symbol, pd.DataFrame(), name, market=market)
+        for name in ("yfinance", "twelvedata", "tradingview")
     }
 
     # --- 2. Call Each Provider (Using Specific Tickers) ---
-    
-    # YFinance
-    try:
-        # ส่ง tickers["yfinance"] แทน symbol เดิม
-        h, c = get_YFin_data_online(tickers["yfinance"], start_date, end_date)
-        raw_data["yfinance"] = {"header": h, "csv": c, "count": extract_record_count(h)}
-    except Exception as e:
-        print(f"⚠️ YFinance Failed: {e}")
-
-    # TwelveData
-    try:
-        # หมายเหตุ: TwelveData อาจต้องแก้ฟังก์ชัน get_twelvedata ให้รับ exchange parameter เพิ่มถ้าเป็นหุ้นไทย
-        h, c = get_twelvedata_stock(tickers["twelvedata"], start_date, end_date)
-        raw_data["twelvedata"] = {"header": h, "csv": c, "count": extract_record_count(h)}
-    except Exception as e:
-        print(f"⚠️ TwelveData Failed: {e}")
-
-    # TradingView
-    try:
-        h, c = get_TV_data_online(tickers["tradingview"], start_date, end_date)
-        raw_data["tradingview"] = {"header": h, "csv": c, "count": extract_record_count(h)}
-    except Exception as e:
-        print(f"⚠️ TradingView Failed: {e}")
-
-    # --- 3. Convert & Pre-process (เหมือนเดิม) ---
-    df_yf = to_df(raw_data["yfinance"]["csv"])
-    df_tw = to_df(raw_data["twelvedata"]["csv"])
-    df_tv = to_df(raw_data["tradingview"]["csv"])
-
-    if not df_yf.empty: df_yf["Date"] = pd.to_datetime(df_yf["Date"])
-    if not df_tw.empty: df_tw["Date"] = pd.to_datetime(df_tw["Date"])
-    if not df_tv.empty: df_tv["Date"] = pd.to_datetime(df_tv["Date"])
-
-    # --- 4. Report Message ---
+    # หมายเหตุ: TwelveData อาจต้องแก้ฟังก์ชัน get_twelvedata ให้รับ exchange parameter เพิ่มถ้าเป็นหุ้นไทย
+    providers = [
+        ("yfinance", "YFinance", get_YFin_data_online),
+        ("twelvedata", "TwelveData", get_twelvedata_stock),
+        ("tradingview", "TradingView", get_TV_data_online),
+    ]
+    health = get_health_registry()
+    store = get_ohlcv_store()
+    latencies = {}
+
+    def fetch_provider(name, label, fetch):
+        """Call one provider through its circuit breaker.
+
+        Returns (entry, latency, called): entry is the provider's PriceFrame or None,
+        latency is None when the call failed. Runs on worker threads, so it does
+        not touch raw_data/latencies itself.
+        """
+        # ข้ามเจ้าที่ circuit เปิดอยู่ (ล่ม/โดน limit) จนกว่าจะครบ cool-down
+        if not health.allow(name, "get_stock_data"):
+            print(f"⏭️ {label} skipped (circuit open)")
+            return None, None, False
+
+        started = time.monotonic()
+        try:
+            if store is not None:
+                res = fetch_from_store(store, name, fetch, tickers[name], start_date, end_date)
+            else:
+                res = fetch(tickers[name], start_date, end_date)
+            latency = time.monotonic() - started
+        except Exception as e:
+            health.record_failure(name, "get_stock_data", time.monotonic() - started)
+            print(f"⚠️ {label} Failed: {e}")
+            return None, None, True
+
+        # Providers return a plain message instead of (header, csv) when there is no data;
+        # นับเป็น success ก็ต่อเมื่อได้ PriceFrame ที่อ่านได้จริงเท่านั้น
+        if isinstance(res, PriceFrame):
+            entry = res
+        elif isinstance(res, tuple):
+            h, c = res
+            try:
+                entry = PriceFrame.from_csv(tickers[name], c, name, header=h)
+            except Exception as e:
+                health.record_failure(name, "get_stock_data", latency)
+                print(f"⚠️ {label}: unreadable data ({e})")
+                return None, latency, True
+        else:
+            health.record_failure(name, "get_stock_data", latency)
+            print(f"⚠️ {label}: {res}")
+            return None, latency, True
+        health.record_success(name, "get_stock_data", latency)
+        entry.market, entry.start_date, entry.end_date = market, start_date, end_date
+        return entry, latency, True
+
+    def collect(name, outcome):
+        entry, latency, called = outcome
+        if entry is not None:
+            raw_data[name] = entry
+        if called:
+            latencies[name] = latency
+        return entry is not None and not entry.empty
+
+    # หลัง warm-up: เรียกเฉพาะเจ้าที่อันดับดีที่สุดก่อน แล้วค่อยไล่ลงตามอันดับ
+    ranking = get_vendor_ranking()
+    # (โหมด consensus ต้องใช้ข้อมูลทุกเจ้า จึงไม่ใช้ ranking)
+    order = ranking.plan(market, "get_stock_data", [p[0] for p in providers]) if ranking and not consensus else None
+    if order:
+        by_name = {name: (label, fetch) for name, label, fetch in providers}
+        print(f"🏁 Learned ranking ({market}): {' → '.join(order)}")
+        for name in order:
+            label, fetch = by_name[name]
+            ok = collect(name, fetch_provider(name, label, fetch))
+            if name in latencies:
+                ranking.record_call(market, "get_stock_data", name, latencies[name], ok)
+            if ok:
+                print(f"🏆 Using {label} (ranked)")
+                return raw_data[name]
+        print("⚠️ Ranked providers returned no data, running full comparison")
+
+    # ดึงทุกเจ้าพร้อมกัน ภายใต้ deadline เดียว; เจ้าที่ช้าเกินได้คะแนน 0 และถูกบันทึกว่าล้มเหลว
+    deadline = get_config().get("provider_fetch_deadline", 30)
+    labels = {name: label for name, label, _ in providers}
+    outcomes, missed = fetch_providers(
+        {
+            name: (lambda name=name, label=label, fetch=fetch: fetch_provider(name, label, fetch))
+            for name, label, fetch in providers
+            if name not in latencies
+        },
+        deadline,
+    )
+    for name, outcome in outcomes.items():
+        collect(name, outcome)
+    for name, reason in missed.items():
+        latencies[name] = None
+        print(f"⏱️ {labels[name]} {reason}, scored 0 in this comparison")
+
+    # --- 3. Report Message ---
     report_message = f"===== TOTAL RECORDS CHECK ({symbol} - {market}) =====\n"
-    report_message += f"YFinance ({tickers['yfinance']}):      {raw_data['yfinance']['count']}\n"
-    report_message += f"TwelveData ({tickers['twelvedata']}):    {raw_data['twelvedata']['count']}\n"
-    report_message += f"TradingView ({tickers['tradingview']}):   {raw_data['tradingview']['count']}\n\n"
+    report_message += f"YFinance ({tickers['yfinance']}):      {raw_data['yfinance'].record_count}\n"
+    report_message += f"TwelveData ({tickers['twelvedata']}):    {raw_data['twelvedata'].record_count}\n"
+    report_message += f"TradingView ({tickers['tradingview']}):   {raw_data['tradingview'].record_count}\n"
+    for name, reason in missed.items():
+        report_message += f"{labels[name]}: {reason}\n"
+    report_message += "\n"
 
-    if df_yf.empty and df_tw.empty and df_tv.empty:
-        return f"# Error: No data found for {symbol}.\n", ""
+    if all(entry.empty for entry in raw_data.values()):
+        return PriceFrame.failed(symbol, f"# Error: No data found for {symbol}.\n", market=market)
 
     # --- 5. Scoring (ปรับปรุง Logic ทองคำ) ---
-    score = {"yfinance": 0, "twelvedata": 0, "tradingview": 0}
-    compare_cols = ["Open", "Close"]
-    
-    # หมายเหตุสำหรับทองคำ: ราคาทองแต่ละเจ้าอาจต่างกันเล็กน้อย (Futures vs Spot) 
-    # อาจต้องปรับ round(2) เป็น round(0) หรือ round(1) ถ้าเป็นทองคำเพื่อให้ match ง่ายขึ้น
-    rounding = 1 if market == "GOLD" else 2 
-
-    def calculate_match(df1, df2, suffix1, suffix2):
-        if df1.empty or df2.empty: return 0
-        try:
-            merged = df1.merge(df2, on="Date", suffixes=(suffix1, suffix2), how="inner")
-            if merged.empty: return 0
-            
-            total_matches = 0
-            for col in compare_cols:
-                # ใช้ rounding dynamic ตามประเภทสินทรัพย์
-                c1 = merged[f"{col}{suffix1}"].round(rounding)
-                c2 = merged[f"{col}{suffix2}"].round(rounding)
-                
-                # สำหรับทองคำ ยอมให้ต่างกันได้นิดหน่อย (Tolerance)
-                if market == "GOLD":
-                     # ยอมให้ต่างกันไม่เกิน 0.5 ดอลลาร์
-                    matches = (abs(c1 - c2) <= 0.5).sum()
-                else:
-                    matches = (c1 == c2).sum()
-                    
-                total_matches += matches
-            return total_matches
-        except Exception:
-            return 0
-
-    # Execute comparisons
-    s_yf_tw = calculate_match(df_yf, df_tw, "_yf", "_tw")
-    score["yfinance"] += s_yf_tw
-    score["twelvedata"] += s_yf_tw
-
-    s_yf_tv = calculate_match(df_yf, df_tv, "_yf", "_tv")
-    score["yfinance"] += s_yf_tv
-    score["tradingview"] += s_yf_tv
-
-    s_tw_tv = calculate_match(df_tw, df_tv, "_tw", "_tv")
-    score["twelvedata"] += s_tw_tv
-    score["tradingview"] += s_tw_tv
-
+    # จัดทุกเจ้าให้อยู่ในตารางเดียว (index = Date) แล้วเทียบทุกคู่พร้อมกัน
+    frames = {name: None if entry.empty else entry.data for name, entry in raw_data.items()}
+    score = score_providers(frames, market)
+    tolerance = score_tolerance(market)
 
     # --- 6. Find Winner (เหมือนเดิม) ---
-    valid_sources = {k: v for k, v in score.items() if raw_data[k]["count"] > 0}
-    
-    if valid_sources:
-        best_source = max(valid_sources, key=lambda k: (valid_sources[k], raw_data[k]["count"]))
-    else:
-        valid_counts = {k: raw_data[k]["count"] for k in raw_data if raw_data[k]["count"] > 0}
-        if valid_counts:
-            best_source = max(valid_counts, key=valid_counts.get)
-        else:
-            return f"# Error: Comparison failed for {symbol}\n", ""
+    best_source = pick_best_source(score, frames)
+    if best_source is None:
+        return PriceFrame.failed(symbol, f"# Error: Comparison failed for {symbol}\n", market=market)
+
+    if ranking:
+        available = [k for k in raw_data if not raw_data[k].empty]
+        ranking.record_comparison(market, "get_stock_data", {k: float(v) for k, v in score.items()}, latencies, available)
 
     sent_to_telegram(report_message, score, best_source)
 
-    return raw_data[best_source]["header"], raw_data[best_source]["csv"]
+    if consensus:
+        # ราคากลาง (median) ของทุกเจ้าต่อแท่ง พร้อมระบุว่าเจ้าไหนตรงกับค่ากลาง
+        columns = ["Open", "High", "Low", "Close", "Volume"]
+        merged = consensus_frame(frames, columns, provenance_columns=COMPARE_COLUMNS, **tolerance)
+        if not merged.empty:
+            for col in ["Open", "High", "Low", "Close"]:
+                merged[col] = merged[col].round(2)
+            merged["Volume"] = merged["Volume"].fillna(0).round().astype("int64")
+            header = f"# Consensus stock data for {symbol.upper()} ({market}) from {start_date} to {end_date}\n"
+            header += f"# Total records: {len(merged)}\n"
+            header += f"# Sources: median of {', '.join(k for k, df in frames.items() if df is not None)}; best single source: {best_source}\n\n"
+            return PriceFrame(symbol, merged, "consensus", market=market, start_date=start_date, end_date=end_date, header=header)
+
+    return raw_data[best_source]
 
 # ==========================================
 # ✅ MAIN TOOL DEFINITION (For Agent)
 # ==========================================
 
+def get_stock_frame(symbol: str, start_date: str, end_date: str, market=None) -> PriceFrame:
+    """Typed counterpart of get_stock_data for in-process callers (no CSV round trip)."""
+    return compare_stock_frames(symbol, start_date, end_date, market=market)
+
 # @tool
 def get_stock_data(
     symbol: Annotated[str, "Ticker symbol of the company, e.g. AAPL, TSM"],
@@ -338,6 +285,5 @@ def get_stock_data(
     """
     
     # เรียกฟังก์ชันเปรียบเทียบโดยตรง (Bypass Router เพื่อแก้ปัญหา Local/Config)
-    header, csv_string = compare_stock_providers(symbol, start_date, end_date)
-    
-    return header + csv_string
\ No newline at end of file
+    # แปลงเป็นข้อความเฉพาะตอนส่งออกให้ LLM / tool เท่านั้น
+    return get_stock_frame(symbol, start_date, end_date).render()
\ No newline at end of file
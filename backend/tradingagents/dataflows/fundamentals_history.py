@@ -0,0 +1,308 @@
+"""
+Columnar multi-year fundamentals history for `pick_fundamental_source_10years`.
+
+Every statement line item of a symbol lives in one long table
+(`<root>/<SYMBOL>.pkl`), one row per
+
+    source | freq | section | period_end | item | value | fetched_at
+
+with the vendor (`source`) as the provenance column, next to a JSON manifest
+of the latest period held per source and frequency. Old fiscal years do not
+change, so a vendor is only asked again once its next report is due (period
+end + one period + filing lag), then at most once per `recheck_after`, and
+only periods newer than the held ones are appended.
+
+Queries (`table`, `item`, `ratio`, `margins`, `growth`, `cagr`) pivot the
+table to one column per line item indexed by fiscal period (yearly or
+quarterly `PeriodIndex`) and work on whole columns at once. Vendors name the
+same line item differently ("netIncome" vs "Net Income"); `ITEM_ALIASES`
+maps the common ones to one name.
+"""
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, Optional, Sequence
+
+import pandas as pd
+
+from .config import get_config
+from .fundamentals_store import FILING_LAG_DAYS, PERIOD_DAYS, PERIOD_TOLERANCE_DAYS, STATEMENT_SECTIONS, to_date_str
+
+COLUMNS = ["source", "freq", "section", "period_end", "item", "value", "fetched_at"]
+CATEGORY_COLUMNS = ["source", "freq", "section", "item"]
+
+FREQS = ("annual", "quarterly")
+# (days per period, filing lag) -> when the next report is due
+FREQ_SCHEDULE = {
+    "annual": (PERIOD_DAYS, FILING_LAG_DAYS),
+    "quarterly": (92, 45),
+}
+PERIOD_CODES = {"annual": "Y", "quarterly": "Q"}
+
+# Same order as PREFERRED_ORDER in local.py: first source wins when merging
+SOURCE_ORDER = ("yfinance", "finnhub", "alphavantage")
+
+ITEM_ALIASES = {
+    "totalRevenue": ("totalRevenue", "Total Revenue", "Operating Revenue"),
+    "grossProfit": ("grossProfit", "Gross Profit"),
+    "operatingIncome": ("operatingIncome", "Operating Income"),
+    "netIncome": ("netIncome", "Net Income", "Net Income Common Stockholders"),
+    "eps": ("eps", "Diluted EPS", "Basic EPS"),
+    "totalAssets": ("totalAssets", "Total Assets"),
+    "totalLiabilities": ("totalLiabilities", "Total Liabilities Net Minority Interest"),
+    "shareholderEquity": ("shareholderEquity", "Stockholders Equity", "Total Equity Gross Minority Interest"),
+    "operatingCashFlow": ("operatingCashFlow", "Operating Cash Flow"),
+    "capitalExpenditures": ("capitalExpenditures", "Capital Expenditure"),
+    "freeCashFlow": ("freeCashFlow", "Free Cash Flow"),
+}
+
+# sections -> {period_end: {item: value}}, the shape of the *_10y fetchers
+HistoryFetch = Callable[[Optional[str]], Dict[str, Dict[str, Dict[str, float]]]]
+
+
+def _empty_frame() -> pd.DataFrame:
+    df = pd.DataFrame({c: pd.Series(dtype="object") for c in COLUMNS})
+    df["period_end"] = pd.to_datetime(df["period_end"])
+    df["value"] = df["value"].astype("float64")
+    df["fetched_at"] = df["fetched_at"].astype("float64")
+    return _compact(df)
+
+
+def _compact(df: pd.DataFrame) -> pd.DataFrame:
+    for col in CATEGORY_COLUMNS:
+        df[col] = df[col].astype("category")
+    return df
+
+
+def sections_to_frame(source: str, freq: str, sections: Dict, fetched_at: float) -> pd.DataFrame:
+    """{section: {period_end: {item: value}}} -> rows of the long table (missing values dropped)."""
+    rows = []
+    for section, by_period in (sections or {}).items():
+        for period, items in (by_period or {}).items():
+            period_end = to_date_str(period)
+            if not period_end:
+                continue
+            for item, value in (items or {}).items():
+                if value is None:
+                    continue
+                rows.append((source, freq, section, period_end, str(item), value, fetched_at))
+    if not rows:
+        return _empty_frame()
+    df = pd.DataFrame(rows, columns=COLUMNS)
+    df["period_end"] = pd.to_datetime(df["period_end"])
+    df["value"] = pd.to_numeric(df["value"], errors="coerce")
+    return _compact(df.dropna(subset=["value"]))
+
+
+class FundamentalsHistoryStore:
+    """Per-symbol long table of statement line items. Thread-safe."""
+
+    def __init__(self, root: str, recheck_after: float = 24 * 3600, clock: Callable[[], float] = time.time):
+        self.root = root
+        self.recheck_after = recheck_after
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._symbol_locks: Dict[str, threading.Lock] = {}
+        self._frames: Dict[str, tuple] = {}  # symbol -> (mtime, frame)
+
+    def _base(self, symbol: str) -> str:
+        return os.path.join(self.root, re.sub(r"[^A-Za-z0-9._=-]", "_", symbol.upper()))
+
+    def _symbol_lock(self, symbol: str) -> threading.Lock:
+        with self._lock:
+            return self._symbol_locks.setdefault(symbol.upper(), threading.Lock())
+
+    # ---------- storage ----------
+
+    def manifest(self, symbol: str) -> Dict:
+        try:
+            with open(self._base(symbol) + ".json", "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def frame(self, symbol: str) -> pd.DataFrame:
+        """The whole long table of a symbol (empty when nothing is stored)."""
+        path = self._base(symbol) + ".pkl"
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return _empty_frame()
+        cached = self._frames.get(symbol.upper())
+        if cached and cached[0] == mtime:
+            return cached[1]
+        try:
+            df = pd.read_pickle(path)
+        except Exception as e:
+            print(f"⚠️ Fundamentals history for {symbol} unreadable, starting over: {e}")
+            return _empty_frame()
+        self._frames[symbol.upper()] = (mtime, df)
+        return df
+
+    def _save(self, symbol: str, df: pd.DataFrame, manifest: Dict):
+        base = self._base(symbol)
+        os.makedirs(self.root, exist_ok=True)
+        try:
+            df.to_pickle(base + ".pkl.tmp")
+            os.replace(base + ".pkl.tmp", base + ".pkl")
+            with open(base + ".json.tmp", "w", encoding="utf-8") as f:
+                json.dump(manifest, f, ensure_ascii=False, indent=2)
+            os.replace(base + ".json.tmp", base + ".json")
+            self._frames[symbol.upper()] = (os.path.getmtime(base + ".pkl"), df)
+        except OSError as e:
+            print(f"⚠️ Could not save fundamentals history for {symbol}: {e}")
+
+    # ---------- incremental fetch ----------
+
+    def due(self, entry: Dict, freq: str) -> Optional[str]:
+        """Why the vendor must be asked for newer periods, or None while the held ones are current."""
+        checked_at = entry.get("checked_at")
+        if checked_at is None:
+            return "not cached"
+        now = self.clock()
+        if now - checked_at < self.recheck_after:
+            return None
+        latest = entry.get("latest")
+        if latest is None:
+            return "empty, recheck"
+        period_days, lag_days = FREQ_SCHEDULE[freq]
+        next_due = datetime.strptime(latest, "%Y-%m-%d") + timedelta(days=period_days + lag_days)
+        today = datetime.fromtimestamp(now, timezone.utc).replace(tzinfo=None)
+        if today >= next_due:
+            return f"next {freq} report due since {next_due:%Y-%m-%d}"
+        return None
+
+    def refresh(self, symbol: str, source: str, freq: str, fetch: HistoryFetch) -> int:
+        """Append the periods of `source` newer than the held ones; returns the rows added.
+
+        `fetch(since)` gets the latest held period end (None on the first run)
+        and returns {section: {period_end: {item: value}}}; vendors that cannot
+        filter may return everything, older periods are ignored.
+        """
+        with self._symbol_lock(symbol):
+            manifest = self.manifest(symbol)
+            entry = manifest.get(source, {}).get(freq, {})
+            reason = self.due(entry, freq)
+            if not reason:
+                return 0
+            latest = entry.get("latest")
+            print(f"   ↻ {source} {freq} history for {symbol}: {reason}")
+            now = self.clock()
+            try:
+                new = sections_to_frame(source, freq, fetch(latest), now)
+            except Exception as e:
+                print(f"⚠️ {source} {freq} history failed for {symbol}: {e}")
+                return 0
+
+            if latest is not None:
+                # งวดเก่าไม่เปลี่ยน: เอาเฉพาะงวดที่ใหม่กว่าที่มีอยู่ (เผื่อปีบัญชี 52/53 สัปดาห์)
+                cutoff = pd.Timestamp(latest) + pd.Timedelta(days=PERIOD_TOLERANCE_DAYS)
+                new = new[new["period_end"] > cutoff]
+
+            df = self.frame(symbol)
+            if not new.empty:
+                df = _compact(pd.concat([df.astype({c: "object" for c in CATEGORY_COLUMNS}),
+                                         new.astype({c: "object" for c in CATEGORY_COLUMNS})], ignore_index=True))
+                latest = new["period_end"].max().strftime("%Y-%m-%d")
+            manifest.setdefault(source, {})[freq] = {"latest": latest, "checked_at": now}
+            self._save(symbol, df, manifest)
+            return len(new)
+
+    # ---------- queries ----------
+
+    def sections(self, symbol: str, source: str, freq: str = "annual") -> Dict[str, Dict[str, Dict[str, float]]]:
+        """One source's history as {section: {period_end: {item: value}}} (the *_10y payload shape)."""
+        df = self.frame(symbol)
+        df = df[(df["source"] == source) & (df["freq"] == freq)]
+        out: Dict[str, Dict[str, Dict[str, float]]] = {s: {} for s in STATEMENT_SECTIONS}
+        for (section, period_end), group in df.groupby(["section", "period_end"], observed=True, sort=True):
+            out.setdefault(section, {})[period_end.strftime("%Y-%m-%d")] = dict(zip(group["item"].astype(str), group["value"]))
+        return out
+
+    def table(self, symbol: str, freq: str = "annual", source: Optional[str] = None) -> pd.DataFrame:
+        """One column per line item, one row per fiscal period (PeriodIndex).
+
+        Without `source`, vendors are merged per period in SOURCE_ORDER: the
+        first vendor that has a value wins.
+        """
+        df = self.frame(symbol)
+        df = df[df["freq"] == freq]
+        sources = [source] if source else [s for s in SOURCE_ORDER if s in set(df["source"].astype(str))]
+        merged = pd.DataFrame()
+        for src in sources:
+            part = df[df["source"] == src]
+            if part.empty:
+                continue
+            part = part.assign(period=part["period_end"].dt.to_period(PERIOD_CODES[freq]), item=part["item"].astype(str))
+            wide = part.pivot_table(index="period", columns="item", values="value", aggfunc="last")
+            merged = wide if merged.empty else merged.combine_first(wide)
+        merged.columns.name = None
+        return merged.sort_index()
+
+    @staticmethod
+    def _column(table: pd.DataFrame, name: str) -> pd.Series:
+        aliases = [a for a in ITEM_ALIASES.get(name, (name,)) if a in table.columns]
+        if not aliases:
+            return pd.Series(index=table.index, dtype="float64", name=name)
+        # ชื่อแรกที่มีค่าในงวดนั้นชนะ
+        return table[aliases].bfill(axis=1).iloc[:, 0].rename(name)
+
+    def item(self, symbol: str, name: str, freq: str = "annual", source: Optional[str] = None) -> pd.Series:
+        """One line item over time (name may be an ITEM_ALIASES key or a vendor's own label)."""
+        return self._column(self.table(symbol, freq, source), name)
+
+    def ratio(self, symbol: str, numerator: str, denominator: str, freq: str = "annual",
+              source: Optional[str] = None) -> pd.Series:
+        table = self.table(symbol, freq, source)
+        den = self._column(table, denominator)
+        return (self._column(table, numerator) / den.where(den != 0)).rename(f"{numerator}/{denominator}")
+
+    def margins(self, symbol: str, freq: str = "annual", source: Optional[str] = None,
+                items: Iterable[str] = ("grossProfit", "operatingIncome", "netIncome", "freeCashFlow")) -> pd.DataFrame:
+        """Each item as a share of totalRevenue, per period."""
+        table = self.table(symbol, freq, source)
+        revenue = self._column(table, "totalRevenue")
+        revenue = revenue.where(revenue != 0)
+        return pd.DataFrame({f"{name}Margin": self._column(table, name) / revenue for name in items}, index=table.index)
+
+    def growth(self, symbol: str, names: Sequence[str] = ("totalRevenue", "netIncome"), freq: str = "annual",
+               source: Optional[str] = None) -> pd.DataFrame:
+        """Period-over-period change of each item."""
+        table = self.table(symbol, freq, source)
+        return pd.DataFrame({name: self._column(table, name).pct_change(fill_method=None) for name in names}, index=table.index)
+
+    def cagr(self, symbol: str, name: str, years: Optional[int] = None, source: Optional[str] = None) -> Optional[float]:
+        """Compound annual growth of an annual item over the last `years` (all held years by default).
+
+        None when there are fewer than two years or the endpoints are not positive.
+        """
+        series = self.item(symbol, name, "annual", source).dropna()
+        if years is not None:
+            series = series[series.index >= series.index[-1] - years] if len(series) else series
+        if len(series) < 2:
+            return None
+        first, last = series.iloc[0], series.iloc[-1]
+        span = series.index[-1].year - series.index[0].year
+        if first <= 0 or last <= 0 or span <= 0:
+            return None
+        return float((last / first) ** (1.0 / span) - 1)
+
+
+_store: Optional[FundamentalsHistoryStore] = None
+_store_lock = threading.Lock()
+
+
+def get_fundamentals_history() -> Optional[FundamentalsHistoryStore]:
+    """Get the process-wide history store, or None when disabled in the config."""
+    global _store
+    settings = get_config().get("fundamentals_history", {})
+    if not settings.get("enabled", False):
+        return None
+    with _store_lock:
+        if _store is None:
+            root = settings.get("path") or os.path.join(get_config()["data_cache_dir"], "fundamentals_history")
+            _store = FundamentalsHistoryStore(root, recheck_after=settings.get("recheck_after", 24 * 3600))
+        return _store
@@ -0,0 +1,226 @@
+"""
+Fiscal-period-aware fundamentals store for `pick_fundamental_source`.
+
+One JSON file per resolved symbol holds, per source (yfinance / finnhub /
+alphavantage):
+
+- the overview (market cap, P/E, ...) with a short TTL;
+- the statement sections keyed by fiscal period (the `fiscalDateEnding` /
+  column date of the latest report). Statements are only refetched when
+  * the source's overview reports a newer fiscal period than the stored one,
+  * an earnings date has passed since they were fetched, or
+  * the next annual report is due (period end + one year + filing lag) and
+    has not shown up yet; then they are rechecked once per `recheck_after`;
+- the chosen-source decision, reused while the inputs it was scored on are
+  unchanged.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Dict, Optional, Tuple
+
+from .config import get_config
+
+STATEMENT_SECTIONS = ("balancesheet", "cashflow", "incomestatement")
+
+# Annual statements: next report expected a year after the period ends, plus the filing lag
+PERIOD_DAYS = 366
+FILING_LAG_DAYS = 90
+# Fiscal year ends reported by different endpoints can differ by a few days (52/53-week years)
+PERIOD_TOLERANCE_DAYS = 30
+
+OverviewFetch = Callable[[], Tuple[Dict, Dict]]
+StatementsFetch = Callable[[], Tuple[Dict, Optional[str]]]
+
+
+def to_date_str(value) -> Optional[str]:
+    """YYYY-MM-DD from a date string, datetime or epoch seconds (None if unusable)."""
+    if value in (None, "", "None", 0):
+        return None
+    try:
+        if isinstance(value, (int, float)):
+            return datetime.fromtimestamp(value, timezone.utc).strftime("%Y-%m-%d")
+        if isinstance(value, (date, datetime)):
+            return value.strftime("%Y-%m-%d")
+        return datetime.strptime(str(value)[:10], "%Y-%m-%d").strftime("%Y-%m-%d")
+    except (ValueError, OverflowError, OSError):
+        return None
+
+
+def merge_hints(old: Dict, new: Dict) -> Dict:
+    """New hints, remembering the last few earnings dates seen.
+
+    An upcoming earnings date is replaced by the next one once it passes, so
+    the dates are accumulated to still notice the one that just passed.
+    """
+    seen = set(old.get("earnings_dates", []))
+    if new.get("earnings_date"):
+        seen.add(new["earnings_date"])
+    merged = {k: v for k, v in new.items() if k != "earnings_date"}
+    merged["earnings_dates"] = sorted(seen)[-4:]
+    return merged
+
+
+def fingerprint(obj) -> str:
+    return hashlib.sha1(json.dumps(obj, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class FundamentalsStore:
+    """Per-symbol fundamentals JSON files. Thread-safe."""
+
+    def __init__(self, root: str, overview_ttl: float = 6 * 3600, recheck_after: float = 24 * 3600,
+                 clock: Callable[[], float] = time.time):
+        self.root = root
+        self.overview_ttl = overview_ttl
+        self.recheck_after = recheck_after
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._symbol_locks: Dict[str, threading.Lock] = {}
+
+    def _path(self, symbol: str) -> str:
+        safe = re.sub(r"[^A-Za-z0-9._=-]", "_", symbol.upper())
+        return os.path.join(self.root, f"{safe}.json")
+
+    def _symbol_lock(self, symbol: str) -> threading.Lock:
+        with self._lock:
+            return self._symbol_locks.setdefault(symbol.upper(), threading.Lock())
+
+    def load(self, symbol: str) -> Dict:
+        try:
+            with open(self._path(symbol), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"symbol": symbol, "sources": {}}
+
+    def _save(self, symbol: str, data: Dict):
+        path = self._path(symbol)
+        os.makedirs(self.root, exist_ok=True)
+        try:
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, default=str)
+            os.replace(path + ".tmp", path)
+        except OSError as e:
+            print(f"⚠️ Could not save fundamentals for {symbol}: {e}")
+
+    def _update(self, symbol: str, fn):
+        """Read-modify-write of one symbol file (concurrent sources must not lose each other's writes)."""
+        with self._symbol_lock(symbol):
+            data = self.load(symbol)
+            result = fn(data)
+            self._save(symbol, data)
+            return result
+
+    # ---------- freshness ----------
+
+    def statements_stale(self, entry: Dict, hints: Dict) -> Optional[str]:
+        """Why the stored statements must be refetched, or None while they are current."""
+        period = entry.get("period")
+        fetched_at = entry.get("statements_at")
+        if fetched_at is None:
+            return "not cached"
+        now = self.clock()
+        if period is None:
+            return "empty, recheck" if now - fetched_at >= self.recheck_after else None
+
+        latest = hints.get("latest_period")
+        if latest and datetime.strptime(latest, "%Y-%m-%d") > datetime.strptime(period, "%Y-%m-%d") + timedelta(days=PERIOD_TOLERANCE_DAYS):
+            return f"newer period {latest}"
+
+        fetched_day = datetime.fromtimestamp(fetched_at, timezone.utc).strftime("%Y-%m-%d")
+        today = datetime.fromtimestamp(now, timezone.utc).strftime("%Y-%m-%d")
+        for earnings in hints.get("earnings_dates", []):
+            if fetched_day < earnings <= today:
+                return f"earnings on {earnings}"
+
+        due = (datetime.strptime(period, "%Y-%m-%d") + timedelta(days=PERIOD_DAYS + FILING_LAG_DAYS)).strftime("%Y-%m-%d")
+        if today >= due and now - fetched_at >= self.recheck_after:
+            return f"next report due since {due}"
+        return None
+
+    # ---------- per-source data ----------
+
+    def get(self, symbol: str, source: str, fetch_overview: OverviewFetch, fetch_statements: StatementsFetch) -> Dict:
+        """{"overview", "balancesheet", "cashflow", "incomestatement"} of one source, fetching only stale parts.
+
+        `fetch_overview()` returns (overview, hints) where hints may carry
+        "latest_period" (latest fiscal year end) and "earnings_date" (YYYY-MM-DD);
+        `fetch_statements()` returns (sections, fiscal_period).
+        """
+        data = self.load(symbol)
+        entry = data.get("sources", {}).get(source, {})
+        now = self.clock()
+        updates = {}
+
+        overview, hints = entry.get("overview"), entry.get("hints", {})
+        if overview is None or now - entry.get("overview_at", 0) >= self.overview_ttl:
+            try:
+                overview, fresh_hints = fetch_overview()
+                hints = merge_hints(hints, fresh_hints or {})
+                updates.update(overview=overview, hints=hints, overview_at=now)
+            except Exception as e:
+                print(f"⚠️ {source} overview failed for {symbol}: {e}")
+                overview = overview or {}
+
+        reason = self.statements_stale(entry, hints or {})
+        periods = entry.get("periods", {})
+        sections = periods.get(entry.get("period") or "", {})
+        if reason:
+            print(f"   ↻ {source} statements for {symbol}: {reason}")
+            try:
+                sections, period = fetch_statements()
+                period = to_date_str(period)
+                # เก็บเฉพาะงวดล่าสุดพอ ("" = source ไม่บอกงวด)
+                updates.update(period=period, statements_at=now, periods={period or "": sections})
+            except Exception as e:
+                print(f"⚠️ {source} statements failed for {symbol}: {e}")
+
+        if updates:
+            def apply(d):
+                d.setdefault("sources", {}).setdefault(source, {}).update(updates)
+            self._update(symbol, apply)
+
+        result = {"overview": overview or {}}
+        for section in STATEMENT_SECTIONS:
+            result[section] = (sections or {}).get(section, {})
+        return result
+
+    # ---------- chosen-source decision ----------
+
+    def decision(self, symbol: str, raw: Dict) -> Optional[Dict]:
+        """Cached decision for exactly these inputs, if any."""
+        cached = self.load(symbol).get("decision")
+        if cached and cached.get("inputs") == fingerprint(raw):
+            return cached.get("result")
+        return None
+
+    def save_decision(self, symbol: str, raw: Dict, result: Dict):
+        stored = {k: v for k, v in result.items() if k != "raw"}
+
+        def apply(d):
+            d["decision"] = {"inputs": fingerprint(raw), "result": stored, "at": self.clock()}
+        self._update(symbol, apply)
+
+
+_store: Optional[FundamentalsStore] = None
+_store_lock = threading.Lock()
+
+
+def get_fundamentals_store() -> Optional[FundamentalsStore]:
+    """Get the process-wide fundamentals store, or None when disabled in the config."""
+    global _store
+    settings = get_config().get("fundamentals_store", {})
+    if not settings.get("enabled", False):
+        return None
+    with _store_lock:
+        if _store is None:
+            root = settings.get("path") or os.path.join(get_config()["data_cache_dir"], "fundamentals")
+            _store = FundamentalsStore(
+                root,
+                overview_ttl=settings.get("overview_ttl", 6 * 3600),
+                recheck_after=settings.get("recheck_after", 24 * 3600),
+            )
+        return _store
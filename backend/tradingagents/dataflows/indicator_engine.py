@@ -0,0 +1,158 @@
+"""
+Single-pass local indicator engine.
+
+Every supported indicator is computed in one vectorized pass over a single
+OHLCV frame, sharing the intermediate series (moving averages, true range,
+typical price), so a full indicator report costs one price fetch instead of
+one remote call per indicator and vendor.
+
+Conventions:
+- SMA / Bollinger / VWMA: full windows only; Bollinger uses the sample std (ddof=1)
+- EMA / MACD: ewm(span, adjust=False), seeded with the first close
+- RSI / ATR: Wilder smoothing, ewm(alpha=1/n, adjust=False), NaN for the first n bars
+- MFI: 14-bar money-flow ratio of the typical price
+"""
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .price_frame import PriceFrame
+from .reconciliation import align_series, match_mask
+
+SMA_PERIODS = (50, 200)
+EMA_PERIODS = (10,)
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+RSI_PERIOD = 14
+BOLL_PERIOD, BOLL_STD = 20, 2
+ATR_PERIOD = 14
+VWMA_PERIOD = 20
+MFI_PERIOD = 14
+
+SUPPORTED_INDICATORS = [
+    "close_50_sma", "close_200_sma", "close_10_ema",
+    "macd", "macds", "macdh",
+    "rsi",
+    "boll", "boll_ub", "boll_lb",
+    "atr",
+    "vwma",
+    "mfi",
+]
+
+# Indicators defined exactly like stockstats (the yfinance vendor), so they can
+# be cross-checked against it; stockstats uses a 14-bar VWMA and a 0-1 MFI.
+CROSS_CHECKABLE = [name for name in SUPPORTED_INDICATORS if name not in ("vwma", "mfi")]
+
+# Calendar days of history needed before the report window so that the
+# 200-bar SMA is defined and the EMAs have converged
+HISTORY_DAYS = 420
+
+
+def _ohlcv(data) -> pd.DataFrame:
+    df = data.data if isinstance(data, PriceFrame) else data
+    df = df.rename(columns={c: c.strip().capitalize() for c in df.columns})
+    return df[["Open", "High", "Low", "Close", "Volume"]].apply(pd.to_numeric, errors="coerce")
+
+
+def _wilder(series: pd.Series, period: int) -> pd.Series:
+    return series.ewm(alpha=1 / period, adjust=False, min_periods=period).mean()
+
+
+def compute_indicators(data, indicators: Optional[List[str]] = None) -> pd.DataFrame:
+    """All (or the requested) indicators for a date-indexed OHLCV frame / PriceFrame.
+
+    Returns a frame with the same index and one column per indicator.
+    """
+    wanted = set(indicators or SUPPORTED_INDICATORS)
+    unknown = wanted - set(SUPPORTED_INDICATORS)
+    if unknown:
+        raise ValueError(f"Indicator(s) {sorted(unknown)} are not supported. Please choose from: {SUPPORTED_INDICATORS}")
+
+    df = _ohlcv(data)
+    close, high, low, volume = df["Close"], df["High"], df["Low"], df["Volume"]
+    out = {}
+
+    for period in SMA_PERIODS:
+        if f"close_{period}_sma" in wanted:
+            out[f"close_{period}_sma"] = close.rolling(period).mean()
+    for period in EMA_PERIODS:
+        if f"close_{period}_ema" in wanted:
+            out[f"close_{period}_ema"] = close.ewm(span=period, adjust=False).mean()
+
+    if wanted & {"macd", "macds", "macdh"}:
+        macd = close.ewm(span=MACD_FAST, adjust=False).mean() - close.ewm(span=MACD_SLOW, adjust=False).mean()
+        signal = macd.ewm(span=MACD_SIGNAL, adjust=False).mean()
+        out["macd"], out["macds"], out["macdh"] = macd, signal, macd - signal
+
+    if "rsi" in wanted:
+        delta = close.diff()
+        avg_gain = _wilder(delta.clip(lower=0), RSI_PERIOD)
+        avg_loss = _wilder(-delta.clip(upper=0), RSI_PERIOD)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsi = 100 - 100 / (1 + avg_gain / avg_loss)
+        # avg_loss == 0 -> RSI 100 (nothing but gains)
+        out["rsi"] = rsi.where(avg_loss != 0, 100.0).where(avg_gain.notna())
+
+    if wanted & {"boll", "boll_ub", "boll_lb"}:
+        mid = close.rolling(BOLL_PERIOD).mean()
+        std = close.rolling(BOLL_PERIOD).std(ddof=1)
+        out["boll"], out["boll_ub"], out["boll_lb"] = mid, mid + BOLL_STD * std, mid - BOLL_STD * std
+
+    if "atr" in wanted:
+        prev_close = close.shift(1)
+        true_range = pd.concat([high - low, (high - prev_close).abs(), (low - prev_close).abs()], axis=1).max(axis=1)
+        out["atr"] = _wilder(true_range, ATR_PERIOD)
+
+    if "vwma" in wanted:
+        out["vwma"] = (close * volume).rolling(VWMA_PERIOD).sum() / volume.rolling(VWMA_PERIOD).sum()
+
+    if "mfi" in wanted:
+        typical = (high + low + close) / 3
+        flow = typical * volume
+        change = typical.diff()
+        positive = flow.where(change > 0, 0.0).rolling(MFI_PERIOD).sum()
+        negative = flow.where(change < 0, 0.0).rolling(MFI_PERIOD).sum()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mfi = 100 - 100 / (1 + positive / negative)
+        # The first bar has no change; no negative flow at all -> MFI 100
+        mfi = mfi.where(negative != 0, 100.0).where(positive.notna())
+        mfi.iloc[:MFI_PERIOD] = np.nan
+        out["mfi"] = mfi
+
+    return pd.DataFrame({name: out[name] for name in SUPPORTED_INDICATORS if name in wanted}, index=df.index)
+
+
+def indicator_window(values: pd.DataFrame, indicator: str, curr_date: str, look_back_days: int) -> List[tuple]:
+    """(date_str, value) pairs of one indicator in [curr_date - look_back_days, curr_date], newest first."""
+    end = pd.Timestamp(curr_date)
+    start = end - pd.Timedelta(days=look_back_days)
+    series = values[indicator].loc[start:end].dropna()
+    return [(d.strftime("%Y-%m-%d"), float(v)) for d, v in series.iloc[::-1].items()]
+
+
+def render_indicator(indicator: str, window: List[tuple], curr_date: str, look_back_days: int, source: str = "local") -> str:
+    """Report text in the same layout as the vendor indicator reports."""
+    from .y_finance import INDICATOR_DESCRIPTIONS
+
+    before = (datetime.strptime(curr_date, "%Y-%m-%d") - timedelta(days=look_back_days)).strftime("%Y-%m-%d")
+    lines = "".join(f"{d}: {v}\n" for d, v in window)
+    return (
+        f"=== {source} ===\n## {indicator} values from {before} to {curr_date}:\n\n"
+        + lines
+        + "\n\n"
+        + INDICATOR_DESCRIPTIONS.get(indicator, "No description available.")
+    )
+
+
+def cross_check(local: List[tuple], remote: List[tuple], tolerance: float = 0.01) -> Dict[str, float]:
+    """Compare local and remote (date_str, value) pairs under a relative tolerance."""
+    def series(pairs):
+        clean = [(d, float(v)) for d, v in pairs if v not in (None, "N/A")]
+        return pd.Series([v for _, v in clean], index=pd.to_datetime([d for d, _ in clean]), dtype=float)
+
+    matrix = align_series({"local": series(local), "remote": series(remote)}).dropna()
+    if matrix.empty:
+        return {"compared": 0, "agreement": float("nan")}
+    agree = match_mask(matrix.to_numpy(), rtol=tolerance)[:, 0, 1]
+    return {"compared": int(len(matrix)), "agreement": float(agree.mean())}
@@ -0,0 +1,106 @@
+"""
+Provider agreement scoring for core_indicator.
+
+Indicator values from Yahoo (list of (date_str, value)), Alpha Vantage (list
+of (datetime, value)) and TradingView (DataFrame with a 'datetime' column) are
+aligned into one (dates x providers) matrix and compared all-pairs at once
+(see reconciliation.match_mask) instead of a per-date loop.
+"""
+import numpy as np
+import pandas as pd
+
+from .reconciliation import align_series, match_mask
+
+
+def _score_series(pairs=None, frame=None, indicator=None) -> pd.Series:
+    """Provider indicator data -> float Series indexed by (normalized) date."""
+    if frame is not None:
+        if not isinstance(frame, pd.DataFrame) or frame.empty:
+            return pd.Series(dtype=float)
+        if 'datetime' not in frame.columns or indicator not in frame.columns:
+            return pd.Series(dtype=float)
+        dates, values = frame['datetime'], frame[indicator]
+    else:
+        if not pairs:
+            return pd.Series(dtype=float)
+        dates = [d for d, v in pairs if v is not None]
+        values = [v for d, v in pairs if v is not None]
+    try:
+        index = pd.to_datetime(pd.Series(dates).astype(str).str[:10], errors="coerce")
+    except Exception:
+        return pd.Series(dtype=float)
+    series = pd.Series(pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(), index=index)
+    return series[series.index.notna() & series.notna()]
+
+def compute_core_indicator_score(data_yf, data_av, data_tv, indicator, tolerance=0.01, return_diagnostics=False):
+    """
+    Compare data from different providers and score their similarity.
+
+    All providers are aligned into one (dates x providers) matrix and compared
+    pairwise at once with a relative-tolerance mask. A provider scores one
+    point per (date, other provider) pair it agrees with.
+
+    Returns (scores, best_sources), plus a per-date diagnostics DataFrame when
+    `return_diagnostics` is set: the provider values, the number of providers
+    with data, agreeing/disagreeing pairs, the largest relative difference and
+    the providers that agree with no other provider on that date.
+    """
+    names = ['yahoo', 'alpha', 'tv']
+    # 1. Yahoo: list of (date_str, value), 2. Alpha Vantage: list of (datetime, value),
+    # 3. TradingView: DataFrame with 'datetime' + indicator columns
+    matrix = align_series({
+        'yahoo': _score_series(pairs=data_yf),
+        'alpha': _score_series(pairs=data_av),
+        'tv': _score_series(frame=data_tv, indicator=indicator),
+    })
+    values = matrix.to_numpy(dtype=float)
+
+    # เทียบทุกคู่พร้อมกัน (เฉพาะคู่ที่มีค่าทั้งสองฝั่ง)
+    mask = match_mask(values, rtol=tolerance)
+    per_source = mask.sum(axis=(0, 2))
+    scores = {name: int(per_source[k]) for k, name in enumerate(names)}
+
+    # เลือก source ที่คะแนนสูงสุด
+    max_score = max(scores.values()) if scores else 0
+    best_sources = [k for k, v in scores.items() if v == max_score]
+    
+    # Fallback: ถ้าคะแนนเป็น 0 หมด ให้เลือกเจ้าที่มีข้อมูลเยอะสุด
+    if max_score == 0:
+        available = ~np.isnan(values)
+        counts = {name: int(available[:, k].sum()) for k, name in enumerate(names)}
+        max_count = max(counts.values())
+        if max_count > 0:
+            best_sources = [k for k, v in counts.items() if v == max_count]
+        else:
+            best_sources = ['alpha'] # Default สุดท้ายถ้าไม่มีข้อมูลเลย
+
+    if not return_diagnostics:
+        return scores, best_sources
+    return scores, best_sources, _score_diagnostics(matrix, mask)
+
+def _score_diagnostics(matrix: pd.DataFrame, mask: np.ndarray) -> pd.DataFrame:
+    """Per-date disagreement details for compute_core_indicator_score."""
+    values = matrix.to_numpy(dtype=float)
+    available = ~np.isnan(values)
+    both = available[:, :, None] & available[:, None, :]
+    both &= ~np.eye(values.shape[1], dtype=bool)  # ไม่นับคู่กับตัวเอง
+    upper = np.triu(np.ones(both.shape[1:], dtype=bool), k=1)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        a, b = values[:, :, None], values[:, None, :]
+        rel = np.abs(a - b) / np.maximum(np.abs(a), np.abs(b))
+    rel = np.where(both & (np.maximum(np.abs(a), np.abs(b)) > 0), rel, 0.0)
+
+    pairs = (both & upper).sum(axis=(1, 2))
+    agree = (mask & upper).sum(axis=(1, 2))
+    # เจ้าที่มีคู่ให้เทียบ แต่ไม่ตรงกับใครเลย
+    isolated = both.any(axis=2) & ~mask.any(axis=2)
+    names = np.array(matrix.columns, dtype=object)
+
+    diagnostics = matrix.copy()
+    diagnostics['n_sources'] = available.sum(axis=1)
+    diagnostics['agree_pairs'] = agree
+    diagnostics['disagree_pairs'] = pairs - agree
+    diagnostics['max_rel_diff'] = rel.max(axis=(1, 2))
+    diagnostics['outliers'] = [",".join(names[row]) for row in isolated]
+    return diagnostics
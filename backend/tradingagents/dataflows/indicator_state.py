@@ -0,0 +1,367 @@
+"""
+Streaming indicator state.
+
+`IndicatorState` keeps just enough per-symbol state to advance every
+indicator of indicator_engine by one bar in O(1): rolling-window sums
+(Kahan-compensated, like pandas), EMA values and Wilder averages, plus the
+last few output rows for report windows. States are persisted as JSON in
+`<root>/<SYMBOL>.json`, so a daily refresh only feeds the new bars instead of
+recomputing a year (or more) of history.
+
+The arithmetic mirrors pandas (ewm alpha derivation and update formula,
+rolling sums), so streamed values match `compute_indicators` up to float
+rounding; `verify_stream` / the `verify` config flag check that against the
+batch engine.
+"""
+import copy
+import json
+import math
+import os
+import re
+import threading
+from collections import deque
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .config import get_config
+from .indicator_engine import (
+    SUPPORTED_INDICATORS, SMA_PERIODS, EMA_PERIODS, MACD_FAST, MACD_SLOW, MACD_SIGNAL,
+    RSI_PERIOD, BOLL_PERIOD, BOLL_STD, ATR_PERIOD, VWMA_PERIOD, MFI_PERIOD,
+    compute_indicators,
+)
+from .price_frame import PriceFrame
+
+STATE_VERSION = 1
+NAN = float("nan")
+
+
+def _alpha_from_span(span: int) -> float:
+    # Same derivation as pandas: span -> com -> alpha
+    return 1.0 / (1.0 + (span - 1) / 2.0)
+
+
+def _alpha_from_alpha(alpha: float) -> float:
+    return 1.0 / (1.0 + (1.0 / alpha - 1.0))
+
+
+class _EWM:
+    """pandas ewm(adjust=False) advanced one observation at a time."""
+
+    def __init__(self, alpha: float, min_periods: int = 0):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.value = NAN
+        self.nobs = 0
+
+    def update(self, x: float) -> float:
+        observed = x == x
+        self.nobs += observed
+        if self.value == self.value:
+            if observed and self.value != x:
+                old_wt = 1.0 - self.alpha
+                self.value = (old_wt * self.value + self.alpha * x) / (old_wt + self.alpha)
+        elif observed:
+            self.value = x
+        return self.value if self.nobs >= max(self.min_periods, 1) else NAN
+
+    def to_dict(self) -> Dict:
+        return {"value": self.value, "nobs": self.nobs}
+
+    def load(self, data: Dict):
+        self.value, self.nobs = float(data["value"]), int(data["nobs"])
+
+
+class _RollingSum:
+    """Fixed-window sum with Kahan compensation; NaN until the window is full."""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.total = 0.0
+        self.comp = 0.0
+
+    def _add(self, x: float):
+        y = x - self.comp
+        t = self.total + y
+        self.comp = (t - self.total) - y
+        self.total = t
+
+    def update(self, x: float) -> float:
+        if len(self.values) == self.window:
+            self._add(-self.values[0])
+        self.values.append(x)
+        self._add(x)
+        return self.total if len(self.values) == self.window else NAN
+
+    def to_dict(self) -> Dict:
+        return {"values": list(self.values), "total": self.total, "comp": self.comp}
+
+    def load(self, data: Dict):
+        self.values = deque((float(v) for v in data["values"]), maxlen=self.window)
+        self.total, self.comp = float(data["total"]), float(data["comp"])
+
+
+class IndicatorState:
+    """Per-symbol streaming state for every indicator in SUPPORTED_INDICATORS."""
+
+    def __init__(self, symbol: str, history_bars: int = 30):
+        self.symbol = symbol.upper()
+        self.last_date: Optional[str] = None
+        self.bars = 0
+        self.prev_close = NAN
+        self.prev_typical = NAN
+        self.history: deque = deque(maxlen=history_bars)
+
+        self.sma = {p: _RollingSum(p) for p in SMA_PERIODS}
+        self.ema = {p: _EWM(_alpha_from_span(p)) for p in EMA_PERIODS}
+        self.macd_fast = _EWM(_alpha_from_span(MACD_FAST))
+        self.macd_slow = _EWM(_alpha_from_span(MACD_SLOW))
+        self.macd_signal = _EWM(_alpha_from_span(MACD_SIGNAL))
+        self.rsi_gain = _EWM(_alpha_from_alpha(1 / RSI_PERIOD), RSI_PERIOD)
+        self.rsi_loss = _EWM(_alpha_from_alpha(1 / RSI_PERIOD), RSI_PERIOD)
+        self.boll_window: deque = deque(maxlen=BOLL_PERIOD)
+        self.atr = _EWM(_alpha_from_alpha(1 / ATR_PERIOD), ATR_PERIOD)
+        self.vwma_pv = _RollingSum(VWMA_PERIOD)
+        self.vwma_v = _RollingSum(VWMA_PERIOD)
+        self.mfi_pos = _RollingSum(MFI_PERIOD)
+        self.mfi_neg = _RollingSum(MFI_PERIOD)
+
+    # ---------- streaming ----------
+
+    def update(self, bar_date, high: float, low: float, close: float, volume: float) -> Dict[str, float]:
+        """Advance by one bar and return the indicator values for it."""
+        high, low, close, volume = float(high), float(low), float(close), float(volume)
+        out = {}
+
+        for p, acc in self.sma.items():
+            out[f"close_{p}_sma"] = acc.update(close) / p
+        for p, ema in self.ema.items():
+            out[f"close_{p}_ema"] = ema.update(close)
+
+        macd = self.macd_fast.update(close) - self.macd_slow.update(close)
+        signal = self.macd_signal.update(macd)
+        out["macd"], out["macds"], out["macdh"] = macd, signal, macd - signal
+
+        delta = close - self.prev_close
+        gain = self.rsi_gain.update(max(delta, 0.0) if delta == delta else NAN)
+        loss = self.rsi_loss.update(max(-delta, 0.0) if delta == delta else NAN)
+        if gain != gain:
+            out["rsi"] = NAN
+        elif loss == 0:
+            out["rsi"] = 100.0
+        else:
+            out["rsi"] = 100 - 100 / (1 + gain / loss)
+
+        self.boll_window.append(close)
+        if len(self.boll_window) == BOLL_PERIOD:
+            window = np.fromiter(self.boll_window, dtype=float)
+            mid = window.mean()
+            std = math.sqrt(((window - mid) ** 2).sum() / (BOLL_PERIOD - 1))
+            out["boll"], out["boll_ub"], out["boll_lb"] = mid, mid + BOLL_STD * std, mid - BOLL_STD * std
+        else:
+            out["boll"] = out["boll_ub"] = out["boll_lb"] = NAN
+
+        if self.prev_close == self.prev_close:
+            true_range = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+        else:
+            true_range = high - low
+        out["atr"] = self.atr.update(true_range)
+
+        out["vwma"] = self.vwma_pv.update(close * volume) / self.vwma_v.update(volume)
+
+        typical = (high + low + close) / 3
+        flow = typical * volume
+        change = typical - self.prev_typical
+        positive = self.mfi_pos.update(flow if change > 0 else 0.0)
+        negative = self.mfi_neg.update(flow if change < 0 else 0.0)
+        if self.bars < MFI_PERIOD or positive != positive:
+            out["mfi"] = NAN
+        elif negative == 0:
+            out["mfi"] = 100.0
+        else:
+            out["mfi"] = 100 - 100 / (1 + positive / negative)
+
+        self.prev_close, self.prev_typical = close, typical
+        self.bars += 1
+        self.last_date = pd.Timestamp(bar_date).strftime("%Y-%m-%d")
+        row = {name: out[name] for name in SUPPORTED_INDICATORS}
+        self.history.append((self.last_date, row))
+        return row
+
+    def advance(self, prices) -> int:
+        """Feed the bars of a date-indexed OHLCV frame / PriceFrame newer than last_date."""
+        df = prices.data if isinstance(prices, PriceFrame) else prices
+        if self.last_date is not None:
+            df = df.loc[df.index > pd.Timestamp(self.last_date)]
+        for bar_date, high, low, close, volume in zip(df.index, df["High"], df["Low"], df["Close"], df["Volume"]):
+            self.update(bar_date, high, low, close, volume)
+        return len(df)
+
+    def values(self) -> Dict[str, float]:
+        return dict(self.history[-1][1]) if self.history else {name: NAN for name in SUPPORTED_INDICATORS}
+
+    def history_frame(self) -> pd.DataFrame:
+        """Recent output rows (up to `history_bars`) as a date-indexed frame."""
+        if not self.history:
+            return pd.DataFrame(columns=SUPPORTED_INDICATORS)
+        index = pd.to_datetime([d for d, _ in self.history])
+        return pd.DataFrame([row for _, row in self.history], index=index, columns=SUPPORTED_INDICATORS)
+
+    # ---------- persistence ----------
+
+    def to_dict(self) -> Dict:
+        return {
+            "version": STATE_VERSION,
+            "symbol": self.symbol,
+            "last_date": self.last_date,
+            "bars": self.bars,
+            "prev_close": self.prev_close,
+            "prev_typical": self.prev_typical,
+            "history_bars": self.history.maxlen,
+            "history": [[d, row] for d, row in self.history],
+            "sma": {str(p): acc.to_dict() for p, acc in self.sma.items()},
+            "ema": {str(p): ema.to_dict() for p, ema in self.ema.items()},
+            "macd": [self.macd_fast.to_dict(), self.macd_slow.to_dict(), self.macd_signal.to_dict()],
+            "rsi": [self.rsi_gain.to_dict(), self.rsi_loss.to_dict()],
+            "boll": list(self.boll_window),
+            "atr": self.atr.to_dict(),
+            "vwma": [self.vwma_pv.to_dict(), self.vwma_v.to_dict()],
+            "mfi": [self.mfi_pos.to_dict(), self.mfi_neg.to_dict()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "IndicatorState":
+        if data.get("version") != STATE_VERSION:
+            raise ValueError(f"Unsupported indicator state version: {data.get('version')}")
+        state = cls(data["symbol"], history_bars=data.get("history_bars", 30))
+        state.last_date = data["last_date"]
+        state.bars = int(data["bars"])
+        state.prev_close, state.prev_typical = float(data["prev_close"]), float(data["prev_typical"])
+        state.history.extend((d, {k: float(v) for k, v in row.items()}) for d, row in data["history"])
+        for p, acc in state.sma.items():
+            acc.load(data["sma"][str(p)])
+        for p, ema in state.ema.items():
+            ema.load(data["ema"][str(p)])
+        for ema, saved in zip((state.macd_fast, state.macd_slow, state.macd_signal), data["macd"]):
+            ema.load(saved)
+        state.rsi_gain.load(data["rsi"][0])
+        state.rsi_loss.load(data["rsi"][1])
+        state.boll_window.extend(float(v) for v in data["boll"])
+        state.atr.load(data["atr"])
+        state.vwma_pv.load(data["vwma"][0])
+        state.vwma_v.load(data["vwma"][1])
+        state.mfi_pos.load(data["mfi"][0])
+        state.mfi_neg.load(data["mfi"][1])
+        return state
+
+
+def verify_stream(prices, rtol: float = 1e-9, atol: float = 1e-9) -> Tuple[bool, Dict[str, float]]:
+    """Stream every bar of `prices` and compare each row with the batch engine.
+
+    Returns (ok, max absolute deviation per indicator).
+    """
+    df = prices.data if isinstance(prices, PriceFrame) else prices
+    batch = compute_indicators(df)
+    state = IndicatorState("VERIFY", history_bars=1)
+    streamed = []
+    for bar_date, high, low, close, volume in zip(df.index, df["High"], df["Low"], df["Close"], df["Volume"]):
+        streamed.append(state.update(bar_date, high, low, close, volume))
+    streamed = pd.DataFrame(streamed, index=df.index, columns=SUPPORTED_INDICATORS)
+
+    ok = True
+    deviation = {}
+    for name in SUPPORTED_INDICATORS:
+        a, b = streamed[name].to_numpy(dtype=float), batch[name].to_numpy(dtype=float)
+        same_nan = np.isnan(a) == np.isnan(b)
+        close_enough = np.isclose(a, b, rtol=rtol, atol=atol, equal_nan=True)
+        ok &= bool(same_nan.all() and close_enough.all())
+        with np.errstate(invalid="ignore"):
+            diff = np.abs(a - b)
+        deviation[name] = float(np.nanmax(diff)) if (~np.isnan(diff)).any() else 0.0
+    return ok, deviation
+
+
+class IndicatorStateStore:
+    """Per-symbol IndicatorState JSON files. Thread-safe."""
+
+    def __init__(self, root: str, history_bars: int = 30):
+        self.root = root
+        self.history_bars = history_bars
+        self._lock = threading.Lock()
+
+    def _path(self, symbol: str) -> str:
+        safe = re.sub(r"[^A-Za-z0-9._=-]", "_", symbol.upper())
+        return os.path.join(self.root, f"{safe}.json")
+
+    def load(self, symbol: str) -> Optional[IndicatorState]:
+        try:
+            with open(self._path(symbol), "r", encoding="utf-8") as f:
+                return IndicatorState.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def save(self, state: IndicatorState):
+        path = self._path(state.symbol)
+        with self._lock:
+            os.makedirs(self.root, exist_ok=True)
+            try:
+                with open(path + ".tmp", "w", encoding="utf-8") as f:
+                    json.dump(state.to_dict(), f)
+                os.replace(path + ".tmp", path)
+            except OSError as e:
+                print(f"⚠️ Could not save indicator state for {state.symbol}: {e}")
+
+    def refresh(self, symbol: str, prices, rebuild: bool = False, verify: bool = False) -> Optional[IndicatorState]:
+        """Advance the stored state of `symbol` with `prices` and return the current view.
+
+        `prices` must overlap the stored last bar (its close must match) so the
+        state connects; otherwise None is returned and the caller should pass
+        the full history with `rebuild=True`. Only completed bars (before
+        today) are persisted: today's bar can still change, so it is applied
+        to a copy. With `verify`, the bars in `prices` are also streamed from
+        scratch and compared row by row with the batch engine.
+        """
+        df = prices.data if isinstance(prices, PriceFrame) else prices
+        state = None if rebuild else self.load(symbol)
+        if state is not None and state.last_date is not None:
+            last = pd.Timestamp(state.last_date)
+            if last not in df.index or not math.isclose(float(df.loc[last, "Close"]), state.prev_close, rel_tol=1e-9):
+                return None  # gap or rewritten history (e.g. split adjustment)
+        if state is None:
+            state = IndicatorState(symbol, history_bars=self.history_bars)
+
+        today = pd.Timestamp(date.today())
+        complete, partial = df.loc[df.index < today], df.loc[df.index >= today]
+        added = state.advance(complete)
+
+        if verify and len(complete):
+            ok, deviation = verify_stream(complete)
+            worst = max(deviation.values()) if deviation else 0.0
+            print(f"   {'✅' if ok else '⚠️'} Indicator state verify {symbol}: {len(complete)} bars, max deviation {worst:.3g}")
+
+        if added:
+            self.save(state)
+        if not partial.empty:
+            state = copy.deepcopy(state)
+            state.advance(partial)
+        return state
+
+
+_store: Optional[IndicatorStateStore] = None
+_store_lock = threading.Lock()
+
+
+def get_indicator_state_store() -> Optional[IndicatorStateStore]:
+    """Get the process-wide state store, or None when disabled in the config."""
+    global _store
+    settings = get_config().get("indicator_state", {})
+    if not settings.get("enabled", False):
+        return None
+    with _store_lock:
+        if _store is None:
+            root = settings.get("path") or os.path.join(get_config()["data_cache_dir"], "indicator_state")
+            _store = IndicatorStateStore(root, history_bars=settings.get("history_bars", 30))
+        return _store
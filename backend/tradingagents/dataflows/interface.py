@@ -16,6 +16,7 @@ from .alpha_vantage import (
     get_news as get_alpha_vantage_news
 )
 from .alpha_vantage_common import AlphaVantageRateLimitError
+from .vendor_router import ROUTING_MODES, get_routing_policy, route, aroute
 
 # Configuration and routing logic
 from .config import get_config
@@ -189,8 +190,8 @@ def get_vendor(category: str, method: str = None) -> str:
     # Fall back to category-level configuration
     return config.get("data_vendors", {}).get(category, "default")
 
-def route_to_vendor(method: str, *args, **kwargs):
-    """Route method calls to appropriate vendor implementation with fallback support."""
+def _resolve_vendor_order(method: str):
+    """Return (primary_vendors, fallback_vendors) for a method."""
     category = get_category_for_method(method)
     vendor_config = get_vendor(category, method)
 
@@ -209,87 +210,44 @@ def route_to_vendor(method: str, *args, **kwargs):
         if vendor not in fallback_vendors:
             fallback_vendors.append(vendor)
 
-    # Debug: Print fallback ordering
-    primary_str = " → ".join(primary_vendors)
-    fallback_str = " → ".join(fallback_vendors)
-    print(f"DEBUG: {method} - Primary: [{primary_str}] | Full fallback order: [{fallback_str}]")
+    return primary_vendors, fallback_vendors
 
-    # Track results and execution state
-    results = []
-    vendor_attempt_count = 0
-    any_primary_vendor_attempted = False
-    successful_vendor = None
+def route_to_vendor(method: str, *args, **kwargs):
+    """Route method calls to appropriate vendor implementation with fallback support.
 
-    for vendor in fallback_vendors:
-        if vendor not in VENDOR_METHODS[method]:
-            if vendor in primary_vendors:
-                print(f"INFO: Vendor '{vendor}' not supported for method '{method}', falling back to next vendor")
-            continue
+    The calls themselves are run by vendor_router.route (response cache,
+    circuit breakers, routing policy from "vendor_routing" in the config).
+    """
+    primary_vendors, fallback_vendors = _resolve_vendor_order(method)
+    policy = get_routing_policy(method)
 
-        vendor_impl = VENDOR_METHODS[method][vendor]
-        is_primary_vendor = vendor in primary_vendors
-        vendor_attempt_count += 1
+    # Debug: Print fallback ordering
+    primary_str = " → ".join(primary_vendors)
+    fallback_str = " → ".join(fallback_vendors)
+    print(f"DEBUG: {method} - Primary: [{primary_str}] | Full fallback order: [{fallback_str}] | Mode: {policy['mode']}")
 
-        # Track if we attempted any primary vendor
-        if is_primary_vendor:
-            any_primary_vendor_attempted = True
+    return route(method, get_category_for_method(method), VENDOR_METHODS[method],
+                 primary_vendors, fallback_vendors, policy, args, kwargs)
 
-        # Debug: Print current attempt
-        vendor_type = "PRIMARY" if is_primary_vendor else "FALLBACK"
-        print(f"DEBUG: Attempting {vendor_type} vendor '{vendor}' for {method} (attempt #{vendor_attempt_count})")
 
-        # Handle list of methods for a vendor
-        if isinstance(vendor_impl, list):
-            vendor_methods = [(impl, vendor) for impl in vendor_impl]
-            print(f"DEBUG: Vendor '{vendor}' has multiple implementations: {len(vendor_methods)} functions")
-        else:
-            vendor_methods = [(vendor_impl, vendor)]
+# ==========================================
+# Async routing
+# ==========================================
 
-        # Run methods for this vendor
-        vendor_results = []
-        for impl_func, vendor_name in vendor_methods:
-            try:
-                print(f"DEBUG: Calling {impl_func.__name__} from vendor '{vendor_name}'...")
-                result = impl_func(*args, **kwargs)
-                vendor_results.append(result)
-                print(f"SUCCESS: {impl_func.__name__} from vendor '{vendor_name}' completed successfully")
-                    
-            except AlphaVantageRateLimitError as e:
-                if vendor == "alpha_vantage":
-                    print(f"RATE_LIMIT: Alpha Vantage rate limit exceeded, falling back to next available vendor")
-                    print(f"DEBUG: Rate limit details: {e}")
-                # Continue to next vendor for fallback
-                continue
-            except Exception as e:
-                # Log error but continue with other implementations
-                print(f"FAILED: {impl_func.__name__} from vendor '{vendor_name}' failed: {e}")
-                continue
+async def aroute_to_vendor(method: str, *args, **kwargs):
+    """Async counterpart of route_to_vendor.
 
-        # Add this vendor's results
-        if vendor_results:
-            results.extend(vendor_results)
-            successful_vendor = vendor
-            result_summary = f"Got {len(vendor_results)} result(s)"
-            print(f"SUCCESS: Vendor '{vendor}' succeeded - {result_summary}")
-            
-            # Stopping logic: Stop after first successful vendor for single-vendor configs
-            # Multiple vendor configs (comma-separated) may want to collect from multiple sources
-            if len(primary_vendors) == 1:
-                print(f"DEBUG: Stopping after successful vendor '{vendor}' (single-vendor config)")
-                break
-        else:
-            print(f"FAILED: Vendor '{vendor}' produced no results")
+    Coroutine vendors are awaited on the running loop; sync vendors run on the
+    shared bounded vendor pool. Routing policy, circuit breakers and the
+    response cache behave as in route_to_vendor, and losing or timed-out
+    calls are cancelled.
+    """
+    primary_vendors, fallback_vendors = _resolve_vendor_order(method)
+    policy = get_routing_policy(method)
 
-    # Final result summary
-    if not results:
-        print(f"FAILURE: All {vendor_attempt_count} vendor attempts failed for method '{method}'")
-        raise RuntimeError(f"All vendor implementations failed for method '{method}'")
-    else:
-        print(f"FINAL: Method '{method}' completed with {len(results)} result(s) from {vendor_attempt_count} vendor attempt(s)")
+    primary_str = " → ".join(primary_vendors)
+    fallback_str = " → ".join(fallback_vendors)
+    print(f"DEBUG: {method} (async) - Primary: [{primary_str}] | Full fallback order: [{fallback_str}] | Mode: {policy['mode']}")
 
-    # Return single result if only one, otherwise concatenate as string
-    if len(results) == 1:
-        return results[0]
-    else:
-        # Convert all results to strings and concatenate
-        return '\n'.join(str(result) for result in results)
\ No newline at end of file
+    return await aroute(method, get_category_for_method(method), VENDOR_METHODS[method],
+                        primary_vendors, fallback_vendors, policy, args, kwargs)
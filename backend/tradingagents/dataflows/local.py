@@ -3,7 +3,13 @@ from __future__ import annotations
 from typing import List, Dict, Optional, Iterable, Tuple, Annotated, Any
 import pandas as pd
 import os, time, json, requests, re, asyncio
-from .config import DATA_DIR
+from .config import DATA_DIR, get_config
+from .symbol_resolver import get_symbol_resolver, vendor_codes
+from .alpha_vantage_common import get_av_client
+from .yf_gateway import get_yf_gateway
+from .fundamentals_store import get_fundamentals_store, to_date_str
+from .fundamentals_history import get_fundamentals_history
+from .reconciliation import field_consensus, unit_match_mask
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
 from .reddit_utils import fetch_top_from_category
@@ -12,6 +18,23 @@ from tradingview_ta import TA_Handler, Interval
 from datetime import datetime, timezone
 import math
 import requests
+from requests.adapters import HTTPAdapter
+from .vendor_pool import run_concurrently as _run_concurrently, fetch_overview_and_statements
+from .artifact_writer import get_artifact_writer
+
+# ===================== ARTIFACT WRITES =====================
+# ไฟล์ผลลัพธ์ทั้งหมดเขียนผ่าน writer กลางเบื้องหลัง (artifact_writer.py) ไม่ขวาง request
+def save_json(obj, path: str):
+    get_artifact_writer().write_json(path, obj)
+
+def save_jsonl(items: List[Dict], path: str, append: bool = False):
+    get_artifact_writer().write_jsonl(path, items, append)
+
+def save_jsonl_line(obj, path: str, append: bool = True):
+    get_artifact_writer().write_jsonl(path, [obj], append)
+
+_save_json = save_json
+_save_jsonl = save_jsonl
 
 
 def get_YFin_data_window(
@@ -494,14 +517,6 @@ def _ensure_dir(path: str):
     if os.path.dirname(path):
         os.makedirs(os.path.dirname(path), exist_ok=True)
 
-def save_jsonl(items: List[Dict], path: str, append: bool = False):
-    _ensure_dir(path)
-    mode = "a" if append else "w"
-    with open(path, mode, encoding="utf-8") as f:
-        for obj in items:
-            f.write(json.dumps(obj, ensure_ascii=False) + "\n")
-    print(f"💾 Saved {len(items)} items to {path}")
-
 # ===================== DATA HELPERS =====================
 def _to_iso_or_raw(ts):
     if isinstance(ts, (int, float)):
@@ -774,19 +789,6 @@ def _to_epoch(dt: datetime) -> int:
 def _ensure_dir(path: str):
     os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
 
-def _save_json(items: List[Dict], path: str):
-    _ensure_dir(path)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(items, f, ensure_ascii=False, indent=2)
-
-def _save_jsonl(items: List[Dict], path: str, append: bool = False):
-    _ensure_dir(path)
-    mode = "a" if append else "w"
-    with open(path, mode, encoding="utf-8") as f:
-        for obj in items:
-            f.write(json.dumps(obj, ensure_ascii=False))
-            f.write("\n")
-
 def _window_epochs(curr_date: str, look_back_days: int) -> Tuple[int, int]:
     """คืน (start_epoch, end_epoch) โดยครอบทั้งวันของช่วงเวลา"""
     curr_dt  = datetime.strptime(curr_date, "%Y-%m-%d")
@@ -949,19 +951,6 @@ import yfinance as yf
 def _ensure_dir(path: str):
     os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
 
-def save_json(items: List[Dict], path: str):
-    _ensure_dir(path)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(items, f, ensure_ascii=False, indent=2)
-
-def save_jsonl(items: List[Dict], path: str, append: bool = False):
-    _ensure_dir(path)
-    mode = "a" if append else "w"
-    with open(path, mode, encoding="utf-8") as f:
-        for obj in items:
-            f.write(json.dumps(obj, ensure_ascii=False))
-            f.write("\n")
-
 def _to_epoch(dt: datetime) -> int:
     return int(dt.replace(tzinfo=timezone.utc).timestamp())
 
@@ -1098,8 +1087,7 @@ def finnhub_get_company_news( symbol: str ) -> List[Dict]:
                     f"Fetched {len(merged)} news items for {symbol} from Finnhub." 
 
     # write text file
-    with open("all_report_message.txt", "a", encoding='utf-8') as file:
-        file.write(reportmessage + "\n")
+    get_artifact_writer().append_text("all_report_message.txt", reportmessage + "\n")
 
     # ถ้าผู้เรียกส่ง save_jsonl_path ให้เติม {symbol} แล้วสร้างไดเรกทอรีถ้ายังไม่มี
     if save_jsonl_path:
@@ -1127,13 +1115,6 @@ USER_AGENT = "news-fetcher:v1 (by u/keingkrai)"
 def _ensure_parent_dir(path: str):
     os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
 
-def save_jsonl(items, path, append: bool = False):
-    _ensure_parent_dir(path)
-    mode = "a" if append else "w"
-    with open(path, mode, encoding="utf-8") as f:
-        for it in items:
-            f.write(json.dumps(it, ensure_ascii=False) + "\n")
-
 def _slug(s: str) -> str:
     """ทำให้เป็นชื่อไฟล์/โฟลเดอร์ที่ปลอดภัยขึ้น"""
     if s is None:
@@ -1225,8 +1206,7 @@ def reddit_get_company_news(query: str):
     # write text file
     reportmessage = f"Fetched {len(out)} news items for {query} from Reddit."
 
-    with open("all_report_message.txt", "a") as file:
-        file.write(reportmessage + "\n")
+    get_artifact_writer().append_text("all_report_message.txt", reportmessage + "\n")
 
     return out
 
@@ -1236,18 +1216,6 @@ import yfinance as yf
 def _ensure_dir(path: str):
     os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
 
-def _save_json(items: List[Dict], path: str):
-    _ensure_dir(path)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(items, f, ensure_ascii=False, indent=2)
-
-def _save_jsonl(items: List[Dict], path: str, append: bool = False):
-    _ensure_dir(path)
-    mode = "a" if append else "w"
-    with open(path, mode, encoding="utf-8") as f:
-        for it in items:
-            f.write(json.dumps(it, ensure_ascii=False) + "\n")
-
 def yfinance_get_company_news(symbol: str) -> List[Dict]:
     """
     ดึงข่าว 'ดิบ' จาก yfinance ตามที่ได้จาก API ตรง ๆ (ไม่กรองเวลา, ไม่ลบซ้ำ, ไม่เปลี่ยนฟิลด์)
@@ -1259,11 +1227,11 @@ def yfinance_get_company_news(symbol: str) -> List[Dict]:
     - คืนค่าลิสต์ข่าวแบบ raw ตาม yfinance (ถูกตัดให้ไม่เกิน max_items)
     """
     max_items: int = 50
-    t = yf.Ticker(symbol)
+    gateway = get_yf_gateway()
     try:
-        news = t.get_news()            # บางเวอร์ชันของ yfinance
+        news = gateway.news(symbol)            # บางเวอร์ชันของ yfinance
     except Exception:
-        news = getattr(t, "news", []) or []
+        news = getattr(gateway.ticker(symbol), "news", []) or []
 
     # coerce ให้เป็น list (ถ้าไม่ใช่)
     if not isinstance(news, list):
@@ -1293,8 +1261,7 @@ def yfinance_get_company_news(symbol: str) -> List[Dict]:
 
     # write text file
     reportmessage = f"Fetched {len(news)} news items for {symbol} from YFinance."
-    with open("all_report_message.txt", "a") as file:
-        file.write(reportmessage + "\n")
+    get_artifact_writer().append_text("all_report_message.txt", reportmessage + "\n")
 
     return news
 
@@ -1311,15 +1278,12 @@ def alphavantage_get_company_news(
         - alphavantage_company_news_<YYYY-MM-DD>.jsonl
     - คืนค่าลิสต์ข่าวแบบ raw ตาม Alpha Vantage (ถูกตัดจำนวนรายการ)
     หมายเหตุ:
-    - ต้องตั้งค่า ALPHAVANTAGE_API_KEY ใน env หรือส่ง api_key เข้ามา
+    - ต้องตั้งค่า ALPHA_VANTAGE_API_KEY ใน env
+    - เรียกผ่าน get_av_client() จึงใช้ rate limit/โควต้าเดียวกับ Alpha Vantage call อื่นๆ
     - NEWS_SENTIMENT รองรับตัวกรองเวลาแบบ time_from/time_to ในรูป YYYYMMDDTHHMM
     """
     look_back_days: int = 7
     max_items: int = 50
-    base_url = "https://www.alphavantage.co/query"
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
-    if not api_key:
-        raise ValueError("Missing ALPHAVANTAGE_API_KEY. Set env or pass api_key param.")
 
     # สร้างช่วงเวลา (UTC) ย้อนหลัง look_back_days วัน
     end_dt = datetime.now(timezone.utc)
@@ -1335,45 +1299,22 @@ def alphavantage_get_company_news(
         "time_to": tt,
         "sort": "LATEST",        # หรือ "EARLIEST"
         "limit": str(max(10, min(max_items, 100))),  # AV จำกัดสูงสุด ~100 ต่อคำขอ
-        "apikey": api_key,
     }
 
-    # เรียก API พร้อม retry ง่ายๆ กันเคส 5xx/429
-    session = requests.Session()
-    items = []
-    for attempt in range(3):
-        try:
-            r = session.get(base_url, params=params, timeout=30)
-            if r.status_code in (429, 503):
-                time.sleep(2 + attempt)
-                continue
-            r.raise_for_status()
-            data = r.json() or {}
-
-            # Alpha Vantage อาจส่งฟิลด์ "Note" เมื่อติด rate limit
-            if "Note" in data:
-                # รอแล้วลองใหม่
-                time.sleep(5 + attempt * 2)
-                continue
-
-            # ข่าวอยู่ใน key "feed"
-            feed = data.get("feed", []) or []
-            if not isinstance(feed, list):
-                try:
-                    feed = list(feed)
-                except Exception:
-                    feed = [feed]
+    # ผ่าน client กลาง (token bucket + โควต้ารายวัน + รวม request ที่ซ้ำกัน + cache)
+    # ติด rate limit จะได้ AlphaVantageRateLimitError ให้ router ไปเจ้าถัดไป ไม่ต้องรอ/ลองใหม่เอง
+    data = json.loads(get_av_client().request(params)) or {}
+    if "Error Message" in data:
+        raise ValueError(f"Alpha Vantage NEWS_SENTIMENT error: {data['Error Message']}")
 
-            items = feed[:max_items]
-            break
-        except requests.HTTPError:
-            if attempt == 2:
-                raise
-            time.sleep(2 + attempt)
+    # ข่าวอยู่ใน key "feed"
+    feed = data.get("feed", []) or []
+    if not isinstance(feed, list):
+        try:
+            feed = list(feed)
         except Exception:
-            if attempt == 2:
-                raise
-            time.sleep(1 + attempt)
+            feed = [feed]
+    items = feed[:max_items]
 
     # เซฟผลลัพธ์แบบ raw
     today = end_dt.strftime("%Y-%m-%d")
@@ -1386,8 +1327,7 @@ def alphavantage_get_company_news(
 
     # write text file
     reportmessage = f"Fetched {len(items)} news items for {symbol} from Alpha Vantage."
-    with open("all_report_message.txt", "a") as file:
-        file.write(reportmessage + "\n")
+    get_artifact_writer().append_text("all_report_message.txt", reportmessage + "\n")
 
     return items
 
@@ -1450,13 +1390,6 @@ from atproto import Client, models as atp_models
 def _ensure_dir(path: str):
     os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
 
-def save_jsonl(items: List[Dict], path: str, append: bool = False):
-    _ensure_dir(path)
-    mode = "a" if append else "w"
-    with open(path, mode, encoding="utf-8") as f:
-        for obj in items:
-            f.write(json.dumps(obj, ensure_ascii=False) + "\n")
-
 # =============================== Bluesky core ==============================
 
 def _post_url_from_uri(uri: str, handle: str) -> str:
@@ -1592,13 +1525,6 @@ from urllib.parse import urljoin
 def _ensure_dir(path: str):
     os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
 
-def save_jsonl(items: List[Dict], path: str, append: bool = False):
-    _ensure_dir(path)
-    mode = "a" if append else "w"
-    with open(path, mode, encoding="utf-8") as f:
-        for obj in items:
-            f.write(json.dumps(obj, ensure_ascii=False) + "\n")
-
 def _strip_html(html: str) -> str:
     if not html:
         return ""
@@ -1742,13 +1668,6 @@ def _ensure_dir(path: str):
     if d:
         os.makedirs(d, exist_ok=True)
 
-def save_jsonl(items: List[Dict], path: str, append: bool = False):
-    _ensure_dir(path)
-    mode = "a" if append else "w"
-    with open(path, mode, encoding="utf-8") as f:
-        for it in items:
-            f.write(json.dumps(it, ensure_ascii=False) + "\n")
-
 def _mk_reddit():
     return praw.Reddit(
         client_id=os.getenv("REDDIT_ID"),
@@ -1852,6 +1771,15 @@ STR_FIELDS = {
 PREFERRED_ORDER = ["yfinance", "finnhub", "alphavantage"]
 UNIT_SCALES = [1, 10, 1000, 1_000_000, 1_000_000_000]
 
+# =========================
+# PER-VENDOR CONCURRENCY
+# =========================
+# Sub-requests of one vendor (overview + statements) run at once on that
+# vendor's own capped pool (vendor_pool.py), so the stage costs one round
+# trip per vendor and never more threads than the vendor's cap.
+_finnhub_session = requests.Session()
+_finnhub_session.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=8))
+
 # =========================
 # IO & UTILS
 # =========================
@@ -1865,17 +1793,6 @@ def _fmt_path(tpl: Optional[str], symbol: str) -> Optional[str]:
     _ensure_dir_for(p)
     return p
 
-def save_json(obj, path: str):
-    _ensure_dir_for(path)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(obj, f, ensure_ascii=False, indent=2)
-
-def save_jsonl_line(obj, path: str, append: bool = True):
-    _ensure_dir_for(path)
-    mode = "a" if append else "w"
-    with open(path, mode, encoding="utf-8") as f:
-        f.write(json.dumps(obj, ensure_ascii=False) + "\n")
-
 def _try_float(x):
     try:
         if x in (None, "", "None", "NaN", "null"): return None
@@ -1901,30 +1818,9 @@ def _str_equal(a: Optional[str], b: Optional[str]) -> bool:
 # =========================
 # 🧠 SMART RESOLVE LOGIC
 # =========================
-def _is_valid_ticker(symbol: str) -> bool:
-    """Check if ticker exists via yfinance fast_info (lightweight check)"""
-    try:
-        t = yf.Ticker(symbol)
-        # Force a fetch of minimal data
-        mc = t.fast_info.market_cap
-        
-        # If market_cap is None, it might be invalid or delisted. Check history to be sure.
-        if mc is None:
-             h = t.history(period="5d")
-             return not h.empty
-
-        return True
-    except:
-        # Fallback: Check if we can get history?
-        try:
-            h = t.history(period="5d")
-            return not h.empty
-        except:
-            return False
-
 def auto_resolve_symbol(symbol: str) -> str:
     """
-    Auto-detect suffix:
+    Auto-detect suffix (via the shared, cached symbol resolver):
     - "PTT" -> "PTT.BK" (If not found in US)
     - "600519" -> "600519.SS"
     - "GOLD"/"XAUUSD" -> "GOLD" (Barrick Gold for fundamentals)
@@ -1932,40 +1828,21 @@ def auto_resolve_symbol(symbol: str) -> str:
     s = symbol.upper().strip()
     
     # 0. Handle Gold/Commodities mapping to Company
-    if s in ["XAUUSD", "GC=F", "GOLD_SPOT"]:
+    if s in ["XAUUSD", "GC=F", "GOLD_SPOT", "GOLD", "XAU/USD"]:
         return "GOLD" # Barrick Gold Corp
 
     # 1. If user already provided suffix, trust them
     if "." in s:
         return s
 
-    # 2. Numeric Symbol (Likely China)
-    if s.isdigit():
-        if _is_valid_ticker(f"{s}.SS"): return f"{s}.SS"
-        if _is_valid_ticker(f"{s}.SZ"): return f"{s}.SZ"
-        # Fallback to HK (.HK) or just return raw
-        return s
+    resolution = get_symbol_resolver().resolve(s)
+    if resolution.get("valid"):
+        return vendor_codes(s, resolution["market"])["yfinance"]
 
-    # 3. Known Thai Stock Pattern (Common 3-6 chars, not standard US dict word often)
-    # Heuristic: Try adding .BK FIRST if checking against Thai market is desired priority, 
-    # OR try Thai .BK fallback aggressively.
-    
-    # Check explicitly if plain symbol works well in US
-    # But many Thai stocks like 'CPALL' might not exist in US, so check US first.
-    if _is_valid_ticker(s):
-        # Even if valid in US, if it's a known Thai bluechip, we might prefer .BK? 
-        # For now, stick to standard logic: US/Global first.
-        return s
-    
-    # 3.2 Try Thai Suffix (.BK)
-    if _is_valid_ticker(f"{s}.BK"):
-        return f"{s}.BK"
-    
-    # 3.3 Default Fallback for potential Thai stocks not yet validated?
-    # If it looks like a Thai ticker (up to 10 chars, typically 3-6), we can default to .BK
+    # 2. Default Fallback for potential Thai stocks not yet validated
     # to let the fetchers try.
     # Ex: KBANK -> KBANK.BK (if KBANK US doesn't exist)
-    return f"{s}.BK" if len(s) >= 3 else s
+    return f"{s}.BK" if len(s) >= 3 and not s.isdigit() else s
 
 # =========================
 # FETCHERS
@@ -1995,80 +1872,124 @@ def _most_recent_col_frame(df) -> Optional[Tuple[str, Dict[str, float]]]:
         print(f"⚠️ YF DataFrame Parse Error: {e}")
         return None
 
-def fetch_yfinance(symbol: str) -> Dict[str, Dict]:
-    t = yf.Ticker(symbol)
-    
-    # Overview
-    ov = {}
-    try:
-        fi = t.fast_info
-        info = t.get_info()
-        ov = {
+def fetch_yfinance_overview(symbol: str) -> Tuple[Dict, Dict]:
+    """(overview, hints): hints carry the latest fiscal year end / earnings date for the store."""
+    gateway = get_yf_gateway()
+
+    def _fast():
+        fi = gateway.ticker(symbol).fast_info
+        return {
             "marketCap": _try_float(getattr(fi, "market_cap", None)),
             "sharesOutstanding": _try_float(getattr(fi, "shares_outstanding", None)),
             "peRatio": _try_float(getattr(fi, "trailing_pe", None)),
             "currency": getattr(fi, "currency", None),
             "exchange": getattr(fi, "exchange", None),
-            "name": info.get("shortName") or info.get("longName"),
-            "sector": info.get("sector"),
-            "industry": info.get("industry")
         }
-    except: pass
 
-    # Statements
+    got = _run_concurrently("yfinance", {"fast": _fast, "info": lambda: gateway.info(symbol)})
+    for part in got.values():
+        if isinstance(part, Exception):
+            raise part
+    info = got["info"]
+    ov = {
+        **got["fast"],
+        "name": info.get("shortName") or info.get("longName"),
+        "sector": info.get("sector"),
+        "industry": info.get("industry")
+    }
+    hints = {
+        "latest_period": to_date_str(info.get("lastFiscalYearEnd")),
+        "earnings_date": to_date_str(info.get("earningsTimestamp")),
+    }
+    return ov, hints
+
+def fetch_yfinance_statements(symbol: str) -> Tuple[Dict, Optional[str]]:
+    """({balancesheet, cashflow, incomestatement}, fiscal period of the latest annual report)."""
+    gateway = get_yf_gateway()
+    # Ticker แยกต่อ request: cache ภายใน yf.Ticker ไม่ได้ออกแบบให้ใช้ข้าม thread
+    got = _run_concurrently("yfinance", {
+        "bs": lambda: _most_recent_col_frame(getattr(gateway.ticker(symbol), "balance_sheet", None)),
+        "cf": lambda: _most_recent_col_frame(getattr(gateway.ticker(symbol), "cashflow", None)),
+        "inc": lambda: _most_recent_col_frame(getattr(gateway.ticker(symbol), "financials", None)),
+        "eps": lambda: _try_float(getattr(gateway.ticker(symbol).fast_info, "trailing_eps", None)),
+    })
     bs, cf, inc = {}, {}, {}
+    periods = []
     
     # Balance Sheet
-    try:
-        # Ticker object might return differnt formats or timezone-aware checks failing
-        bs_raw = _most_recent_col_frame(getattr(t, "balance_sheet", None))
-        if bs_raw:
-            r = bs_raw[1]
-            bs = {
-                "totalAssets": r.get("Total Assets"),
-                "totalLiabilities": r.get("Total Liab") or r.get("Total Liabilities Net Minority Interest"),
-                "shareholderEquity": r.get("Total Stockholder Equity") or r.get("Total Equity Gross Minority Interest")
-            }
-    except Exception as e: print(f"YF BS Error: {e}")
+    bs_raw = got["bs"]
+    if isinstance(bs_raw, Exception):
+        print(f"YF BS Error: {bs_raw}")
+    elif bs_raw:
+        periods.append(bs_raw[0])
+        r = bs_raw[1]
+        bs = {
+            "totalAssets": r.get("Total Assets"),
+            "totalLiabilities": r.get("Total Liab") or r.get("Total Liabilities Net Minority Interest"),
+            "shareholderEquity": r.get("Total Stockholder Equity") or r.get("Total Equity Gross Minority Interest")
+        }
 
     # Cash Flow
-    try:
-        cf_raw = _most_recent_col_frame(getattr(t, "cashflow", None))
-        if cf_raw:
-            r = cf_raw[1]
-            op = r.get("Total Cash From Operating Activities") or r.get("Operating Cash Flow")
-            cap = r.get("Capital Expenditures")
-            fcf = r.get("Free Cash Flow")
-            if fcf is None and op is not None and cap is not None: fcf = op - cap
-            cf = {"operatingCashFlow": op, "freeCashFlow": fcf, "capitalExpenditures": cap}
-    except Exception as e: print(f"YF CF Error: {e}")
+    cf_raw = got["cf"]
+    if isinstance(cf_raw, Exception):
+        print(f"YF CF Error: {cf_raw}")
+    elif cf_raw:
+        periods.append(cf_raw[0])
+        r = cf_raw[1]
+        op = r.get("Total Cash From Operating Activities") or r.get("Operating Cash Flow")
+        cap = r.get("Capital Expenditures")
+        fcf = r.get("Free Cash Flow")
+        if fcf is None and op is not None and cap is not None: fcf = op - cap
+        cf = {"operatingCashFlow": op, "freeCashFlow": fcf, "capitalExpenditures": cap}
 
     # Income
-    inc_raw = _most_recent_col_frame(getattr(t, "financials", None))
+    inc_raw = got["inc"]
+    if isinstance(inc_raw, Exception):
+        raise inc_raw
     if inc_raw:
+        periods.append(inc_raw[0])
         r = inc_raw[1]
-        eps = None
-        try: eps = _try_float(getattr(t.fast_info, "trailing_eps", None))
-        except: pass
+        eps = None if isinstance(got["eps"], Exception) else got["eps"]
         inc = {"totalRevenue": r.get("Total Revenue"), "netIncome": r.get("Net Income"), "eps": eps}
 
-    return {"overview": ov, "balancesheet": bs, "cashflow": cf, "incomestatement": inc}
+    period = max((p for p in map(to_date_str, periods) if p), default=None)
+    return {"balancesheet": bs, "cashflow": cf, "incomestatement": inc}, period
+
+def fetch_yfinance(symbol: str) -> Dict[str, Dict]:
+    # overview กับงบดึงพร้อมกันบน pool ของ yfinance (แต่ละส่วนกระจาย sub-request ของตัวเองอีกชั้น)
+    return fetch_overview_and_statements(
+        "yfinance",
+        lambda: fetch_yfinance_overview(symbol)[0],
+        lambda: fetch_yfinance_statements(symbol)[0],
+    )
 
 # --- AlphaVantage ---
-def fetch_alphavantage(symbol: str) -> Dict[str, Dict]:
-    if not ALPHAVANTAGE_API_KEY: return {}
-    
-    def _get(func):
-        try:
-            url = "https://www.alphavantage.co/query"
-            r = requests.get(url, params={"function": func, "symbol": symbol, "apikey": ALPHAVANTAGE_API_KEY}, timeout=REQUEST_TIMEOUT)
-            if r.status_code == 200:
-                d = r.json()
-                if "Note" not in d and "Error Message" not in d: return d
-        except: pass
-        return {}
-
-    ov_raw = _get("OVERVIEW")
+def _av_get(func: str, symbol: str) -> Dict:
+    try:
+        # ผ่าน client กลาง (pooling + โควต้า + รวม request ที่ซ้ำกัน)
+        d = json.loads(get_av_client().request({"function": func, "symbol": symbol}))
+        if "Note" not in d and "Error Message" not in d: return d
+    except Exception: pass
+    return {}
+
+def _av_fiscal_year_end(ov_raw: Dict) -> Optional[str]:
+    """Latest fiscal year end from OVERVIEW (FiscalYearEnd month + LatestQuarter)."""
+    latest_q = to_date_str(ov_raw.get("LatestQuarter"))
+    month = ov_raw.get("FiscalYearEnd")
+    if not latest_q or not month:
+        return None
+    try:
+        m = datetime.strptime(month[:3], "%b").month
+    except ValueError:
+        return None
+    lq = datetime.strptime(latest_q, "%Y-%m-%d")
+    year = lq.year if m <= lq.month else lq.year - 1
+    end = (pd.Timestamp(year=year, month=m, day=1) + pd.offsets.MonthEnd(0))
+    return end.strftime("%Y-%m-%d")
+
+def fetch_alphavantage_overview(symbol: str) -> Tuple[Dict, Dict]:
+    if not ALPHAVANTAGE_API_KEY: return {}, {}
+    ov_raw = _av_get("OVERVIEW", symbol)
     ov = {
         "name": ov_raw.get("Name"), "currency": ov_raw.get("Currency"),
         "exchange": ov_raw.get("Exchange"), "sector": ov_raw.get("Sector"),
@@ -2076,48 +1997,71 @@ def fetch_alphavantage(symbol: str) -> Dict[str, Dict]:
         "peRatio": _try_float(ov_raw.get("PERatio")),
         "sharesOutstanding": _try_float(ov_raw.get("SharesOutstanding"))
     }
+    return ov, {"latest_period": _av_fiscal_year_end(ov_raw)}
+
+def fetch_alphavantage_statements(symbol: str) -> Tuple[Dict, Optional[str]]:
+    if not ALPHAVANTAGE_API_KEY: return {}, None
+    periods = []
+
+    got = _run_concurrently("alphavantage", {
+        func: (lambda f=func: _av_get(f, symbol)) for func in ("BALANCE_SHEET", "CASH_FLOW", "INCOME_STATEMENT")
+    })
 
     def _parse_rep(func, mapper):
-        raw = _get(func)
+        raw = got[func] if isinstance(got[func], dict) else {}
         reports = raw.get("annualReports", [])
         if not reports: return {k: None for k in mapper}
         r = reports[0]
+        periods.append(r.get("fiscalDateEnding"))
         return {k: _try_float(r.get(v)) for k, v in mapper.items()}
 
     bs = _parse_rep("BALANCE_SHEET", {"totalAssets": "totalAssets", "totalLiabilities": "totalLiabilities", "shareholderEquity": "totalShareholderEquity"})
     cf = _parse_rep("CASH_FLOW", {"operatingCashFlow": "operatingCashflow", "capitalExpenditures": "capitalExpenditures", "freeCashFlow": "freeCashFlow"}) # logic compute fcf separate if needed
     inc = _parse_rep("INCOME_STATEMENT", {"totalRevenue": "totalRevenue", "netIncome": "netIncome", "eps": "reportedEPS"})
 
-    return {"overview": ov, "balancesheet": bs, "cashflow": cf, "incomestatement": inc}
+    period = max((p for p in map(to_date_str, periods) if p), default=None)
+    return {"balancesheet": bs, "cashflow": cf, "incomestatement": inc}, period
+
+def fetch_alphavantage(symbol: str) -> Dict[str, Dict]:
+    if not ALPHAVANTAGE_API_KEY: return {}
+    return fetch_overview_and_statements(
+        "alphavantage",
+        lambda: fetch_alphavantage_overview(symbol)[0],
+        lambda: fetch_alphavantage_statements(symbol)[0],
+    )
 
 # --- Finnhub ---
-def fetch_finnhub(symbol: str) -> Dict[str, Dict]:
-    if not FINNHUB_API_KEY: return {}
+def _finnhub_get(path, params):
+    try:
+        params["token"] = FINNHUB_API_KEY
+        r = _finnhub_session.get(f"https://finnhub.io/api/v1/{path}", params=params, timeout=REQUEST_TIMEOUT)
+        return r.json() if r.status_code == 200 else {}
+    except: return {}
+
+def fetch_finnhub_overview(symbol: str) -> Tuple[Dict, Dict]:
+    if not FINNHUB_API_KEY: return {}, {}
     # Optimization: Finnhub free doesn't support .BK/.SS well mostly.
     # But we try anyway or rely on clean symbol
-    
-    def _get(path, params):
-        try:
-            params["token"] = FINNHUB_API_KEY
-            r = requests.get(f"https://finnhub.io/api/v1/{path}", params=params, timeout=REQUEST_TIMEOUT)
-            return r.json() if r.status_code == 200 else {}
-        except: return {}
-
-    prof = _get("stock/profile2", {"symbol": symbol})
+    prof = _finnhub_get("stock/profile2", {"symbol": symbol})
     ov = {
         "name": prof.get("name"), "currency": prof.get("currency"),
         "marketCap": _try_float(prof.get("marketCapitalization", 0)) * 1_000_000, # FH returns in Million usually
         "sharesOutstanding": _try_float(prof.get("shareOutstanding")),
         "sector": prof.get("finnhubIndustry")
     }
-    
+    return ov, {}
+
+def fetch_finnhub_statements(symbol: str) -> Tuple[Dict, Optional[str]]:
+    if not FINNHUB_API_KEY: return {}, None
     # Financials
-    rep = _get("stock/financials-reported", {"symbol": symbol})
+    rep = _finnhub_get("stock/financials-reported", {"symbol": symbol})
     data = rep.get("data", [])
     bs, cf, inc = {}, {}, {}
+    period = None
     
     if data:
         report = data[0].get("report", {})
+        period = to_date_str(data[0].get("endDate"))
         
         def _find(lst, keys):
             for item in lst:
@@ -2133,7 +2077,21 @@ def fetch_finnhub(symbol: str) -> Dict[str, Dict]:
         }
         # ... (CF and INC mapping would be similar) ...
 
-    return {"overview": ov, "balancesheet": bs, "cashflow": cf, "incomestatement": inc}
+    return {"balancesheet": bs, "cashflow": cf, "incomestatement": inc}, period
+
+def fetch_finnhub(symbol: str) -> Dict[str, Dict]:
+    if not FINNHUB_API_KEY: return {}
+    return fetch_overview_and_statements(
+        "finnhub",
+        lambda: fetch_finnhub_overview(symbol)[0],
+        lambda: fetch_finnhub_statements(symbol)[0],
+    )
+
+FUNDAMENTAL_FETCHERS = {
+    "yfinance": (fetch_yfinance_overview, fetch_yfinance_statements),
+    "finnhub": (fetch_finnhub_overview, fetch_finnhub_statements),
+    "alphavantage": (fetch_alphavantage_overview, fetch_alphavantage_statements),
+}
 
 # =========================
 # ORCHESTRATOR & SCORING
@@ -2141,11 +2099,21 @@ def fetch_finnhub(symbol: str) -> Dict[str, Dict]:
 async def fetch_all_fundamentals(symbol: str) -> Dict:
     # Use asyncio.gather to fetch data concurrently in separate threads
     # This prevents blocking the event loop while waiting for HTTP requests
-    results = await asyncio.gather(
-        asyncio.to_thread(fetch_yfinance, symbol),
-        asyncio.to_thread(fetch_finnhub, symbol),
-        asyncio.to_thread(fetch_alphavantage, symbol)
-    )
+    store = get_fundamentals_store()
+    if store is not None:
+        # งบการเงินเปลี่ยนแค่ตอนมีงวดใหม่ -> ดึงเฉพาะส่วนที่หมดอายุ
+        def _fetch(src):
+            fetch_overview, fetch_statements = FUNDAMENTAL_FETCHERS[src]
+            return store.get(symbol, src, lambda: fetch_overview(symbol), lambda: fetch_statements(symbol))
+        results = await asyncio.gather(
+            *(asyncio.to_thread(_fetch, src) for src in ("yfinance", "finnhub", "alphavantage"))
+        )
+    else:
+        results = await asyncio.gather(
+            asyncio.to_thread(fetch_yfinance, symbol),
+            asyncio.to_thread(fetch_finnhub, symbol),
+            asyncio.to_thread(fetch_alphavantage, symbol)
+        )
     
     y, f, a = results
 
@@ -2153,15 +2121,60 @@ async def fetch_all_fundamentals(symbol: str) -> Dict:
     def _count(d): return sum(1 for sec in d.values() for v in sec.values() if v is not None)
     
     log_msg = f"Fetched fundamentals for {symbol}: YF={_count(y)}, FH={_count(f)}, AV={_count(a)} fields."
-    with open(REPORT_LOG_PATH, "a", encoding="utf-8") as file:
-        file.write(log_msg + "\n")
+    get_artifact_writer().append_text(REPORT_LOG_PATH, log_msg + "\n")
 
     return {"symbol": symbol, "raw": {"yfinance": y, "finnhub": f, "alphavantage": a}}
 
+def _field_matrix(raw: Dict, srcs: List[str]) -> pd.DataFrame:
+    """NUM_FIELDS x sources matrix of the latest-period values (index "section.field")."""
+    index = [f"{sec}.{fld}" for sec, flds in NUM_FIELDS.items() for fld in flds]
+    data = {
+        s: [_try_float(raw.get(s, {}).get(sec, {}).get(fld)) for sec, flds in NUM_FIELDS.items() for fld in flds]
+        for s in srcs
+    }
+    return pd.DataFrame(data, index=index, columns=srcs, dtype=float)
+
+def build_golden_record(raw: Dict, srcs: Optional[List[str]] = None) -> Tuple[Dict, Dict]:
+    """Field-level consensus across vendors -> (record, provenance).
+
+    Numeric fields (NUM_FIELDS) take the value most vendors agree with (unit
+    aware, ties by PREFERRED_ORDER); other fields take the first vendor in
+    PREFERRED_ORDER that has them. provenance[section][field] =
+    {"source", "agree", "confidence"} with confidence = agreeing vendors / vendors.
+    """
+    srcs = srcs or PREFERRED_ORDER
+    record: Dict[str, Dict] = {}
+    provenance: Dict[str, Dict] = {}
+
+    consensus = field_consensus(_field_matrix(raw, srcs), scales=UNIT_SCALES)
+    for key, row in consensus.iterrows():
+        if row["source"] is None:
+            continue
+        sec, fld = key.split(".", 1)
+        record.setdefault(sec, {})[fld] = float(row["value"])
+        provenance.setdefault(sec, {})[fld] = {
+            "source": row["source"], "agree": row["sources"], "confidence": round(float(row["confidence"]), 3)
+        }
+
+    # ฟิลด์ที่ไม่ใช่ตัวเลข (ชื่อ, สกุลเงิน, ...) และฟิลด์อื่น ๆ: ใช้ลำดับ PREFERRED_ORDER
+    for sec in ("overview", "balancesheet", "cashflow", "incomestatement"):
+        fields = {fld for s in srcs for fld in (raw.get(s, {}).get(sec) or {})} - set(NUM_FIELDS.get(sec, []))
+        for fld in sorted(fields):
+            vals = {s: (raw.get(s, {}).get(sec) or {}).get(fld) for s in srcs}
+            present = [s for s in srcs if vals[s] not in (None, "")]
+            if not present:
+                continue
+            chosen = present[0]
+            agree = [s for s in present if _str_equal(vals[s], vals[chosen])]
+            record.setdefault(sec, {})[fld] = vals[chosen]
+            provenance.setdefault(sec, {})[fld] = {
+                "source": chosen, "agree": agree, "confidence": round(len(agree) / len(srcs), 3)
+            }
+    return record, provenance
+
 def decide_single_source(fetched: Dict) -> Dict:
     raw = fetched["raw"]
     srcs = ["yfinance", "finnhub", "alphavantage"]
-    scores = {s: 0 for s in srcs}
     completeness = {s: 0 for s in srcs}
 
     sections = ["overview", "balancesheet", "cashflow", "incomestatement"]
@@ -2172,20 +2185,10 @@ def decide_single_source(fetched: Dict) -> Dict:
             data = raw.get(s, {}).get(sec, {})
             cnt = sum(1 for v in data.values() if v is not None and v != "")
             completeness[s] += cnt
-        
-        # Cross-validation Score
-        nums = NUM_FIELDS.get(sec, [])
-        vals = {s: raw.get(s, {}).get(sec, {}) for s in srcs}
-        
-        # Compare pairs
-        pairs = [("yfinance","finnhub"), ("yfinance","alphavantage"), ("finnhub","alphavantage")]
-        for fld in nums:
-            for s1, s2 in pairs:
-                v1 = _try_float(vals[s1].get(fld))
-                v2 = _try_float(vals[s2].get(fld))
-                if _match_units(v1, v2):
-                    scores[s1] += 1
-                    scores[s2] += 1
+
+    # Cross-validation Score: (field, other vendor) pairs that agree, all pairs at once
+    mask = unit_match_mask(_field_matrix(raw, srcs).to_numpy(), UNIT_SCALES)
+    scores = {s: int(mask[:, i, :].sum()) for i, s in enumerate(srcs)}
 
     # Pick Winner
     top_score = max(scores.values())
@@ -2203,12 +2206,16 @@ def decide_single_source(fetched: Dict) -> Dict:
                 winner = p
                 break
 
+    # Golden record: ค่าที่ดีที่สุดรายฟิลด์ (ไม่ทิ้งฟิลด์ที่ผู้ชนะไม่มี)
+    record, provenance = build_golden_record(raw, PREFERRED_ORDER)
+
     return {
         "symbol": fetched["symbol"],
         "chosen_source": winner,
         "scores": scores,
         "completeness": completeness,
-        "final_payload": raw.get(winner),
+        "final_payload": record,
+        "provenance": provenance,
         "raw": raw,
         "timestamp": _now_iso()
     }
@@ -2218,31 +2225,40 @@ async def pick_fundamental_source(symbol: str) -> Dict:
     Main Entry Point:
     1. Resolve Symbol (Add .BK, .SS, etc.)
     2. Fetch all sources
-    3. Score & Pick winner
+    3. Score & build the field-level golden record (reused while the inputs are unchanged)
     4. Save Files
     """
     resolved_symbol = auto_resolve_symbol(symbol)
     print(f"Resolved to: {resolved_symbol}")
 
     fetched = await fetch_all_fundamentals(resolved_symbol)
+    store = get_fundamentals_store()
+    cached = store.decision(resolved_symbol, fetched["raw"]) if store is not None else None
+    if cached is not None and "provenance" in cached:
+        print(f"✅ Fundamentals for {resolved_symbol} unchanged, reusing the golden record")
+        return cached
+
     result = decide_single_source(fetched)
-    # Save Logic
+    if store is not None:
+        store.save_decision(resolved_symbol, fetched["raw"], result)
+    # Save Logic (only when the inputs changed)
     # 1. Raw Data
     raw_path = _fmt_path(DEFAULT_RAW_JSON, resolved_symbol)
     if raw_path: save_json({"symbol": resolved_symbol, "raw": result["raw"]}, raw_path)
 
     # 2. Choice Data (Clean)
+    clean_res = {k:v for k,v in result.items() if k != "raw"}
     json_path = _fmt_path(DEFAULT_JSON_PATH, resolved_symbol)
     if json_path: 
-        clean_res = {k:v for k,v in result.items() if k != "raw"}
         save_json(clean_res, json_path)
 
     # 3. JSONL Append
     jsonl_path = _fmt_path(DEFAULT_JSONL_PATH, resolved_symbol)
-    if jsonl_path: save_jsonl_line(result, jsonl_path)
+    if jsonl_path: save_jsonl_line(clean_res, jsonl_path)
 
     print(f"✅ Data saved for {resolved_symbol}. Winner: {result['chosen_source']}")
-    return result
+    # raw ของทุก vendor อยู่ในไฟล์แล้ว ไม่ต้องส่งต่อให้ LLM
+    return clean_res
 
 # =========================
 # 10-YEAR HISTORICAL LOGIC
@@ -2255,126 +2271,131 @@ def _safe_date_str(d):
         return str(d)[:10]
     except: return str(d)
 
-def fetch_yfinance_10y(symbol: str) -> Dict[str, Dict]:
-    """Fetch all available historical data from YFinance (Exclude specific fields)"""
-    print(f"   Running YFinance for {symbol}...")
-    t = yf.Ticker(symbol)
-    
-    # 1. ระบุรายชื่อฟิลด์ที่ต้องการลบออก (ต้องพิมพ์ให้ตรงกับ key ของ yfinance เป๊ะๆ)
-    EXCLUDE_KEYS = [
-        "Interest Expense", 
-        "Net Interest Income", 
-        "Total Revenue"
-    ]
+def _fast_info_fields(t, names) -> Dict[str, Any]:
+    # fast_info โหลดแบบ lazy: อ่านค่าใน worker เพื่อให้ request เกิดใน thread นั้น
+    fi = t.fast_info
+    return {k: getattr(fi, k, None) for k in names}
 
-    # Overview
-    ov = {}
-    try:
-        info = t.get_info()
-        fi = t.fast_info 
-        ov = {
-            "marketCap": _try_float(info.get("marketCap", getattr(fi, "market_cap", None))),
-            "sharesOutstanding": _try_float(info.get("sharesOutstanding", getattr(fi, "shares_outstanding", None))),
-            "peRatio": _try_float(info.get("trailingPE", getattr(fi, "trailing_pe", None))),
-            "currency": info.get("currency", getattr(fi, "currency", None)),
-            "name": info.get("shortName") or info.get("longName"),
-            "sector": info.get("sector"),
-            "industry": info.get("industry")
-        }
-    except: pass
+# 1. ระบุรายชื่อฟิลด์ที่ต้องการลบออก (ต้องพิมพ์ให้ตรงกับ key ของ yfinance เป๊ะๆ)
+YF_HISTORY_EXCLUDE_KEYS = [
+    "Interest Expense", 
+    "Net Interest Income", 
+    "Total Revenue"
+]
+
+YF_HISTORY_ATTRS = {
+    "annual": {"balancesheet": "balance_sheet", "cashflow": "cashflow", "incomestatement": "financials"},
+    "quarterly": {"balancesheet": "quarterly_balance_sheet", "cashflow": "quarterly_cashflow", "incomestatement": "quarterly_financials"},
+}
+
+AV_HISTORY_MAPPERS = {
+    "BALANCE_SHEET": ("balancesheet", {"totalAssets": "totalAssets", "totalLiabilities": "totalLiabilities", "shareholderEquity": "totalShareholderEquity"}),
+    "CASH_FLOW": ("cashflow", {"operatingCashFlow": "operatingCashflow", "capitalExpenditures": "capitalExpenditures", "freeCashFlow": "freeCashFlow"}), # logic compute fcf separate if needed
+    "INCOME_STATEMENT": ("incomestatement", {"totalRevenue": "totalRevenue", "netIncome": "netIncome", "eps": "reportedEPS", "interestExpense": "interestExpense", "netInterestIncome": "netInterestIncome"}),
+}
 
-    def _parse_df(df):
-        out = {}
-        if df is None or getattr(df, "empty", True): return out
+def _after(date_key: str, since: Optional[str]) -> bool:
+    return since is None or date_key > since
+
+def _yf_parse_history(df, since: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+    out = {}
+    if df is None or getattr(df, "empty", True): return out
+    
+    for col in df.columns:
+        date_key = _safe_date_str(col)
+        if not _after(date_key, since): continue
+        series_dict = df[col].to_dict()
         
-        for col in df.columns:
-            date_key = _safe_date_str(col)
-            series_dict = df[col].to_dict()
+        clean = {}
+        for k, v in series_dict.items():
+            key_str = str(k).strip() # ตัดช่องว่างหน้าหลัง
             
-            clean = {}
-            for k, v in series_dict.items():
-                key_str = str(k).strip() # ตัดช่องว่างหน้าหลัง
-                
-                # 2. เช็คว่าชื่อฟิลด์นี้ อยู่ในบัญชี (Exclude List) หรือไม่
-                if key_str in EXCLUDE_KEYS:
-                    continue # ข้ามเลย ไม่เอา
+            # 2. เช็คว่าชื่อฟิลด์นี้ อยู่ในบัญชี (Exclude List) หรือไม่
+            if key_str in YF_HISTORY_EXCLUDE_KEYS:
+                continue # ข้ามเลย ไม่เอา
 
-                val = _try_float(v)
-                if val is not None:
-                    clean[key_str] = val
-            
-            if clean:
-                out[date_key] = clean
-        return out
+            val = _try_float(v)
+            if val is not None:
+                clean[key_str] = val
+        
+        if clean:
+            out[date_key] = clean
+    return out
 
+def fetch_yfinance_history_overview(symbol: str) -> Dict:
+    gateway = get_yf_gateway()
+    got = _run_concurrently("yfinance", {
+        "info": lambda: gateway.info(symbol),
+        "fi": lambda: _fast_info_fields(gateway.ticker(symbol), ("market_cap", "shares_outstanding", "trailing_pe", "currency")),
+    })
     try:
-        bs = _parse_df(t.balance_sheet)
-        cf = _parse_df(t.cashflow)
-        inc = _parse_df(t.financials)
-    except Exception as e:
-        print(f"    YFinance Error: {e}")
-        return {}
-
-    return {"overview": ov, "balancesheet": bs, "cashflow": cf, "incomestatement": inc}
+        info, fi = got["info"], got["fi"]
+        if isinstance(info, Exception): raise info
+        if isinstance(fi, Exception): fi = {}
+        return {
+            "marketCap": _try_float(info.get("marketCap", fi.get("market_cap"))),
+            "sharesOutstanding": _try_float(info.get("sharesOutstanding", fi.get("shares_outstanding"))),
+            "peRatio": _try_float(info.get("trailingPE", fi.get("trailing_pe"))),
+            "currency": info.get("currency", fi.get("currency")),
+            "name": info.get("shortName") or info.get("longName"),
+            "sector": info.get("sector"),
+            "industry": info.get("industry")
+        }
+    except: return {}
+
+def fetch_yfinance_history(symbol: str, freq: str = "annual", since: Optional[str] = None) -> Dict[str, Dict]:
+    """{section: {period_end: {item: value}}} from YFinance (Exclude specific fields); periods after `since` only."""
+    gateway = get_yf_gateway()
+    # งบทั้งสามยิงพร้อมกัน (Ticker แยกต่อ request)
+    got = _run_concurrently("yfinance", {
+        section: (lambda attr=attr: getattr(gateway.ticker(symbol), attr))
+        for section, attr in YF_HISTORY_ATTRS[freq].items()
+    })
+    for part in got.values():
+        if isinstance(part, Exception): raise part
+    return {section: _yf_parse_history(df, since) for section, df in got.items()}
 
-def fetch_alphavantage_10y(symbol: str) -> Dict[str, Dict]:
+def fetch_alphavantage_history_overview(symbol: str) -> Dict:
     if not ALPHAVANTAGE_API_KEY: return {}
-    
-    def _get(func):
-        try:
-            url = "https://www.alphavantage.co/query"
-            r = requests.get(url, params={"function": func, "symbol": symbol, "apikey": ALPHAVANTAGE_API_KEY}, timeout=REQUEST_TIMEOUT)
-            if r.status_code == 200:
-                d = r.json()
-                if "Note" not in d and "Error Message" not in d: return d
-        except: pass
-        return {}
-
-    ov_raw = _get("OVERVIEW")
-    ov = {
+    ov_raw = _av_get("OVERVIEW", symbol)
+    return {
         "name": ov_raw.get("Name"), "currency": ov_raw.get("Currency"),
         "marketCap": _try_float(ov_raw.get("MarketCapitalization")),
         "peRatio": _try_float(ov_raw.get("PERatio"))
     }
 
-    def _parse_reps(func, mapper):
-        raw = _get(func)
-        reports = raw.get("annualReports", [])
-        out = {}
-        for r in reports:
+def fetch_alphavantage_history(symbol: str, freq: str = "annual", since: Optional[str] = None) -> Dict[str, Dict]:
+    """Annual / quarterly reports of the three statements (AV always returns the full history)."""
+    if not ALPHAVANTAGE_API_KEY: return {}
+    got = _run_concurrently("alphavantage", {f: (lambda f=f: _av_get(f, symbol)) for f in AV_HISTORY_MAPPERS})
+    reports_key = "annualReports" if freq == "annual" else "quarterlyReports"
+
+    out = {}
+    for func, (section, mapper) in AV_HISTORY_MAPPERS.items():
+        raw = got[func] if isinstance(got[func], dict) else {}
+        out[section] = {}
+        for r in raw.get(reports_key, []):
             # fiscalDateEnding is the key
             d = r.get("fiscalDateEnding")
-            if not d: continue
-            
-            clean = {k: _try_float(r.get(v)) for k, v in mapper.items()}
-            out[d] = clean
-        return out
-
-    bs = _parse_reps("BALANCE_SHEET", {"totalAssets": "totalAssets", "totalLiabilities": "totalLiabilities", "shareholderEquity": "totalShareholderEquity"})
-    cf = _parse_reps("CASH_FLOW", {"operatingCashFlow": "operatingCashflow", "capitalExpenditures": "capitalExpenditures", "freeCashFlow": "freeCashFlow"}) # logic compute fcf separate if needed
-    inc = _parse_reps("INCOME_STATEMENT", {"totalRevenue": "totalRevenue", "netIncome": "netIncome", "eps": "reportedEPS", "interestExpense": "interestExpense", "netInterestIncome": "netInterestIncome"})
-
-    return {"overview": ov, "balancesheet": bs, "cashflow": cf, "incomestatement": inc}
+            if not d or not _after(d, since): continue
+            out[section][d] = {k: _try_float(r.get(v)) for k, v in mapper.items()}
+    return out
 
-def fetch_finnhub_10y(symbol: str) -> Dict[str, Dict]:
+def fetch_finnhub_history_overview(symbol: str) -> Dict:
     if not FINNHUB_API_KEY: return {}
-    
-    def _get(path, params):
-        try:
-            params["token"] = FINNHUB_API_KEY
-            r = requests.get(f"https://finnhub.io/api/v1/{path}", params=params, timeout=REQUEST_TIMEOUT)
-            return r.json() if r.status_code == 200 else {}
-        except: return {}
-
-    prof = _get("stock/profile2", {"symbol": symbol})
-    ov = {
+    prof = _finnhub_get("stock/profile2", {"symbol": symbol})
+    return {
         "name": prof.get("name"), "currency": prof.get("currency"),
         "marketCap": _try_float(prof.get("marketCapitalization", 0)) * 1_000_000
     }
-    
-    # Financials
-    # freq='annual' for 10 years history usually
-    rep = _get("stock/financials-reported", {"symbol": symbol, "freq": "annual"})
+
+def fetch_finnhub_history(symbol: str, freq: str = "annual", since: Optional[str] = None) -> Dict[str, Dict]:
+    """financials-reported; `from` filters on the period end, so only newer years are downloaded."""
+    if not FINNHUB_API_KEY: return {}
+    params = {"symbol": symbol, "freq": freq}
+    if since:
+        params["from"] = (datetime.strptime(since, "%Y-%m-%d") + pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+    rep = _finnhub_get("stock/financials-reported", params)
     data = rep.get("data", [])
     
     bs, cf, inc = {}, {}, {}
@@ -2386,8 +2407,8 @@ def fetch_finnhub_10y(symbol: str) -> Dict[str, Dict]:
         return None
         
     for entry in data:
-        date_key = entry.get("endDate") or f"{entry.get('year')}-12-31" # fallback
-        if not date_key: continue
+        date_key = (entry.get("endDate") or f"{entry.get('year')}-12-31")[:10] # fallback
+        if not date_key or not _after(date_key, since): continue
         
         report = entry.get("report", {})
         
@@ -2418,9 +2439,54 @@ def fetch_finnhub_10y(symbol: str) -> Dict[str, Dict]:
         if any(v is not None for v in inc_clean.values()):
             inc[date_key] = inc_clean
 
-    return {"overview": ov, "balancesheet": bs, "cashflow": cf, "incomestatement": inc}
+    return {"balancesheet": bs, "cashflow": cf, "incomestatement": inc}
+
+# source -> (overview fetcher, history fetcher)
+HISTORY_FETCHERS = {
+    "yfinance": (fetch_yfinance_history_overview, fetch_yfinance_history),
+    "finnhub": (fetch_finnhub_history_overview, fetch_finnhub_history),
+    "alphavantage": (fetch_alphavantage_history_overview, fetch_alphavantage_history),
+}
+
+def _source_configured(source: str) -> bool:
+    return {"finnhub": bool(FINNHUB_API_KEY), "alphavantage": bool(ALPHAVANTAGE_API_KEY)}.get(source, True)
+
+def _fetch_10y(symbol: str, source: str, history) -> Dict[str, Dict]:
+    """Overview + annual history of one source; `history()` supplies the statements."""
+    if not _source_configured(source): return {}
+    overview_fn, _ = HISTORY_FETCHERS[source]
+    # overview กับงบดึงพร้อมกันบน pool ของ vendor นั้น
+    return fetch_overview_and_statements(source, lambda: overview_fn(symbol), history)
+
+def fetch_yfinance_10y(symbol: str) -> Dict[str, Dict]:
+    """Fetch all available historical data from YFinance (Exclude specific fields)"""
+    print(f"   Running YFinance for {symbol}...")
+    return _fetch_10y(symbol, "yfinance", lambda: fetch_yfinance_history(symbol))
+
+def fetch_alphavantage_10y(symbol: str) -> Dict[str, Dict]:
+    return _fetch_10y(symbol, "alphavantage", lambda: fetch_alphavantage_history(symbol))
+
+def fetch_finnhub_10y(symbol: str) -> Dict[str, Dict]:
+    return _fetch_10y(symbol, "finnhub", lambda: fetch_finnhub_history(symbol))
+
+def fetch_stored_10y(symbol: str, source: str) -> Dict[str, Dict]:
+    """Like fetch_<source>_10y, but statements come from the history store (only newer periods are fetched)."""
+    store = get_fundamentals_history()
+    _, history_fn = HISTORY_FETCHERS[source]
+
+    def _history():
+        for freq in get_config().get("fundamentals_history", {}).get("freqs", ["annual"]):
+            store.refresh(symbol, source, freq, lambda since, freq=freq: history_fn(symbol, freq, since))
+        return store.sections(symbol, source, "annual")
+
+    return _fetch_10y(symbol, source, _history)
 
 async def fetch_all_fundamentals_10y(symbol: str) -> Dict:
+    if get_fundamentals_history() is not None:
+        srcs = ["yfinance", "finnhub", "alphavantage"]
+        results = await asyncio.gather(*(asyncio.to_thread(fetch_stored_10y, symbol, s) for s in srcs))
+        return {"symbol": symbol, "raw": dict(zip(srcs, results))}
+
     results = await asyncio.gather(
         asyncio.to_thread(fetch_yfinance_10y, symbol),
         asyncio.to_thread(fetch_finnhub_10y, symbol),
@@ -1,6 +1,7 @@
 from typing import Annotated
 from .local import ryt9_get_company_news, alphavantage_get_company_news, get_world_news_yf, fetch_reddit_world_news, fetch_reddit_symbol_top_praw, fetch_mastodon_stock_posts, fetch_bsky_stock_posts, pick_fundamental_source, finnhub_get_company_news, reddit_get_company_news, yfinance_get_company_news, fetch_finnhub_world_news
 import os, requests, asyncio
+from .artifact_writer import get_artifact_writer
 from rich.console import Console
 
 console = Console()
@@ -93,8 +94,7 @@ def get_yfinance_world_news(
     report_message =  f"Yfinance global news have : {count} posts."
                      
     # write text file
-    with open("all_report_message.txt", "a", encoding='utf-8') as file:
-        file.write(report_message + "\n")
+    get_artifact_writer().append_text("all_report_message.txt", report_message + "\n")
     # print(f'\n\n\n [get_reddit_world_news] Reddit world news result:\n{res}\n\n\n')
     return res
 
@@ -111,8 +111,7 @@ def get_reddit_world_news(
                      f"Reddit global news have : {count} posts."
                      
     # write text file
-    with open("all_report_message.txt", "a", encoding='utf-8') as file:
-        file.write("\n" + report_message + "\n")
+    get_artifact_writer().append_text("all_report_message.txt", "\n" + report_message + "\n")
         
     return res
 
@@ -129,8 +128,7 @@ def get_finnhub_world_news(
     report_message = f"Finnhub global news have : {count} posts."
                      
     # write text file
-    with open("all_report_message.txt", "a", encoding='utf-8') as file:
-        file.write(report_message + "\n\n")
+    get_artifact_writer().append_text("all_report_message.txt", report_message + "\n\n")
     return res
 
 #social media news
@@ -145,8 +143,7 @@ def get_bluesky_news(
                      f"Bluesky news fetched for {ticker}: {count} posts found."
 
     # write text file
-    with open("all_report_message.txt", "a", encoding='utf-8') as file:
-        file.write("\n" + report_message + "\n")
+    get_artifact_writer().append_text("all_report_message.txt", "\n" + report_message + "\n")
 
     return res
 
@@ -160,8 +157,7 @@ def get_mastodon_news(
     report_message = f"Mastodon news fetched for {ticker}: {count} posts found."
 
     # write text file
-    with open("all_report_message.txt", "a") as file:
-        file.write(report_message + "\n")
+    get_artifact_writer().append_text("all_report_message.txt", report_message + "\n")
 
     return res
 
@@ -175,8 +171,7 @@ def get_subreddit_news(
     report_message = f"Subreddit news fetched for {symbol}: {count} posts found."
 
     # write text file
-    with open("all_report_message.txt", "a") as file:
-        file.write(report_message + "\n\n")
+    get_artifact_writer().append_text("all_report_message.txt", report_message + "\n\n")
 
     return res
 
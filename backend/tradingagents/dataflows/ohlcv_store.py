@@ -0,0 +1,244 @@
+"""
+Local incremental OHLCV store.
+
+Daily bars are kept per provider and symbol in
+`<root>/<provider>/<SYMBOL>.pkl` (a date-indexed DataFrame) next to a JSON
+manifest of the date ranges already fetched. A range request downloads only
+the gaps the manifest does not cover and serves the slice from disk, so a
+daily rerun fetches the newest bar instead of the whole window.
+
+Days from today onwards are never marked as covered: the current bar can
+still change, so it is refetched (and overwritten) on the next request.
+"""
+import json
+import os
+import re
+import threading
+from datetime import date, datetime, timedelta
+from typing import Callable, List, Optional, Tuple
+
+import pandas as pd
+
+from .config import get_config
+
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+Range = Tuple[str, str]
+
+
+def _to_date(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+
+
+def merge_ranges(ranges: List[Range]) -> List[Range]:
+    """Merge overlapping or adjacent inclusive date ranges."""
+    merged: List[List[date]] = []
+    for start, end in sorted((_to_date(s), _to_date(e)) for s, e in ranges):
+        if merged and start <= merged[-1][1] + timedelta(days=1):
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [(s.isoformat(), e.isoformat()) for s, e in merged]
+
+
+def subtract_ranges(start, end, covered: List[Range]) -> List[Range]:
+    """Parts of the inclusive range [start, end] that `covered` does not contain."""
+    cursor, end = _to_date(start), _to_date(end)
+    gaps = []
+    for c_start, c_end in merge_ranges(covered):
+        c_start, c_end = _to_date(c_start), _to_date(c_end)
+        if c_end < cursor:
+            continue
+        if c_start > end:
+            break
+        if c_start > cursor:
+            gaps.append((cursor.isoformat(), (c_start - timedelta(days=1)).isoformat()))
+        cursor = max(cursor, c_end + timedelta(days=1))
+        if cursor > end:
+            break
+    if cursor <= end:
+        gaps.append((cursor.isoformat(), end.isoformat()))
+    return gaps
+
+
+def frame_from_csv(csv_string: str) -> pd.DataFrame:
+    """Provider CSV (Date column first) -> date-indexed OHLCV frame."""
+    from io import StringIO
+
+    if not csv_string or not csv_string.strip():
+        return pd.DataFrame(columns=OHLCV_COLUMNS)
+    df = pd.read_csv(StringIO(csv_string))
+    date_col = "Date" if "Date" in df.columns else df.columns[0]
+    df.index = pd.to_datetime(df.pop(date_col)).dt.tz_localize(None).dt.normalize()
+    df.index.name = "Date"
+    # บาง provider (TwelveData) ส่งใหม่สุดก่อน: ต้องเรียงก่อน slice ด้วยวันที่
+    df = df[~df.index.duplicated(keep="last")].sort_index()
+    return df[[c for c in OHLCV_COLUMNS if c in df.columns]]
+
+
+# Provider message for a range without bars (weekend, holiday): the range is
+# settled, unlike errors or "No data ... (<API message>)" replies
+_NO_BARS_IN_RANGE = re.compile(r"^No data found for .+ between \d{4}-\d{2}-\d{2} and \d{4}-\d{2}-\d{2}$")
+
+
+def provider_gap_fetcher(provider: str, fetch: Callable) -> Callable[[str, str, str], Optional[pd.DataFrame]]:
+    """Gap fetcher for OHLCVStore.get_range around a provider function.
+
+    `fetch(symbol, start, end)` returns (header, csv) with `end` exclusive, or
+    a message. "No data found ... between <start> and <end>" becomes an empty
+    frame, so the gap is marked covered; exceptions, other messages and
+    unreadable CSV give None and the gap is tried again next time.
+    """
+    def fetch_gap(symbol, gap_start, gap_end):
+        # ขอเกินไป 1 วัน เพราะ end ของ yfinance เป็นแบบ exclusive แล้วค่อยตัดให้พอดีช่วง
+        fetch_end = (datetime.strptime(gap_end, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+        try:
+            res = fetch(symbol, gap_start, fetch_end)
+        except Exception as e:
+            print(f"   ↳ {provider} {symbol} {gap_start}..{gap_end} failed: {e}")
+            return None
+        if not isinstance(res, tuple):
+            print(f"   ↳ {provider} {symbol} {gap_start}..{gap_end}: {res}")
+            if isinstance(res, str) and _NO_BARS_IN_RANGE.match(res.strip()):
+                return pd.DataFrame(columns=OHLCV_COLUMNS)
+            return None
+        try:
+            frame = frame_from_csv(res[1])
+            if "Close" not in frame.columns:
+                raise ValueError("no Close column")
+            return frame.loc[gap_start:gap_end]
+        except Exception as e:
+            print(f"   ↳ {provider} {symbol} {gap_start}..{gap_end}: unreadable data ({e})")
+            return None
+
+    return fetch_gap
+
+
+class OHLCVStore:
+    """Per-(provider, symbol) bar files plus coverage manifests. Thread-safe."""
+
+    def __init__(self, root: str):
+        self.root = root
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def _lock(self, provider: str, symbol: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault((provider, symbol), threading.Lock())
+
+    def _paths(self, provider: str, symbol: str) -> Tuple[str, str]:
+        safe = re.sub(r"[^A-Za-z0-9._=-]", "_", symbol.upper())
+        folder = os.path.join(self.root, provider)
+        return os.path.join(folder, f"{safe}.pkl"), os.path.join(folder, f"{safe}.json")
+
+    # ---------- raw access ----------
+
+    def coverage(self, provider: str, symbol: str) -> List[Range]:
+        _, manifest_path = self._paths(provider, symbol)
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                return [tuple(r) for r in json.load(f).get("ranges", [])]
+        except (OSError, ValueError):
+            return []
+
+    def load(self, provider: str, symbol: str) -> pd.DataFrame:
+        data_path, _ = self._paths(provider, symbol)
+        try:
+            return pd.read_pickle(data_path)
+        except (OSError, ValueError, EOFError):
+            return pd.DataFrame(columns=OHLCV_COLUMNS)
+
+    def _write(self, provider: str, symbol: str, frame: pd.DataFrame, ranges: List[Range]):
+        data_path, manifest_path = self._paths(provider, symbol)
+        os.makedirs(os.path.dirname(data_path), exist_ok=True)
+        frame.to_pickle(data_path + ".tmp")
+        os.replace(data_path + ".tmp", data_path)
+        manifest = {
+            "symbol": symbol.upper(),
+            "provider": provider,
+            "ranges": merge_ranges(ranges),
+            "bars": int(len(frame)),
+            "updated": datetime.now().isoformat(timespec="seconds"),
+        }
+        with open(manifest_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(manifest_path + ".tmp", manifest_path)
+
+    def drop(self, provider: str, symbol: str):
+        """Forget a symbol's bars and coverage (e.g. after a price adjustment)."""
+        with self._lock(provider, symbol):
+            for path in self._paths(provider, symbol):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def missing_ranges(self, provider: str, symbol: str, start, end) -> List[Range]:
+        return subtract_ranges(start, end, self.coverage(provider, symbol))
+
+    # ---------- incremental fetch ----------
+
+    def get_range(
+        self,
+        provider: str,
+        symbol: str,
+        start,
+        end,
+        fetch: Callable[[str, str, str], Optional[pd.DataFrame]],
+    ) -> pd.DataFrame:
+        """Bars in [start, end] (inclusive), fetching only uncovered gaps.
+
+        `fetch(symbol, gap_start, gap_end)` returns a date-indexed frame (an
+        empty frame when the provider has no bars) or None on failure; failed
+        gaps are not marked as covered.
+        """
+        start, end = _to_date(start), _to_date(end)
+        with self._lock(provider, symbol):
+            frame = self.load(provider, symbol)
+            ranges = self.coverage(provider, symbol)
+            gaps = subtract_ranges(start, end, ranges)
+
+            if gaps:
+                print(f"📦 {provider}:{symbol.upper()} fetching {len(gaps)} missing range(s): {gaps}")
+                last_complete = date.today() - timedelta(days=1)
+                new_parts = []
+                for gap_start, gap_end in gaps:
+                    part = fetch(symbol, gap_start, gap_end)
+                    if part is None:
+                        continue
+                    new_parts.append(part)
+                    covered_end = min(_to_date(gap_end), last_complete)
+                    if _to_date(gap_start) <= covered_end:
+                        ranges.append((gap_start, covered_end.isoformat()))
+
+                if new_parts:
+                    # Newer fetches win for overlapping days (e.g. today's bar)
+                    parts = [p for p in [frame] + new_parts if not p.empty]
+                    frame = pd.concat(parts) if parts else frame
+                    frame = frame[~frame.index.duplicated(keep="last")].sort_index()
+                    self._write(provider, symbol, frame, ranges)
+
+        if frame.empty:
+            return frame
+        return frame.loc[pd.Timestamp(start):pd.Timestamp(end)]
+
+
+_store: Optional[OHLCVStore] = None
+_store_lock = threading.Lock()
+
+
+def get_ohlcv_store() -> Optional[OHLCVStore]:
+    """Get the process-wide store, or None when disabled in the config."""
+    global _store
+    settings = get_config().get("ohlcv_store", {})
+    if not settings.get("enabled", False):
+        return None
+    with _store_lock:
+        if _store is None:
+            root = settings.get("path") or os.path.join(get_config()["data_cache_dir"], "ohlcv")
+            _store = OHLCVStore(root)
+        return _store
@@ -0,0 +1,67 @@
+"""
+Typed in-memory price frames.
+
+Inside the dataflow layer OHLCV data travels as a `PriceFrame`: a
+date-indexed DataFrame plus the metadata that used to live only in the CSV
+comment header (symbol, source, record count, date range). Text is produced
+once, by `render()`, at the LLM prompt / tool-output boundary, instead of being
+written with `to_csv` and parsed back with `read_csv` at every hop.
+"""
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+
+import pandas as pd
+
+from .ohlcv_store import OHLCV_COLUMNS, frame_from_csv
+
+
+@dataclass
+class PriceFrame:
+    """Date-indexed OHLCV bars with provenance."""
+
+    symbol: str
+    data: pd.DataFrame
+    source: str
+    market: Optional[str] = None
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    retrieved_at: datetime = field(default_factory=datetime.now)
+    # Original comment header of the provider (kept so rendered output stays unchanged)
+    header: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def record_count(self) -> int:
+        return 0 if self.data is None else int(len(self.data))
+
+    @property
+    def empty(self) -> bool:
+        return self.record_count == 0
+
+    @classmethod
+    def from_csv(cls, symbol: str, csv_string: str, source: str, header: Optional[str] = None, **meta) -> "PriceFrame":
+        """Build from a provider's (header, csv) output; the only place that parses text."""
+        return cls(symbol=symbol, data=frame_from_csv(csv_string), source=source, header=header, **meta)
+
+    @classmethod
+    def failed(cls, symbol: str, message: str, **meta) -> "PriceFrame":
+        return cls(symbol=symbol, data=pd.DataFrame(columns=OHLCV_COLUMNS), source="none", error=message, **meta)
+
+    def default_header(self) -> str:
+        header = f"# Stock data for {self.symbol.upper()} from {self.start_date} to {self.end_date}\n"
+        header += f"# Total records: {self.record_count}\n"
+        header += f"# Data retrieved on: {self.retrieved_at.strftime('%Y-%m-%d %H:%M:%S')} (source: {self.source})\n\n"
+        return header
+
+    def to_csv(self) -> str:
+        if self.empty:
+            return ""
+        return self.data.to_csv(index_label="Date", date_format="%Y-%m-%d")
+
+    def render(self) -> str:
+        """Header + CSV text, as handed to the LLM / tool output."""
+        if self.error:
+            return self.error
+        return (self.header or self.default_header()) + self.to_csv()
+
@@ -0,0 +1,99 @@
+"""
+Concurrent provider fetch and agreement scoring for compare_stock_frames.
+
+Every provider is called at once on a bounded `FanoutPool` under one shared
+deadline. A provider that misses it is not dropped silently: it is reported
+in `missed` (with the reason), scored 0 and left for the caller to record as
+a failed call. Its thread keeps a pool slot until the provider returns (the
+late result still lands in the OHLCV store); while every slot is taken by
+such stragglers, further providers are reported as missed instead of
+queueing behind them.
+"""
+import concurrent.futures
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+import pandas as pd
+
+from .config import get_config
+from .reconciliation import align_series, agreement_scores
+from .vendor_router import FanoutPool
+
+COMPARE_COLUMNS = ["Open", "Close"]
+
+_provider_pool: Optional[FanoutPool] = None
+_provider_pool_lock = threading.Lock()
+
+
+def get_provider_pool() -> FanoutPool:
+    """Process-wide pool for the provider fetch ("provider_fetch_workers" in the config)."""
+    global _provider_pool
+    with _provider_pool_lock:
+        if _provider_pool is None:
+            _provider_pool = FanoutPool(get_config().get("provider_fetch_workers", 8))
+        return _provider_pool
+
+
+def fetch_providers(
+    calls: Dict[str, Callable[[], object]],
+    deadline: Optional[float],
+    pool: Optional[FanoutPool] = None,
+) -> Tuple[Dict[str, object], Dict[str, str]]:
+    """Run every provider call concurrently under one deadline (seconds, None = wait).
+
+    Returns (outcomes, missed): the return value of every call that finished
+    in time, and a reason for every provider that did not.
+    """
+    pool = pool or get_provider_pool()
+    outcomes, missed = {}, {}
+    running = {}
+    for name, call in calls.items():
+        handle = pool.try_submit(call)
+        if handle is None:
+            missed[name] = f"provider pool busy ({pool.abandoned} late call(s) still running)"
+            continue
+        running[handle.future] = (name, handle)
+
+    done, not_done = concurrent.futures.wait(running, timeout=deadline)
+    for future in done:
+        name, _ = running[future]
+        try:
+            outcomes[name] = future.result()
+        except Exception as e:
+            missed[name] = f"failed: {e}"
+    for future in not_done:
+        name, handle = running[future]
+        pool.abandon(handle)
+        missed[name] = f"missed the {deadline}s deadline"
+    return outcomes, missed
+
+
+def score_providers(frames: Dict[str, Optional[pd.DataFrame]], market: str) -> Dict[str, int]:
+    """Agreement score per provider: matching (bar, other provider) pairs on Open and Close.
+
+    Every provider in `frames` gets a score; missing or empty frames score 0.
+    """
+    score = {name: 0 for name in frames}
+    # หมายเหตุสำหรับทองคำ: ราคาทองแต่ละเจ้าอาจต่างกันเล็กน้อย (Futures vs Spot)
+    # สำหรับทองคำ ยอมให้ต่างกันได้นิดหน่อย (ไม่เกิน 0.5 ดอลลาร์)
+    tolerance = score_tolerance(market)
+    for col in COMPARE_COLUMNS:
+        matrix = align_series({
+            name: df[col] if df is not None and col in df else None
+            for name, df in frames.items()
+        })
+        for name, matches in agreement_scores(matrix, **tolerance).items():
+            score[name] += matches
+    return score
+
+
+def score_tolerance(market: str) -> dict:
+    return {"rounding": 1 if market == "GOLD" else 2, "atol": 0.5 if market == "GOLD" else None}
+
+
+def pick_best_source(score: Dict[str, int], frames: Dict[str, Optional[pd.DataFrame]]) -> Optional[str]:
+    """Highest score among providers with data; more bars break ties."""
+    valid = {k: v for k, v in score.items() if frames.get(k) is not None and not frames[k].empty}
+    if not valid:
+        return None
+    return max(valid, key=lambda k: (valid[k], len(frames[k])))
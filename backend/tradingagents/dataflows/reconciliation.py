@@ -0,0 +1,199 @@
+"""
+Vectorized multi-source reconciliation.
+
+Provider series are aligned into one date-indexed matrix (one column per
+source) and compared all-pairs at once with NumPy tolerance masks, instead of
+pairwise merges or per-date Python loops. The same matrix also yields a
+consensus (median) series with per-bar provenance.
+"""
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+def align_series(series: Dict[str, pd.Series]) -> pd.DataFrame:
+    """Outer-join named series on their (datetime) index into one matrix.
+
+    Empty or missing sources still get an all-NaN column so callers can rely
+    on the column order matching `series`.
+    """
+    columns = {}
+    for name, s in series.items():
+        if s is None or len(s) == 0:
+            columns[name] = pd.Series(dtype=float)
+            continue
+        s = pd.to_numeric(pd.Series(s), errors="coerce")
+        s.index = pd.to_datetime(s.index)
+        # Keep the last value for duplicated timestamps
+        columns[name] = s[~s.index.duplicated(keep="last")]
+    matrix = pd.concat(columns, axis=1).sort_index() if columns else pd.DataFrame()
+    return matrix.reindex(columns=list(series))
+
+
+def match_mask(
+    values: np.ndarray,
+    rounding: Optional[int] = None,
+    atol: Optional[float] = None,
+    rtol: Optional[float] = None,
+) -> np.ndarray:
+    """Pairwise agreement for a (dates x sources) array -> (dates x sources x sources) bool.
+
+    - `rounding` rounds values first; with no tolerance the rounded values must be equal
+    - `atol`: |a - b| <= atol
+    - `rtol`: |a - b| / max(|a|, |b|) <= rtol (two zeros agree)
+    Pairs with a missing value and the diagonal never match.
+    """
+    v = np.asarray(values, dtype=float)
+    if rounding is not None:
+        v = np.round(v, rounding)
+    a = v[:, :, None]
+    b = v[:, None, :]
+    diff = np.abs(a - b)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if rtol is not None:
+            denom = np.maximum(np.abs(a), np.abs(b))
+            mask = np.where(denom == 0, diff == 0, diff / denom <= rtol)
+        elif atol is not None:
+            mask = diff <= atol
+        else:
+            mask = diff == 0
+
+    mask &= ~np.isnan(diff)
+    k = v.shape[1]
+    mask &= ~np.eye(k, dtype=bool)[None, :, :]
+    return mask
+
+
+def pairwise_agreement(matrix: pd.DataFrame, **tolerance) -> pd.DataFrame:
+    """Sources x sources matrix of agreeing bars."""
+    mask = match_mask(matrix.to_numpy(), **tolerance)
+    return pd.DataFrame(mask.sum(axis=0), index=matrix.columns, columns=matrix.columns)
+
+
+def agreement_scores(matrix: pd.DataFrame, **tolerance) -> Dict[str, int]:
+    """Per source: number of (bar, other source) pairs it agrees with."""
+    pairs = pairwise_agreement(matrix, **tolerance)
+    return {name: int(pairs[name].sum()) for name in matrix.columns}
+
+
+def consensus_series(matrix: pd.DataFrame, **tolerance) -> pd.DataFrame:
+    """Median across sources per bar, with provenance.
+
+    Columns: value (median of available sources), n_sources, sources (the
+    sources whose value agrees with the median under `tolerance`).
+    """
+    values = matrix.to_numpy(dtype=float)
+    with np.errstate(all="ignore"):
+        median = np.nanmedian(values, axis=1) if values.size else np.array([])
+    median_mask = _agrees_with(values, median, **tolerance)
+    names = np.array(matrix.columns, dtype=object)
+    sources = [",".join(names[row]) for row in median_mask]
+    return pd.DataFrame(
+        {
+            "value": median,
+            "n_sources": (~np.isnan(values)).sum(axis=1),
+            "sources": sources,
+        },
+        index=matrix.index,
+    )
+
+
+def consensus_frame(
+    frames: Dict[str, pd.DataFrame],
+    columns: List[str],
+    provenance_columns: Optional[List[str]] = None,
+    **tolerance,
+) -> pd.DataFrame:
+    """Consensus OHLCV-style frame from date-indexed provider frames.
+
+    Each column is the per-bar median across providers; `Sources` lists the
+    providers that agree with the consensus on every `provenance_columns`
+    column of that bar (default: all columns).
+    """
+    provenance_columns = columns if provenance_columns is None else provenance_columns
+    frames = {name: df for name, df in frames.items() if df is not None and not df.empty}
+    if not frames:
+        return pd.DataFrame(columns=columns + ["Sources"])
+
+    out = {}
+    agree = None
+    for col in columns:
+        matrix = align_series({name: df[col] if col in df else None for name, df in frames.items()})
+        if out:
+            matrix = matrix.reindex(out[columns[0]].index)
+        values = matrix.to_numpy(dtype=float)
+        with np.errstate(all="ignore"):
+            median = np.nanmedian(values, axis=1)
+        out[col] = pd.Series(median, index=matrix.index)
+        if col in provenance_columns:
+            mask = _agrees_with(values, median, **tolerance)
+            agree = mask if agree is None else agree & mask
+
+    result = pd.DataFrame(out)
+    names = np.array(list(frames), dtype=object)
+    if agree is None:
+        agree = np.zeros((len(result), len(names)), dtype=bool)
+    result["Sources"] = [",".join(names[row]) for row in agree]
+    return result.dropna(how="all", subset=columns)
+
+
+def unit_match_mask(values: np.ndarray, scales=(1,), rtol: float = 1e-3, atol: float = 1e-2) -> np.ndarray:
+    """Like `match_mask`, but a pair also agrees when it matches after rescaling either side.
+
+    Vendors report some fields in different units (e.g. millions vs units);
+    a and b agree when |a*sa - b*sb| <= max(atol, rtol * max(|a*sa|, |b*sb|))
+    for any sa, sb in `scales`.
+    """
+    v = np.asarray(values, dtype=float)
+    s = np.asarray(scales, dtype=float)
+    # (rows, sources, sources, scales, scales)
+    a = v[:, :, None, None, None] * s[None, None, None, :, None]
+    b = v[:, None, :, None, None] * s[None, None, None, None, :]
+    with np.errstate(invalid="ignore"):
+        mask = (np.abs(a - b) <= np.maximum(atol, rtol * np.maximum(np.abs(a), np.abs(b)))).any(axis=(3, 4))
+    mask &= ~np.isnan(v)[:, :, None] & ~np.isnan(v)[:, None, :]
+    mask &= ~np.eye(v.shape[1], dtype=bool)[None, :, :]
+    return mask
+
+
+def field_consensus(matrix: pd.DataFrame, scales=(1,), rtol: float = 1e-3, atol: float = 1e-2) -> pd.DataFrame:
+    """Per-field consensus across sources (fields x sources matrix, columns in preference order).
+
+    For every field the value of the source most other sources agree with
+    (`unit_match_mask`) is kept; ties go to the earlier column. Columns:
+    value, source, sources (agreeing with the chosen value, itself included),
+    n_agree, n_reported and confidence = n_agree / number of sources.
+    """
+    values = matrix.to_numpy(dtype=float)
+    n_fields, n_sources = values.shape
+    mask = unit_match_mask(values, scales, rtol=rtol, atol=atol)
+    support = np.where(np.isnan(values), -1, mask.sum(axis=2))
+    chosen = support.argmax(axis=1) if n_sources else np.zeros(n_fields, dtype=int)
+    rows = np.arange(n_fields)
+    reported = (~np.isnan(values)).sum(axis=1)
+    has_value = reported > 0
+
+    agree = mask[rows, chosen, :] if n_sources else np.zeros((n_fields, 0), dtype=bool)
+    agree[rows, chosen] = has_value
+    names = np.array(matrix.columns, dtype=object)
+    n_agree = agree.sum(axis=1)
+    return pd.DataFrame(
+        {
+            "value": np.where(has_value, values[rows, chosen] if n_sources else np.nan, np.nan),
+            "source": np.where(has_value, names[chosen] if n_sources else None, None),
+            "sources": [list(names[row]) for row in agree],
+            "n_agree": n_agree,
+            "n_reported": reported,
+            "confidence": n_agree / max(n_sources, 1),
+        },
+        index=matrix.index,
+    )
+
+
+def _agrees_with(values: np.ndarray, reference: np.ndarray, rounding=None, atol=None, rtol=None) -> np.ndarray:
+    """(dates x sources) mask of values agreeing with a per-date reference."""
+    stacked = np.concatenate([np.asarray(reference, dtype=float)[:, None], values], axis=1)
+    mask = match_mask(stacked, rounding=rounding, atol=atol, rtol=rtol)
+    return mask[:, 0, 1:]
@@ -0,0 +1,202 @@
+"""
+Persistent TTL response cache for vendor calls.
+
+Entries are stored in a local SQLite file keyed by (method, vendor, normalized
+arguments). Each entry carries its own expiry (None = never expires) and the
+table is kept below `max_entries` by evicting the least recently used rows.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, datetime
+from typing import Any, Dict, Optional, Tuple
+
+from .config import get_config
+
+# Results that describe a failure rather than data should never be cached
+_ERROR_PREFIXES = ("error", "# error", "no data", "missing ", "❌", "invalid ")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    method TEXT NOT NULL,
+    vendor TEXT NOT NULL,
+    value TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL,
+    last_access REAL NOT NULL
+)
+"""
+
+
+def _normalize(value):
+    """Make an argument JSON-stable (dates as ISO strings, containers recursively)."""
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in sorted(value.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if value is None or isinstance(value, (int, float, bool)):
+        return value
+    return str(value)
+
+
+def make_key(method: str, vendor: str, params) -> str:
+    payload = json.dumps([method, vendor, _normalize(params)], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def is_error_result(value) -> bool:
+    """True for the messages vendors return instead of raising ("Error…", "No data found…", "Missing …_API_KEY…")."""
+    return isinstance(value, str) and value.strip().lower().startswith(_ERROR_PREFIXES)
+
+
+def is_cacheable(value) -> bool:
+    """Only cache real payloads: skip None, empty values and error messages."""
+    if value is None or is_error_result(value):
+        return False
+    if isinstance(value, str):
+        return bool(value.strip())
+    if isinstance(value, (list, dict, tuple)):
+        return len(value) > 0
+    return True
+
+
+class ResponseCache:
+    """SQLite-backed TTL + LRU cache. Safe to share between threads."""
+
+    def __init__(self, path: str, max_entries: int = 5000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_access ON responses(last_access)")
+        self._conn.commit()
+
+    def get(self, method: str, vendor: str, params) -> Tuple[bool, Any]:
+        """Return (hit, value). Expired entries count as misses and are dropped."""
+        key = make_key(method, vendor, params)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return False, None
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                return False, None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        return True, json.loads(value)
+
+    def set(self, method: str, vendor: str, params, value, ttl: Optional[float]) -> bool:
+        """Store a value; `ttl` in seconds, None keeps it until evicted. Returns False if skipped."""
+        if not is_cacheable(value):
+            return False
+        try:
+            encoded = json.dumps(value, ensure_ascii=False)
+        except (TypeError, ValueError):
+            return False
+
+        key = make_key(method, vendor, params)
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, method, vendor, value, created_at, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, method, vendor, encoded, now, expires_at, now),
+            )
+            self._evict()
+            self._conn.commit()
+        return True
+
+    def _evict(self):
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY last_access ASC LIMIT ?)",
+                (overflow,),
+            )
+            self.evictions += overflow
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "entries": count,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Get the process-wide cache, or None when disabled in the config."""
+    global _cache
+    settings = get_config().get("response_cache", {})
+    if not settings.get("enabled", False):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            path = settings.get("path") or os.path.join(
+                get_config()["data_cache_dir"], "response_cache.sqlite3"
+            )
+            _cache = ResponseCache(path, max_entries=settings.get("max_entries", 5000))
+        return _cache
+
+
+def _reaches_today(params) -> bool:
+    """True if any date-like argument is today or later (the data may still change)."""
+    today = date.today().isoformat()
+    values = params.values() if isinstance(params, dict) else params
+    for value in values:
+        if isinstance(value, (datetime, date)):
+            value = value.isoformat()
+        if isinstance(value, str) and len(value) >= 10 and value[4:5] == "-" and value[7:8] == "-":
+            if value[:10] >= today:
+                return True
+    return False
+
+
+def get_ttl(method: str, category: str, params) -> Optional[float]:
+    """TTL in seconds for a method: method override, then category, capped for open ranges."""
+    settings = get_config().get("response_cache", {})
+    ttls = settings.get("ttl", {})
+    ttl = ttls[method] if method in ttls else ttls.get(category)
+    open_range_ttl = settings.get("open_range_ttl")
+    if open_range_ttl is not None and _reaches_today(params):
+        ttl = open_range_ttl if ttl is None else min(ttl, open_range_ttl)
+    return ttl
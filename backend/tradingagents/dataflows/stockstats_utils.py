@@ -1,9 +1,151 @@
 import pandas as pd
-import yfinance as yf
+
 from stockstats import wrap
-from typing import Annotated
+from typing import Annotated, Dict, List, Tuple
+from collections import OrderedDict
+from datetime import date
 import os
+import threading
 from .config import get_config, DATA_DIR
+from .ohlcv_store import OHLCVStore, OHLCV_COLUMNS, get_ohlcv_store
+from .yf_gateway import get_yf_gateway
+
+# Adjusted daily bars used for stockstats, kept in the OHLCV store under this provider name
+STOCKSTATS_PROVIDER = "yfinance_adjusted"
+HISTORY_YEARS = 15
+
+_fallback_store = None
+_memo: "OrderedDict[str, tuple]" = OrderedDict()  # symbol -> (day, wrapped frame), LRU order
+_memo_lock = threading.Lock()
+_symbol_locks: Dict[str, threading.Lock] = {}
+
+
+def _price_store() -> OHLCVStore:
+    global _fallback_store
+    store = get_ohlcv_store()
+    if store is not None:
+        return store
+    if _fallback_store is None:
+        _fallback_store = OHLCVStore(os.path.join(get_config()["data_cache_dir"], "ohlcv"))
+    return _fallback_store
+
+
+def _download(symbol: str, start: str, end: str) -> pd.DataFrame:
+    """Adjusted Yahoo bars in [start, end) as a date-indexed OHLCV frame."""
+    data = get_yf_gateway().download(
+        symbol,
+        start=start,
+        end=end,
+        multi_level_index=False,
+        progress=False,
+        auto_adjust=True,
+    )
+    if data is None or data.empty:
+        return pd.DataFrame(columns=OHLCV_COLUMNS)
+    data.index = pd.to_datetime(data.index).tz_localize(None).normalize()
+    data.index.name = "Date"
+    return data[[c for c in OHLCV_COLUMNS if c in data.columns]]
+
+
+def load_price_history(symbol: str) -> pd.DataFrame:
+    """15 years of adjusted daily bars, downloading only the days not stored yet.
+
+    New bars are appended to the symbol's store file. Each gap is fetched with
+    a few days of overlap: if the overlapping (adjusted) closes changed, a
+    dividend or split re-based the history and the symbol is re-downloaded
+    in full.
+    """
+    store = _price_store()
+    today = pd.Timestamp.today().normalize()
+    start = (today - pd.DateOffset(years=HISTORY_YEARS)).strftime("%Y-%m-%d")
+    # Only completed sessions (yfinance's `end` used to be exclusive of today)
+    end = (today - pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+
+    for _ in range(2):
+        existing = store.load(STOCKSTATS_PROVIDER, symbol)
+        rebased = []
+
+        def fetch_gap(sym, gap_start, gap_end):
+            overlap_start = (pd.Timestamp(gap_start) - pd.Timedelta(days=10)).strftime("%Y-%m-%d")
+            fetch_end = (pd.Timestamp(gap_end) + pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+            try:
+                part = _download(sym, overlap_start, fetch_end)
+            except Exception as e:
+                print(f"⚠️ Stockstats download failed for {sym}: {e}")
+                return None
+            if not existing.empty and not part.empty:
+                common = part.index.intersection(existing.index)
+                common = common[common < pd.Timestamp(gap_start)]
+                if len(common):
+                    old, new = existing.loc[common, "Close"].astype(float), part.loc[common, "Close"].astype(float)
+                    if ((old - new).abs() > 1e-6 * new.abs().clip(lower=1)).any():
+                        rebased.append(sym)
+            return part.loc[gap_start:gap_end]
+
+        frame = store.get_range(STOCKSTATS_PROVIDER, symbol, start, end, fetch_gap)
+        if not rebased:
+            return frame
+        print(f"🔁 {symbol}: adjusted prices changed (dividend/split), re-downloading history")
+        store.drop(STOCKSTATS_PROVIDER, symbol)
+    return frame
+
+
+def _symbol_lock(symbol: str) -> threading.Lock:
+    with _memo_lock:
+        return _symbol_locks.setdefault(symbol, threading.Lock())
+
+
+def _memo_frame(symbol: str):
+    """The memoized wrapped frame (caller holds the symbol lock).
+
+    Frames from an earlier day are dropped, and only the `memo_size` most
+    recently used symbols are kept.
+    """
+    today = date.today().isoformat()
+    with _memo_lock:
+        for stale in [s for s, (day, _) in _memo.items() if day != today]:
+            del _memo[stale]
+        cached = _memo.get(symbol)
+        if cached is not None:
+            _memo.move_to_end(symbol)
+            return cached[1]
+    data = load_price_history(symbol).reset_index()
+    df = wrap(data)
+    df["Date"] = pd.to_datetime(df["Date"]).dt.strftime("%Y-%m-%d")
+    with _memo_lock:
+        _memo[symbol] = (today, df)
+        max_size = max(int(get_config().get("stockstats", {}).get("memo_size", 16)), 1)
+        while len(_memo) > max_size:
+            _memo.popitem(last=False)
+    return df
+
+
+def get_stockstats_frame(symbol: str):
+    """Copy of the symbol's wrapped stockstats frame (memoized in-process for the day)."""
+    with _symbol_lock(symbol):
+        return _memo_frame(symbol).copy()
+
+
+def get_indicator_values(symbol: str, indicator: str) -> Tuple[List[str], List]:
+    """(dates, values) of one stockstats indicator over the cached history.
+
+    stockstats adds the indicator column to the memoized frame the first
+    time, so it is computed under the symbol lock; later calls are a column
+    access.
+    """
+    with _symbol_lock(symbol):
+        df = _memo_frame(symbol)
+        values = df[indicator]
+        return list(df["Date"]), list(values)
+
+
+def get_indicator_series(symbol: str, indicator: str) -> Dict[str, str]:
+    """{date: value} of one stockstats indicator over the cached history ("N/A" for NaN)."""
+    dates, values = get_indicator_values(symbol, indicator)
+    return {
+        d: ("N/A" if pd.isna(v) else str(v))
+        for d, v in zip(dates, values)
+    }
 
 
 class StockstatsUtils:
@@ -36,41 +178,12 @@ class StockstatsUtils:
             except FileNotFoundError:
                 raise Exception("Stockstats fail: Yahoo Finance data not fetched yet!")
         else:
-            # Get today's date as YYYY-mm-dd to add to cache
-            today_date = pd.Timestamp.today()
-            curr_date = pd.to_datetime(curr_date)
-
-            end_date = today_date
-            start_date = today_date - pd.DateOffset(years=15)
-            start_date = start_date.strftime("%Y-%m-%d")
-            end_date = end_date.strftime("%Y-%m-%d")
-
-            # Get config and ensure cache directory exists
-            os.makedirs(config["data_cache_dir"], exist_ok=True)
-
-            data_file = os.path.join(
-                config["data_cache_dir"],
-                f"{symbol}-YFin-data-{start_date}-{end_date}.csv",
-            )
-
-            if os.path.exists(data_file):
-                data = pd.read_csv(data_file)
-                data["Date"] = pd.to_datetime(data["Date"])
-            else:
-                data = yf.download(
-                    symbol,
-                    start=start_date,
-                    end=end_date,
-                    multi_level_index=False,
-                    progress=False,
-                    auto_adjust=True,
-                )
-                data = data.reset_index()
-                data.to_csv(data_file, index=False)
-
-            df = wrap(data)
-            df["Date"] = df["Date"].dt.strftime("%Y-%m-%d")
-            curr_date = curr_date.strftime("%Y-%m-%d")
+            # Symbol-keyed incremental cache (only new bars are downloaded)
+            curr_date = pd.to_datetime(curr_date).strftime("%Y-%m-%d")
+            dates, values = get_indicator_values(symbol, indicator)
+            if curr_date in dates:
+                return values[dates.index(curr_date)]
+            return "N/A: Not a trading day (weekend or holiday)"
 
         df[indicator]  # trigger stockstats to calculate the indicator
         matching_rows = df[df["Date"].str.startswith(curr_date)]
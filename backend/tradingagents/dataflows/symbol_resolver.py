@@ -0,0 +1,290 @@
+"""
+Unified symbol / market resolution.
+
+One place decides which market a user symbol belongs to (US, TH, HK, CN,
+GOLD) and what code each vendor expects for it. Resolution order:
+
+1. Offline rules: gold aliases and explicit suffixes (.BK/.HK/.SS/.SZ)
+2. In-memory cache, seeded from api/stock_data.STOCK_LISTS and persisted to
+   <data_cache_dir>/symbol_cache.json
+3. A single batched yfinance probe over all candidate listings; symbols
+   that match nothing are negatively cached for `negative_ttl` seconds
+
+After the first sight of a symbol, resolution is a dict lookup.
+"""
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from .config import get_config
+
+GOLD_ALIASES = {"GOLD", "XAUUSD", "GC=F", "XAU/USD"}
+SUFFIX_MARKETS = {".HK": "HK", ".BK": "TH", ".SS": "CN", ".SZ": "CN"}
+US_EXCHANGES = {"NYSE", "NASDAQ", "AMEX", "OTC"}
+DEFAULT_MARKET = "US"
+
+
+def _normalize(symbol: str) -> str:
+    return symbol.upper().strip()
+
+
+def rule_market(symbol: str) -> Optional[str]:
+    """Market decided without any lookup, or None."""
+    s = _normalize(symbol)
+    if s in GOLD_ALIASES:
+        return "GOLD"
+    for suffix, market in SUFFIX_MARKETS.items():
+        if s.endswith(suffix):
+            return market
+    return None
+
+
+def probe_candidates(symbol: str) -> List[tuple]:
+    """(yfinance listing, market) to try for a bare symbol, in priority order."""
+    s = _normalize(symbol)
+    candidates = []
+    if s.isdigit():
+        # หุ้นฮ่องกง 1-5 หลัก (Yahoo ใช้ 4 หลัก), หุ้นจีน 6 หลัก
+        candidates.append((f"{s.zfill(4)}.HK", "HK"))
+        if len(s) == 6:
+            if s.startswith("6"):
+                candidates.append((f"{s}.SS", "CN"))
+            candidates.append((f"{s}.SZ", "CN"))
+    candidates.append((s, "US"))
+    # หุ้นไทยที่ไม่ได้ใส่ .BK มา (เช่น KBANK)
+    candidates.append((f"{s}.BK", "TH"))
+    return candidates
+
+
+def vendor_codes(symbol: str, market: str) -> Dict[str, str]:
+    """Per-vendor codes for a symbol in a market."""
+    s = _normalize(symbol)
+    codes = {
+        "yfinance": s,
+        "twelvedata": s,
+        "tradingview": s,
+        "alphavantage": s,
+        "market_type": "stock",
+    }
+
+    # --- ตลาดฮ่องกง (HK) ---
+    if market == "HK":
+        raw_code = s.replace(".HK", "")
+        codes["yfinance"] = f"{raw_code.zfill(4)}.HK"
+        codes["alphavantage"] = f"{raw_code.zfill(4)}.HK"
+        # TradingView ไม่เอาเลข 0 นำหน้า (0700 -> 700)
+        codes["tradingview"] = f"HKEX:{int(raw_code)}" if raw_code.isdigit() else f"HKEX:{raw_code}"
+        codes["twelvedata"] = raw_code.zfill(4)
+
+    # --- ตลาดจีนแผ่นดินใหญ่ (CN) ---
+    elif market == "CN":
+        code = s.split(".")[0]
+        if "." in s:
+            shanghai = s.endswith(".SS")
+        else:
+            shanghai = code.startswith("6")
+        codes["yfinance"] = f"{code}.SS" if shanghai else f"{code}.SZ"
+        # AlphaVantage ใช้ .SH สำหรับ Shanghai
+        codes["alphavantage"] = f"{code}.SH" if shanghai else f"{code}.SZ"
+        codes["tradingview"] = f"{'SSE' if shanghai else 'SZSE'}:{code}"
+
+    # --- ตลาดไทย (TH) ---
+    elif market == "TH":
+        raw_code = s.replace(".BK", "")
+        codes["yfinance"] = f"{raw_code}.BK"
+        codes["alphavantage"] = f"{raw_code}.BK"
+        codes["tradingview"] = f"SET:{raw_code}"
+        codes["twelvedata"] = raw_code
+
+    # --- ตลาดทอง (GOLD) ---
+    elif market == "GOLD":
+        codes["market_type"] = "commodities"
+        codes["yfinance"] = "GC=F"
+        codes["twelvedata"] = "XAU/USD"
+        codes["tradingview"] = "OANDA:XAUUSD"
+        codes["alphavantage"] = "XAUUSD"
+
+    return codes
+
+
+def seed_from_stock_lists(stock_lists: Dict[str, List[Dict]]) -> Dict[str, Dict]:
+    """Cache entries from api/stock_data.STOCK_LISTS-style data."""
+    entries = {}
+    for listed_market, stocks in stock_lists.items():
+        for stock in stocks:
+            symbol = _normalize(stock.get("symbol", ""))
+            if not symbol:
+                continue
+            market = rule_market(symbol)
+            if market is None and stock.get("exchange") in US_EXCHANGES:
+                market = "US"  # e.g. US-listed Chinese ADRs and gold miners
+            if market is None:
+                market = listed_market
+            entry = {"market": market, "valid": True, "source": "seed"}
+            entries[symbol] = entry
+            # "PTT.BK" ก็ให้ "PTT" รู้จักด้วย
+            if "." in symbol and market in ("TH", "HK"):
+                entries.setdefault(symbol.split(".")[0], entry)
+    return entries
+
+
+def probe_yfinance(listings: List[str]) -> Set[str]:
+    """Listings that have recent bars on Yahoo, checked with one batched download."""
+    import pandas as pd
+    from .yf_gateway import get_yf_gateway
+
+    if not listings:
+        return set()
+    try:
+        data = get_yf_gateway().download(
+            listings, period="5d", progress=False, group_by="ticker", auto_adjust=True, threads=True
+        )
+    except Exception as e:
+        print(f"⚠️ Symbol probe failed: {e}")
+        return set()
+
+    valid = set()
+    for listing in listings:
+        try:
+            frame = data[listing] if isinstance(data.columns, pd.MultiIndex) else data
+            if not frame["Close"].dropna().empty:
+                valid.add(listing)
+        except KeyError:
+            continue
+    return valid
+
+
+class SymbolResolver:
+    """Symbol -> market cache with batched probing and negative caching. Thread-safe."""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        negative_ttl: float = 24 * 3600,
+        seed: Optional[Dict[str, Dict]] = None,
+        probe: Callable[[List[str]], Set[str]] = probe_yfinance,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = path
+        self.negative_ttl = negative_ttl
+        self.probe = probe
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict] = dict(seed or {})
+        self._entries.update(self._load())
+
+    def _load(self) -> Dict[str, Dict]:
+        if not self.path:
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        if not self.path:
+            return
+        with self._lock:
+            learned = {k: v for k, v in self._entries.items() if v.get("source") != "seed"}
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        try:
+            with open(self.path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(learned, f, indent=2)
+            os.replace(self.path + ".tmp", self.path)
+        except OSError as e:
+            print(f"⚠️ Could not save symbol cache: {e}")
+
+    def _cached(self, symbol: str) -> Optional[Dict]:
+        entry = self._entries.get(symbol)
+        if entry is None:
+            return None
+        if not entry.get("valid") and self.clock() - entry.get("checked", 0) > self.negative_ttl:
+            return None  # negative entry expired: probe again
+        return entry
+
+    def lookup(self, symbol: str) -> Optional[Dict]:
+        """Resolution without any network access, or None if the symbol is unknown."""
+        s = _normalize(symbol)
+        market = rule_market(s)
+        if market:
+            return {"market": market, "valid": True, "source": "rule"}
+        with self._lock:
+            return self._cached(s)
+
+    def resolve_many(self, symbols: Iterable[str]) -> Dict[str, Dict]:
+        """Resolve several symbols; all unknown ones are probed in one batch."""
+        results = {}
+        unknown = []
+        for symbol in symbols:
+            s = _normalize(symbol)
+            entry = self.lookup(s)
+            if entry is None:
+                unknown.append(s)
+            else:
+                results[s] = entry
+
+        if unknown:
+            candidates = {s: probe_candidates(s) for s in unknown}
+            listings = sorted({listing for cands in candidates.values() for listing, _ in cands})
+            print(f"🕵️ Probing market for {', '.join(unknown)} ({len(listings)} listing(s), 1 batch)")
+            valid = self.probe(listings)
+            now = self.clock()
+            with self._lock:
+                for s, cands in candidates.items():
+                    match = next(((listing, market) for listing, market in cands if listing in valid), None)
+                    if match:
+                        entry = {"market": match[1], "valid": True, "source": "probe", "listing": match[0], "checked": now}
+                        print(f"   👉 {s}: {match[1]} ({match[0]})")
+                    else:
+                        entry = {"market": DEFAULT_MARKET, "valid": False, "source": "probe", "checked": now}
+                        print(f"   ⚠️ {s}: not found, defaulting to {DEFAULT_MARKET}")
+                    self._entries[s] = entry
+                    results[s] = entry
+            self._save()
+        return results
+
+    def resolve(self, symbol: str) -> Dict:
+        s = _normalize(symbol)
+        return self.resolve_many([s])[s]
+
+    def market(self, symbol: str) -> str:
+        return self.resolve(symbol)["market"]
+
+    def codes(self, symbol: str, market: Optional[str] = None) -> Dict[str, str]:
+        return vendor_codes(symbol, market or self.market(symbol))
+
+
+_resolver: Optional[SymbolResolver] = None
+_resolver_lock = threading.Lock()
+
+
+def _load_stock_lists() -> Dict[str, List[Dict]]:
+    try:
+        from api.stock_data import STOCK_LISTS
+    except ImportError:
+        return {}
+    return STOCK_LISTS
+
+
+def get_symbol_resolver() -> SymbolResolver:
+    """Get the process-wide resolver (seeded from STOCK_LISTS on first use)."""
+    global _resolver
+    with _resolver_lock:
+        if _resolver is None:
+            settings = get_config().get("symbol_resolver", {})
+            path = settings.get("path") or os.path.join(get_config()["data_cache_dir"], "symbol_cache.json")
+            _resolver = SymbolResolver(
+                path=path,
+                negative_ttl=settings.get("negative_ttl", 24 * 3600),
+                seed=seed_from_stock_lists(_load_stock_lists()),
+            )
+        return _resolver
+
+
+def detect_market(symbol: str) -> str:
+    """Market for a user symbol: US, TH, HK, CN or GOLD."""
+    return get_symbol_resolver().market(symbol)
@@ -4,6 +4,8 @@ from datetime import datetime
 import pandas as pd
 import dotenv
 import os
+from .config import get_config
+from .tv_session import get_tv_pool, bars_needed
 
 def get_TV_data_online(
     symbol: Annotated[str, "ticker symbol of the company"],
@@ -13,8 +15,8 @@ def get_TV_data_online(
     interval: Annotated[str, "Interval for data, e.g., 1d, 1h"] = "1d",
 ):
     dotenv.load_dotenv()
-    # tv = TvDatafeed(username=os.getenv('TV_USERNAME'), password=os.getenv('TV_PASSWORD'))
-    tv = TvDatafeed()
+    # Anonymous session from the shared pool (no new handshake per call)
+    pool = get_tv_pool()
 
     # Validate date
     datetime.strptime(start_date, "%Y-%m-%d")
@@ -35,12 +37,14 @@ def get_TV_data_online(
     if interval not in interval_map:
         return f"Invalid interval. Supported: {list(interval_map.keys())}"
 
-    # Fetch data
-    data = tv.get_hist(
+    # Fetch only as many bars as reach back to start_date
+    settings = get_config().get("tradingview", {})
+    n_bars = bars_needed(start_date, interval, margin=settings.get("calendar_margin", 5))
+    data = pool.get_hist(
         symbol=symbol,
         exchange=exchange,
         interval=interval_map[interval],
-        n_bars=5000
+        n_bars=n_bars
     )
 
     if data is None or data.empty:
@@ -111,6 +115,8 @@ from tvDatafeed import TvDatafeed, Interval
 from stockstats import wrap
 from datetime import datetime, timedelta
 import pandas as pd
+import re
+from .symbol_resolver import detect_market
 
 # สร้าง object สำหรับ login TradingView (anonymous ก็ได้)
 def get_tv_params(symbol: str, market: str):
@@ -152,22 +158,13 @@ def get_tv_params(symbol: str, market: str):
         return symbol, "NASDAQ"
 
 def auto_detect_market(symbol: str) -> str:
-    symbol = symbol.upper().strip()
-    
-    # ทองคำ/Forex
-    if symbol in ["GOLD", "XAUUSD", "GC=F", "XAU/USD"]: return "GOLD"
-    
-    # หุ้นจีน/ฮ่องกง (ตัวเลข)
-    if symbol.isdigit():
-        if len(symbol) <= 5: return "HK" # ฮ่องกง
-        return "CN" # จีนแผ่นดินใหญ่
-        
-    # หุ้นไทย (เช็ค YF เร็วๆ)
-    try:
-        if yf.Ticker(f"{symbol}.BK").fast_info.market_cap is not None: return "TH"
-    except: pass
+    """Market of a symbol via the shared, cached symbol resolver."""
+    return detect_market(symbol)
 
-    return "US" # Default
+def indicator_warmup_bars(indicator: str) -> int:
+    """Bars before the window an indicator needs (its longest period, at least 100 as before)."""
+    periods = [int(p) for p in re.findall(r"_(\d+)", indicator)]
+    return max([100] + periods)
 
 def get_tradingview_indicators(symbol, indicator, curr_date, look_back_days = 30, market=None, exchange=None):
 
@@ -186,7 +183,17 @@ def get_tradingview_indicators(symbol, indicator, curr_date, look_back_days = 30
         "vwma": "VWMA: A moving average weighted by volume. Usage: Confirm trends by integrating price action with volume data. Tips: Watch for skewed results from volume spikes; use in combination with other volume analyses."
     }
 
-    tv = TvDatafeed(username=os.getenv('TV_USERNAME'), password=os.getenv('TV_PASSWORD'))
+    pool = get_tv_pool(authenticated=True)
+
+    # Bars from the start of the window up to today, plus warm-up for the indicator
+    before_date = datetime.strptime(curr_date, "%Y-%m-%d") - timedelta(days=look_back_days)
+    settings = get_config().get("tradingview", {})
+    n_bars = bars_needed(
+        before_date,
+        "1d",
+        warmup_bars=indicator_warmup_bars(indicator),
+        margin=settings.get("calendar_margin", 5),
+    )
 
     # 1. จัดการเรื่อง Exchange และ Symbol
     if exchange is None:
@@ -206,7 +213,7 @@ def get_tradingview_indicators(symbol, indicator, curr_date, look_back_days = 30
         for ex in us_exchanges:
             try:
                 # ดึงมาครั้งเดียวแล้วใช้ต่อเลย ไม่ต้องดึงใหม่ข้างล่าง
-                temp_df = tv.get_hist(tv_symbol, ex, interval=Interval.in_daily, n_bars=look_back_days + 100)
+                temp_df = pool.get_hist(tv_symbol, ex, interval=Interval.in_daily, n_bars=n_bars)
                 if temp_df is not None and not temp_df.empty:
                     df = temp_df
                     final_exchange = ex
@@ -215,7 +222,7 @@ def get_tradingview_indicators(symbol, indicator, curr_date, look_back_days = 30
                 continue
     else:
         try:
-            df = tv.get_hist(tv_symbol, tv_exchange, interval=Interval.in_daily, n_bars=look_back_days + 100)
+            df = pool.get_hist(tv_symbol, tv_exchange, interval=Interval.in_daily, n_bars=n_bars)
         except:
             df = None
 
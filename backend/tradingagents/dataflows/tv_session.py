@@ -0,0 +1,138 @@
+"""
+Pooled TradingView datafeed sessions.
+
+`TvDatafeed()` logs in (or fetches an anonymous token) when it is created,
+and keeps its websocket as instance state while `get_hist` runs, so an
+instance must not be shared by two threads at once. The pool keeps a few
+instances per login and hands each one to a single thread at a time; a
+session that raised is thrown away and rebuilt on the next checkout.
+
+`bars_needed` sizes `n_bars` from the requested start date instead of always
+asking for 5000 bars: TradingView returns the latest n bars counted back from
+now, so the count is the number of trading sessions between the start date
+and today (weekdays, an upper bound for exchange holidays) plus any warm-up
+bars the caller needs for indicators.
+"""
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from .config import get_config
+
+# TradingView's hard cap per request
+MAX_BARS = 5000
+
+# Bars per trading day for intraday intervals (24h markets such as gold / FX
+# are the worst case, so the count is an upper bound for stock sessions too)
+_INTRADAY_BARS_PER_DAY = {"1m": 1440, "5m": 288, "15m": 96, "1h": 24, "4h": 6}
+
+
+def _to_date(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+
+
+def bars_needed(start_date, interval: str = "1d", warmup_bars: int = 0, margin: int = 5,
+                today: Optional[date] = None, max_bars: int = MAX_BARS) -> int:
+    """Smallest `n_bars` whose window (counted back from today) reaches `start_date`."""
+    today = today or date.today()
+    start = _to_date(start_date)
+    if start > today:
+        start = today
+    weekdays = int(np.busday_count(start, today)) + 1  # both ends inclusive
+
+    if interval == "1d":
+        bars = weekdays
+    elif interval == "1w":
+        bars = (today - start).days // 7 + 1
+    elif interval == "1M":
+        bars = (today.year - start.year) * 12 + today.month - start.month + 1
+    elif interval in _INTRADAY_BARS_PER_DAY:
+        bars = weekdays * _INTRADAY_BARS_PER_DAY[interval]
+    else:
+        raise ValueError(f"Unsupported interval: {interval}")
+
+    return int(min(max(bars + warmup_bars + margin, 1), max_bars))
+
+
+class TVSessionPool:
+    """Up to `size` reusable TvDatafeed sessions for one login."""
+
+    def __init__(self, size: int = 2, username: Optional[str] = None, password: Optional[str] = None,
+                 factory: Optional[Callable[[], object]] = None):
+        self.size = max(int(size), 1)
+        self.username = username
+        self.password = password
+        self._factory = factory or self._create
+        self._idle: "queue.LifoQueue" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self.created = 0
+        self.reused = 0
+        self.discarded = 0
+        self._lock = threading.Lock()
+
+    def _create(self):
+        from tvDatafeed import TvDatafeed
+
+        if self.username and self.password:
+            return TvDatafeed(username=self.username, password=self.password)
+        return TvDatafeed()
+
+    @contextmanager
+    def session(self, timeout: Optional[float] = None):
+        """Check out a session for the calling thread only; blocks while all are busy."""
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError("No TradingView session became free in time")
+        tv = None
+        try:
+            try:
+                tv = self._idle.get_nowait()
+                with self._lock:
+                    self.reused += 1
+            except queue.Empty:
+                tv = self._factory()
+                with self._lock:
+                    self.created += 1
+            yield tv
+        except Exception:
+            # websocket / token อาจเสียไปแล้ว -> ทิ้ง แล้วสร้างใหม่รอบหน้า
+            if tv is not None:
+                with self._lock:
+                    self.discarded += 1
+                tv = None
+            raise
+        finally:
+            if tv is not None:
+                self._idle.put(tv)
+            self._slots.release()
+
+    def get_hist(self, symbol: str, exchange: str, interval, n_bars: int, **kwargs):
+        with self.session() as tv:
+            return tv.get_hist(symbol=symbol, exchange=exchange, interval=interval, n_bars=n_bars, **kwargs)
+
+    def stats(self) -> dict:
+        return {"size": self.size, "created": self.created, "reused": self.reused, "discarded": self.discarded}
+
+
+_pools: Dict[Tuple[Optional[str], bool], TVSessionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_tv_pool(authenticated: bool = False) -> TVSessionPool:
+    """Process-wide session pool; `authenticated` uses TV_USERNAME / TV_PASSWORD when set."""
+    settings = get_config().get("tradingview", {})
+    username = os.getenv("TV_USERNAME") if authenticated else None
+    password = os.getenv("TV_PASSWORD") if authenticated else None
+    key = (username, bool(password))
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = TVSessionPool(settings.get("pool_size", 2), username=username, password=password)
+        return _pools[key]
@@ -1,8 +1,201 @@
 import os
-import pandas as pd
+import threading
+import time
+from collections import deque
 from datetime import datetime
-from typing import Annotated
-from twelvedata import TDClient
+from typing import Annotated, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+from .config import get_config
+from .ohlcv_store import OHLCV_COLUMNS
+from .price_frame import PriceFrame
+
+API_BASE_URL = "https://api.twelvedata.com"
+
+# TwelveData interval mapping (1d/1w/1M แบบของคุณ → twelvedata ใช้ “1day”, “1week”, “1month”)
+INTERVAL_MAP = {
+    "1d": "1day",
+    "1w": "1week",
+    "1M": "1month"
+}
+
+
+class TwelveDataRateLimitError(Exception):
+    """Raised when the per-minute credit budget is exhausted (locally or by the API)."""
+    pass
+
+
+class CreditBudget:
+    """Sliding one-minute window of API credits (every symbol in a request costs one)."""
+
+    def __init__(self, per_minute: int, clock=time.monotonic, sleep=time.sleep):
+        self.per_minute = max(int(per_minute), 1)
+        self.clock = clock
+        self.sleep = sleep
+        self._spent = deque()  # (time, credits)
+        self._lock = threading.Lock()
+
+    def _used(self, now: float) -> int:
+        while self._spent and now - self._spent[0][0] >= 60:
+            self._spent.popleft()
+        return sum(c for _, c in self._spent)
+
+    def spend(self, credits: int, max_wait: Optional[float] = None) -> float:
+        """Reserve `credits`, sleeping until the window has room; returns the wait."""
+        credits = min(int(credits), self.per_minute)
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self.clock()
+                used = self._used(now)
+                if used + credits <= self.per_minute:
+                    self._spent.append((now, credits))
+                    return waited
+                # รอจนกว่าเครดิตก้อนเก่าสุดจะหลุดออกจากหน้าต่าง 1 นาที
+                wait = 60 - (now - self._spent[0][0])
+            if max_wait is not None and waited + wait > max_wait:
+                raise TwelveDataRateLimitError(f"TwelveData credit budget busy (next credits in {wait:.0f}s)")
+            self.sleep(wait)
+            waited += wait
+
+
+def _values_to_frame(values: List[dict]) -> pd.DataFrame:
+    """TwelveData `values` rows -> date-indexed OHLCV frame, oldest first."""
+    if not values:
+        return pd.DataFrame(columns=OHLCV_COLUMNS)
+    df = pd.DataFrame(values)
+    df.index = pd.to_datetime(df.pop("datetime")).dt.normalize()
+    df.index.name = "Date"
+    df = df.rename(columns={c: c.capitalize() for c in df.columns})
+    if "Volume" not in df.columns:
+        df["Volume"] = 0
+    df = df[OHLCV_COLUMNS].apply(pd.to_numeric, errors="coerce")
+    return df.sort_index()
+
+
+class TwelveDataClient:
+    """Shared TwelveData HTTP client: one pooled session, credit pacing and batch requests."""
+
+    def __init__(self, api_key: Optional[str] = None, credits_per_minute: int = 8,
+                 max_symbols_per_call: int = 8, max_wait: Optional[float] = 60, timeout: float = 30,
+                 session: Optional[requests.Session] = None, budget: Optional[CreditBudget] = None):
+        self.api_key = api_key or os.getenv("TWELVEDATA_API_KEY")
+        self.max_symbols_per_call = max(1, min(int(max_symbols_per_call), int(credits_per_minute)))
+        self.max_wait = max_wait
+        self.timeout = timeout
+        self.budget = budget or CreditBudget(credits_per_minute)
+        if session is None:
+            session = requests.Session()
+            session.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=8))
+        self.session = session
+        self.calls = 0
+
+    def _time_series(self, symbols: List[str], interval: str, start_date: str, end_date: str) -> Dict[str, dict]:
+        """One time_series call for up to max_symbols_per_call symbols -> {symbol: payload}."""
+        if not self.api_key:
+            raise ValueError("Missing TWELVEDATA_API_KEY in .env")
+        self.budget.spend(len(symbols), self.max_wait)
+        params = {
+            "symbol": ",".join(symbols),
+            "interval": interval,
+            "start_date": start_date,
+            "end_date": end_date,
+            "outputsize": 5000,  # จำนวนจุดข้อมูล
+            "timezone": "Exchange",  # ใช้ timezone ของตลาด (เช่น NASDAQ)
+            "apikey": self.api_key,
+        }
+        response = self.session.get(f"{API_BASE_URL}/time_series", params=params, timeout=self.timeout)
+        self.calls += 1
+        response.raise_for_status()
+        payload = response.json()
+        if payload.get("code") == 429:
+            raise TwelveDataRateLimitError(payload.get("message", "TwelveData rate limit"))
+        # ขอ symbol เดียว API จะไม่ห่อผลด้วยชื่อ symbol
+        if len(symbols) == 1:
+            return {symbols[0]: payload}
+        if payload.get("status") == "error":
+            return {s: payload for s in symbols}
+        return {s: payload.get(s, {"status": "error", "message": "missing from batch response"}) for s in symbols}
+
+    def time_series(self, symbol: str, start_date: str, end_date: str, interval: str = "1day") -> pd.DataFrame:
+        """Bars of one symbol (raises ValueError with the API message when there are none)."""
+        payload = self._time_series([symbol], interval, start_date, end_date)[symbol]
+        if payload.get("status") == "error":
+            raise ValueError(payload.get("message", "TwelveData error"))
+        return _values_to_frame(payload.get("values"))
+
+    def batch_time_series(self, requests_: Iterable[Tuple[str, str, str]], interval: str = "1day") -> Dict[str, PriceFrame]:
+        """Fetch many (symbol, start_date, end_date) requests in as few calls as the budget allows.
+
+        Symbols are grouped into calls of up to max_symbols_per_call (never more
+        than the per-minute credits, so every call can go out), neighbours in
+        start date first; each call asks for the union of its members' ranges
+        and the result is sliced back per symbol. Returns {symbol: PriceFrame};
+        symbols that failed get a failed PriceFrame with the API message.
+        """
+        ranges: Dict[str, Tuple[str, str]] = {}
+        for symbol, start_date, end_date in requests_:
+            if symbol in ranges:
+                start_date = min(start_date, ranges[symbol][0])
+                end_date = max(end_date, ranges[symbol][1])
+            ranges[symbol] = (start_date, end_date)
+
+        ordered = sorted(ranges, key=lambda s: ranges[s])
+        chunks = [ordered[i:i + self.max_symbols_per_call] for i in range(0, len(ordered), self.max_symbols_per_call)]
+        print(f"📦 TwelveData batch: {len(ordered)} symbol(s) in {len(chunks)} call(s)")
+
+        results: Dict[str, PriceFrame] = {}
+        for chunk in chunks:
+            start_date = min(ranges[s][0] for s in chunk)
+            end_date = max(ranges[s][1] for s in chunk)
+            try:
+                payloads = self._time_series(chunk, interval, start_date, end_date)
+            except Exception as e:
+                for s in chunk:
+                    results[s] = PriceFrame.failed(s, f"TwelveData request failed: {e}", start_date=ranges[s][0], end_date=ranges[s][1])
+                continue
+            for s in chunk:
+                s_start, s_end = ranges[s]
+                payload = payloads[s]
+                if payload.get("status") == "error":
+                    results[s] = PriceFrame.failed(s, payload.get("message", "TwelveData error"), start_date=s_start, end_date=s_end)
+                    continue
+                frame = _values_to_frame(payload.get("values")).loc[s_start:s_end]
+                results[s] = PriceFrame(s, frame, "twelvedata", start_date=s_start, end_date=s_end)
+        return results
+
+
+_client: Optional[TwelveDataClient] = None
+_client_lock = threading.Lock()
+
+
+def get_td_client() -> TwelveDataClient:
+    """Process-wide TwelveData client (settings under "twelvedata" in the config)."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            settings = get_config().get("twelvedata", {})
+            _client = TwelveDataClient(
+                credits_per_minute=settings.get("credits_per_minute", 8),
+                max_symbols_per_call=settings.get("max_symbols_per_call", 8),
+                max_wait=settings.get("max_wait", 60),
+                timeout=settings.get("timeout", 30),
+            )
+        return _client
+
+
+def get_twelvedata_batch(
+    requests_: Annotated[List[Tuple[str, str, str]], "(symbol, start_date, end_date) tuples"],
+    interval: Annotated[str, "Interval for data, e.g., 1d, 1w, 1M"] = "1d",
+) -> Dict[str, PriceFrame]:
+    """Per-symbol PriceFrames for a watchlist, grouped into multi-symbol time_series calls."""
+    if interval not in INTERVAL_MAP:
+        raise ValueError(f"Invalid interval. Supported: {list(INTERVAL_MAP.keys())}")
+    return get_td_client().batch_time_series(requests_, INTERVAL_MAP[interval])
+
 
 def get_twelvedata_stock(
     symbol: Annotated[str, "ticker symbol of the company"],
@@ -10,49 +203,24 @@ def get_twelvedata_stock(
     end_date: Annotated[str, "End date in yyyy-mm-dd format"],
     interval: Annotated[str, "Interval for data, e.g., 1day, 1week, 1month"] = "1d",
 ):
-    api_key = os.getenv("TWELVEDATA_API_KEY")
-    # api_key = "e74d6f8538fa40cabdc1dec473592c9a"
-    if not api_key:
+    client = get_td_client()
+    if not client.api_key:
         return "Missing TWELVEDATA_API_KEY in .env"
 
-    td = TDClient(apikey=api_key)
-
-    # TwelveData interval mapping (1d/1w/1M แบบของคุณ → twelvedata ใช้ “1day”, “1week”, “1month”)
-    interval_map = {
-        "1d": "1day",
-        "1w": "1week",
-        "1M": "1month"
-    }
-    if interval not in interval_map:
-        return f"Invalid interval. Supported: {list(interval_map.keys())}"
-
-    td_interval = interval_map[interval]
-
-    # ดึง data จาก API
-    ts = td.time_series(
-        symbol=symbol,
-        interval=td_interval,
-        start_date=start_date,
-        end_date=end_date,
-        outputsize=5000,  # จำนวนจุดข้อมูล
-        timezone="Exchange"  # ใช้ timezone ของตลาด (เช่น NASDAQ)
-    )
+    if interval not in INTERVAL_MAP:
+        return f"Invalid interval. Supported: {list(INTERVAL_MAP.keys())}"
 
-    # ดึงเป็น pandas DataFrame
-    df = ts.as_pandas()
+    # ดึง data จาก API (shared session; rate-limit errors propagate to the circuit breaker)
+    try:
+        df = client.time_series(symbol, start_date, end_date, INTERVAL_MAP[interval])
+    except ValueError as e:
+        return f"No data found for {symbol} in TwelveData between {start_date} and {end_date} ({e})"
 
     if df is None or df.empty:
         return f"No data found for {symbol} in TwelveData between {start_date} and {end_date}"
 
-    # Tweak: rename columnให้เหมือน Alpha Vantage แบบก่อน
-    # TwelveData ส่งชื่อ columns เป็น open, high, low, close, volume
-    df = df.rename(columns={
-        "open": "Open",
-        "high": "High",
-        "low": "Low",
-        "close": "Close",
-        "volume": "Volume"
-    })
+    # ลำดับใหม่สุดก่อน เหมือนที่ TDClient.as_pandas() เคยคืนมา
+    df = df.iloc[::-1].copy()
 
     # round ค่าเหมือนโค้ดเดิม
     df["Open"] = df["Open"].round(2)
@@ -62,7 +230,7 @@ def get_twelvedata_stock(
     df["Volume"] = df["Volume"].fillna(0).astype(int)
 
     # สร้าง CSV string
-    csv_string = df.to_csv(index_label="Date")
+    csv_string = df.to_csv(index_label="Date", date_format="%Y-%m-%d")
 
     # สร้าง header
     header = (
@@ -79,4 +247,4 @@ def get_twelvedata_stock(
 #     "AAPL",
 #     "2024-11-17",
 #     "2025-11-17"
-# ))
\ No newline at end of file
+# ))
@@ -1,8 +1,9 @@
 import os
 import json
+import threading
 import pandas as pd
 from datetime import date, timedelta, datetime
-from typing import Annotated
+from typing import Annotated, Any, Callable, Dict, Hashable
 
 SavePathType = Annotated[str, "File path to save data. If None, data is not saved."]
 
@@ -37,3 +38,51 @@ def get_next_weekday(date):
         return next_weekday
     else:
         return date
+
+
+class SingleFlight:
+    """Coalesce identical concurrent calls.
+
+    The first caller for a key runs the function; callers that arrive while it
+    is in flight wait and receive the same result (or exception) instead of
+    issuing their own request.
+    """
+
+    class _Call:
+        def __init__(self):
+            self.done = threading.Event()
+            self.result = None
+            self.error = None
+            self.waiters = 0
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, "SingleFlight._Call"] = {}
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = self._Call()
+            else:
+                call.waiters += 1
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result
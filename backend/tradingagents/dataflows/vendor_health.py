@@ -0,0 +1,191 @@
+"""
+Process-wide vendor health registry.
+
+Every (vendor, method) pair gets a circuit breaker that records call outcomes
+and latencies. A breaker opens after repeated failures (or a high error rate
+over its recent window) and the vendor is skipped until the cool-down expires;
+then a single probe call is let through (half-open) to decide whether to close
+it again or re-open it.
+"""
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+from .config import get_config
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+DEFAULT_BREAKER_CONFIG = {
+    "failure_threshold": 3,       # consecutive failures that open the breaker
+    "error_rate_threshold": 0.5,  # or: error rate over the window ...
+    "min_calls": 5,               # ... once at least this many calls were seen
+    "window_size": 20,            # outcomes/latencies kept per breaker
+    "cooldown_seconds": 60,       # how long an open breaker skips the vendor
+    "rate_limit_cooldown_seconds": 900,  # cool-down after a quota/rate-limit error
+}
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker for a single (vendor, method) pair."""
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        error_rate_threshold: float = 0.5,
+        min_calls: int = 5,
+        window_size: int = 20,
+        cooldown_seconds: float = 60,
+        clock=time.monotonic,
+        **_ignored,
+    ):
+        self.failure_threshold = failure_threshold
+        self.error_rate_threshold = error_rate_threshold
+        self.min_calls = min_calls
+        self.cooldown_seconds = cooldown_seconds
+        self.clock = clock
+
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.total_calls = 0
+        self.total_failures = 0
+        self.outcomes = deque(maxlen=window_size)
+        self.latencies = deque(maxlen=window_size)
+        self.opened_at: Optional[float] = None
+        self.current_cooldown = cooldown_seconds
+        self.probe_started: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Return True if a call may be made now."""
+        with self._lock:
+            now = self.clock()
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                if now - self.opened_at < self.current_cooldown:
+                    return False
+                self.state = HALF_OPEN
+                self.probe_started = None
+            # Half-open: let exactly one probe through. A probe that never
+            # reports back (abandoned call) releases its slot after a cool-down.
+            if self.probe_started is not None and now - self.probe_started < self.current_cooldown:
+                return False
+            self.probe_started = now
+            return True
+
+    def record_success(self, latency: Optional[float] = None):
+        with self._lock:
+            self._record(True, latency)
+            self.consecutive_failures = 0
+            if self.state != CLOSED:
+                self.state = CLOSED
+                self.opened_at = None
+                self.probe_started = None
+                self.current_cooldown = self.cooldown_seconds
+
+    def record_failure(self, latency: Optional[float] = None, cooldown: Optional[float] = None):
+        """Record a failed call. A `cooldown` forces the breaker open for that long."""
+        with self._lock:
+            self._record(False, latency)
+            self.consecutive_failures += 1
+            if cooldown is not None:
+                self._trip(cooldown)
+            elif self.state == HALF_OPEN:
+                self._trip(self.cooldown_seconds)
+            elif self.state == CLOSED and self._should_trip():
+                self._trip(self.cooldown_seconds)
+
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return sum(1 for ok in self.outcomes if not ok) / len(self.outcomes)
+
+    def avg_latency(self) -> Optional[float]:
+        if not self.latencies:
+            return None
+        return sum(self.latencies) / len(self.latencies)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            retry_in = None
+            if self.state == OPEN:
+                retry_in = max(0.0, self.current_cooldown - (self.clock() - self.opened_at))
+            return {
+                "state": self.state,
+                "calls": self.total_calls,
+                "failures": self.total_failures,
+                "consecutive_failures": self.consecutive_failures,
+                "error_rate": round(self.error_rate(), 3),
+                "avg_latency": self.avg_latency(),
+                "retry_in": retry_in,
+            }
+
+    def _record(self, ok: bool, latency: Optional[float]):
+        self.total_calls += 1
+        if not ok:
+            self.total_failures += 1
+        self.outcomes.append(ok)
+        if latency is not None:
+            self.latencies.append(latency)
+
+    def _should_trip(self) -> bool:
+        if self.consecutive_failures >= self.failure_threshold:
+            return True
+        return len(self.outcomes) >= self.min_calls and self.error_rate() >= self.error_rate_threshold
+
+    def _trip(self, cooldown: float):
+        self.state = OPEN
+        self.opened_at = self.clock()
+        self.current_cooldown = cooldown
+        self.probe_started = None
+
+
+class VendorHealthRegistry:
+    """Thread-safe collection of circuit breakers keyed by (vendor, method)."""
+
+    def __init__(self, breaker_config: Optional[Dict] = None):
+        self._breaker_config = breaker_config
+        self._breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def _config(self) -> Dict:
+        if self._breaker_config is not None:
+            return {**DEFAULT_BREAKER_CONFIG, **self._breaker_config}
+        return {**DEFAULT_BREAKER_CONFIG, **get_config().get("circuit_breaker", {})}
+
+    def breaker(self, vendor: str, method: str) -> CircuitBreaker:
+        key = (vendor, method)
+        with self._lock:
+            if key not in self._breakers:
+                self._breakers[key] = CircuitBreaker(**self._config())
+            return self._breakers[key]
+
+    def allow(self, vendor: str, method: str) -> bool:
+        return self.breaker(vendor, method).allow()
+
+    def record_success(self, vendor: str, method: str, latency: Optional[float] = None):
+        self.breaker(vendor, method).record_success(latency)
+
+    def record_failure(self, vendor: str, method: str, latency: Optional[float] = None, rate_limited: bool = False):
+        cooldown = self._config()["rate_limit_cooldown_seconds"] if rate_limited else None
+        self.breaker(vendor, method).record_failure(latency, cooldown=cooldown)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self._lock:
+            items = list(self._breakers.items())
+        return {f"{vendor}:{method}": b.snapshot() for (vendor, method), b in items}
+
+    def reset(self):
+        with self._lock:
+            self._breakers.clear()
+
+
+_registry = VendorHealthRegistry()
+
+
+def get_health_registry() -> VendorHealthRegistry:
+    """Get the process-wide vendor health registry."""
+    return _registry
@@ -0,0 +1,93 @@
+"""
+Per-vendor capped worker pools for the fundamentals fetchers in local.py.
+
+Every request to a vendor runs on that vendor's pool of
+`fundamentals_concurrency[vendor]` threads, so the cap holds however the
+calls nest: fetch_yfinance runs overview and statements as two tasks on the
+yfinance pool, and each of them fans out its own sub-requests on the same
+pool. A worker that waits for sub-requests does not sit on its slot: the
+ones no worker has picked up yet are run on the waiting thread itself, which
+also rules out a deadlock when every worker is waiting.
+"""
+import concurrent.futures
+import threading
+from typing import Any, Callable, Dict
+
+from .config import get_config
+
+_local = threading.local()
+
+
+class VendorPool:
+    """Capped pool for one vendor; `run` returns {name: result or exception}."""
+
+    def __init__(self, vendor: str, max_workers: int = 4):
+        self.vendor = vendor
+        self.max_workers = max(int(max_workers), 1)
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix=f"fund-{vendor}",
+            initializer=self._mark_worker,
+        )
+
+    def _mark_worker(self):
+        _local.pool = self
+
+    def in_worker(self) -> bool:
+        return getattr(_local, "pool", None) is self
+
+    def run(self, calls: Dict[str, Callable[[], Any]]) -> Dict[str, Any]:
+        """Run independent sub-requests at once; a failed call yields its exception object."""
+        futures = {name: self._executor.submit(fn) for name, fn in calls.items()}
+        inline = self.in_worker()
+        out = {}
+        for name, fn in calls.items():
+            future = futures[name]
+            if inline and future.cancel():
+                # ยังไม่มี worker ว่างมารับ: รันเองบนเธรดนี้ (ถือ slot ของ pool อยู่แล้ว)
+                try:
+                    out[name] = fn()
+                except Exception as e:
+                    out[name] = e
+                continue
+            try:
+                out[name] = future.result()
+            except Exception as e:
+                out[name] = e
+        return out
+
+
+_pools: Dict[str, VendorPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_vendor_pool(vendor: str) -> VendorPool:
+    """Process-wide pool per vendor (caps under "fundamentals_concurrency" in the config)."""
+    with _pools_lock:
+        if vendor not in _pools:
+            cap = get_config().get("fundamentals_concurrency", {}).get(vendor, 4)
+            _pools[vendor] = VendorPool(vendor, cap)
+        return _pools[vendor]
+
+
+def run_concurrently(vendor: str, calls: Dict[str, Callable[[], Any]]) -> Dict[str, Any]:
+    """Run a vendor's independent sub-requests at once on its pool; a failed call yields its exception object."""
+    return get_vendor_pool(vendor).run(calls)
+
+
+def fetch_overview_and_statements(
+    vendor: str,
+    overview: Callable[[], Dict],
+    statements: Callable[[], Dict],
+) -> Dict[str, Dict]:
+    """{"overview": ..., **statement sections} of one vendor, both parts fetched at once on its pool.
+
+    A part that raises is reported and left out (the overview as {}), the
+    other part is still returned.
+    """
+    got = run_concurrently(vendor, {"overview": overview, "statements": statements})
+    for part, value in got.items():
+        if isinstance(value, Exception):
+            print(f"⚠️ {vendor} {part} Error: {value}")
+            got[part] = {}
+    return {"overview": got["overview"] or {}, **(got["statements"] or {})}
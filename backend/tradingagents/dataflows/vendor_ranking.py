@@ -0,0 +1,206 @@
+"""
+Learned vendor ranking per (market, data type).
+
+The provider comparisons in core_stock_price and core_indicator score how well
+each vendor agrees with the others and how long it took. Those observations are
+folded into exponentially weighted averages and persisted as JSON, so after a
+warm-up period a call can go straight to the historically best (and, among
+equally good vendors, fastest) vendor and fall back down the ranking, with a
+full comparison only every `explore_every` calls. The file is written at most
+once per `flush_interval` seconds and once more at exit.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from .config import get_config
+
+DEFAULT_RANKING_CONFIG = {
+    "enabled": True,
+    "path": None,
+    "alpha": 0.3,
+    "warmup_samples": 5,
+    "explore_every": 20,
+    "agreement_bucket": 0.05,
+    "flush_interval": 5.0,
+}
+
+
+class VendorRanking:
+    """EWMA agreement/success/latency stats per (market, data type, vendor)."""
+
+    def __init__(
+        self,
+        path: str,
+        alpha: float = 0.3,
+        warmup_samples: int = 5,
+        explore_every: int = 20,
+        agreement_bucket: float = 0.05,
+        flush_interval: float = 5.0,
+        clock=time.monotonic,
+        **_ignored,
+    ):
+        self.path = path
+        self.alpha = alpha
+        self.warmup_samples = warmup_samples
+        self.explore_every = explore_every
+        self.agreement_bucket = agreement_bucket
+        self.flush_interval = flush_interval
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._save_lock = threading.RLock()
+        self._dirty = False
+        self._last_save: Optional[float] = None
+        self.saves = 0
+        self._data: Dict[str, Dict] = self._load()
+
+    # ---------- persistence ----------
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        """Write the stats now (one writer at a time, so the file is never mixed)."""
+        with self._save_lock:
+            with self._lock:
+                payload = json.dumps(self._data, ensure_ascii=False, indent=2)
+                self._dirty = False
+                self._last_save = self.clock()
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write(payload)
+                os.replace(tmp_path, self.path)
+                self.saves += 1
+            except OSError as e:
+                with self._lock:
+                    self._dirty = True
+                print(f"⚠️ Could not save vendor ranking: {e}")
+
+    def flush(self):
+        """Save if anything changed since the last save."""
+        with self._save_lock:
+            if self._dirty:
+                self.save()
+
+    def _mark_dirty(self):
+        """Record a change; hit the disk at most once per flush_interval (the rest at flush / exit)."""
+        with self._lock:
+            self._dirty = True
+            due = self._last_save is None or self.clock() - self._last_save >= self.flush_interval
+        if due:
+            self.flush()
+
+    # ---------- recording ----------
+
+    def _entry(self, market: str, data_type: str) -> Dict:
+        key = f"{market}:{data_type}"
+        return self._data.setdefault(key, {"comparisons": 0, "calls": 0, "vendors": {}})
+
+    def _ewma(self, old: Optional[float], new: float) -> float:
+        return new if old is None else old + self.alpha * (new - old)
+
+    def _update(self, entry: Dict, vendor: str, ok: bool, latency: Optional[float], agreement: Optional[float]):
+        stats = entry["vendors"].setdefault(
+            vendor, {"agreement": None, "success": None, "latency": None, "samples": 0}
+        )
+        stats["samples"] += 1
+        stats["success"] = self._ewma(stats["success"], 1.0 if ok else 0.0)
+        if ok and latency is not None:
+            stats["latency"] = self._ewma(stats["latency"], float(latency))
+        if agreement is not None:
+            stats["agreement"] = self._ewma(stats["agreement"], float(agreement))
+
+    def record_comparison(
+        self,
+        market: str,
+        data_type: str,
+        scores: Dict[str, float],
+        latencies: Dict[str, Optional[float]],
+        available: Iterable[str],
+    ):
+        """Fold in one full comparison.
+
+        `scores` are the raw agreement scores per vendor, `latencies` the call
+        durations and `available` the vendors that actually returned data.
+        Agreement is normalised to the best score of this comparison.
+        """
+        available = set(available)
+        top = max((float(v) for v in scores.values()), default=0.0)
+        with self._lock:
+            entry = self._entry(market, data_type)
+            entry["comparisons"] += 1
+            for vendor in set(scores) | set(latencies):
+                ok = vendor in available
+                if not ok:
+                    agreement = 0.0
+                elif top > 0:
+                    agreement = float(scores.get(vendor, 0)) / top
+                else:
+                    agreement = None  # nothing to compare against
+                self._update(entry, vendor, ok, latencies.get(vendor), agreement)
+        self._mark_dirty()
+
+    def record_call(self, market: str, data_type: str, vendor: str, latency: Optional[float], ok: bool):
+        """Fold in a single ranked call (latency and success only)."""
+        with self._lock:
+            self._update(self._entry(market, data_type), vendor, ok, latency, None)
+        self._mark_dirty()
+
+    # ---------- ranking ----------
+
+    def _sort_key(self, stats: Dict):
+        agreement = stats["agreement"] if stats["agreement"] is not None else 0.0
+        success = stats["success"] if stats["success"] is not None else 1.0
+        bucket = round(agreement * success / self.agreement_bucket)
+        latency = stats["latency"] if stats["latency"] is not None else float("inf")
+        return (-bucket, latency)
+
+    def rank(self, market: str, data_type: str, vendors: List[str]) -> List[str]:
+        """Order `vendors` best first; vendors without history keep their order at the end."""
+        with self._lock:
+            known = dict(self._data.get(f"{market}:{data_type}", {}).get("vendors", {}))
+        ranked = sorted((v for v in vendors if v in known), key=lambda v: self._sort_key(known[v]))
+        return ranked + [v for v in vendors if v not in known]
+
+    def plan(self, market: str, data_type: str, vendors: List[str]) -> Optional[List[str]]:
+        """Vendor order for a ranked call, or None when a full comparison is due."""
+        with self._lock:
+            entry = self._entry(market, data_type)
+            entry["calls"] += 1
+            warm = entry["comparisons"] >= self.warmup_samples
+            explore = self.explore_every and entry["calls"] % self.explore_every == 0
+        if not warm or explore:
+            return None
+        return self.rank(market, data_type, vendors)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self._lock:
+            return json.loads(json.dumps(self._data))
+
+
+_ranking: Optional[VendorRanking] = None
+_ranking_lock = threading.Lock()
+
+
+def get_vendor_ranking() -> Optional[VendorRanking]:
+    """Get the process-wide ranking, or None when disabled in the config."""
+    global _ranking
+    settings = {**DEFAULT_RANKING_CONFIG, **get_config().get("vendor_ranking", {})}
+    if not settings["enabled"]:
+        return None
+    with _ranking_lock:
+        if _ranking is None:
+            path = settings["path"] or os.path.join(get_config()["data_cache_dir"], "vendor_ranking.json")
+            _ranking = VendorRanking(**{**settings, "path": path})
+            atexit.register(_ranking.flush)
+        return _ranking
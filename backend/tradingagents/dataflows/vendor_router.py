@@ -0,0 +1,633 @@
+"""
+Routing engine behind route_to_vendor / aroute_to_vendor (interface.py).
+
+interface.py owns the vendor tables (which implementations serve which tool
+method) and the vendor order from the config; the functions here take one
+method's table, `impls` ({vendor: impl or [impls]}), and run the calls
+through the response cache, the circuit breakers and the routing policy.
+
+Concurrent fan-out ("first_success" / "quorum" / "gather_all") runs on its
+own `FanoutPool`. A running call cannot be interrupted, so a call that times
+out or is no longer needed keeps its worker until it returns; the pool
+counts those abandoned calls and refuses new fan-out calls while every
+worker is taken, instead of queueing them behind hung vendors. Timeouts and
+recorded latencies are measured from the moment each call starts running.
+"""
+import asyncio
+import concurrent.futures
+import functools
+import inspect
+import threading
+import time
+from typing import Optional
+
+from .alpha_vantage_common import AlphaVantageRateLimitError
+from .config import get_config
+from .response_cache import get_response_cache, get_ttl, is_error_result
+from .vendor_health import get_health_registry
+
+ROUTING_MODES = ("sequential", "first_success", "quorum", "gather_all")
+
+
+def get_routing_policy(method: str) -> dict:
+    """Get the routing policy for a tool method (see "vendor_routing" in the config)."""
+    policy = {"mode": "sequential", "quorum": 1, "timeout": None}
+    policy.update(get_config().get("vendor_routing", {}).get(method, {}))
+    if policy["mode"] not in ROUTING_MODES:
+        raise ValueError(f"Unknown routing mode '{policy['mode']}' for method '{method}'")
+    return policy
+
+
+# ==========================================
+# Worker pools
+# ==========================================
+
+class FanoutCall:
+    """One call on a FanoutPool; `started` / `finished` are set by the worker."""
+
+    def __init__(self, pool: "FanoutPool"):
+        self.pool = pool
+        self.future: Optional[concurrent.futures.Future] = None
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.abandoned = False
+
+    def _run(self, fn, args):
+        self.started = time.monotonic()
+        try:
+            return fn(*args)
+        finally:
+            self.finished = time.monotonic()
+            self.pool._release(self)
+
+    def elapsed(self, now: Optional[float] = None) -> float:
+        """Seconds the call has been running (0 while it is still queued)."""
+        if self.started is None:
+            return 0.0
+        end = self.finished if self.finished is not None else (time.monotonic() if now is None else now)
+        return end - self.started
+
+    def expired(self, timeout, now: float) -> bool:
+        return bool(timeout) and self.started is not None and self.finished is None and now - self.started >= timeout
+
+
+class FanoutPool:
+    """Bounded pool for fan-out calls with one slot per worker.
+
+    A call holds its slot until it really returns, also after it was
+    abandoned, so `try_submit` returns None once every worker is busy.
+    """
+
+    def __init__(self, max_workers: int = 8):
+        self.max_workers = max(int(max_workers), 1)
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="vendor-fanout"
+        )
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.abandoned = 0
+
+    def try_submit(self, fn, *args) -> Optional[FanoutCall]:
+        with self._lock:
+            if self.in_flight >= self.max_workers:
+                return None
+            self.in_flight += 1
+        call = FanoutCall(self)
+        call.future = self._executor.submit(call._run, fn, args)
+        return call
+
+    def abandon(self, call: FanoutCall) -> bool:
+        """Give up on a call. Returns True if it is still running and now counts as abandoned."""
+        if call.future.cancel():
+            # ยังไม่ได้เริ่มรัน worker จะไม่คืน slot ให้เอง
+            self._release(call)
+            return False
+        with self._lock:
+            if call.finished is not None or call.abandoned:
+                return False
+            call.abandoned = True
+            self.abandoned += 1
+            return True
+
+    def _release(self, call: FanoutCall):
+        with self._lock:
+            self.in_flight -= 1
+            if call.abandoned:
+                self.abandoned -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"max_workers": self.max_workers, "in_flight": self.in_flight, "abandoned": self.abandoned}
+
+
+_fanout_pool: Optional[FanoutPool] = None
+_executor = None
+_pool_lock = threading.Lock()
+
+
+def get_fanout_pool() -> FanoutPool:
+    """Process-wide pool for concurrent fan-out ("vendor_fanout_workers" in the config)."""
+    global _fanout_pool
+    with _pool_lock:
+        if _fanout_pool is None:
+            _fanout_pool = FanoutPool(get_config().get("vendor_fanout_workers", 8))
+        return _fanout_pool
+
+
+def _get_executor() -> concurrent.futures.ThreadPoolExecutor:
+    """Shared worker pool for sync vendors called from the async routes."""
+    global _executor
+    with _pool_lock:
+        if _executor is None:
+            _executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=get_config().get("vendor_max_workers", 16),
+                thread_name_prefix="vendor",
+            )
+        return _executor
+
+
+# ==========================================
+# Helpers
+# ==========================================
+
+def _impl_name(impl) -> str:
+    return getattr(impl, "__name__", repr(impl))
+
+
+def _impl_list(impls: dict, vendor: str) -> list:
+    vendor_impl = impls[vendor]
+    return vendor_impl if isinstance(vendor_impl, list) else [vendor_impl]
+
+
+def _get_call_timeout(vendor: str, impl, policy: dict):
+    """Per-call timeout: implementation name, then vendor name, then method policy."""
+    timeouts = get_config().get("vendor_timeouts", {})
+    for key in (_impl_name(impl), vendor):
+        if key in timeouts:
+            return timeouts[key]
+    return policy.get("timeout")
+
+
+def _health_key(impls: dict, vendor: str, impl) -> str:
+    """Vendors with a list of implementations are tracked per implementation."""
+    if isinstance(impls[vendor], list):
+        return _impl_name(impl)
+    return vendor
+
+
+def _call_params(impl, args, kwargs) -> dict:
+    """Bind call arguments to the implementation's signature for cache keys."""
+    try:
+        bound = inspect.signature(impl).bind(*args, **kwargs)
+        bound.apply_defaults()
+        params = dict(bound.arguments)
+    except (TypeError, ValueError):
+        params = {"args": list(args), "kwargs": dict(kwargs)}
+    for name in ("symbol", "ticker"):
+        if isinstance(params.get(name), str):
+            params[name] = params[name].strip().upper()
+    return params
+
+
+def _cache_store(cache, method: str, category: str, health_key: str, params: dict, result):
+    """Cache a finished result (callers await coroutine vendors first)."""
+    if cache is None:
+        return
+    ttl = get_ttl(method, category, params)
+    cache.set(method, health_key, params, result, ttl)
+
+
+def combine_results(results: list):
+    # Return single result if only one, otherwise concatenate as string
+    if len(results) == 1:
+        return results[0]
+    else:
+        # Convert all results to strings and concatenate
+        return '\n'.join(str(result) for result in results)
+
+
+def _needed_results(policy: dict, n_candidates: int) -> int:
+    """How many successful calls satisfy the policy."""
+    if policy["mode"] == "gather_all":
+        return n_candidates
+    if policy["mode"] == "quorum":
+        return min(max(int(policy.get("quorum", 1)), 1), n_candidates)
+    return 1
+
+
+# ==========================================
+# Sync routing
+# ==========================================
+
+def route(method: str, category: str, impls: dict, primary_vendors: list, fallback_vendors: list,
+          policy: dict, args, kwargs):
+    """Run one method call over its vendors (see route_to_vendor)."""
+    results = []
+    errors = []
+    vendor_attempt_count = 0
+
+    if policy["mode"] != "sequential":
+        results = route_concurrent(method, category, impls, primary_vendors, policy, args, kwargs, errors)
+        vendor_attempt_count = len(primary_vendors)
+        if results:
+            print(f"FINAL: Method '{method}' completed with {len(results)} result(s) from concurrent fan-out")
+            return combine_results(results)
+        print(f"FAILED: Concurrent fan-out produced no results for {method}, falling back sequentially")
+        fallback_vendors = [v for v in fallback_vendors if v not in primary_vendors]
+
+    seq_results, seq_attempts = route_sequential(method, category, impls, fallback_vendors, primary_vendors,
+                                                 args, kwargs, errors)
+    results.extend(seq_results)
+    vendor_attempt_count += seq_attempts
+
+    # Final result summary
+    if not results and errors:
+        # ไม่มีเจ้าไหนได้ข้อมูลจริง: ส่งข้อความ error ของ vendor กลับไปเหมือนเดิม
+        print(f"FAILURE: All {vendor_attempt_count} vendor attempts failed for method '{method}', returning their error replies")
+        return combine_results(errors)
+    if not results:
+        print(f"FAILURE: All {vendor_attempt_count} vendor attempts failed for method '{method}'")
+        raise RuntimeError(f"All vendor implementations failed for method '{method}'")
+    else:
+        print(f"FINAL: Method '{method}' completed with {len(results)} result(s) from {vendor_attempt_count} vendor attempt(s)")
+
+    return combine_results(results)
+
+
+def route_sequential(method: str, category: str, impls: dict, vendors: list, primary_vendors: list, args, kwargs,
+                     errors: Optional[list] = None):
+    """Try vendors one after another. Returns (results, vendor_attempt_count).
+
+    Error replies (see is_error_result) count as failed calls; they are
+    appended to `errors` instead of the results.
+    """
+    health = get_health_registry()
+    cache = get_response_cache()
+
+    # Track results and execution state
+    results = []
+    vendor_attempt_count = 0
+
+    for vendor in vendors:
+        if vendor not in impls:
+            if vendor in primary_vendors:
+                print(f"INFO: Vendor '{vendor}' not supported for method '{method}', falling back to next vendor")
+            continue
+
+        is_primary_vendor = vendor in primary_vendors
+        vendor_attempt_count += 1
+
+        # Debug: Print current attempt
+        vendor_type = "PRIMARY" if is_primary_vendor else "FALLBACK"
+        print(f"DEBUG: Attempting {vendor_type} vendor '{vendor}' for {method} (attempt #{vendor_attempt_count})")
+
+        # Handle list of methods for a vendor
+        vendor_methods = _impl_list(impls, vendor)
+        if isinstance(impls[vendor], list):
+            print(f"DEBUG: Vendor '{vendor}' has multiple implementations: {len(vendor_methods)} functions")
+
+        # Run methods for this vendor
+        vendor_results = []
+        for impl_func in vendor_methods:
+            name = _impl_name(impl_func)
+            health_key = _health_key(impls, vendor, impl_func)
+            params = _call_params(impl_func, args, kwargs)
+            if cache is not None:
+                hit, cached = cache.get(method, health_key, params)
+                if hit:
+                    vendor_results.append(cached)
+                    print(f"CACHE HIT: {name} from vendor '{vendor}'")
+                    continue
+
+            if not health.allow(health_key, method):
+                print(f"SKIP: {name} from vendor '{vendor}' skipped (circuit open)")
+                continue
+
+            call_started = time.monotonic()
+            try:
+                print(f"DEBUG: Calling {name} from vendor '{vendor}'...")
+                result = _resolve(impl_func(*args, **kwargs))
+                if is_error_result(result):
+                    health.record_failure(health_key, method, time.monotonic() - call_started)
+                    if errors is not None:
+                        errors.append(result)
+                    print(f"FAILED: {name} from vendor '{vendor}' returned an error: {result.strip()[:200]}")
+                    continue
+                vendor_results.append(result)
+                health.record_success(health_key, method, time.monotonic() - call_started)
+                _cache_store(cache, method, category, health_key, params, result)
+                print(f"SUCCESS: {name} from vendor '{vendor}' completed successfully")
+
+            except AlphaVantageRateLimitError as e:
+                health.record_failure(health_key, method, time.monotonic() - call_started, rate_limited=True)
+                if vendor == "alpha_vantage":
+                    print(f"RATE_LIMIT: Alpha Vantage rate limit exceeded, falling back to next available vendor")
+                    print(f"DEBUG: Rate limit details: {e}")
+                # Continue to next vendor for fallback
+                continue
+            except Exception as e:
+                health.record_failure(health_key, method, time.monotonic() - call_started)
+                # Log error but continue with other implementations
+                print(f"FAILED: {name} from vendor '{vendor}' failed: {e}")
+                continue
+
+        # Add this vendor's results
+        if vendor_results:
+            results.extend(vendor_results)
+            print(f"SUCCESS: Vendor '{vendor}' succeeded - Got {len(vendor_results)} result(s)")
+
+            # Stopping logic: Stop after first successful vendor for single-vendor configs
+            # Multiple vendor configs (comma-separated) may want to collect from multiple sources
+            if len(primary_vendors) == 1:
+                print(f"DEBUG: Stopping after successful vendor '{vendor}' (single-vendor config)")
+                break
+        else:
+            print(f"FAILED: Vendor '{vendor}' produced no results")
+
+    return results, vendor_attempt_count
+
+
+def _resolve(result):
+    """Drive a coroutine result to completion from sync code, so it can be cached and combined."""
+    if not inspect.iscoroutine(result):
+        return result
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(result)
+    # มี event loop วิ่งอยู่ในเธรดนี้ asyncio.run ใช้ไม่ได้ ให้ไปรันบนเธรดอื่น
+    return _get_executor().submit(asyncio.run, result).result()
+
+
+def _run_impl(impl, args, kwargs):
+    """Worker body for concurrent calls; coroutine vendors are driven to completion here."""
+    return _resolve(impl(*args, **kwargs))
+
+
+def route_concurrent(method: str, category: str, impls: dict, vendors: list, policy: dict, args, kwargs,
+                     errors: Optional[list] = None) -> list:
+    """Fan out to every implementation of the given vendors at once.
+
+    "first_success" returns as soon as one call succeeds, "quorum" once
+    policy["quorum"] calls succeed, "gather_all" once every call has finished
+    or timed out. Error replies count as failed calls and go to `errors`.
+    Each call's timeout runs from the moment it starts on the
+    fan-out pool. Calls that are no longer needed are cancelled, or abandoned
+    (result discarded) if already running. Calls that find the pool full are
+    skipped. Results are returned in configuration order.
+    """
+    health = get_health_registry()
+    cache = get_response_cache()
+    candidates = []
+    for vendor in vendors:
+        if vendor not in impls:
+            print(f"INFO: Vendor '{vendor}' not supported for method '{method}', skipping in fan-out")
+            continue
+        for impl in _impl_list(impls, vendor):
+            health_key = _health_key(impls, vendor, impl)
+            params = _call_params(impl, args, kwargs)
+            if cache is not None:
+                hit, cached = cache.get(method, health_key, params)
+                if hit:
+                    print(f"CACHE HIT: {_impl_name(impl)} from vendor '{vendor}'")
+                    candidates.append((vendor, impl, params, True, cached))
+                    continue
+            if not health.allow(health_key, method):
+                print(f"SKIP: {_impl_name(impl)} from vendor '{vendor}' skipped (circuit open)")
+                continue
+            candidates.append((vendor, impl, params, False, None))
+
+    if not candidates:
+        return []
+
+    needed = _needed_results(policy, len(candidates))
+    print(f"DEBUG: Fan-out {method} to {len(candidates)} call(s), mode={policy['mode']}, need {needed}")
+
+    results = {}
+    pool = get_fanout_pool()
+    calls = {}
+    for idx, (vendor, impl, params, is_cached, cached) in enumerate(candidates):
+        if is_cached:
+            results[idx] = cached
+            continue
+        if len(results) >= needed:
+            break
+        call = pool.try_submit(_run_impl, impl, args, kwargs)
+        if call is None:
+            print(f"SKIP: {_impl_name(impl)} from vendor '{vendor}' skipped (fan-out pool saturated, "
+                  f"{pool.abandoned} abandoned call(s) still running)")
+            continue
+        calls[call.future] = (idx, vendor, impl, params, call, _get_call_timeout(vendor, impl, policy))
+
+    pending = set(calls)
+    while pending and len(results) < needed:
+        now = time.monotonic()
+        waits = []
+        for future in pending:
+            call, timeout = calls[future][4], calls[future][5]
+            if timeout:
+                # A call still queued is rechecked after a full timeout
+                waits.append(timeout - call.elapsed(now) if call.started is not None else timeout)
+        wait_for = max(0.0, min(waits)) if waits else None
+        done, pending = concurrent.futures.wait(
+            pending, timeout=wait_for, return_when=concurrent.futures.FIRST_COMPLETED
+        )
+
+        # Every finished call is recorded and cached, even past the quorum
+        for future in done:
+            idx, vendor, impl, params, call, _ = calls[future]
+            health_key = _health_key(impls, vendor, impl)
+            elapsed = call.elapsed()
+            try:
+                result = future.result()
+                if is_error_result(result):
+                    health.record_failure(health_key, method, elapsed)
+                    if errors is not None:
+                        errors.append(result)
+                    print(f"FAILED: {_impl_name(impl)} from vendor '{vendor}' returned an error: {result.strip()[:200]}")
+                    continue
+                health.record_success(health_key, method, elapsed)
+                _cache_store(cache, method, category, health_key, params, result)
+                print(f"SUCCESS: {_impl_name(impl)} from vendor '{vendor}' completed in {elapsed:.2f}s")
+                if len(results) < needed:
+                    results[idx] = result
+            except AlphaVantageRateLimitError as e:
+                health.record_failure(health_key, method, elapsed, rate_limited=True)
+                print(f"RATE_LIMIT: {_impl_name(impl)} from vendor '{vendor}' hit rate limit: {e}")
+            except Exception as e:
+                health.record_failure(health_key, method, elapsed)
+                print(f"FAILED: {_impl_name(impl)} from vendor '{vendor}' failed: {e}")
+
+        now = time.monotonic()
+        expired = {f for f in pending if calls[f][4].expired(calls[f][5], now)}
+        for future in expired:
+            _, vendor, impl, _, call, timeout = calls[future]
+            health.record_failure(_health_key(impls, vendor, impl), method, call.elapsed(now))
+            pool.abandon(call)
+            print(f"TIMEOUT: {_impl_name(impl)} from vendor '{vendor}' exceeded its {timeout}s timeout, abandoning")
+        pending -= expired
+
+    # Cancel losing calls once the policy is satisfied
+    for future in pending:
+        _, vendor, impl, _, call, _ = calls[future]
+        if pool.abandon(call):
+            print(f"DEBUG: Abandoning in-flight {_impl_name(impl)} from vendor '{vendor}'")
+
+    return [results[idx] for idx in sorted(results)]
+
+
+# ==========================================
+# Async routing
+# ==========================================
+
+async def aroute(method: str, category: str, impls: dict, primary_vendors: list, fallback_vendors: list,
+                 policy: dict, args, kwargs):
+    """Async counterpart of route (see aroute_to_vendor)."""
+    results = []
+    errors = []
+    if policy["mode"] != "sequential":
+        results = await aroute_concurrent(method, category, impls, primary_vendors, policy, args, kwargs, errors)
+        if results:
+            print(f"FINAL: Method '{method}' completed with {len(results)} result(s) from concurrent fan-out")
+            return combine_results(results)
+        print(f"FAILED: Concurrent fan-out produced no results for {method}, falling back sequentially")
+        fallback_vendors = [v for v in fallback_vendors if v not in primary_vendors]
+
+    vendor_attempt_count = 0
+    for vendor in fallback_vendors:
+        if vendor not in impls:
+            if vendor in primary_vendors:
+                print(f"INFO: Vendor '{vendor}' not supported for method '{method}', falling back to next vendor")
+            continue
+
+        vendor_attempt_count += 1
+        vendor_results = []
+        for impl in _impl_list(impls, vendor):
+            ok, result = await _ainvoke(method, category, impls, vendor, impl, args, kwargs,
+                                        _get_call_timeout(vendor, impl, policy))
+            if ok:
+                vendor_results.append(result)
+            elif is_error_result(result):
+                errors.append(result)
+
+        if vendor_results:
+            results.extend(vendor_results)
+            print(f"SUCCESS: Vendor '{vendor}' succeeded - Got {len(vendor_results)} result(s)")
+            if len(primary_vendors) == 1:
+                break
+        else:
+            print(f"FAILED: Vendor '{vendor}' produced no results")
+
+    if not results and errors:
+        print(f"FAILURE: All {vendor_attempt_count} vendor attempts failed for method '{method}', returning their error replies")
+        return combine_results(errors)
+    if not results:
+        print(f"FAILURE: All {vendor_attempt_count} vendor attempts failed for method '{method}'")
+        raise RuntimeError(f"All vendor implementations failed for method '{method}'")
+
+    print(f"FINAL: Method '{method}' completed with {len(results)} result(s) from {vendor_attempt_count} vendor attempt(s)")
+    return combine_results(results)
+
+
+async def _acall(impl, args, kwargs):
+    """Await coroutine vendors directly; run sync vendors on the shared bounded pool."""
+    if inspect.iscoroutinefunction(impl):
+        return await impl(*args, **kwargs)
+    loop = asyncio.get_running_loop()
+    result = await loop.run_in_executor(_get_executor(), functools.partial(impl, *args, **kwargs))
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+async def _ainvoke(method: str, category: str, impls: dict, vendor: str, impl, args, kwargs, timeout=None):
+    """Run one implementation through the cache, circuit breaker and timeout. Returns (ok, result).
+
+    An error reply comes back as (False, reply).
+    """
+    health = get_health_registry()
+    cache = get_response_cache()
+    health_key = _health_key(impls, vendor, impl)
+    params = _call_params(impl, args, kwargs)
+    name = _impl_name(impl)
+
+    if cache is not None:
+        hit, cached = cache.get(method, health_key, params)
+        if hit:
+            print(f"CACHE HIT: {name} from vendor '{vendor}'")
+            return True, cached
+
+    if not health.allow(health_key, method):
+        print(f"SKIP: {name} from vendor '{vendor}' skipped (circuit open)")
+        return False, None
+
+    started = time.monotonic()
+    try:
+        print(f"DEBUG: Calling {name} from vendor '{vendor}'...")
+        result = await asyncio.wait_for(_acall(impl, args, kwargs), timeout)
+    except asyncio.TimeoutError:
+        health.record_failure(health_key, method, time.monotonic() - started)
+        print(f"TIMEOUT: {name} from vendor '{vendor}' exceeded its timeout, cancelled")
+        return False, None
+    except AlphaVantageRateLimitError as e:
+        health.record_failure(health_key, method, time.monotonic() - started, rate_limited=True)
+        print(f"RATE_LIMIT: {name} from vendor '{vendor}' hit rate limit: {e}")
+        return False, None
+    except Exception as e:
+        health.record_failure(health_key, method, time.monotonic() - started)
+        print(f"FAILED: {name} from vendor '{vendor}' failed: {e}")
+        return False, None
+
+    elapsed = time.monotonic() - started
+    if is_error_result(result):
+        health.record_failure(health_key, method, elapsed)
+        print(f"FAILED: {name} from vendor '{vendor}' returned an error: {result.strip()[:200]}")
+        return False, result
+    health.record_success(health_key, method, elapsed)
+    _cache_store(cache, method, category, health_key, params, result)
+    print(f"SUCCESS: {name} from vendor '{vendor}' completed in {elapsed:.2f}s")
+    return True, result
+
+
+async def aroute_concurrent(method: str, category: str, impls: dict, vendors: list, policy: dict, args, kwargs,
+                            errors: Optional[list] = None) -> list:
+    """Async fan-out with the same policies as route_concurrent; losers are cancelled."""
+    candidates = []
+    for vendor in vendors:
+        if vendor not in impls:
+            print(f"INFO: Vendor '{vendor}' not supported for method '{method}', skipping in fan-out")
+            continue
+        candidates.extend((vendor, impl) for impl in _impl_list(impls, vendor))
+
+    if not candidates:
+        return []
+
+    needed = _needed_results(policy, len(candidates))
+    print(f"DEBUG: Fan-out {method} (async) to {len(candidates)} call(s), mode={policy['mode']}, need {needed}")
+
+    tasks = {}
+    for idx, (vendor, impl) in enumerate(candidates):
+        timeout = _get_call_timeout(vendor, impl, policy)
+        task = asyncio.ensure_future(_ainvoke(method, category, impls, vendor, impl, args, kwargs, timeout))
+        tasks[task] = idx
+
+    results = {}
+    pending = set(tasks)
+    while pending and len(results) < needed:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            if len(results) >= needed:
+                break
+            ok, result = task.result()
+            if ok:
+                results[tasks[task]] = result
+            elif errors is not None and is_error_result(result):
+                errors.append(result)
+
+    # Cancel losing calls once the policy is satisfied
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    return [results[idx] for idx in sorted(results)]
@@ -0,0 +1,170 @@
+"""
+Shared yfinance gateway.
+
+Every Yahoo Finance call in the app goes through one `YFinanceGateway`:
+
+- one HTTP session for all `yf.Ticker` objects and `yf.download` calls, so
+  cookies / crumb and connections are reused instead of renegotiated per
+  caller;
+- per-host concurrency limits enforced inside that session (every request
+  yfinance makes, including its internal cookie / crumb fetches, waits for a
+  slot of its host), so bursts from the API, the graph and the schedulers
+  stay below Yahoo's throttling threshold;
+- identical requests already in flight (same ticker + parameters) are
+  coalesced with `SingleFlight`;
+- `download_batch` turns many single-ticker history requests into a few
+  multi-ticker `yf.download` calls.
+"""
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import pandas as pd
+import yfinance as yf
+
+from .config import get_config
+from .utils import SingleFlight
+
+try:
+    from curl_cffi import requests as _http
+
+    _SESSION_BASE = _http.Session
+    _SESSION_KWARGS = {"impersonate": "chrome"}
+except ImportError:  # older yfinance works with plain requests
+    import requests as _http
+
+    _SESSION_BASE = _http.Session
+    _SESSION_KWARGS = {}
+
+
+class HostLimiter:
+    """Bounded number of concurrent requests per host."""
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None, default: int = 4):
+        self.limits = dict(limits or {})
+        self.default = max(int(default), 1)
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def _semaphore(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            sem = self._semaphores.get(host)
+            if sem is None:
+                sem = self._semaphores[host] = threading.BoundedSemaphore(max(int(self.limits.get(host, self.default)), 1))
+            return sem
+
+    @contextmanager
+    def slot(self, url: str):
+        sem = self._semaphore(urlparse(url).netloc.lower())
+        with sem:
+            yield
+
+
+class _LimitedSession(_SESSION_BASE):
+    """HTTP session that takes a per-host slot around every request."""
+
+    def __init__(self, limiter: HostLimiter, **kwargs):
+        super().__init__(**kwargs)
+        self._limiter = limiter
+
+    def request(self, method, url, *args, **kwargs):
+        with self._limiter.slot(url):
+            return super().request(method, url, *args, **kwargs)
+
+
+def _key(*parts, **kwargs) -> Tuple:
+    return parts + tuple(sorted((k, str(v)) for k, v in kwargs.items()))
+
+
+class YFinanceGateway:
+    """Single entry point for Yahoo Finance (shared session, host limits, de-duplication)."""
+
+    def __init__(self, host_limits: Optional[Dict[str, int]] = None, default_limit: int = 4,
+                 batch_size: int = 50, session=None):
+        self.limiter = HostLimiter(host_limits, default_limit)
+        self.session = session if session is not None else _LimitedSession(self.limiter, **_SESSION_KWARGS)
+        self.batch_size = max(int(batch_size), 1)
+        self.flight = SingleFlight()
+
+    # ---------- objects ----------
+
+    def ticker(self, symbol: str) -> "yf.Ticker":
+        """yf.Ticker bound to the shared session (for statements, holders, ...)."""
+        return yf.Ticker(symbol, session=self.session)
+
+    # ---------- de-duplicated calls ----------
+
+    def history(self, symbol: str, **kwargs) -> pd.DataFrame:
+        return self.flight.do(_key("history", symbol, **kwargs), lambda: self.ticker(symbol).history(**kwargs))
+
+    def info(self, symbol: str) -> dict:
+        return self.flight.do(_key("info", symbol), lambda: self.ticker(symbol).get_info())
+
+    def news(self, symbol: str):
+        return self.flight.do(_key("news", symbol), lambda: self.ticker(symbol).get_news())
+
+    def download(self, tickers, **kwargs) -> pd.DataFrame:
+        """yf.download on the shared session; identical concurrent downloads run once."""
+        kwargs.setdefault("progress", False)
+        names = tickers if isinstance(tickers, str) else ",".join(tickers)
+        return self.flight.do(
+            _key("download", names, **kwargs),
+            lambda: yf.download(tickers, session=self.session, **kwargs),
+        )
+
+    # ---------- batching ----------
+
+    def download_batch(self, requests_: Iterable[Tuple[str, str, str]], **kwargs) -> Dict[str, pd.DataFrame]:
+        """Daily history for many (symbol, start, end) requests in few multi-ticker downloads.
+
+        Requests with the same range share a download (up to `batch_size`
+        tickers each). `end` is exclusive, as in yf.download. Returns
+        {symbol: frame}; a symbol Yahoo has no bars for gets an empty frame.
+        """
+        by_range: Dict[Tuple[str, str], List[str]] = {}
+        for symbol, start, end in requests_:
+            symbols = by_range.setdefault((start, end), [])
+            if symbol not in symbols:
+                symbols.append(symbol)
+
+        results: Dict[str, pd.DataFrame] = {}
+        for (start, end), symbols in by_range.items():
+            for i in range(0, len(symbols), self.batch_size):
+                chunk = symbols[i:i + self.batch_size]
+                data = self.download(chunk, start=start, end=end, group_by="ticker", **kwargs)
+                for symbol in chunk:
+                    results[symbol] = split_download(data, symbol)
+        return results
+
+
+def split_download(data: Optional[pd.DataFrame], symbol: str) -> pd.DataFrame:
+    """One ticker's frame out of a (possibly multi-ticker) yf.download result."""
+    if data is None or data.empty:
+        return pd.DataFrame()
+    if isinstance(data.columns, pd.MultiIndex):
+        level = 0 if symbol in data.columns.get_level_values(0) else 1
+        if symbol not in data.columns.get_level_values(level):
+            return pd.DataFrame()
+        frame = data.xs(symbol, axis=1, level=level)
+    else:
+        frame = data
+    return frame.dropna(how="all")
+
+
+_gateway: Optional[YFinanceGateway] = None
+_gateway_lock = threading.Lock()
+
+
+def get_yf_gateway() -> YFinanceGateway:
+    """Process-wide yfinance gateway (settings under "yfinance" in the config)."""
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            settings = get_config().get("yfinance", {})
+            _gateway = YFinanceGateway(
+                host_limits=settings.get("host_limits"),
+                default_limit=settings.get("default_host_limit", 4),
+                batch_size=settings.get("batch_size", 50),
+            )
+        return _gateway
@@ -7,6 +7,7 @@ import pandas as pd
 from functools import wraps
 
 from .utils import save_output, SavePathType, decorate_all_methods
+from .yf_gateway import get_yf_gateway
 
 
 def init_ticker(func: Callable) -> Callable:
@@ -14,7 +15,7 @@ def init_ticker(func: Callable) -> Callable:
 
     @wraps(func)
     def wrapper(symbol: Annotated[str, "ticker symbol"], *args, **kwargs) -> Any:
-        ticker = yf.Ticker(symbol)
+        ticker = get_yf_gateway().ticker(symbol)
         return func(ticker, *args, **kwargs)
 
     return wrapper
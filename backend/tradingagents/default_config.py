@@ -65,4 +65,195 @@ DEFAULT_CONFIG = {
         "get_indicators": "local",
         "get_fundamentals": "local",
     },
+    # Routing policy per tool method (default: "sequential" fallback).
+    # Concurrent modes fan out to every implementation of the primary vendor(s)
+    # at once and fall back sequentially only if none of them succeed.
+    #   mode: "sequential" | "first_success" | "quorum" | "gather_all"
+    #   quorum: successful results to wait for in "quorum" mode
+    #   timeout: default per-call timeout in seconds
+    "vendor_routing": {
+        "get_news": {"mode": "gather_all", "timeout": 30},
+        "get_global_news": {"mode": "gather_all", "timeout": 30},
+    },
+    # Per-call timeouts (seconds) keyed by vendor name or implementation
+    # function name; takes precedence over the method policy timeout.
+    "vendor_timeouts": {
+        # Example: "alpha_vantage": 15,
+        # Example: "get_ryt9_company_news": 20,
+    },
+    # Worker pool for sync vendors called from the async routes.
+    "vendor_max_workers": 16,
+    # Separate pool for the concurrent fan-out modes. A timed-out or losing
+    # call keeps its worker until it returns; while every worker is taken,
+    # further fan-out calls are skipped (sequential fallback still runs).
+    "vendor_fanout_workers": 8,
+    # Shared deadline (seconds) for the concurrent provider fetch in
+    # compare_stock_providers; providers that miss it score 0 and count as a
+    # failed call in the vendor ranking. Late calls keep one of the
+    # provider_fetch_workers threads until they return.
+    "provider_fetch_deadline": 30,
+    "provider_fetch_workers": 8,
+    # Circuit breakers per (vendor, method): skip a vendor for a cool-down
+    # window after repeated failures or a quota/rate-limit error.
+    "circuit_breaker": {
+        "failure_threshold": 3,
+        "error_rate_threshold": 0.5,
+        "min_calls": 5,
+        "window_size": 20,
+        "cooldown_seconds": 60,
+        "rate_limit_cooldown_seconds": 900,
+    },
+    # Shared Alpha Vantage client: pacing and quota of the API tier, checked
+    # before a request is sent (free tier: 5/min, 25/day; None = unlimited).
+    "alpha_vantage": {
+        "requests_per_minute": 5,
+        "requests_per_day": 25,
+        "max_wait": 60,  # fail fast instead of waiting longer than this for a slot
+        "timeout": 30,
+        "quota_path": None,  # default: <data_cache_dir>/alpha_vantage_quota.json
+        # Raw response cache below _make_api_request (hits cost no quota).
+        # Freshness per function: "statement" (until the next fiscal period
+        # is due), "daily" (until the end of the UTC day), seconds, or None.
+        "cache": {
+            "enabled": True,
+            "path": None,  # default: <data_cache_dir>/alpha_vantage_cache.sqlite3
+            "max_entries": 5000,
+            "default_ttl": 3600,
+            "freshness": {
+                # Example: "NEWS_SENTIMENT": 600,
+            },
+        },
+    },
+    # Shared TvDatafeed sessions (tv_session.py); n_bars is sized from the
+    # requested start date instead of a fixed 5000.
+    "tradingview": {
+        "pool_size": 2,
+        "calendar_margin": 5,  # extra bars on top of the weekday count
+    },
+    # Per-symbol fundamentals for pick_fundamental_source (fundamentals_store.py):
+    # overview fields expire after overview_ttl, statements only when a newer
+    # fiscal period / earnings date shows up (or the next report is overdue,
+    # then rechecked every recheck_after seconds).
+    "fundamentals_store": {
+        "enabled": True,
+        "path": None,  # default: <data_cache_dir>/fundamentals
+        "overview_ttl": 6 * 3600,
+        "recheck_after": 24 * 3600,
+    },
+    # Multi-year statement history for pick_fundamental_source_10years
+    # (fundamentals_history.py): one columnar table per symbol, vendors are
+    # only asked for periods newer than the held ones once they are due.
+    "fundamentals_history": {
+        "enabled": True,
+        "path": None,  # default: <data_cache_dir>/fundamentals_history
+        "freqs": ["annual", "quarterly"],
+        "recheck_after": 24 * 3600,
+    },
+    # Threads per fundamentals vendor (dataflows/vendor_pool.py): overview,
+    # statements and their sub-requests all share the vendor's pool.
+    "fundamentals_concurrency": {
+        "yfinance": 4,
+        "finnhub": 2,
+        "alphavantage": 4,
+    },
+    # In-process stockstats frames (stockstats_utils.py): one per symbol for
+    # the day, at most memo_size symbols (least recently used dropped).
+    "stockstats": {
+        "memo_size": 16,
+    },
+    # Write-behind artifact writer (artifact_writer.py): JSON / JSONL dumps and
+    # report-log lines are written by one background thread in batches.
+    "artifact_writer": {
+        "enabled": True,  # False = write synchronously on the caller's thread
+        "max_queue": 1000,  # callers block when this many writes are pending
+        "batch_size": 64,
+    },
+    # Shared yfinance gateway (yf_gateway.py): one session for every Yahoo
+    # call, concurrent requests capped per host.
+    "yfinance": {
+        "host_limits": {
+            "query1.finance.yahoo.com": 4,
+            "query2.finance.yahoo.com": 4,
+        },
+        "default_host_limit": 4,
+        "batch_size": 50,  # tickers per multi-ticker download
+    },
+    # Shared TwelveData client (twelve_data.get_td_client). Every symbol in a
+    # time_series request costs one credit; batches never exceed the minute budget.
+    "twelvedata": {
+        "credits_per_minute": 8,
+        "max_symbols_per_call": 8,
+        "max_wait": 60,
+        "timeout": 30,
+    },
+    # Persistent response cache underneath route_to_vendor (SQLite file).
+    "response_cache": {
+        "enabled": True,
+        "path": None,  # default: <data_cache_dir>/response_cache.sqlite3
+        "max_entries": 5000,
+        # TTL in seconds per category, overridable per method (None = keep until evicted)
+        "ttl": {
+            "core_stock_apis": None,
+            "technical_indicators": 24 * 3600,
+            "fundamental_data": 24 * 3600,
+            "news_data": 15 * 60,
+            "get_insider_sentiment": 24 * 3600,
+            "get_insider_transactions": 24 * 3600,
+        },
+        # Requests whose date range reaches today are capped at this TTL
+        "open_range_ttl": 15 * 60,
+    },
+    # compare_stock_providers: return the per-bar median of all providers
+    # (with a Sources provenance column) instead of the single best provider.
+    "stock_consensus": False,
+    # Local incremental OHLCV store (daily bars per provider/symbol with a
+    # coverage manifest); only missing days are fetched from the providers.
+    "ohlcv_store": {
+        "enabled": True,
+        "path": None,  # default: <data_cache_dir>/ohlcv
+    },
+    # Local indicator engine behind get_all_indicators_batch: one OHLCV fetch,
+    # every indicator computed in a single pass. Every `cross_check_every`
+    # batches one indicator is compared with yfinance/stockstats (0 = never).
+    "indicator_engine": {
+        "enabled": True,
+        "history_days": 420,  # calendar days fetched before the report window
+        "cross_check_every": 10,
+        "cross_check_tolerance": 0.01,
+    },
+    # Persisted per-symbol streaming indicator state (rolling sums, EMA and
+    # Wilder averages): a daily batch only feeds the new bars. `verify`
+    # rebuilds from full history and checks every streamed row against the
+    # batch engine.
+    "indicator_state": {
+        "enabled": True,
+        "path": None,  # default: <data_cache_dir>/indicator_state
+        "history_bars": 30,  # recent rows kept for report windows
+        "verify": False,
+    },
+    # Weekly / monthly indicators resampled from one daily series
+    # (core_calculator.process_multi_timeframe); enough history for a monthly MACD.
+    "multi_timeframe": {
+        "history_days": 1825,
+        "timeframes": ["daily", "weekly", "monthly"],
+    },
+    # Shared symbol -> market resolver (seeded from api/stock_data.STOCK_LISTS,
+    # learned entries persisted to <data_cache_dir>/symbol_cache.json).
+    "symbol_resolver": {
+        "path": None,
+        "negative_ttl": 24 * 3600,  # re-probe unknown symbols after this many seconds
+    },
+    # Learned vendor ranking per (market, data type) for the provider
+    # comparisons in core_stock_price / core_indicator. After warm-up only the
+    # best ranked vendor is called (falling back down the ranking), with a full
+    # comparison every `explore_every` calls to keep the scores fresh.
+    "vendor_ranking": {
+        "enabled": True,
+        "path": None,  # default: <data_cache_dir>/vendor_ranking.json
+        "alpha": 0.3,  # EWMA weight of the newest observation
+        "warmup_samples": 5,
+        "explore_every": 20,
+        "agreement_bucket": 0.05,  # agreement gaps below this are ties; the faster vendor wins
+        "flush_interval": 5,  # seconds between writes of the JSON file (flushed at exit too)
+    },
 }
\ No newline at end of file
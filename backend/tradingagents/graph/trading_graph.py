@@ -26,11 +26,13 @@ from tradingagents.agents.utils.agent_states import (
     RiskDebateState,
 )
 from tradingagents.dataflows.config import set_config
+from tradingagents.dataflows.artifact_writer import get_artifact_writer
 
 # Import the new abstract tool methods from agent_utils
 from tradingagents.agents.utils.agent_utils import (
     get_stock_data,
     get_indicators,
+    get_multi_timeframe_indicators,
     get_fundamentals,
     get_balance_sheet,
     get_cashflow,
@@ -181,6 +183,7 @@ class TradingAgentsGraph:
                     get_stock_data,
                     # Technical indicators
                     get_indicators,
+                    get_multi_timeframe_indicators,
                 ]
             ),
             "social": ToolNode(
@@ -493,6 +496,8 @@ class TradingAgentsGraph:
                 f.write(str(sum_final_decision))
                 
             print("📝 Sent telegram...")    
+            # รอให้ log ที่ยังค้างในคิว write-behind ลงไฟล์ก่อนอ่าน
+            get_artifact_writer().flush()
             with open("all_report_message.txt", "r", encoding="utf-8") as f:
                 report_messages = f.read()
                 sent_to_telegram(report_messages)